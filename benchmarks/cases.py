@@ -0,0 +1,228 @@
+r"""Benchmark cases for the distributed primitives and layers.
+
+Each case builds, for one partition layout, tensor size and dtype, the module
+to benchmark and the local input of the current worker.  Cases are
+registered with :any:`case`, under the name used on the command line.
+
+A layout is a dict of partition shapes, a function of the number of workers
+``n``.  Tensor sizes are the approximate number of elements of the global
+input tensor.
+
+"""
+
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from mpi4py import MPI
+
+import distdl.nn as dnn
+from distdl.nn.mixins.conv_mixin import ConvMixin
+from distdl.nn.mixins.halo_mixin import HaloMixin
+from distdl.utilities.slicing import compute_subshape
+from distdl.utilities.torch import zero_volume_tensor
+
+CASES = dict()
+
+
+class Case:
+    r"""A registered benchmark case.
+
+    Parameters
+    ----------
+    name : str
+        Name of the case.
+    kind : str
+        ``"primitive"`` or ``"layer"``.
+    layouts : callable
+        Returns the list of layouts to benchmark on ``n`` workers.
+    build : callable
+        Returns the module, the local input and the partitions, to be
+        deactivated after the benchmark, for a partition of all workers, a
+        layout, a size and a dtype.
+
+    """
+
+    def __init__(self, name, kind, layouts, build):
+
+        self.name = name
+        self.kind = kind
+        self.layouts = layouts
+        self.build = build
+
+
+def case(name, kind, layouts):
+    r"""Registers the decorated builder as the benchmark case ``name``."""
+
+    def decorator(build):
+        CASES[name] = Case(name, kind, layouts, build)
+        return build
+
+    return decorator
+
+
+def _dims(n, d):
+    return list(MPI.Compute_dims(n, d))
+
+
+def _partition(P_world, shape):
+
+    P_base = P_world.create_partition_inclusive(np.arange(int(np.prod(shape))))
+    P = P_base.create_cartesian_topology_partition(shape)
+
+    return P, [P, P_base]
+
+
+def _input(P, global_shape, dtype):
+
+    if not P.active:
+        x = zero_volume_tensor(dtype=dtype)
+    else:
+        x = torch.randn(*compute_subshape(P.shape, P.index, global_shape), dtype=dtype)
+
+    return x.requires_grad_()
+
+
+def _matrix_shape(size):
+
+    # A [1, m, k] tensor with m * k ~ size
+    m = 2**(int(math.log2(size)) // 2)
+    return [1, m, max(1, size // m)]
+
+
+def _flat_layouts(n):
+    return [{"P_x": [1, 1, n]}, {"P_x": [1] + _dims(n, 2)}]
+
+
+@case("all_gather", "primitive", _flat_layouts)
+def all_gather(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+    module = dnn.AllGather(P_x, axes_all_gather=(2,))
+
+    return module, _input(P_x, _matrix_shape(size), dtype), partitions
+
+
+@case("reduce_scatter", "primitive", _flat_layouts)
+def reduce_scatter(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+    module = dnn.ReduceScatter(P_x, axes_reduce_scatter=(2,))
+
+    # Each worker holds a full-size contribution to the reduction
+    global_shape = _matrix_shape(size)
+    global_shape[2] *= layout["P_x"][2]
+
+    return module, _input(P_x, global_shape, dtype), partitions
+
+
+@case("all_sum_reduce", "primitive", _flat_layouts)
+def all_sum_reduce(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+    module = dnn.AllSumReduce(P_x, axes_reduce=(0, 1, 2))
+
+    # Each worker holds a full-size contribution to the reduction
+    global_shape = np.asarray(_matrix_shape(size)) * np.asarray(layout["P_x"])
+
+    return module, _input(P_x, global_shape, dtype), partitions
+
+
+@case("broadcast", "primitive", _flat_layouts)
+def broadcast(P_world, layout, size, dtype):
+
+    P_root, partitions = _partition(P_world, [1, 1, 1])
+    P_x, partitions_x = _partition(P_world, layout["P_x"])
+    module = dnn.Broadcast(P_root, P_x)
+
+    return module, _input(P_root, _matrix_shape(size), dtype), partitions + partitions_x
+
+
+@case("sum_reduce", "primitive", _flat_layouts)
+def sum_reduce(P_world, layout, size, dtype):
+
+    P_root, partitions = _partition(P_world, [1, 1, 1])
+    P_x, partitions_x = _partition(P_world, layout["P_x"])
+    module = dnn.SumReduce(P_x, P_root)
+
+    # Each worker holds a full-size contribution to the reduction
+    global_shape = np.asarray(_matrix_shape(size)) * np.asarray(layout["P_x"])
+
+    return module, _input(P_x, global_shape, dtype), partitions + partitions_x
+
+
+@case("repartition", "primitive",
+      lambda n: [{"P_x": [1, 1, n], "P_y": [1, n, 1]},
+                 {"P_x": [1] + _dims(n, 2), "P_y": [1, n, 1]}])
+def repartition(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+    P_y, partitions_y = _partition(P_world, layout["P_y"])
+    module = dnn.Repartition(P_x, P_y)
+
+    return module, _input(P_x, _matrix_shape(size), dtype), partitions + partitions_y
+
+
+class _ConvGeometry(HaloMixin, ConvMixin):
+    pass
+
+
+@case("halo_exchange", "primitive",
+      lambda n: [{"P_x": [1, 1, n, 1]}, {"P_x": [1, 1] + _dims(n, 2)}])
+def halo_exchange(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+
+    # The halos of a 3 x 3 convolution of a [1, 4, h, w] tensor
+    h = 2**(int(math.log2(max(1, size // 4))) // 2)
+    global_shape = np.array([1, 4, h, max(1, size // (4 * h))])
+    halo_shape, recv_buffer_shape, send_buffer_shape, _ = \
+        _ConvGeometry()._compute_exchange_info(global_shape, [1, 1, 3, 3], [1, 1, 1, 1], [0, 0, 0, 0],
+                                               [1, 1, 1, 1], P_x.active, P_x.shape, P_x.index)
+    module = dnn.HaloExchange(P_x, halo_shape, recv_buffer_shape, send_buffer_shape)
+
+    x = _input(P_x, global_shape, dtype)
+    if P_x.active:
+        padding = tuple(np.array(list(reversed(halo_shape)), dtype=int).flatten())
+        x = F.pad(x.detach(), pad=padding).requires_grad_()
+
+    return module, x, partitions
+
+
+@case("conv_feature_3d", "layer",
+      lambda n: [{"P_x": [1, 1] + _dims(n, 3)}, {"P_x": [1, 1, n, 1, 1]}])
+def conv_feature_3d(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+    module = dnn.DistributedFeatureConv3d(P_x, 4, 4, (3, 3, 3), padding=(1, 1, 1)).to(dtype)
+
+    d = max(2, round((size / 8)**(1 / 3)))
+
+    return module, _input(P_x, [2, 4, d, d, d], dtype), partitions
+
+
+@case("linear_all_gather_zero", "layer",
+      lambda n: [{"P_y": [1, 1, n]}, {"P_y": [_dims(n, 2)[1], 1, _dims(n, 2)[0]]}])
+def linear_all_gather_zero(P_world, layout, size, dtype):
+
+    P_y, partitions = _partition(P_world, layout["P_y"])
+
+    # The weights of a [f, f] linear layer, applied to 16 tokens
+    f = 2**round(math.log2(math.sqrt(size)))
+    module = dnn.DistributedLinearAllGatherZero(P_y, f, f, dtype=dtype)
+
+    return module, _input(P_y, [layout["P_y"][0], 16, f], dtype), partitions
+
+
+@case("batch_norm", "layer",
+      lambda n: [{"P_x": [n, 1, 1]}, {"P_x": [_dims(n, 2)[0], 1, _dims(n, 2)[1]]}])
+def batch_norm(P_world, layout, size, dtype):
+
+    P_x, partitions = _partition(P_world, layout["P_x"])
+
+    # Statistics of 8 features, over the batch and the last dimension
+    module = dnn.DistributedBatchNorm(P_x, 8, dtype=dtype)
+    batch = 2 * layout["P_x"][0]
+
+    return module, _input(P_x, [batch, 8, max(1, size // (8 * batch))], dtype), partitions
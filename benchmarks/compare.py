@@ -0,0 +1,103 @@
+r"""Compares benchmark results with a baseline and flags regressions.
+
+Run with, e.g.,
+    > python compare.py results.json baseline.json --tolerance 0.1
+
+Exits with status 1 if any case regressed.
+
+"""
+
+import argparse
+import json
+import sys
+
+from harness import key
+
+# Timings compared with the baseline, and how to read them from a result
+METRICS = {"setup": lambda result: result["setup_s"],
+           "forward": lambda result: result["forward_s"]["median"],
+           "backward": lambda result: result["backward_s"]["median"]}
+
+
+def compare(results, baseline, tolerance=0.1, min_delta=1e-4):
+    r"""Returns the regressions of ``results`` with respect to ``baseline``.
+
+    A timing regresses if it exceeds its baseline by more than the relative
+    ``tolerance`` and, to ignore the noise of very short timings, by more
+    than ``min_delta`` seconds.  Cases absent from the baseline are ignored.
+
+    Parameters
+    ----------
+    results : list
+        Results of :any:`harness.measure`.
+    baseline : list
+        Baseline results.
+    tolerance : float, optional
+        Relative tolerance.
+    min_delta : float, optional
+        Absolute tolerance, in seconds.
+
+    Returns
+    -------
+    List of dicts with the case, the metric, the baseline and new timings,
+    and their ratio, worst first.
+
+    """
+
+    reference = {key(result): result for result in baseline}
+
+    regressions = list()
+    for result in results:
+        base = reference.get(key(result))
+        if base is None:
+            continue
+        for metric, value in METRICS.items():
+            new = value(result)
+            old = value(base)
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append({"case": key(result),
+                                    "metric": metric,
+                                    "baseline_s": old,
+                                    "new_s": new,
+                                    "ratio": new / old if old > 0 else float("inf")})
+
+    regressions.sort(key=lambda regression: regression["ratio"], reverse=True)
+
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def report(regressions, file=sys.stdout):
+
+    if not regressions:
+        print("No regressions.", file=file)
+        return
+
+    print(f"{len(regressions)} regression(s):", file=file)
+    for regression in regressions:
+        print(f"  {regression['case']} {regression['metric']}: "
+              f"{regression['baseline_s'] * 1e3:.3f} ms -> {regression['new_s'] * 1e3:.3f} ms "
+              f"({regression['ratio']:.2f}x)", file=file)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", help="Results, as written by run.py.")
+    parser.add_argument("baseline", help="Baseline results, as written by run.py.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative tolerance.")
+    parser.add_argument("--min-delta", type=float, default=1e-4, help="Absolute tolerance, in seconds.")
+    args = parser.parse_args()
+
+    regressions = compare(load(args.results), load(args.baseline), args.tolerance, args.min_delta)
+    report(regressions)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+r"""Timing and measurement of one benchmark case on all workers.
+
+All times are those of the slowest worker: every timed region starts at a
+barrier and the per-worker times are max-reduced.  Setup, i.e., the
+construction of the module and its first forward and backward pass, where
+distdl allocates buffers and builds communication plans, is timed separately
+from the steady-state passes.
+
+"""
+
+import resource
+import time
+
+import numpy as np
+import torch
+
+from distdl.utilities import tracer
+
+
+def _barrier(P_world):
+    P_world._comm.Barrier()
+
+
+def _max(P_world, values):
+    return P_world.allreduce_data(np.asarray(values, dtype=np.float64), op="max")
+
+
+def _max_rss_mb():
+    # On Linux, the high-water mark of the resident set size is in kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _step(module, x, dy=None):
+
+    t0 = time.perf_counter()
+    y = module(x)
+    t1 = time.perf_counter()
+
+    if dy is None:
+        dy = torch.randn_like(y)
+    t2 = time.perf_counter()
+    y.backward(dy)
+    t3 = time.perf_counter()
+
+    return t1 - t0, t3 - t2, dy
+
+
+def _summary(times):
+    return {"median": float(np.median(times)), "min": float(np.min(times)), "max": float(np.max(times))}
+
+
+def measure(P_world, case, layout, size, dtype, warmup=2, repeats=10):
+    r"""Benchmarks one case on all workers of ``P_world``.
+
+    Parameters
+    ----------
+    P_world : Partition
+        Partition of all workers.
+    case : Case
+        Benchmark case.
+    layout : dict
+        Partition shapes.
+    size : int
+        Approximate number of elements of the global input tensor.
+    dtype : torch.dtype
+        Dtype of the tensors.
+    warmup : int, optional
+        Number of untimed steady-state passes.
+    repeats : int, optional
+        Number of timed steady-state passes.
+
+    Returns
+    -------
+    Dict of the results, the same on all workers.
+
+    """
+
+    rss_before = _max_rss_mb()
+
+    # Setup: construction, and the first pass
+    _barrier(P_world)
+    t0 = time.perf_counter()
+    module, x, partitions = case.build(P_world, layout, size, dtype)
+    _, _, dy = _step(module, x)
+    setup = time.perf_counter() - t0
+
+    for _ in range(warmup):
+        _step(module, x, dy)
+
+    forward = np.zeros(repeats)
+    backward = np.zeros(repeats)
+    for i in range(repeats):
+        _barrier(P_world)
+        forward[i], backward[i], _ = _step(module, x, dy)
+
+    # Volume of communication, from one traced pass
+    tracer.enable()
+    _step(module, x, dy)
+    tracer.disable()
+    nbytes = {"forward": 0, "backward": 0}
+    for event in tracer.events():
+        nbytes[event["cat"]] += event["args"]["bytes_sent"] + event["args"]["bytes_received"]
+    tracer.reset()
+
+    rss = _max_rss_mb()
+
+    # The slowest worker determines the time of a collective pass
+    reduced = _max(P_world, np.concatenate([[setup], forward, backward,
+                                            [nbytes["forward"], nbytes["backward"], rss, rss - rss_before]]))
+    setup = reduced[0]
+    forward = reduced[1:1 + repeats]
+    backward = reduced[1 + repeats:1 + 2 * repeats]
+    forward_bytes, backward_bytes, rss, rss_growth = reduced[1 + 2 * repeats:]
+
+    for P in partitions:
+        P.deactivate()
+
+    return {"case": case.name,
+            "kind": case.kind,
+            "layout": layout,
+            "size": size,
+            "dtype": str(dtype).replace("torch.", ""),
+            "workers": P_world.size,
+            "setup_s": setup,
+            "forward_s": _summary(forward),
+            "backward_s": _summary(backward),
+            "forward_bytes": int(forward_bytes),
+            "backward_bytes": int(backward_bytes),
+            "forward_GBps": forward_bytes / np.median(forward) / 1e9,
+            "backward_GBps": backward_bytes / np.median(backward) / 1e9,
+            "max_rss_MB": rss,
+            "rss_growth_MB": rss_growth}
+
+
+def key(result):
+    r"""Returns the identifier of a result, to match it with a baseline."""
+
+    layout = ",".join(f"{name}={'x'.join(str(s) for s in shape)}" for name, shape in sorted(result["layout"].items()))
+    return f"{result['case']}[{layout}][{result['size']}][{result['dtype']}][np={result['workers']}]"
@@ -0,0 +1,116 @@
+r"""Benchmarks the distdl primitives and layers.
+
+Sweeps the tensor sizes, dtypes and partition layouts of each case, and
+reports the setup time, the steady-state forward and backward latency, the
+bandwidth and the memory high-water mark as JSON.
+
+Run with, e.g.,
+    > mpirun -np 4 python run.py --output results.json
+    > mpirun -np 4 python run.py --cases all_gather repartition --sizes 65536 --baseline baseline.json
+
+With ``--baseline``, the results are compared with those of an earlier run,
+and the exit status is 1 if any case regressed.
+
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+import torch
+from cases import CASES
+from compare import compare
+from compare import load
+from compare import report
+from harness import key
+from harness import measure
+from mpi4py import MPI
+
+import distdl
+from distdl.backends.common.partition import MPIPartition
+from distdl.config import set_backend
+
+
+def parse_args():
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES),
+                        help="Cases to run.  Default: all.")
+    parser.add_argument("--kind", choices=["primitive", "layer"], default=None,
+                        help="Only run the cases of this kind.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[2**12, 2**16, 2**20],
+                        help="Approximate numbers of elements of the global input tensors.")
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "float64"], help="Tensor dtypes.")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed passes per case.")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed passes per case.")
+    parser.add_argument("--output", default=None, help="Path of the JSON results.  Default: standard output.")
+    parser.add_argument("--baseline", default=None, help="Results of an earlier run to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative tolerance of the comparison.")
+    parser.add_argument("--min-delta", type=float, default=1e-4,
+                        help="Absolute tolerance of the comparison, in seconds.")
+
+    return parser.parse_args()
+
+
+def main():
+
+    args = parse_args()
+
+    set_backend(backend_comm="mpi", backend_array="numpy")
+    torch.manual_seed(MPI.COMM_WORLD.Get_rank())
+
+    P_world = MPIPartition(MPI.COMM_WORLD)
+    root = P_world.rank == 0
+
+    cases = [CASES[name] for name in args.cases if args.kind is None or CASES[name].kind == args.kind]
+
+    # The first communication of the process is much slower than the
+    # following ones, so it is not recorded
+    if cases:
+        measure(P_world, cases[0], cases[0].layouts(P_world.size)[0], min(args.sizes), getattr(torch, args.dtypes[0]),
+                warmup=0, repeats=1)
+
+    results = list()
+    for case in cases:
+        for layout in case.layouts(P_world.size):
+            for size in args.sizes:
+                for dtype in args.dtypes:
+                    result = measure(P_world, case, layout, size, getattr(torch, dtype),
+                                     warmup=args.warmup, repeats=args.repeats)
+                    results.append(result)
+                    if root:
+                        print(f"{key(result)}: setup {result['setup_s'] * 1e3:.3f} ms, "
+                              f"forward {result['forward_s']['median'] * 1e3:.3f} ms, "
+                              f"backward {result['backward_s']['median'] * 1e3:.3f} ms",
+                              file=sys.stderr)
+
+    status = 0
+    if root:
+        output = {"meta": {"distdl": distdl.__version__,
+                           "torch": torch.__version__,
+                           "mpi": MPI.Get_library_version().rstrip("\x00").splitlines()[0],
+                           "host": platform.node(),
+                           "workers": P_world.size,
+                           "date": datetime.datetime.now().isoformat(timespec="seconds")},
+                  "results": results}
+        if args.output is None:
+            json.dump(output, sys.stdout, indent=1)
+        else:
+            with open(args.output, "w") as f:
+                json.dump(output, f, indent=1)
+
+        if args.baseline is not None:
+            regressions = compare(results, load(args.baseline), args.tolerance, args.min_delta)
+            report(regressions, file=sys.stderr)
+            status = 1 if regressions else 0
+
+    status = P_world._comm.bcast(status, root=0)
+    P_world.deactivate()
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
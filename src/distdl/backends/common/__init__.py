@@ -7,6 +7,7 @@ from .partition import MPIPartition as Partition  # noqa: F401
 from .tensor_comm import assemble_global_tensor_structure  # noqa: F401
 from .tensor_comm import assemble_global_tensor_structure_along_axis  # noqa: F401
 from .tensor_comm import broadcast_tensor_structure  # noqa: F401
+from .work import MPICollectiveWork as CollectiveWork  # noqa: F401
 
 operation_map = {
     "min": _MPI.MIN,
@@ -1,5 +1,7 @@
+import weakref
 from abc import ABC
 from abc import abstractmethod
+from collections import OrderedDict
 
 import numpy as np
 
@@ -147,3 +149,152 @@ class MPIBufferManager(ABC):
 
         """
         raise NotImplementedError(self.__class__.__name__ + '.request_buffers')
+
+
+class MPIBufferPool(ABC):
+    r"""Pool of reusable expandable buffers, for communication outputs.
+
+    Unlike the buffers handed out by a buffer manager, which are owned by a
+    layer and overwritten by its next call, an array acquired from a pool is
+    leased to the caller.  It can be wrapped, without a copy, as the output
+    tensor of a collective.  Its storage returns to the pool once the array,
+    and every tensor sharing its memory, has been garbage collected.
+
+    Storage is bucketed in size classes, so that arrays of similar volume
+    reuse the same buffers.  Classes are powers of two up to ``fine_volume``
+    elements and, above it, quarter steps between powers of two, so that
+    large arrays, e.g., gathered weights, waste at most a quarter of their
+    size.  Idle buffers are evicted, least recently used first, once their
+    total size exceeds a limit.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Maximum total size, in bytes, of idle buffers kept by the pool.
+    fine_volume : int, optional
+        Volume, in elements, above which size classes are quarter steps.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Maximum total size, in bytes, of idle buffers kept by the pool.
+    free_bytes : int
+        Total size, in bytes, of idle buffers currently kept by the pool.
+
+    """
+
+    def __init__(self, max_bytes=2**32, fine_volume=2**20):
+
+        self.max_bytes = max_bytes
+        self.free_bytes = 0
+        self.fine_volume = fine_volume
+
+        # Idle buffers, keyed by (dtype, capacity) size class
+        self._buckets = dict()
+
+        # Idle buffers, in order of release, for LRU eviction
+        self._lru = OrderedDict()
+
+        # Buffers released by the garbage collector, which may run at any
+        # point, are only recorded here and returned to the pool later.
+        self._released = list()
+
+    @abstractmethod
+    def _create_buffer(self, dtype, capacity):
+        r"""Creates a new expandable buffer with the given capacity."""
+        raise NotImplementedError(self.__class__.__name__ + '._create_buffer')
+
+    def _size_class(self, volume):
+
+        size = 1 << int(volume - 1).bit_length()
+        if size <= self.fine_volume:
+            return size
+
+        # Multiples of a quarter of the next lower power of two
+        step = size >> 3
+        return -(-volume // step) * step
+
+    def _nbytes(self, buff):
+
+        return buff.capacity * np.dtype(buff.dtype).itemsize
+
+    def _reclaim(self):
+
+        while self._released:
+            buff = self._released.pop()
+
+            # A buffer larger than the limit would only flush the others
+            if self._nbytes(buff) > self.max_bytes:
+                continue
+
+            key = (buff.dtype, buff.capacity)
+            self._buckets.setdefault(key, list()).append(buff)
+            self._lru[id(buff)] = buff
+            self.free_bytes += self._nbytes(buff)
+
+        self.trim(self.max_bytes)
+
+    def trim(self, max_bytes=0):
+        r"""Evicts idle buffers, least recently used first.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Size, in bytes, of idle buffers to keep.  By default, all idle
+            buffers are evicted.
+
+        """
+
+        while self.free_bytes > max_bytes and self._lru:
+            _, buff = self._lru.popitem(last=False)
+            self._buckets[(buff.dtype, buff.capacity)].remove(buff)
+            self.free_bytes -= self._nbytes(buff)
+
+    def request_array(self, shape, dtype):
+        r"""Leases an uninitialized, contiguous array from the pool.
+
+        Parameters
+        ----------
+        shape : iterable
+            Shape of the array.
+        dtype : numpy.dtype
+            Data type of the array.
+
+        Returns
+        -------
+        An array with the requested shape and data type.
+
+        Warning
+        -------
+        The lease is tied to the returned array object.  NumPy views derived
+        from it do not extend the lease, so the array itself must be kept
+        alive, e.g., by wrapping it with `torch.from_numpy`, for as long as
+        its memory is in use.
+
+        """
+
+        self._reclaim()
+
+        shape = tuple(int(s) for s in shape)
+        volume = int(np.prod(shape))
+        dtype = np.dtype(dtype)
+
+        if volume == 0:
+            return self._create_buffer(dtype, 0).raw_buffer.reshape(shape)
+
+        key = (dtype, self._size_class(volume))
+        bucket = self._buckets.get(key)
+        if bucket:
+            # Reuse the most recently released buffer of this size class
+            buff = bucket.pop()
+            del self._lru[id(buff)]
+            self.free_bytes -= self._nbytes(buff)
+        else:
+            buff = self._create_buffer(*key)
+
+        # A fresh view, rather than one cached by the buffer, so that its
+        # lifetime tracks that of the lease.
+        array = buff.raw_buffer[:volume].reshape(shape)
+        weakref.finalize(array, self._released.append, buff)
+
+        return array
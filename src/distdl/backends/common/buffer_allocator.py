@@ -92,3 +92,45 @@ def allocate_halo_exchange_buffers(buffer_manager, slices, recv_buffer_shape, se
         buffers_out.append(buffers_i)
 
     return buffers_out
+
+
+def allocate_neighborhood_exchange_buffers(buffer_manager, slices, dtype):
+    r"""Allocator for concurrent halo exchange buffers.
+
+    Parameters
+    ----------
+    slices : list
+        List of tuples (offset, bulk slice, ghost slice), one for each
+        neighbor.
+    dtype :
+        Data type of input/output tensors.
+
+    Returns
+    -------
+    List of (bulk buffer, ghost buffer) pairs, one for each neighbor.  A
+    buffer is None if the corresponding region is empty.
+
+    """
+
+    model_dtype = convert_torch_to_model_dtype(dtype)
+
+    # All exchanges are in flight at once, so each region needs its own buffer.
+    shapes = []
+    for offset, bulk_slice, ghost_slice in slices:
+        shapes.append(compute_nd_slice_shape(bulk_slice))
+        shapes.append(compute_nd_slice_shape(ghost_slice))
+
+    count = sum(1 for shape in shapes if np.prod(shape) > 0)
+    buffers = buffer_manager.request_buffers(count, dtype=model_dtype)
+
+    i = 0
+    buffers_out = []
+    for shape in shapes:
+        buff = None
+        if np.prod(shape) > 0:
+            buff = buffers[i]
+            buff.allocate_view(shape)
+            i += 1
+        buffers_out.append(buff)
+
+    return list(zip(buffers_out[0::2], buffers_out[1::2]))
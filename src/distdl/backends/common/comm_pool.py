@@ -0,0 +1,122 @@
+from mpi4py import MPI
+
+from distdl.backends.common.compare import check_null_comm
+from distdl.backends.common.compare import check_null_group
+
+
+def _world_ranks(group):
+    r"""Returns the ranks, in ``MPI_COMM_WORLD``, of the members of a group,
+    in the order of the group."""
+
+    world_group = MPI.COMM_WORLD.Get_group()
+    ranks = MPI.Group.Translate_ranks(group, list(range(group.Get_size())), world_group)
+    world_group.Free()
+
+    return tuple(int(r) for r in ranks)
+
+
+class MPICommunicatorPool:
+    r"""Process-wide pool of shared, reference counted MPI communicators.
+
+    Partitions over the same ordered set of workers, with the same topology,
+    share a single communicator, rather than creating a new one each time.
+    This bounds the number of communicators, and MPI context ids, used by deep
+    networks whose layers create identical partitions, and skips the
+    collective creation for all but the first of them.
+
+    A communicator is freed only when the last partition using it releases it.
+
+    Warning
+    -------
+    The decision to reuse a communicator is made locally by each worker, but
+    creating one is collective.  Thus, as is already the case for creation,
+    every member of a partition must release it, so that all members agree on
+    which communicators are in the pool.
+
+    """
+
+    def __init__(self):
+
+        # Map from key to [communicator, reference count]
+        self._entries = dict()
+
+        # Map from communicator handle to key, to find entries on release
+        self._keys = dict()
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def acquire(self, group, create, *topology):
+        r"""Returns a communicator for a group, creating it only if required.
+
+        Parameters
+        ----------
+        group : MPI group
+            Group of the workers in the communicator, in rank order.
+        create : callable
+            Function, taking no arguments, that creates the communicator.
+            It is called, collectively over ``group``, only if there is no
+            matching communicator in the pool.
+        topology : optional
+            Any hashable description of the topology of the communicator.
+
+        Returns
+        -------
+        The communicator.  Workers outside of ``group`` get the result of
+        ``create``, which is not pooled.
+
+        """
+
+        if check_null_group(group) or group.Get_rank() == MPI.UNDEFINED:
+            return create()
+
+        key = (_world_ranks(group),) + topology
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[1] += 1
+            return entry[0]
+
+        comm = create()
+        if not check_null_comm(comm):
+            self._entries[key] = [comm, 1]
+            self._keys[comm.py2f()] = key
+
+        return comm
+
+    def release(self, comm):
+        r"""Releases a reference to a communicator, freeing it if it was the
+        last one.
+
+        Parameters
+        ----------
+        comm : MPI communicator
+            Communicator to release.
+
+        Returns
+        -------
+        ``True`` if ``comm`` belongs to the pool, otherwise ``False``, in which
+        case the caller remains responsible for it.
+
+        """
+
+        if check_null_comm(comm):
+            return False
+
+        key = self._keys.get(comm.py2f())
+        if key is None:
+            return False
+
+        entry = self._entries[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._entries[key]
+            del self._keys[comm.py2f()]
+            entry[0].Free()
+
+        return True
+
+
+# Shared by all partitions in the process
+communicator_pool = MPICommunicatorPool()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Maximum number of dimensions that can be described by a packed header
+packed_metadata_capacity = 16
+
+# Number of leading header entries that precede the shape
+_n_fields = 3
+
+
+def packed_metadata_size(capacity=packed_metadata_capacity):
+    r"""Returns the length of a packed metadata header.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        Maximum number of dimensions the header can describe.
+
+    Returns
+    -------
+    The number of integers in the header.
+
+    """
+
+    return _n_fields + capacity
+
+
+def pack_metadata(dtype_id, shape, requires_grad=False,
+                  capacity=packed_metadata_capacity, fill=-1):
+    r"""Packs the description of an array into a single integer buffer.
+
+    The header has a fixed length, so workers that do not yet know the
+    dimension of the array can still post a matching receive, and all of
+    dtype, gradient requirement, dimension and shape travel in one message.
+    Its layout is ``[dtype_id, requires_grad, ndim, shape[0], ...]``, with
+    unused shape entries set to ``fill``.  All entries are non-negative,
+    except the padding, so a header can be moved with an ``MPI.MAX``
+    reduction against a buffer filled with ``-1``.
+
+    Parameters
+    ----------
+    dtype_id : int
+        Integer identifier of the dtype, from :any:`distdl.utilities.dtype`.
+    shape : iterable
+        Shape of the array.
+    requires_grad : bool, optional
+        Gradient requirement of the array.
+    capacity : int, optional
+        Maximum number of dimensions the header can describe.
+    fill : int, optional
+        Value of the unused shape entries.
+
+    Returns
+    -------
+    The packed header, as a NumPy ``int64`` array.
+
+    """
+
+    shape = [int(n) for n in shape]
+    if len(shape) > capacity:
+        raise ValueError(f"Packed metadata supports at most {capacity} dimensions, got {len(shape)}.")
+
+    header = np.full(packed_metadata_size(capacity), fill, dtype=np.int64)
+    header[0] = dtype_id
+    header[1] = 1 if requires_grad else 0
+    header[2] = len(shape)
+    header[_n_fields:_n_fields + len(shape)] = shape
+
+    return header
+
+
+def unpack_metadata(header):
+    r"""Unpacks a header created by :any:`pack_metadata`.
+
+    Parameters
+    ----------
+    header : array_like
+        The packed header.
+
+    Returns
+    -------
+    Tuple of the integer dtype identifier, the gradient requirement and the
+    shape, as a tuple of ints.
+
+    """
+
+    ndim = int(header[2])
+    shape = tuple(int(n) for n in header[_n_fields:_n_fields + ndim])
+
+    return int(header[0]), bool(header[1]), shape
@@ -1,12 +1,18 @@
+import itertools
+
 import numpy as np
 from mpi4py import MPI
 
 from distdl import backends
+from distdl.backends.common.comm_pool import communicator_pool
 from distdl.backends.common.compare import check_identical_comm
 from distdl.backends.common.compare import check_identical_group
 from distdl.backends.common.compare import check_null_comm
 from distdl.backends.common.compare import check_null_group
 from distdl.backends.common.compare import check_null_rank
+from distdl.backends.common.metadata import pack_metadata
+from distdl.backends.common.metadata import packed_metadata_size
+from distdl.backends.common.metadata import unpack_metadata
 from distdl.utilities.debug import print_sequential
 from distdl.utilities.dtype import intID_to_numpy_dtype_dict
 from distdl.utilities.dtype import numpy_to_intID_dtype_dict
@@ -79,6 +85,13 @@ class MPIPartition:
         Lexicographic identifiers in each Cartesian dimension.
     """
 
+    # Layout of the header used by `broadcast_data`: the root marker, the
+    # packed metadata and then room for a payload as large as the metadata, so
+    # that packed headers can themselves be broadcast in one message.
+    _broadcast_payload_offset = 1 + packed_metadata_size()
+    _broadcast_header_size = _broadcast_payload_offset + packed_metadata_size()
+    _broadcast_header_payload_bytes = 8 * packed_metadata_size()
+
     def __init__(self, comm=MPI.COMM_NULL, group=MPI.GROUP_NULL, root=None, device=None,
                  requested_device=None, initialize_backend_comm=False):
 
@@ -168,7 +181,9 @@ class MPIPartition:
         if self.active:
             if (self._comm != MPI.COMM_NULL and  # noqa W504
                 self._comm != MPI.COMM_WORLD):  # noqa E129
-                self._comm.Free()
+                # Shared communicators are only freed by their last user
+                if not communicator_pool.release(self._comm):
+                    self._comm.Free()
 
             if self._group != MPI.GROUP_NULL:
                 self._group.Free()
@@ -246,7 +261,10 @@ class MPIPartition:
         ranks = np.asarray(ranks)
         group = self._group.Incl(ranks)
 
-        comm = self._comm.Create_group(group)
+        # Workers outside of this partition cannot be in the new one
+        comm = MPI.COMM_NULL
+        if self.active:
+            comm = communicator_pool.acquire(group, lambda: self._comm.Create_group(group))
 
         return MPIPartition(comm, group, root=self._root, device=self.device)
 
@@ -281,7 +299,7 @@ class MPIPartition:
 
         group = MPI.Group.Union(self._group, other._group)
 
-        comm = self._root.Create_group(group)
+        comm = communicator_pool.acquire(group, lambda: self._root.Create_group(group))
 
         P_union = MPIPartition(comm, group, root=self._root, device=self.device)
         if initialize_backend_comm:
@@ -315,7 +333,9 @@ class MPIPartition:
 
         shape = np.asarray(shape)
         if self.active:
-            comm = self._comm.Create_cart(shape, **options)
+            comm = communicator_pool.acquire(self._group,
+                                             lambda: self._comm.Create_cart(shape, **options),
+                                             "cart", tuple(shape.tolist()), repr(sorted(options.items())))
             group = comm.Get_group()
 
             if not check_identical_group(self._group, group):
@@ -435,6 +455,10 @@ class MPIPartition:
 
         """
 
+        # Identical partitions share a communicator from the pool
+        def create_comm(group, tag):
+            return communicator_pool.acquire(group, lambda: P_union._comm.Create_group(group, tag=tag))
+
         # We will only do certain work if certain groups were created.
         has_send_group = not check_null_group(group_send)
         has_recv_group = not check_null_group(group_recv)
@@ -454,29 +478,29 @@ class MPIPartition:
             # cannot happen.  It may be linear time, but this is part of the
             # setup phase anyway.
             if recv_ranks[0] < send_ranks[0]:
-                comm_recv = P_union._comm.Create_group(group_recv, tag=recv_ranks[0])
+                comm_recv = create_comm(group_recv, recv_ranks[0])
                 P_recv = MPIPartition(comm_recv, group_recv, root=P_union._root,
                                       device=P_union.device)
-                comm_send = P_union._comm.Create_group(group_send, tag=send_ranks[0])
+                comm_send = create_comm(group_send, send_ranks[0])
                 P_send = MPIPartition(comm_send, group_send, root=P_union._root,
                                       device=P_union.device)
             else:
-                comm_send = P_union._comm.Create_group(group_send, tag=send_ranks[0])
+                comm_send = create_comm(group_send, send_ranks[0])
                 P_send = MPIPartition(comm_send, group_send, root=P_union._root,
                                       device=P_union.device)
-                comm_recv = P_union._comm.Create_group(group_recv, tag=recv_ranks[0])
+                comm_recv = create_comm(group_recv, recv_ranks[0])
                 P_recv = MPIPartition(comm_recv, group_recv, root=P_union._root,
                                       device=P_union.device)
         elif has_send_group and not has_recv_group and not same_send_recv_group:
-            comm_send = P_union._comm.Create_group(group_send, tag=send_ranks[0])
+            comm_send = create_comm(group_send, send_ranks[0])
             P_send = MPIPartition(comm_send, group_send, root=P_union._root,
                                   device=P_union.device)
         elif not has_send_group and has_recv_group and not same_send_recv_group:
-            comm_recv = P_union._comm.Create_group(group_recv, tag=recv_ranks[0])
+            comm_recv = create_comm(group_recv, recv_ranks[0])
             P_recv = MPIPartition(comm_recv, group_recv, root=P_union._root,
                                   device=P_union.device)
         else:  # if has_send_group and has_recv_group and same_send_recv_group
-            comm_send = P_union._comm.Create_group(group_send, tag=send_ranks[0])
+            comm_send = create_comm(group_send, send_ranks[0])
             P_send = MPIPartition(comm_send, group_send, root=P_union._root,
                                   device=P_union.device)
             P_recv = P_send
@@ -848,6 +872,11 @@ class MPIPartition:
         -------
         The broadcast data.
 
+        Note
+        ----
+        Small data, such as shapes or packed metadata headers, travels with its
+        description in a single collective.  Larger data requires a second one.
+
         """
 
         # If the data is coming from a different partition
@@ -856,48 +885,42 @@ class MPIPartition:
 
         if P_data is None:
             P_data = self
-            data_root = root
-        else:
-            # Find the root rank (on P_data) in the self communicator
-            rank_map = -1 * np.ones(self.size, dtype=int)
-            rank_map_data = np.array([-1], dtype=int)
-            if P_data.active:
-                rank_map_data[0] = P_data.rank
-            self._comm.Allgather(rank_map_data, rank_map)
-
-            if root in rank_map:
-                data_root = np.where(rank_map == root)[0][0]
-            else:
-                raise ValueError("Requested root rank is not in P_data.")
 
-        # Give everyone the dimension of the data array
-        data_dim = np.zeros(1, dtype=int)
-        if P_data.active and self.rank == data_root:
-            # Ensure that data is a numpy array
-            data = np.atleast_1d(data)
-            data_dim[0] = len(data.shape)
-        self._comm.Bcast(data_dim, root=data_root)
-
-        # Give everyone the shape of the data
-        data_shape = np.zeros(data_dim[0], dtype=int)
-        if P_data.active and self.rank == data_root:
+        # The root identifies itself, describes the data and, if it is small
+        # enough, includes the data itself in a single fixed-size header.  All
+        # other workers contribute zeros, so a bitwise-or reduction delivers
+        # the root's header to everyone, without first locating the root.
+        header = np.zeros(self._broadcast_header_size, dtype=np.int64)
+        if P_data.active and P_data.rank == root:
             # Ensure that data is a numpy array
             data = np.atleast_1d(data)
-            data_shape[:] = np.asarray(data.shape)
-        self._comm.Bcast(data_shape, root=data_root)
-
-        data_dtype = np.zeros(1, dtype=int)
-        if P_data.active and self.rank == data_root:
-            # Ensure that data is a numpy array
-            data_dtype[0] = numpy_to_intID_dtype_dict[data.dtype]
-        self._comm.Bcast(data_dtype, root=data_root)
-        data_dtype = intID_to_numpy_dtype_dict[data_dtype[0]]
-
-        out_data = np.zeros(data_shape, dtype=data_dtype)
-        if P_data.active and P_data.rank == root:
+            header[0] = self.rank + 1
+            header[1:self._broadcast_payload_offset] = \
+                pack_metadata(numpy_to_intID_dtype_dict[data.dtype], data.shape, fill=0)
+            if data.nbytes <= self._broadcast_header_payload_bytes:
+                payload = header[self._broadcast_payload_offset:].view(np.uint8)
+                payload[:data.nbytes] = np.ascontiguousarray(data).view(np.uint8).ravel()
+        self._comm.Allreduce(MPI.IN_PLACE, header, op=MPI.BOR)
+
+        if header[0] == 0:
+            raise ValueError("Requested root rank is not in P_data.")
+        data_root = int(header[0]) - 1
+
+        data_dtype, _, data_shape = unpack_metadata(header[1:self._broadcast_payload_offset])
+        data_dtype = intID_to_numpy_dtype_dict[data_dtype]
+
+        nbytes = int(np.prod(data_shape)) * np.dtype(data_dtype).itemsize
+        if self.rank == data_root:
             out_data = data
+        elif nbytes <= self._broadcast_header_payload_bytes:
+            payload = header[self._broadcast_payload_offset:].view(np.uint8)
+            out_data = payload[:nbytes].view(data_dtype).reshape(data_shape).copy()
+        else:
+            out_data = np.zeros(data_shape, dtype=data_dtype)
 
-        self._comm.Bcast(out_data, root=data_root)
+        # Larger data follows in a second message
+        if nbytes > self._broadcast_header_payload_bytes:
+            self._comm.Bcast(out_data, root=data_root)
 
         return out_data
 
@@ -929,6 +952,35 @@ class MPIPartition:
 
         return out_data
 
+    def alltoall_data(self, data):
+        r"""Exchange information between all pairs of workers.
+
+        Note
+        ----
+        This is a general all-to-all in the sense of traditional parallelism.
+
+        Parameters
+        ----------
+        data :
+            The data to be exchanged, with first dimension of the size of the
+            partition.  Row `i` is sent to the worker of rank `i`.
+
+        Returns
+        -------
+        The output data, as a NumPy integer array, where row `i` is the data
+        from the worker of rank `i`.
+
+        """
+
+        data = np.ascontiguousarray(data, dtype=int)
+        if len(data) != self.size:
+            raise ValueError(f"All-to-all data must have {self.size} rows, but has {len(data)}.")
+
+        out_data = np.empty_like(data)
+        self._comm.Alltoall(data, out_data)
+
+        return out_data
+
     def allreduce_data(self, data, op="sum"):
         r"""Reduce information from all workers to all workers.
 
@@ -1027,6 +1079,10 @@ class MPICartesianPartition(MPIPartition):
         if self.active:
             self.index = self.cartesian_index(self.rank)
 
+        # Sub-topology partitions owned by this partition, keyed by the
+        # dimensions they preserve
+        self._subtopology_partitions = dict()
+
     def deactivate(self):
         r"""Deactivates this partition by releasing any resources and
         nullifying any other properties.
@@ -1047,6 +1103,11 @@ class MPICartesianPartition(MPIPartition):
         # Preserve the shape
         shape = self.shape
 
+        # Release any cached sub-topology partitions before our own resources
+        for P_sub in self._subtopology_partitions.values():
+            P_sub.deactivate()
+        self._subtopology_partitions = dict()
+
         super(MPICartesianPartition, self).deactivate()
 
         self.shape = np.asarray(shape).astype(int)
@@ -1088,6 +1149,40 @@ class MPICartesianPartition(MPIPartition):
             comm = MPI.COMM_NULL
             return MPIPartition(comm, root=self._root, device=self.device)
 
+    def cached_cartesian_subtopology_partition(self, remain_shape):
+        r"""Returns a cached partition with Cartesian topology in specific
+        sub-dimensions.
+
+        Behaves like :any:`create_cartesian_subtopology_partition`, but the
+        sub-partition is created only on the first request for a given
+        ``remain_shape`` and is reused afterwards.  The returned partition is
+        owned by this partition and is released when this partition is
+        deactivated, so callers must *not* deactivate it.
+
+        Parameters
+        ----------
+        remain_shape : iterable
+            Iterable containing boolean flags indicating if the dimension is
+            to be preserved.
+
+        Returns
+        -------
+        A (possibly cached) :any:`MPICartesianPartition` instance.
+
+        """
+
+        key = tuple(bool(r) for r in remain_shape)
+
+        if key not in self._subtopology_partitions:
+            P_sub = self.create_cartesian_subtopology_partition(list(key))
+            # Inactive workers get a fresh null partition each time, there
+            # are no resources to share.
+            if not self.active:
+                return P_sub
+            self._subtopology_partitions[key] = P_sub
+
+        return self._subtopology_partitions[key]
+
     def cartesian_index(self, rank):
         r"""Given the rank, returns the Cartesian coordinates of the worker.
 
@@ -1140,3 +1235,41 @@ class MPICartesianPartition(MPIPartition):
             neighbor_ranks.append((lrank, rrank))
 
         return neighbor_ranks
+
+    def neighborhood_ranks(self, rank):
+        r"""Given the rank, returns the ranks of all Cartesian neighboring
+        workers, including the diagonal neighbors.
+
+        Parameters
+        ----------
+        rank :
+            Lexicographic identifier of the desired worker.
+
+        Returns
+        -------
+        neighborhood_ranks :
+            List of (offset, rank) pairs, for each offset in
+            :math:`\{-1, 0, 1\}^d` except the zero offset, in lexicographic
+            order.
+
+        """
+
+        if not self.active:
+            raise Exception()
+
+        index = self.cartesian_index(rank)
+
+        # Resulting list
+        neighborhood_ranks = []
+
+        for offset in itertools.product([-1, 0, 1], repeat=self.dim):
+            if not any(offset):
+                continue
+            nindex = index + np.asarray(offset)
+            if np.any(nindex < 0) or np.any(nindex >= self.shape):
+                nrank = MPI.PROC_NULL
+            else:
+                nrank = self._comm.Get_cart_rank(nindex.tolist())
+            neighborhood_ranks.append((offset, nrank))
+
+        return neighborhood_ranks
@@ -0,0 +1,103 @@
+from mpi4py import MPI
+
+from distdl.utilities import tracer
+
+
+class MPICollectiveWork:
+    r"""Handle to an in-flight MPI communication.
+
+    Returned by the asynchronous entry points of the back-end functionals.
+    The communication is started when the handle is created, and it is
+    completed, and its result unpacked, by :any:`wait`.  Any work performed
+    between the two overlaps with the communication.
+
+    Parameters
+    ----------
+    requests : list
+        MPI requests that must complete before the result is available.
+    finalize : callable
+        Function, taking no arguments, that unpacks and returns the result
+        once all requests have completed.
+    buffers : list, optional
+        Communication buffers that must be kept alive until the requests
+        have completed.
+
+    """
+
+    def __init__(self, requests, finalize, buffers=None):
+
+        self._requests = requests
+        self._finalize = finalize
+        self._buffers = buffers
+
+        self._completed = False
+        self._result = None
+
+        # Record of the traced primitive call that started the communication
+        self._span = tracer.current()
+
+    def test(self):
+        r"""Checks, without blocking, if the communication has completed.
+
+        Returns
+        -------
+        True if a call to :any:`wait` will not block on communication.
+
+        """
+
+        if self._completed:
+            return True
+
+        return MPI.Request.Testall(self._requests)
+
+    def wait(self):
+        r"""Completes the communication and returns its result.
+
+        Subsequent calls return the same result.
+
+        Returns
+        -------
+        The result of the communication.
+
+        """
+
+        if not self._completed:
+            if self._span is None:
+                MPI.Request.Waitall(self._requests)
+                self._result = self._finalize()
+            else:
+                # The call may be completed while another one is traced
+                with tracer.resumed(self._span):
+                    tracer.mark(None)
+                    MPI.Request.Waitall(self._requests)
+                    tracer.mark("wait")
+                    self._result = self._finalize()
+                    tracer.mark("unpack")
+            self._finalize = None
+            self._buffers = None
+            self._completed = True
+
+        return self._result
+
+    def then(self, function):
+        r"""Chains a function onto the result of this communication.
+
+        Parameters
+        ----------
+        function : callable
+            Function applied to the result of this communication.
+
+        Returns
+        -------
+        A new handle, tracking the same communication, whose result is the
+        output of ``function``.
+
+        """
+
+        work = MPICollectiveWork(self._requests, lambda: function(self.wait()))
+
+        # The chained handle completes the same traced call, even if it is
+        # created after the call has returned
+        work._span = self._span
+
+        return work
@@ -0,0 +1,108 @@
+__all__ = ["AllToAllFunction"]
+
+import cupy as cp
+import numpy as np
+import torch
+
+from distdl.utilities.dtype import torch_to_cupy_dtype_dict
+from distdl.utilities.torch import zero_volume_tensor
+
+
+def _all_to_all(input, P_alltoall, send_counts, recv_counts):
+
+    device = input.device
+
+    if not P_alltoall.active:
+        return zero_volume_tensor(device=device, dtype=input.dtype)
+
+    cupy_dtype = torch_to_cupy_dtype_dict[input.dtype]
+    received = cp.empty((int(np.sum(recv_counts)),) + tuple(input.shape[1:]), dtype=cupy_dtype)
+
+    # Counts are given in rows, of the trailing dimensions of the tensor
+    row_volume = int(np.prod(input.shape[1:]))
+    send_counts = np.asarray(send_counts, dtype=np.int64) * row_volume
+    recv_counts = np.asarray(recv_counts, dtype=np.int64) * row_volume
+    send_displacements = np.concatenate([[0], np.cumsum(send_counts)[:-1]])
+    recv_displacements = np.concatenate([[0], np.cumsum(recv_counts)[:-1]])
+
+    input_cupy = cp.asarray(input.detach().contiguous(), dtype=cupy_dtype)
+    P_alltoall._comm.Alltoallv((input_cupy, (send_counts, send_displacements)),
+                               (received, (recv_counts, recv_displacements)))
+
+    return torch.as_tensor(received, dtype=input.dtype, device=device)
+
+
+class AllToAllFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed all-to-all layer.
+
+    Implements the required `forward()` and adjoint (`backward()`) operations
+    for a distributed AllToAll layer using the PyTorch autograd interface.
+
+    This implementation uses MPI for data movement, accessed through the
+    ``mpi4py`` MPI wrappers, and requires a CUDA-aware MPI.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, P_alltoall, send_counts, recv_counts):
+        r"""Forward function of distributed all-to-all layer.
+
+        This method implements the forward all-to-all operation using the
+        ``MPI_Alltoallv`` function on the communicator defined by
+        ``P_alltoall``.
+
+        When the current worker is inactive in the ``P_alltoall`` partition,
+        it will output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor, with the rows sent to each worker contiguous and in
+            rank order.
+        P_alltoall : Partition
+            Partition the all-to-all happens within.
+        send_counts : iterable
+            Number of rows sent to each worker.
+        recv_counts : iterable
+            Number of rows received from each worker.
+
+        Returns
+        -------
+        output :
+            Output tensor, with the rows received from each worker contiguous
+            and in rank order.
+
+        """
+
+        ctx.P_alltoall = P_alltoall
+        ctx.send_counts = send_counts
+        ctx.recv_counts = recv_counts
+
+        return _all_to_all(input, P_alltoall, send_counts, recv_counts)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of distributed all-to-all layer.
+
+        This method implements the adjoint of the Jacobian of the all-to-all
+        operation, the all-to-all with the send and receive counts exchanged,
+        using the ``MPI_Alltoallv`` function.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        grad_input = _all_to_all(grad_output, ctx.P_alltoall, ctx.recv_counts, ctx.send_counts)
+
+        return grad_input, None, None, None
@@ -11,7 +11,7 @@ from distdl.utilities.torch import zero_volume_tensor
 class HaloExchangeFunction(torch.autograd.Function):
 
     @staticmethod
-    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks):
+    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks, inplace=False):
 
         device = input.device
         ctx.slices = slices
@@ -24,10 +24,14 @@ class HaloExchangeFunction(torch.autograd.Function):
             return zero_volume_tensor(input.shape[0], device=device)
 
         # TODO: mark_dirty() is buggy and does not work properly if halo exchange is
-        # chained with certain operations like ReLU, MaxPool, etc. For now, we make
-        # a memory copy of the input, rather than modifying the halo in place.
+        # chained with certain operations like ReLU, MaxPool, etc. Unless the caller
+        # owns the input, e.g., a persistent padded buffer, we make a memory copy of
+        # the input, rather than modifying the halo in place.
         # ctx.mark_dirty(input)
-        output = torch.clone(input.detach())
+        if inplace:
+            output = input.detach()
+        else:
+            output = torch.clone(input.detach())
 
         if P_x.size == 1:
             return input
@@ -67,11 +71,13 @@ class HaloExchangeFunction(torch.autograd.Function):
                 status = MPI.Status()
                 index = MPI.Request.Waitany(reqs, status)
 
+                # Ghost data are written through .data, so that the writes are
+                # not seen by autograd when the exchange is in place.
                 if index != MPI.UNDEFINED:
                     if index == 0:
-                        output[lgs] = torch.as_tensor(lgb, device=device)
+                        output.data[lgs] = torch.as_tensor(lgb, device=device)
                     elif index == 1:
-                        output[rgs] = torch.as_tensor(rgb, device=device)
+                        output.data[rgs] = torch.as_tensor(rgb, device=device)
                 n_reqs_completed += 1
 
         return output.requires_grad_(input.requires_grad)
@@ -88,10 +94,10 @@ class HaloExchangeFunction(torch.autograd.Function):
         assert grad_output.device == device
 
         if not P_x.active:
-            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None
+            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None, None
 
         if P_x.size == 1:
-            return grad_output, None, None, None, None
+            return grad_output, None, None, None, None, None
 
         ctx.mark_dirty(grad_output)
 
@@ -140,4 +146,4 @@ class HaloExchangeFunction(torch.autograd.Function):
 
                 n_reqs_completed += 1
 
-        return grad_output, None, None, None, None
+        return grad_output, None, None, None, None, None
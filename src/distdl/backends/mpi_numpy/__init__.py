@@ -1,4 +1,5 @@
 from ..common import CartesianPartition  # noqa: F401
+from ..common import CollectiveWork  # noqa: F401
 from ..common import Partition  # noqa: F401
 from ..common import assemble_global_tensor_structure  # noqa: F401
 from ..common import assemble_global_tensor_structure_along_axis  # noqa: F401
@@ -9,6 +10,8 @@ from ..common import tensor_decomposition as tensor_decomposition  # noqa: F401
 from . import functional  # noqa: F401
 from .buffer_numpy import MPIExpandableNumpyBuffer as ExpandableBuffer  # noqa: F401
 from .buffer_numpy import MPINumpyBufferManager as BufferManager  # noqa: F401
+from .buffer_numpy import MPINumpyBufferPool as BufferPool  # noqa: F401
+from .buffer_numpy import default_buffer_pool  # noqa: F401
 from .device import get_device  # noqa: F401
 from .device import set_device  # noqa: F401
 
@@ -1,6 +1,7 @@
 import numpy as np
 
 from ..common.buffer import MPIBufferManager
+from ..common.buffer import MPIBufferPool
 from ..common.buffer import MPIExpandableBuffer
 
 
@@ -134,3 +135,28 @@ class MPINumpyBufferManager(MPIBufferManager):
 
         # Return the requested number of buffers
         return dtype_buffers[:n_buffers]
+
+
+class MPINumpyBufferPool(MPIBufferPool):
+    r"""NumPy (mpi4py compatible) implementation of a pool of reusable
+    expandable buffers.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        Maximum total size, in bytes, of idle buffers kept by the pool.
+    fine_volume : int, optional
+        Volume, in elements, above which size classes are quarter steps.
+
+    """
+
+    def __init__(self, max_bytes=2**32, fine_volume=2**20):
+        super().__init__(max_bytes, fine_volume)
+
+    def _create_buffer(self, dtype, capacity):
+
+        return MPIExpandableNumpyBuffer(dtype, initial_capacity=capacity)
+
+
+# Shared by the collectives, so that their outputs reuse each other's storage
+default_buffer_pool = MPINumpyBufferPool()
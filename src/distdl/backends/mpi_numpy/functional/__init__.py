@@ -1,14 +1,25 @@
 from distdl.backends.mpi_numpy.functional.all_gather import AllGatherFunction  # noqa: F401
 from distdl.backends.mpi_numpy.functional.all_sum_reduce import AllSumReduceFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.all_to_all import AllToAllFunction  # noqa: F401
 from distdl.backends.mpi_numpy.functional.broadcast import BroadcastFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.compressed import CompressedAllGatherFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.compressed import CompressedAllSumReduceFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.compressed import CompressedBroadcastFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.compressed import CompressedReduceScatterFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.compressed import CompressedSumReduceFunction  # noqa: F401
 from distdl.backends.mpi_numpy.functional.halo_exchange import HaloExchangeFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.halo_exchange import NeighborhoodHaloExchangeFunction  # noqa: F401
 from distdl.backends.mpi_numpy.functional.reduce_scatter import ReduceScatterFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.repartition import PersistentRepartitionFunction  # noqa: F401
 from distdl.backends.mpi_numpy.functional.repartition import RepartitionFunction  # noqa: F401
+from distdl.backends.mpi_numpy.functional.repartition import RepartitionPlan  # noqa: F401
 from distdl.backends.mpi_numpy.functional.sum_reduce import SumReduceFunction  # noqa: F401
 
 from . import all_gather  # noqa: F401
 from . import all_sum_reduce  # noqa: F401
+from . import all_to_all  # noqa: F401
 from . import broadcast  # noqa: F401
+from . import compressed  # noqa: F401
 from . import halo_exchange  # noqa: F401
 from . import reduce_scatter  # noqa: F401
 from . import repartition  # noqa: F401
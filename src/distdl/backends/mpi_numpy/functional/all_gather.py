@@ -2,13 +2,15 @@ __all__ = ["AllGatherFunction"]
 
 import numpy as np
 import torch
-from einops import rearrange
 from mpi4py import MPI
 
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.backends.mpi_numpy.buffer_numpy import default_buffer_pool
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_mpi_dtype_dict
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
-from distdl.utilities.slicing import get_rearrange_ordering
-from distdl.utilities.torch import distdl_padding_to_torch_padding
+from distdl.utilities.slicing import compute_balanced_counts
+from distdl.utilities.torch import to_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -30,23 +32,21 @@ class AllGatherFunction(torch.autograd.Function):
     -------
     The ``mpi4py`` interface currently used requires NumPy views of the tensors.
 
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
     """
 
     @staticmethod
-    def forward(ctx, input, P_allgather,
-                input_tensor_structure, output_tensor_structure, axes, scale_backward):
-        r"""Forward function of distributed all-gather layer.
-
-        This method implements the forward all-gather operation using the
-        ``MPI_Allgather`` function on the communicator defined by ``P_allgather``.
-
-        When the current worker is inactive in the ``P_allgather`` partition, it will
-        output a zero-volume tensor.
+    def start_forward(input, P_allgather,
+                      input_tensor_structure, output_tensor_structure, axes):
+        r"""Starts the forward all-gather, without waiting for it to complete.
 
         Parameters
         ----------
-        ctx :
-            PyTorch context.
         input : `torch.tensor`
             Input tensor.
         P_allgather : Partition
@@ -59,200 +59,233 @@ class AllGatherFunction(torch.autograd.Function):
             requires_grad).
         axes : tuple
             Axes along which to all-gather.
-        scale_backward : int
-            Divide the backward pass by this number.
 
         Returns
         -------
-        output :
-            Output tensor.
+        work :
+            Work handle, whose `wait()` returns the output tensor.
 
         """
 
         device = input.device
-        ctx.P_allgather = P_allgather
-        ctx.input_tensor_structure = input_tensor_structure
-        ctx.output_tensor_structure = output_tensor_structure
-        ctx.device = device
-        ctx.axes = axes
-        ctx.scale_backward = scale_backward
-        ctx.remainder = 0
 
-        output = zero_volume_tensor(device=device, dtype=output_tensor_structure.dtype)
-        input_tensor_shape = np.array(input_tensor_structure.shape)
-        output_tensor_shape = np.array(output_tensor_structure.shape)
+        axis = axes[0]
+        output_tensor_shape = list(output_tensor_structure.shape)
 
         requests = []
+        buffers = []
+        gathered_data = None
 
         # There is no need to specificy a root.
         if P_allgather.active:
 
-            # If output shape does not evenly divide by number of partitions, we need to zero-pad the input
-            ctx.remainder = output_tensor_shape[axes[0]] % P_allgather.shape[axes[0]]
-            if ctx.remainder != 0:
-                if P_allgather.rank >= ctx.remainder:
-                    padding = [0] * 2 * P_allgather.dim
-                    padding[2 * axes[0]] = 1
-                    padding = distdl_padding_to_torch_padding(tuple(padding))
-                    input = torch.nn.functional.pad(input, padding, mode='constant', value=0)
-
-                # Update input/ouput shapes after padding
-                input_tensor_shape = input.shape
-                output_shape = list(output_tensor_shape)
-                output_shape[axes[0]] = input_tensor_shape[axes[0]] * P_allgather.shape[axes[0]]
-                output_tensor_shape = torch.Size(output_shape)
-
-            # Allocate flattened output array
+            # Data are gathered with the all-gather dimension leading, so
+            # that the contribution of each worker, even if the dimension does
+            # not divide evenly, is a contiguous block of the output.
+            gathered_shape = [output_tensor_shape[axis]] + \
+                output_tensor_shape[:axis] + output_tensor_shape[axis+1:]
+            counts, displacements = compute_balanced_counts(gathered_shape[0],
+                                                            P_allgather.shape[axis],
+                                                            int(np.prod(gathered_shape[1:])))
+
+            # Allocate output array
             numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-            gathered_data = np.zeros(np.prod(output_tensor_shape), dtype=numpy_dtype)
+            gathered_data = default_buffer_pool.request_array(gathered_shape, numpy_dtype)
 
             # All-gather
-            input_numpy = np.asarray(input.detach().cpu().numpy(), dtype=numpy_dtype)
+            input_numpy = to_numpy(input.movedim(axis, 0))
             input_dtype = torch_to_mpi_dtype_dict[input_tensor_structure.dtype]
             output_dtype = torch_to_mpi_dtype_dict[output_tensor_structure.dtype]
-            req = P_allgather._comm.Iallgather((input_numpy, input_dtype), (gathered_data, output_dtype))
+            req = P_allgather._comm.Iallgatherv((input_numpy, input_dtype),
+                                                (gathered_data, counts, displacements, output_dtype))
             requests.append(req)
+            buffers.append(input_numpy)
+            tracer.mark("pack", sent=input_numpy.nbytes, received=gathered_data.nbytes)
 
-        MPI.Request.Waitall(requests)
-
-        # If we had to receive data, we need to tensorify it.
-        if P_allgather.active:
-
-            # Re-order flat output array from all-gather to correct cartesian shape
-            gathered_cart_shape = [P_allgather.shape[axes[0]]] + list(input_tensor_shape)
-            output = torch.asarray(gathered_data, device=device).reshape(gathered_cart_shape)
+        def finalize():
 
-            # Dimension ordering for rearrange.E.g.,  p a, b, c -> a, (p b), c
-            in_shape_char, out_shape_char = get_rearrange_ordering(P_allgather.dim, axes[0])
+            if not P_allgather.active:
+                return zero_volume_tensor(device=device, dtype=output_tensor_structure.dtype)
 
-            # If we zero-padded, we need to remove the padding now from the gathered tensor.
-            if ctx.remainder > 0:
-
-                # Split tensor into its original inputs, so we can
-                # remove padding from inputs that were zero-padded
-                output_list = list(torch.split(output, 1, dim=0))
-
-                # Remove padding
-                s = [slice(None)] * (P_allgather.dim + 1)
-                s[axes[0] + 1] = slice(0, -1)
-                for i in range(ctx.remainder, P_allgather.shape[axes[0]]):
-                    output_list[i] = output_list[i][s]
-
-                # Rearrange
-                for i in range(P_allgather.shape[axes[0]]):
-                    output_list[i] = rearrange(output_list[i], in_shape_char + ' -> ' + out_shape_char)
-
-                # Undo splitting
-                output = torch.cat(tuple(output_list), dim=axes[0])
-
-            else:
-                output = rearrange(output, in_shape_char + ' -> ' + out_shape_char)
+            # Move the all-gather dimension back in place.  This is only a
+            # copy if the dimensions ahead of it are not all trivial.
+            output = torch.asarray(gathered_data, device=device).movedim(0, axis).contiguous()
             output.requires_grad_(output_tensor_structure.requires_grad)
 
-        return output
+            return output
 
-    @staticmethod
-    def backward(ctx, grad_output):
-        r"""Backward function of distributed all-gather layer.
+        return MPICollectiveWork(requests, finalize, buffers)
 
-        This method implements the adjoint of the Jacobian of the
-        all-gather operation, the reduce-scatter operation, using the
-        ``MPI_Reduce_scatter`` function.
-
-        When the current worker is inactive in the ``P_allgather`` partition,
-        it will output a zero-volume tensor.
+    @staticmethod
+    def start_backward(grad_output, P_allgather,
+                       input_tensor_structure, output_tensor_structure, axes,
+                       scale_backward):
+        r"""Starts the adjoint all-gather (a reduce-scatter), without waiting
+        for it to complete.
 
         Parameters
         ----------
-        ctx :
-            PyTorch context.
         grad_output : `torch.tensor`
             Input tensor.
+        P_allgather : Partition
+            Partition all-gather happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+        axes : tuple
+            Axes along which to all-gather.
+        scale_backward : int
+            Divide the backward pass by this number.
 
         Returns
         -------
-        grad_input :
-            Output tensor.
+        work :
+            Work handle, whose `wait()` returns the gradient tensor.
+
         """
 
-        P_allgather = ctx.P_allgather
-        input_tensor_structure = ctx.input_tensor_structure
-        output_tensor_structure = ctx.output_tensor_structure
-        device = ctx.device
-        axes = ctx.axes
-        remainder = ctx.remainder
+        device = grad_output.device
 
-        grad_input = zero_volume_tensor(device=device, dtype=input_tensor_structure.dtype)
-        input_tensor_shape = np.array(input_tensor_structure.shape)
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
+        output_tensor_shape = list(output_tensor_structure.shape)
 
         # Scale gradient by given scalar
-        if ctx.scale_backward is not None:
-            grad_output.div_(ctx.scale_backward)
+        if scale_backward is not None:
+            grad_output.div_(scale_backward)
 
         requests = []
+        buffers = []
+        scattered_data = None
 
         # All-gather operation
         if P_allgather.active:
 
-            # Re-order input array
-            expanded_order, new_order = get_rearrange_ordering(len(grad_output.shape), axes[0])
-            operation = new_order + ' -> ' + expanded_order
-
-            # If input shape does not split evenly along no. of partitions, we need to zero-pad
-            if remainder > 0:
-
-                # Split tensor along reduce-scatter axis
-                local_shapes = [output_tensor_structure.shape[axes[0]] // P_allgather.shape[axes[0]]] * \
-                    P_allgather.shape[axes[0]]
-                for i in range(ctx.remainder):
-                    local_shapes[i] += 1
-                grad_output_list = list(torch.split(grad_output, local_shapes, dim=axes[0]))
-
-                # Re-order each sub-tensor
-                for i in range(P_allgather.shape[axes[0]]):
-                    grad_output_list[i] = rearrange(grad_output_list[i], operation, p=1)
-
-                # Zero-pad sub-tensors that are too small
-                for i in range(ctx.remainder, P_allgather.shape[axes[0]]):
-                    padding = [0] * 2 * P_allgather.dim
-                    padding[2 * axes[0]] = 1
-                    padding = distdl_padding_to_torch_padding(tuple(padding))
-                    grad_output_list[i] = torch.nn.functional.pad(grad_output_list[i], padding,
-                                                                  mode='constant', value=0)
-
-                # Concatenate and flatten
-                grad_output_flat = torch.cat(grad_output_list, dim=0).reshape(-1)
-
-                # Update output shape for ranks that received zero-padded data
-                if P_allgather.rank >= ctx.remainder:
-                    input_tensor_shape[axes[0]] += 1
-            else:
-                grad_output_flat = rearrange(grad_output, operation, p=P_allgather.shape[axes]).reshape(-1)
+            # The adjoint reduces blocks laid out as by the forward all-gather,
+            # with the all-gather dimension leading.
+            scattered_shape = [input_tensor_shape[axis]] + \
+                input_tensor_shape[:axis] + input_tensor_shape[axis+1:]
+            counts, _ = compute_balanced_counts(output_tensor_shape[axis],
+                                                P_allgather.shape[axis],
+                                                int(np.prod(scattered_shape[1:])))
 
             # Allocate output array
             numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
-            scattered_data = np.zeros(input_tensor_shape, dtype=numpy_dtype)
-            grad_output_flat = np.asarray(grad_output_flat.detach().cpu().numpy(), dtype=numpy_dtype)
+            scattered_data = default_buffer_pool.request_array(scattered_shape, numpy_dtype)
+            grad_output_numpy = to_numpy(grad_output.movedim(axis, 0))
 
             # Reduce-scatter primitive
             input_dtype = torch_to_mpi_dtype_dict[input_tensor_structure.dtype]
             output_dtype = torch_to_mpi_dtype_dict[output_tensor_structure.dtype]
-            req = P_allgather._comm.Ireduce_scatter((grad_output_flat, output_dtype),
-                                                    (scattered_data, input_dtype), op=MPI.SUM)
+            req = P_allgather._comm.Ireduce_scatter((grad_output_numpy, output_dtype),
+                                                    (scattered_data, input_dtype),
+                                                    recvcounts=counts, op=MPI.SUM)
             requests.append(req)
+            buffers.append(grad_output_numpy)
+            tracer.mark("pack", sent=grad_output_numpy.nbytes, received=scattered_data.nbytes)
 
-        MPI.Request.Waitall(requests)
+        def finalize():
+
+            if not P_allgather.active:
+                return zero_volume_tensor(device=device, dtype=input_tensor_structure.dtype)
 
-        # If we had to receive data, we need to tensorify it.
-        if P_allgather.active:
             grad_input = torch.as_tensor(scattered_data, dtype=input_tensor_structure.dtype,
                                          device=device)
+            grad_input = grad_input.movedim(0, axis).contiguous()
             grad_input.requires_grad_(input_tensor_structure.requires_grad)
 
-            # If we're one of the workers having received zero-padded data, remove padding
-            if remainder != 0 and P_allgather.rank >= remainder:
-                s = [slice(None)] * (P_allgather.dim)
-                s[axes[0]] = slice(0, -1)
-                grad_input = grad_input[s]
+            return grad_input
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
+    @staticmethod
+    def forward(ctx, input, P_allgather,
+                input_tensor_structure, output_tensor_structure, axes, scale_backward,
+                work=None):
+        r"""Forward function of distributed all-gather layer.
+
+        This method implements the forward all-gather operation using the
+        ``MPI_Iallgatherv`` function on the communicator defined by ``P_allgather``.
+
+        When the current worker is inactive in the ``P_allgather`` partition, it will
+        output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        P_allgather : Partition
+            Partition all-gather happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+        axes : tuple
+            Axes along which to all-gather.
+        scale_backward : int
+            Divide the backward pass by this number.
+        work : optional
+            Handle returned by `start_forward()` for this input.  If given,
+            the communication has already been started and is only completed.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        ctx.P_allgather = P_allgather
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.device = input.device
+        ctx.axes = axes
+        ctx.scale_backward = scale_backward
+
+        if work is None:
+            work = AllGatherFunction.start_forward(input, P_allgather,
+                                                   input_tensor_structure,
+                                                   output_tensor_structure,
+                                                   axes)
+
+        return work.wait()
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of distributed all-gather layer.
+
+        This method implements the adjoint of the Jacobian of the
+        all-gather operation, the reduce-scatter operation, using the
+        ``MPI_Ireduce_scatter`` function.
+
+        When the current worker is inactive in the ``P_allgather`` partition,
+        it will output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        work = AllGatherFunction.start_backward(grad_output, ctx.P_allgather,
+                                                ctx.input_tensor_structure,
+                                                ctx.output_tensor_structure,
+                                                ctx.axes,
+                                                ctx.scale_backward)
+        grad_input = work.wait()
 
-        return grad_input, None, None, None, None, None
+        return grad_input, None, None, None, None, None, None
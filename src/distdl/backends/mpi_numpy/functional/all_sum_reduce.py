@@ -1,10 +1,14 @@
 __all__ = ["AllSumReduceFunction"]
 
-import numpy as np
 import torch
 from mpi4py import MPI
 
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.backends.mpi_numpy.buffer_numpy import default_buffer_pool
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.torch import from_numpy
+from distdl.utilities.torch import to_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -26,11 +30,130 @@ class AllSumReduceFunction(torch.autograd.Function):
     -------
     The ``mpi4py`` interface currently used requires NumPy views of the tensors.
 
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
     """
 
+    @staticmethod
+    def start_forward(input, P_allreduce,
+                      input_tensor_structure, output_tensor_structure):
+        r"""Starts the forward all-sum-reduction, without waiting for it to
+        complete.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor.
+        P_allreduce : Partition
+            Partition reduction happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the output tensor.
+
+        """
+
+        device = input.device
+
+        requests = []
+        buffers = []
+        reduced_data = None
+
+        # There is no need to specificy a root.
+        if P_allreduce.active:
+            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
+
+            reduced_data = default_buffer_pool.request_array(input_tensor_structure.shape, numpy_dtype)
+            input_numpy = to_numpy(input)
+            req = P_allreduce._comm.Iallreduce(input_numpy, reduced_data, op=MPI.SUM)
+            requests.append(req)
+            buffers.append(input_numpy)
+            tracer.mark("pack", sent=input_numpy.nbytes, received=reduced_data.nbytes)
+
+        def finalize():
+
+            # If we had to receive data, we need to tensorify it.
+            if P_allreduce.active:
+                return from_numpy(reduced_data,
+                                  requires_grad=output_tensor_structure.requires_grad,
+                                  device=device)
+
+            return zero_volume_tensor(device=device)
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
+    @staticmethod
+    def start_backward(grad_output, P_allreduce, input_tensor_structure, scale_backward):
+        r"""Starts the adjoint all-sum-reduction, without waiting for it to
+        complete.
+
+        Parameters
+        ----------
+        grad_output : `torch.tensor`
+            Input tensor.
+        P_allreduce : Partition
+            Partition reduction happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        scale_backward: int
+            Scale the backward pass by given scalar.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the gradient tensor.
+
+        """
+
+        device = grad_output.device
+
+        # Scale gradient by given scalar
+        if scale_backward is not None:
+            grad_output.div_(scale_backward)
+
+        requests = []
+        buffers = []
+        reduced_data = None
+
+        # All-sum-reduce is self-adjoint
+        if P_allreduce.active:
+            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
+
+            reduced_data = default_buffer_pool.request_array(input_tensor_structure.shape, numpy_dtype)
+            grad_output_numpy = to_numpy(grad_output)
+            req = P_allreduce._comm.Iallreduce(grad_output_numpy, reduced_data, op=MPI.SUM)
+            requests.append(req)
+            buffers.append(grad_output_numpy)
+            tracer.mark("pack", sent=grad_output_numpy.nbytes, received=reduced_data.nbytes)
+
+        def finalize():
+
+            # If we had to receive data, we need to tensorify it.
+            if P_allreduce.active:
+                return from_numpy(reduced_data,
+                                  requires_grad=input_tensor_structure.requires_grad,
+                                  device=device)
+
+            return zero_volume_tensor(device=device)
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
     @staticmethod
     def forward(ctx, input, P_allreduce,
-                input_tensor_structure, output_tensor_structure, scale_backward):
+                input_tensor_structure, output_tensor_structure, scale_backward,
+                work=None):
         r"""Forward function of distributed all-sum-reduction layer.
 
         This method implements the forward all-sum-reduction operation using the
@@ -55,6 +178,9 @@ class AllSumReduceFunction(torch.autograd.Function):
             requires_grad).
         scale_backward: int
             Scale the backward pass by given scalar.
+        work : optional
+            Handle returned by `start_forward()` for this input.  If given,
+            the communication has already been started and is only completed.
 
         Returns
         -------
@@ -63,35 +189,18 @@ class AllSumReduceFunction(torch.autograd.Function):
 
         """
 
-        device = input.device
         ctx.P_allreduce = P_allreduce
         ctx.input_tensor_structure = input_tensor_structure
         ctx.output_tensor_structure = output_tensor_structure
-        ctx.device = device
+        ctx.device = input.device
         ctx.scale_backward = scale_backward
 
-        output = zero_volume_tensor(device=device)
+        if work is None:
+            work = AllSumReduceFunction.start_forward(input, P_allreduce,
+                                                      input_tensor_structure,
+                                                      output_tensor_structure)
 
-        requests = []
-
-        # There is no need to specificy a root.
-        if P_allreduce.active:
-            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-
-            reduced_data = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
-            input_numpy = input.detach().cpu().numpy()
-            req = P_allreduce._comm.Iallreduce(input_numpy, reduced_data, op=MPI.SUM)
-            requests.append(req)
-
-        MPI.Request.Waitall(requests)
-
-        # If we had to receive data, we need to tensorify it.
-        if P_allreduce.active:
-            output = torch.tensor(reduced_data,
-                                  requires_grad=output_tensor_structure.requires_grad,
-                                  device=device)
-
-        return output
+        return work.wait()
 
     @staticmethod
     def backward(ctx, grad_output):
@@ -117,32 +226,9 @@ class AllSumReduceFunction(torch.autograd.Function):
             Output tensor.
         """
 
-        P_allreduce = ctx.P_allreduce
-        input_tensor_structure = ctx.input_tensor_structure
-        device = ctx.device
-
-        grad_input = zero_volume_tensor(device=device)
-
-        # Scale gradient by given scalar
-        if ctx.scale_backward is not None:
-            grad_output.div_(ctx.scale_backward)
-        requests = []
-
-        # All-sum-reduce is self-adjoint
-        if P_allreduce.active:
-            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-
-            reduced_data = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
-            grad_output_numpy = grad_output.detach().cpu().numpy()
-            req = P_allreduce._comm.Iallreduce(grad_output_numpy, reduced_data, op=MPI.SUM)
-            requests.append(req)
-
-        MPI.Request.Waitall(requests)
-
-        # If we had to receive data, we need to tensorify it.
-        if P_allreduce.active:
-            grad_input = torch.tensor(reduced_data,
-                                      requires_grad=input_tensor_structure.requires_grad,
-                                      device=device)
+        work = AllSumReduceFunction.start_backward(grad_output, ctx.P_allreduce,
+                                                   ctx.input_tensor_structure,
+                                                   ctx.scale_backward)
+        grad_input = work.wait()
 
-        return grad_input, None, None, None, None
+        return grad_input, None, None, None, None, None
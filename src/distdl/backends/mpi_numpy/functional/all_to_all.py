@@ -0,0 +1,261 @@
+__all__ = ["AllToAllFunction"]
+
+import numpy as np
+import torch
+
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.utilities import tracer
+from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.torch import from_numpy
+from distdl.utilities.torch import to_numpy
+from distdl.utilities.torch import zero_volume_tensor
+
+
+def _start_all_to_all(input, P_alltoall, send_counts, recv_counts):
+
+    device = input.device
+
+    requests = []
+    buffers = []
+    received = None
+
+    if P_alltoall.active:
+
+        numpy_dtype = torch_to_numpy_dtype_dict[input.dtype]
+        received = np.empty((int(np.sum(recv_counts)),) + tuple(input.shape[1:]), dtype=numpy_dtype)
+
+        # Counts are given in rows, of the trailing dimensions of the tensor
+        row_volume = int(np.prod(input.shape[1:]))
+        send_counts = np.asarray(send_counts, dtype=np.int64) * row_volume
+        recv_counts = np.asarray(recv_counts, dtype=np.int64) * row_volume
+        send_displacements = np.concatenate([[0], np.cumsum(send_counts)[:-1]])
+        recv_displacements = np.concatenate([[0], np.cumsum(recv_counts)[:-1]])
+
+        input_numpy = to_numpy(input.contiguous())
+        req = P_alltoall._comm.Ialltoallv((input_numpy, (send_counts, send_displacements)),
+                                          (received, (recv_counts, recv_displacements)))
+        requests.append(req)
+        buffers.append(input_numpy)
+        tracer.mark("pack", sent=input_numpy.nbytes, received=received.nbytes)
+
+    def finalize():
+
+        if P_alltoall.active:
+            return from_numpy(received, device=device)
+
+        return zero_volume_tensor(device=device, dtype=input.dtype)
+
+    return MPICollectiveWork(requests, finalize, buffers)
+
+
+def _start_shift(input, P_alltoall, displacement):
+
+    device = input.device
+
+    requests = []
+    buffers = []
+    received = None
+
+    if P_alltoall.active:
+
+        # Only the two neighbours at the displacement are involved, so that
+        # the cost does not grow with the size of the partition
+        dest = (P_alltoall.rank + displacement) % P_alltoall.size
+        source = (P_alltoall.rank - displacement) % P_alltoall.size
+
+        # The data are only moved, so they are sent as bytes, which also
+        # covers the 16-bit floating-point types that MPI lacks
+        input_numpy = to_numpy(input.contiguous().view(-1).view(torch.uint8))
+        received = np.empty_like(input_numpy)
+        requests.append(P_alltoall._comm.Irecv(received, source=source))
+        requests.append(P_alltoall._comm.Isend(input_numpy, dest=dest))
+        buffers.append(input_numpy)
+        tracer.mark("pack", sent=input_numpy.nbytes, received=received.nbytes)
+
+    def finalize():
+
+        if P_alltoall.active:
+            return from_numpy(received, device=device).view(input.dtype).view(input.shape)
+
+        return zero_volume_tensor(device=device, dtype=input.dtype)
+
+    return MPICollectiveWork(requests, finalize, buffers)
+
+
+class AllToAllFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed all-to-all layer.
+
+    Implements the required `forward()` and adjoint (`backward()`) operations
+    for a distributed AllToAll layer using the PyTorch autograd interface.
+
+    This implementation uses MPI for data movement, accessed through the
+    ``mpi4py`` MPI wrappers.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    Warning
+    -------
+    The ``mpi4py`` interface currently used requires NumPy views of the tensors.
+
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
+    """
+
+    @staticmethod
+    def start_forward(input, P_alltoall, send_counts, recv_counts):
+        r"""Starts the forward all-to-all, without waiting for it to complete.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor, with the rows sent to each worker contiguous and in
+            rank order.
+        P_alltoall : Partition
+            Partition the all-to-all happens within.
+        send_counts : iterable
+            Number of rows sent to each worker.
+        recv_counts : iterable
+            Number of rows received from each worker.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the output tensor.
+
+        """
+
+        return _start_all_to_all(input, P_alltoall, send_counts, recv_counts)
+
+    @staticmethod
+    def start_backward(grad_output, P_alltoall, send_counts, recv_counts):
+        r"""Starts the adjoint all-to-all, without waiting for it to complete.
+
+        The adjoint of an all-to-all is the all-to-all with the send and
+        receive counts exchanged.
+
+        Parameters
+        ----------
+        grad_output : `torch.tensor`
+            Gradient of the output tensor.
+        P_alltoall : Partition
+            Partition the all-to-all happens within.
+        send_counts : iterable
+            Number of rows sent to each worker in the forward pass.
+        recv_counts : iterable
+            Number of rows received from each worker in the forward pass.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the gradient tensor.
+
+        """
+
+        return _start_all_to_all(grad_output, P_alltoall, recv_counts, send_counts)
+
+    @staticmethod
+    def start_shift(input, P_alltoall, displacement=1):
+        r"""Starts a cyclic shift of the input, without waiting for it to complete.
+
+        The shift is the all-to-all in which each worker sends all of its
+        rows to the worker ``displacement`` ranks ahead, but it is performed
+        with point-to-point messages between the two neighbours only.  The
+        input must be of the same shape on all workers.  Messages of
+        successive shifts are received in the order they are started.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor.
+        P_alltoall : Partition
+            Partition the shift happens within.
+        displacement : int, optional
+            Number of ranks the input moves forward by.  Default is 1.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the tensor of the worker
+            ``displacement`` ranks behind.
+
+        """
+
+        return _start_shift(input, P_alltoall, displacement)
+
+    @staticmethod
+    def forward(ctx, input, P_alltoall, send_counts, recv_counts, work=None):
+        r"""Forward function of distributed all-to-all layer.
+
+        This method implements the forward all-to-all operation using the
+        ``MPI_Ialltoallv`` function on the communicator defined by
+        ``P_alltoall``.
+
+        When the current worker is inactive in the ``P_alltoall`` partition,
+        it will output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor, with the rows sent to each worker contiguous and in
+            rank order.
+        P_alltoall : Partition
+            Partition the all-to-all happens within.
+        send_counts : iterable
+            Number of rows sent to each worker.
+        recv_counts : iterable
+            Number of rows received from each worker.
+        work : optional
+            Handle returned by `start_forward()` for this input.  If given,
+            the communication has already been started and is only completed.
+
+        Returns
+        -------
+        output :
+            Output tensor, with the rows received from each worker contiguous
+            and in rank order.
+
+        """
+
+        ctx.P_alltoall = P_alltoall
+        ctx.send_counts = send_counts
+        ctx.recv_counts = recv_counts
+
+        if work is None:
+            work = AllToAllFunction.start_forward(input, P_alltoall, send_counts, recv_counts)
+
+        return work.wait()
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of distributed all-to-all layer.
+
+        This method implements the adjoint of the Jacobian of the all-to-all
+        operation, the all-to-all with the send and receive counts exchanged,
+        using the ``MPI_Ialltoallv`` function.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        work = AllToAllFunction.start_backward(grad_output, ctx.P_alltoall, ctx.send_counts, ctx.recv_counts)
+        grad_input = work.wait()
+
+        return grad_input, None, None, None, None
@@ -4,7 +4,11 @@ import numpy as np
 import torch
 from mpi4py import MPI
 
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.torch import from_numpy
+from distdl.utilities.torch import to_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -26,12 +30,182 @@ class BroadcastFunction(torch.autograd.Function):
     -------
     The ``mpi4py`` interface currently used requires NumPy views of the tensors.
 
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
     """
 
+    @staticmethod
+    def start_forward(input, P_send, P_recv, preserve_batch,
+                      input_tensor_structure, output_tensor_structure):
+        r"""Starts the forward broadcast, without waiting for it to complete.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor.
+        P_send : Partition
+            Sending partition current worker is a part of.
+        P_recv : Partition
+            Receiving partition current worker is a part of.
+        preserve_batch : bool
+            Indicates if batch size should be preserved for zero-volume outputs.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the output tensor.
+
+        """
+
+        device = input.device
+
+        # This allows all ranks to use the same exit path, so that we can be
+        # sure that all requests have cleared.
+        if preserve_batch:
+            output = zero_volume_tensor(input.shape[0], device=device)
+        else:
+            output = zero_volume_tensor(device=device)
+
+        # MPI requests to clear
+        requests = []
+        buffers = []
+
+        # Send all of the data
+        if P_send.active:
+            input_numpy = to_numpy(input)
+            req = P_send._comm.Ibcast(input_numpy, root=0)
+            requests.append(req)
+            buffers.append(input_numpy)
+            tracer.mark("pack", sent=input_numpy.nbytes)
+
+        recv_data = None
+        if P_recv.active:
+            # If I send to and receive from the same partition, make a copy.
+            if P_send == P_recv:
+                output = input.clone()
+            # If I just receive, receive the broadcast
+            else:
+                numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
+                recv_data = np.empty(output_tensor_structure.shape, dtype=numpy_dtype)
+
+                req = P_recv._comm.Ibcast(recv_data, root=0)
+                requests.append(req)
+                tracer.mark("pack", received=recv_data.nbytes)
+
+        def finalize():
+
+            if recv_data is not None:
+                return from_numpy(recv_data,
+                                  requires_grad=output_tensor_structure.requires_grad,
+                                  device=device)
+
+            return output
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
+    @staticmethod
+    def start_backward(grad_output, P_send, P_recv, preserve_batch,
+                       input_tensor_structure, output_tensor_structure,
+                       scale_backward):
+        r"""Starts the adjoint broadcast (a sum-reduction), without waiting for
+        it to complete.
+
+        Parameters
+        ----------
+        grad_output : `torch.tensor`
+            Input tensor.
+        P_send : Partition
+            Sending partition current worker is a part of.
+        P_recv : Partition
+            Receiving partition current worker is a part of.
+        preserve_batch : bool
+            Indicates if batch size should be preserved for zero-volume outputs.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+        scale_backward : int
+            Divide the backward pass by this number.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the gradient tensor.
+
+        """
+
+        device = grad_output.device
+
+        # This allows all ranks to use the same exit path, so that we can be
+        # sure that all requests have cleared.
+        if preserve_batch:
+            grad_input = zero_volume_tensor(grad_output.shape[0], device=device)
+        else:
+            grad_input = zero_volume_tensor(device=device)
+
+        requests = []
+        buffers = []
+
+        # If I received data (either from a remote worker or just from myself)
+        # I need to reduce that data.  If I send and receive to myself, this
+        # is OK, as the reduction accounts for the copy, unlike the broadcast
+        # above.
+        reduced_data_recv = None
+        if P_recv.active:
+            if scale_backward is not None:
+                grad_output.div_(scale_backward)
+            numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
+            reduced_data_recv = np.empty(output_tensor_structure.shape, dtype=numpy_dtype)
+            grad_output_numpy = to_numpy(grad_output)
+            req = P_recv._comm.Ireduce(grad_output_numpy, reduced_data_recv, root=0, op=MPI.SUM)
+            requests.append(req)
+            buffers.append(grad_output_numpy)
+            tracer.mark("pack", sent=grad_output_numpy.nbytes, received=reduced_data_recv.nbytes)
+
+        # If I sent data in the forward, I have to receive it here.  Unless I
+        # also received that data, then I already have it from above.
+        reduced_data_send = None
+        if P_send != P_recv and P_send.active:
+            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
+            # The root contributes its buffer in place, so it must start at zero.
+            reduced_data_send = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
+            req = P_send._comm.Ireduce(MPI.IN_PLACE, reduced_data_send, root=0, op=MPI.SUM)
+            requests.append(req)
+            tracer.mark("pack", received=reduced_data_send.nbytes)
+
+        def finalize():
+
+            # If we had to receive data, we need to tensorify it.
+            if P_send.active:
+                if P_send == P_recv:
+                    return from_numpy(reduced_data_recv,
+                                      requires_grad=input_tensor_structure.requires_grad,
+                                      device=device)
+                else:
+                    return from_numpy(reduced_data_send,
+                                      requires_grad=input_tensor_structure.requires_grad,
+                                      device=device)
+
+            return grad_input
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
     @staticmethod
     def forward(ctx, input, P_send, P_recv, preserve_batch,
                 input_tensor_structure, output_tensor_structure,
-                scale_backward):
+                scale_backward, work=None):
         r"""Forward function of distributed broadcast layer.
 
         This method implements the forward broadcast operation using the
@@ -83,6 +257,9 @@ class BroadcastFunction(torch.autograd.Function):
             requires_grad).
         scale_backward : int
             Divide the backward pass by this number.
+        work : optional
+            Handle returned by `start_forward()` for this input.  If given,
+            the communication has already been started and is only completed.
 
         Returns
         -------
@@ -91,48 +268,20 @@ class BroadcastFunction(torch.autograd.Function):
 
         """
 
-        device = input.device
         ctx.P_send = P_send
         ctx.P_recv = P_recv
         ctx.preserve_batch = preserve_batch
         ctx.input_tensor_structure = input_tensor_structure
         ctx.output_tensor_structure = output_tensor_structure
         ctx.scale_backward = scale_backward
-        ctx.device = device
-
-        # This allows all ranks to use the same exit path, so that we can be
-        # sure that all requests have cleared.
-        if preserve_batch:
-            output = zero_volume_tensor(input.shape[0], device=device)
-        else:
-            output = zero_volume_tensor(device=device)
-
-        # MPI requests to clear
-        requests = []
-
-        # Send all of the data
-        if P_send.active:
-            input_numpy = input.detach().cpu().contiguous().numpy()
-            req = P_send._comm.Ibcast(input_numpy, root=0)
-            requests.append(req)
-
-        if P_recv.active:
-            # If I send to and receive from the same partition, make a copy.
-            if P_send == P_recv:
-                output = input.clone()
-            # If I just receive, receive the broadcast
-            else:
-                numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
-                output = np.zeros(output_tensor_structure.shape, dtype=numpy_dtype)
-
-                req = P_recv._comm.Ibcast(output, root=0)
-                req.Wait()
-                output = torch.tensor(output, requires_grad=output_tensor_structure.requires_grad, device=device)
+        ctx.device = input.device
 
-        # Complete all broadcast operations.
-        MPI.Request.Waitall(requests)
+        if work is None:
+            work = BroadcastFunction.start_forward(input, P_send, P_recv, preserve_batch,
+                                                   input_tensor_structure,
+                                                   output_tensor_structure)
 
-        return output
+        return work.wait()
 
     @staticmethod
     def backward(ctx, grad_output):
@@ -182,56 +331,13 @@ class BroadcastFunction(torch.autograd.Function):
             Output tensor.
         """
 
-        P_send = ctx.P_send
-        P_recv = ctx.P_recv
-        preserve_batch = ctx.preserve_batch
-        input_tensor_structure = ctx.input_tensor_structure
-        output_tensor_structure = ctx.output_tensor_structure
-        device = ctx.device
-
-        assert grad_output.device == device
-
-        # This allows all ranks to use the same exit path, so that we can be
-        # sure that all requests have cleared.
-        if preserve_batch:
-            grad_input = zero_volume_tensor(grad_output.shape[0], device=device)
-        else:
-            grad_input = zero_volume_tensor(device=device)
-
-        requests = []
-
-        # If I received data (either from a remote worker or just from myself)
-        # I need to reduce that data.  If I send and receive to myself, this
-        # is OK, as the reduction accounts for the copy, unlike the broadcast
-        # above.
-        if P_recv.active:
-            if ctx.scale_backward is not None:
-                grad_output.div_(ctx.scale_backward)
-            numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
-            reduced_data_recv = np.zeros(output_tensor_structure.shape, dtype=numpy_dtype)
-            grad_output_numpy = grad_output.detach().cpu().contiguous().numpy()
-            req = P_recv._comm.Ireduce(grad_output_numpy, reduced_data_recv, root=0, op=MPI.SUM)
-            requests.append(req)
+        assert grad_output.device == ctx.device
 
-        # If I sent data in the forward, I have to receive it here.  Unless I
-        # also received that data, then I already have it from above.
-        if P_send != P_recv and P_send.active:
-            numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-            reduced_data_send = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
-            req = P_send._comm.Ireduce(MPI.IN_PLACE, reduced_data_send, root=0, op=MPI.SUM)
-            requests.append(req)
-
-        MPI.Request.Waitall(requests)
-
-        # If we had to receive data, we need to tensorify it.
-        if P_send.active:
-            if P_send == P_recv:
-                grad_input = torch.tensor(reduced_data_recv,
-                                          requires_grad=input_tensor_structure.requires_grad,
-                                          device=device)
-            else:
-                grad_input = torch.tensor(reduced_data_send,
-                                          requires_grad=input_tensor_structure.requires_grad,
-                                          device=device)
+        work = BroadcastFunction.start_backward(grad_output, ctx.P_send, ctx.P_recv,
+                                                ctx.preserve_batch,
+                                                ctx.input_tensor_structure,
+                                                ctx.output_tensor_structure,
+                                                ctx.scale_backward)
+        grad_input = work.wait()
 
-        return grad_input, None, None, None, None, None, None
+        return grad_input, None, None, None, None, None, None, None
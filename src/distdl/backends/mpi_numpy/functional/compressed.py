@@ -0,0 +1,704 @@
+__all__ = ["CompressedAllGatherFunction",
+           "CompressedAllSumReduceFunction",
+           "CompressedBroadcastFunction",
+           "CompressedReduceScatterFunction",
+           "CompressedSumReduceFunction"]
+
+import numpy as np
+import torch
+from mpi4py import MPI
+
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.utilities import tracer
+from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.slicing import compute_balanced_counts
+from distdl.utilities.torch import to_numpy
+from distdl.utilities.torch import zero_volume_tensor
+
+# MPI has no 16-bit floating-point types, so compressed data are moved as
+# integers of the same width.
+_wire_dtypes = {1: torch.int8, 2: torch.int16, 4: torch.int32, 8: torch.int64}
+
+
+def _compress(tensor, comm_dtype):
+    r"""Returns a NumPy array with the bits of a tensor rounded to ``comm_dtype``."""
+
+    tensor = tensor.detach().to(dtype=comm_dtype, memory_format=torch.contiguous_format, copy=True)
+    return to_numpy(tensor.view(_wire_dtypes[tensor.element_size()]))
+
+
+def _decompress(array, comm_dtype, dtype, device):
+    r"""Returns the tensor, of type ``dtype``, encoded by :any:`_compress`."""
+
+    return torch.from_numpy(array).view(comm_dtype).to(device=device, dtype=dtype)
+
+
+def _accumulation_dtype(dtype):
+    return torch.promote_types(dtype, torch.float32)
+
+
+def _start_reduce_scatter(comm, data, counts, displacements, comm_dtype, dtype, device):
+    r"""Starts a reduce-scatter of compressed data, accumulated at full
+    precision.
+
+    The reduction takes two stages: an all-to-all exchanges the compressed
+    blocks, so that each worker receives every contribution to its block,
+    which it then sums at (at least) single precision.  This moves the same
+    volume as a ring reduce-scatter, but no partial sum is ever rounded.
+
+    Parameters
+    ----------
+    comm : MPI communicator
+        Communicator of the reduce-scatter.
+    data : numpy.ndarray
+        Compressed, contiguous data, with the blocks in rank order.
+    counts : tuple
+        Number of elements in the block of each worker.
+    displacements : tuple
+        Offset of the block of each worker.
+    comm_dtype : torch.dtype
+        Communication dtype.
+    dtype : torch.dtype
+        Dtype of the result.
+    device : torch.device
+        Device of the result.
+
+    Returns
+    -------
+    work :
+        Work handle, whose `wait()` returns the flat reduced block of the
+        local worker.
+
+    """
+
+    size = comm.Get_size()
+    count = counts[comm.Get_rank()]
+
+    received = np.empty((size, count), dtype=data.dtype)
+    req = comm.Ialltoallv((data, (counts, displacements)),
+                          (received, ([count] * size, [count * q for q in range(size)])))
+    tracer.mark("pack", sent=data.nbytes, received=received.nbytes)
+
+    def finalize():
+        blocks = _decompress(received, comm_dtype, _accumulation_dtype(dtype), device)
+        return blocks.sum(0).to(dtype)
+
+    return MPICollectiveWork([req], finalize, [data])
+
+
+def _start_all_gather(comm, data, counts, displacements, comm_dtype, dtype, device):
+    r"""Starts an all-gather of compressed data.
+
+    Returns a work handle, whose `wait()` returns the flat, decompressed
+    blocks of all workers, in rank order.
+
+    """
+
+    gathered = np.empty(sum(counts), dtype=data.dtype)
+    req = comm.Iallgatherv(data, (gathered, (counts, displacements)))
+    tracer.mark("pack", sent=data.nbytes, received=gathered.nbytes)
+
+    return MPICollectiveWork([req], lambda: _decompress(gathered, comm_dtype, dtype, device), [data])
+
+
+def _start_gather(comm, data, counts, displacements, comm_dtype, dtype, device):
+    r"""Starts a gather of compressed data to the root, 0, of ``comm``.
+
+    Returns a work handle, whose `wait()` returns, on the root, the flat,
+    decompressed blocks of all workers, in rank order, and None elsewhere.
+
+    """
+
+    gathered = np.empty(sum(counts), dtype=data.dtype) if comm.Get_rank() == 0 else None
+    req = comm.Igatherv(data, (gathered, (counts, displacements)), root=0)
+    tracer.mark("pack", sent=data.nbytes, received=0 if gathered is None else gathered.nbytes)
+
+    def finalize():
+        if gathered is None:
+            return None
+        return _decompress(gathered, comm_dtype, dtype, device)
+
+    return MPICollectiveWork([req], finalize, [data])
+
+
+def _sum_reduce(reductions, comm_dtype):
+    r"""Sum-reduces tensors to the root, 0, of their partitions, with
+    compressed communication and accumulation at full precision.
+
+    The reduction is a reduce-scatter (see :any:`_start_reduce_scatter`)
+    followed by a gather of the reduced blocks.  A worker may take part in
+    several reductions, over overlapping partitions, so each stage is started
+    for all of them before any is completed.
+
+    Parameters
+    ----------
+    reductions : list
+        Pairs of a partition and the local contribution to its reduction.
+    comm_dtype : torch.dtype
+        Communication dtype.
+
+    Returns
+    -------
+    List of the reduced tensors, on the roots, or None.
+
+    """
+
+    layouts = list()
+    works = list()
+    for P, tensor in reductions:
+        counts, displacements = compute_balanced_counts(tensor.numel(), P.size)
+        layouts.append((counts, displacements))
+        works.append(_start_reduce_scatter(P._comm, _compress(tensor, comm_dtype), counts, displacements,
+                                           comm_dtype, tensor.dtype, tensor.device))
+    blocks = [work.wait() for work in works]
+
+    works = [_start_gather(P._comm, _compress(block, comm_dtype), counts, displacements,
+                           comm_dtype, tensor.dtype, tensor.device)
+             for (P, tensor), block, (counts, displacements) in zip(reductions, blocks, layouts)]
+    gathered = [work.wait() for work in works]
+
+    return [data if data is None else data.view(tensor.shape)
+            for (_, tensor), data in zip(reductions, gathered)]
+
+
+def _broadcast(broadcasts, comm_dtype, structure, device):
+    r"""Broadcasts tensors from the root, 0, of their partitions, with
+    compressed communication.
+
+    Parameters
+    ----------
+    broadcasts : list
+        Pairs of a partition and, on its root, the tensor to broadcast, or
+        None elsewhere.
+    comm_dtype : torch.dtype
+        Communication dtype.
+    structure : TensorStructure
+        Structure of the tensors received by non-root workers.
+    device : torch.device
+        Device of the received tensors.
+
+    Returns
+    -------
+    List of the broadcast tensors, rounded to ``comm_dtype``, on all workers.
+
+    """
+
+    requests = list()
+    arrays = list()
+    for P, tensor in broadcasts:
+        if tensor is not None:
+            data = _compress(tensor, comm_dtype)
+        else:
+            wire_dtype = _wire_dtypes[torch.empty((), dtype=comm_dtype).element_size()]
+            data = np.empty(structure.shape, dtype=torch_to_numpy_dtype_dict[wire_dtype])
+        requests.append(P._comm.Ibcast(data, root=0))
+        arrays.append((data, tensor))
+        if tensor is not None:
+            tracer.mark("pack", sent=data.nbytes)
+        else:
+            tracer.mark("pack", received=data.nbytes)
+
+    MPI.Request.Waitall(requests)
+    tracer.mark("wait")
+
+    outputs = [_decompress(data, comm_dtype,
+                           structure.dtype if tensor is None else tensor.dtype,
+                           device if tensor is None else tensor.device)
+               for data, tensor in arrays]
+    tracer.mark("unpack")
+
+    return outputs
+
+
+def _empty_output(preserve_batch, batch_tensor, device):
+    if preserve_batch:
+        return zero_volume_tensor(batch_tensor.shape[0], device=device)
+    return zero_volume_tensor(device=device)
+
+
+class CompressedAllGatherFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed all-gather layer,
+    with compressed communication.
+
+    Data are rounded to a lower precision communication dtype, e.g.,
+    ``torch.bfloat16``, before they are gathered, and the gathered data are
+    returned at the dtype of the input.  Every worker receives the same,
+    rounded, data, including for its own block.
+
+    The adjoint, a reduce-scatter, exchanges the compressed gradients with an
+    all-to-all and accumulates them at full precision.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
+    """
+
+    @staticmethod
+    def start_forward(input, P_allgather,
+                      input_tensor_structure, output_tensor_structure, axes, comm_dtype):
+        r"""Starts the forward all-gather, without waiting for it to complete.
+
+        See :any:`AllGatherFunction.start_forward`.  ``comm_dtype`` is the
+        communication dtype.
+
+        """
+
+        device = input.device
+        axis = axes[0]
+        output_tensor_shape = list(output_tensor_structure.shape)
+
+        if not P_allgather.active:
+            return MPICollectiveWork([], lambda: zero_volume_tensor(device=device,
+                                                                    dtype=output_tensor_structure.dtype))
+
+        # Data are gathered with the all-gather dimension leading, so that
+        # the contribution of each worker is a contiguous block of the output.
+        gathered_shape = [output_tensor_shape[axis]] + output_tensor_shape[:axis] + output_tensor_shape[axis+1:]
+        counts, displacements = compute_balanced_counts(gathered_shape[0],
+                                                        P_allgather.shape[axis],
+                                                        int(np.prod(gathered_shape[1:])))
+
+        work = _start_all_gather(P_allgather._comm, _compress(input.movedim(axis, 0), comm_dtype),
+                                 counts, displacements, comm_dtype, output_tensor_structure.dtype, device)
+
+        def finalize(gathered):
+            output = gathered.view(gathered_shape).movedim(0, axis).contiguous()
+            return output.requires_grad_(output_tensor_structure.requires_grad)
+
+        return work.then(finalize)
+
+    @staticmethod
+    def start_backward(grad_output, P_allgather,
+                       input_tensor_structure, output_tensor_structure, axes,
+                       scale_backward, comm_dtype):
+        r"""Starts the adjoint all-gather (a reduce-scatter), without waiting
+        for it to complete.
+
+        See :any:`AllGatherFunction.start_backward`.  ``comm_dtype`` is the
+        communication dtype.
+
+        """
+
+        device = grad_output.device
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
+        output_tensor_shape = list(output_tensor_structure.shape)
+
+        if scale_backward is not None:
+            grad_output.div_(scale_backward)
+
+        if not P_allgather.active:
+            return MPICollectiveWork([], lambda: zero_volume_tensor(device=device,
+                                                                    dtype=input_tensor_structure.dtype))
+
+        scattered_shape = [input_tensor_shape[axis]] + input_tensor_shape[:axis] + input_tensor_shape[axis+1:]
+        counts, displacements = compute_balanced_counts(output_tensor_shape[axis],
+                                                        P_allgather.shape[axis],
+                                                        int(np.prod(scattered_shape[1:])))
+
+        work = _start_reduce_scatter(P_allgather._comm, _compress(grad_output.movedim(axis, 0), comm_dtype),
+                                     counts, displacements, comm_dtype, input_tensor_structure.dtype, device)
+
+        def finalize(block):
+            grad_input = block.view(scattered_shape).movedim(0, axis).contiguous()
+            return grad_input.requires_grad_(input_tensor_structure.requires_grad)
+
+        return work.then(finalize)
+
+    @staticmethod
+    def forward(ctx, input, P_allgather,
+                input_tensor_structure, output_tensor_structure, axes, scale_backward, comm_dtype,
+                work=None):
+
+        ctx.P_allgather = P_allgather
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.axes = axes
+        ctx.scale_backward = scale_backward
+        ctx.comm_dtype = comm_dtype
+
+        if work is None:
+            work = CompressedAllGatherFunction.start_forward(input, P_allgather,
+                                                             input_tensor_structure,
+                                                             output_tensor_structure,
+                                                             axes, comm_dtype)
+
+        return work.wait()
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        work = CompressedAllGatherFunction.start_backward(grad_output, ctx.P_allgather,
+                                                          ctx.input_tensor_structure,
+                                                          ctx.output_tensor_structure,
+                                                          ctx.axes,
+                                                          ctx.scale_backward,
+                                                          ctx.comm_dtype)
+
+        return work.wait(), None, None, None, None, None, None, None
+
+
+class CompressedReduceScatterFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed reduce-scatter
+    layer, with compressed communication.
+
+    Data are rounded to a lower precision communication dtype, e.g.,
+    ``torch.bfloat16``, and exchanged with an all-to-all, after which each
+    worker sums the contributions to its block at (at least) single
+    precision.  The adjoint, an all-gather, gathers the compressed data.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
+    """
+
+    @staticmethod
+    def start_forward(input, P_reducescatter,
+                      input_tensor_structure, output_tensor_structure, axes, comm_dtype):
+        r"""Starts the forward reduce-scatter, without waiting for it to
+        complete.
+
+        See :any:`ReduceScatterFunction.start_forward`.  ``comm_dtype`` is
+        the communication dtype.
+
+        """
+
+        device = input.device
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
+        output_tensor_shape = list(output_tensor_structure.shape)
+
+        if not P_reducescatter.active:
+            return MPICollectiveWork([], lambda: zero_volume_tensor(device=device,
+                                                                    dtype=output_tensor_structure.dtype))
+
+        scattered_shape = [output_tensor_shape[axis]] + output_tensor_shape[:axis] + output_tensor_shape[axis+1:]
+        counts, displacements = compute_balanced_counts(input_tensor_shape[axis],
+                                                        P_reducescatter.shape[axis],
+                                                        int(np.prod(scattered_shape[1:])))
+
+        work = _start_reduce_scatter(P_reducescatter._comm, _compress(input.movedim(axis, 0), comm_dtype),
+                                     counts, displacements, comm_dtype, output_tensor_structure.dtype, device)
+
+        def finalize(block):
+            output = block.view(scattered_shape).movedim(0, axis).contiguous()
+            return output.requires_grad_(output_tensor_structure.requires_grad)
+
+        return work.then(finalize)
+
+    @staticmethod
+    def start_backward(grad_output, P_reducescatter,
+                       input_tensor_structure, output_tensor_structure, axes, comm_dtype):
+        r"""Starts the adjoint reduce-scatter (an all-gather), without waiting
+        for it to complete.
+
+        See :any:`ReduceScatterFunction.start_backward`.  ``comm_dtype`` is
+        the communication dtype.
+
+        """
+
+        device = grad_output.device
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
+
+        if not P_reducescatter.active:
+            return MPICollectiveWork([], lambda: zero_volume_tensor(device=device,
+                                                                    dtype=input_tensor_structure.dtype))
+
+        gathered_shape = [input_tensor_shape[axis]] + input_tensor_shape[:axis] + input_tensor_shape[axis+1:]
+        counts, displacements = compute_balanced_counts(gathered_shape[0],
+                                                        P_reducescatter.shape[axis],
+                                                        int(np.prod(gathered_shape[1:])))
+
+        work = _start_all_gather(P_reducescatter._comm, _compress(grad_output.movedim(axis, 0), comm_dtype),
+                                 counts, displacements, comm_dtype, input_tensor_structure.dtype, device)
+
+        return work.then(lambda gathered: gathered.view(gathered_shape).movedim(0, axis).contiguous())
+
+    @staticmethod
+    def forward(ctx, input, P_reducescatter,
+                input_tensor_structure, output_tensor_structure, axes, comm_dtype,
+                work=None):
+
+        ctx.P_reducescatter = P_reducescatter
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.axes = axes
+        ctx.comm_dtype = comm_dtype
+
+        if work is None:
+            work = CompressedReduceScatterFunction.start_forward(input, P_reducescatter,
+                                                                 input_tensor_structure,
+                                                                 output_tensor_structure,
+                                                                 axes, comm_dtype)
+
+        return work.wait()
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        work = CompressedReduceScatterFunction.start_backward(grad_output, ctx.P_reducescatter,
+                                                              ctx.input_tensor_structure,
+                                                              ctx.output_tensor_structure,
+                                                              ctx.axes,
+                                                              ctx.comm_dtype)
+
+        return work.wait(), None, None, None, None, None, None
+
+
+class CompressedAllSumReduceFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed all-sum-reduce
+    layer, with compressed communication.
+
+    The flattened tensor is reduce-scattered as by
+    :any:`CompressedReduceScatterFunction`, with accumulation at full
+    precision, and the reduced blocks are rounded once more to the
+    communication dtype and all-gathered.  All workers receive the same,
+    rounded, result.  The layer is self-adjoint.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`.  Only the first stage is
+    started; the all-gather runs in the `wait()` of the returned handle.
+
+    """
+
+    @staticmethod
+    def _start(input, P_allreduce, tensor_structure, comm_dtype):
+
+        device = input.device
+
+        if not P_allreduce.active:
+            return MPICollectiveWork([], lambda: zero_volume_tensor(device=device))
+
+        counts, displacements = compute_balanced_counts(input.numel(), P_allreduce.size)
+        work = _start_reduce_scatter(P_allreduce._comm, _compress(input, comm_dtype),
+                                     counts, displacements, comm_dtype, tensor_structure.dtype, device)
+
+        def finalize(block):
+            output = _start_all_gather(P_allreduce._comm, _compress(block, comm_dtype),
+                                       counts, displacements, comm_dtype, tensor_structure.dtype, device).wait()
+            return output.view(tensor_structure.shape).requires_grad_(tensor_structure.requires_grad)
+
+        return work.then(finalize)
+
+    @staticmethod
+    def start_forward(input, P_allreduce,
+                      input_tensor_structure, output_tensor_structure, comm_dtype):
+        r"""Starts the forward all-sum-reduction, without waiting for it to
+        complete.
+
+        See :any:`AllSumReduceFunction.start_forward`.  ``comm_dtype`` is the
+        communication dtype.
+
+        """
+
+        return CompressedAllSumReduceFunction._start(input, P_allreduce, output_tensor_structure, comm_dtype)
+
+    @staticmethod
+    def start_backward(grad_output, P_allreduce, input_tensor_structure, scale_backward, comm_dtype):
+        r"""Starts the adjoint all-sum-reduction, without waiting for it to
+        complete.
+
+        See :any:`AllSumReduceFunction.start_backward`.  ``comm_dtype`` is the
+        communication dtype.
+
+        """
+
+        if scale_backward is not None:
+            grad_output.div_(scale_backward)
+
+        return CompressedAllSumReduceFunction._start(grad_output, P_allreduce, input_tensor_structure, comm_dtype)
+
+    @staticmethod
+    def forward(ctx, input, P_allreduce,
+                input_tensor_structure, output_tensor_structure, scale_backward, comm_dtype,
+                work=None):
+
+        ctx.P_allreduce = P_allreduce
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.scale_backward = scale_backward
+        ctx.comm_dtype = comm_dtype
+
+        if work is None:
+            work = CompressedAllSumReduceFunction.start_forward(input, P_allreduce,
+                                                                input_tensor_structure,
+                                                                output_tensor_structure,
+                                                                comm_dtype)
+
+        return work.wait()
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        work = CompressedAllSumReduceFunction.start_backward(grad_output, ctx.P_allreduce,
+                                                             ctx.input_tensor_structure,
+                                                             ctx.scale_backward,
+                                                             ctx.comm_dtype)
+
+        return work.wait(), None, None, None, None, None, None
+
+
+class CompressedBroadcastFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed broadcast layer,
+    with compressed communication.
+
+    The input is rounded to the communication dtype and broadcast.  Workers
+    that are both the source and a destination of the broadcast also output
+    the rounded input, so all copies are identical.
+
+    The adjoint, a sum-reduction, is a compressed reduce-scatter, with
+    accumulation at full precision, followed by a compressed gather to the
+    root.  See :any:`BroadcastFunction` for the roles of the send and receive
+    partitions.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, P_send, P_recv, preserve_batch,
+                input_tensor_structure, output_tensor_structure,
+                scale_backward, comm_dtype):
+
+        device = input.device
+        ctx.P_send = P_send
+        ctx.P_recv = P_recv
+        ctx.preserve_batch = preserve_batch
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.scale_backward = scale_backward
+        ctx.comm_dtype = comm_dtype
+        ctx.device = device
+
+        output = _empty_output(preserve_batch, input, device)
+
+        broadcasts = list()
+        if P_send.active:
+            broadcasts.append((P_send, input))
+        if P_recv.active and P_send != P_recv:
+            broadcasts.append((P_recv, None))
+        outputs = _broadcast(broadcasts, comm_dtype, output_tensor_structure, device)
+
+        if P_recv.active:
+            output = outputs[-1].requires_grad_(output_tensor_structure.requires_grad)
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        P_send = ctx.P_send
+        P_recv = ctx.P_recv
+        device = ctx.device
+
+        grad_input = _empty_output(ctx.preserve_batch, grad_output, device)
+
+        reductions = list()
+        if P_recv.active:
+            if ctx.scale_backward is not None:
+                grad_output.div_(ctx.scale_backward)
+            reductions.append((P_recv, grad_output))
+        if P_send != P_recv and P_send.active:
+            reductions.append((P_send, torch.zeros(ctx.input_tensor_structure.shape,
+                                                   dtype=ctx.input_tensor_structure.dtype,
+                                                   device=device)))
+        reduced = _sum_reduce(reductions, ctx.comm_dtype)
+
+        if P_send.active:
+            grad_input = reduced[-1].requires_grad_(ctx.input_tensor_structure.requires_grad)
+
+        return grad_input, None, None, None, None, None, None, None
+
+
+class CompressedSumReduceFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed sum-reduction
+    layer, with compressed communication.
+
+    The sum-reduction is a compressed reduce-scatter, with accumulation at
+    full precision, followed by a compressed gather to the root.  The
+    adjoint, a broadcast, broadcasts the compressed data.  See
+    :any:`SumReduceFunction` for the roles of the send and receive
+    partitions.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, P_send, P_recv, preserve_batch,
+                input_tensor_structure, output_tensor_structure, comm_dtype):
+
+        device = input.device
+        ctx.P_send = P_send
+        ctx.P_recv = P_recv
+        ctx.preserve_batch = preserve_batch
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.comm_dtype = comm_dtype
+        ctx.device = device
+
+        output = _empty_output(preserve_batch, input, device)
+
+        reductions = list()
+        if P_send.active:
+            reductions.append((P_send, input))
+        if P_send != P_recv and P_recv.active:
+            reductions.append((P_recv, torch.zeros(output_tensor_structure.shape,
+                                                   dtype=output_tensor_structure.dtype,
+                                                   device=device)))
+        reduced = _sum_reduce(reductions, comm_dtype)
+
+        if P_recv.active and reduced[-1] is not None:
+            output = reduced[-1].requires_grad_(output_tensor_structure.requires_grad)
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        P_send = ctx.P_send
+        P_recv = ctx.P_recv
+        device = ctx.device
+
+        grad_input = _empty_output(ctx.preserve_batch, grad_output, device)
+
+        broadcasts = list()
+        if P_recv.active:
+            broadcasts.append((P_recv, grad_output))
+        if P_send.active and P_send != P_recv:
+            broadcasts.append((P_send, None))
+        grads = _broadcast(broadcasts, ctx.comm_dtype, ctx.input_tensor_structure, device)
+
+        if P_send.active:
+            grad_input = grads[-1].requires_grad_(ctx.input_tensor_structure.requires_grad)
+
+        return grad_input, None, None, None, None, None, None
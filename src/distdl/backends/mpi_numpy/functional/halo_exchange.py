@@ -1,79 +1,171 @@
-__all__ = ["HaloExchangeFunction"]
+__all__ = ["HaloExchangeFunction", "NeighborhoodHaloExchangeFunction"]
 
 import numpy as np
 import torch
 from mpi4py import MPI
 
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.utilities import tracer
 from distdl.utilities.slicing import compute_nd_slice_shape
 from distdl.utilities.torch import zero_volume_tensor
 
 
 class HaloExchangeFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed halo exchange.
+
+    Note
+    ----
+    The forward exchange can also be started asynchronously, with
+    `start_forward()`, which returns a work handle whose `wait()` completes
+    the exchange and returns the result.
+
+    """
 
     @staticmethod
-    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks):
+    def _post_exchange(output, i, P_x, slices, buffers, neighbor_ranks):
+
+        lbs, lgs, rbs, rgs = slices[i]
+        lbb, lgb, rbb, rgb = buffers[i]
+        if lbb is not None:
+            lbb = lbb.get_view(compute_nd_slice_shape(lbs))
+        if lgb is not None:
+            lgb = lgb.get_view(compute_nd_slice_shape(lgs))
+        if rbb is not None:
+            rbb = rbb.get_view(compute_nd_slice_shape(rbs))
+        if rgb is not None:
+            rgb = rgb.get_view(compute_nd_slice_shape(rgs))
+        lrank, rrank = neighbor_ranks[i]
+
+        if lbb is not None:
+            np.copyto(lbb, output[lbs].cpu().numpy())
+        if rbb is not None:
+            np.copyto(rbb, output[rbs].cpu().numpy())
+
+        ltag = 0
+        rtag = 1
+
+        lrecv_req = P_x._comm.Irecv(lgb, source=lrank, tag=rtag) if lgb is not None else MPI.REQUEST_NULL
+        rrecv_req = P_x._comm.Irecv(rgb, source=rrank, tag=ltag) if rgb is not None else MPI.REQUEST_NULL
+        lsend_req = P_x._comm.Isend(lbb, dest=lrank, tag=ltag) if lbb is not None else MPI.REQUEST_NULL
+        rsend_req = P_x._comm.Isend(rbb, dest=rrank, tag=rtag) if rbb is not None else MPI.REQUEST_NULL
+
+        reqs = [lrecv_req, rrecv_req, lsend_req, rsend_req]
+        ghosts = (lgs, lgb, rgs, rgb)
+        tracer.mark("pack",
+                    sent=sum(b.nbytes for b in (lbb, rbb) if b is not None),
+                    received=sum(b.nbytes for b in (lgb, rgb) if b is not None))
+
+        return reqs, ghosts
 
-        device = input.device
-        ctx.slices = slices
-        ctx.buffers = buffers
-        ctx.neighbor_ranks = neighbor_ranks
-        ctx.P_x = P_x
-        ctx.device = device
+    @staticmethod
+    def _unpack_exchange(output, index, ghosts):
 
-        if not P_x.active:
-            return zero_volume_tensor(input.shape[0], device=device)
+        lgs, lgb, rgs, rgb = ghosts
+
+        # Ghost data are written through .data, so that the writes are not
+        # seen by autograd when the exchange is in place.  Only ghost regions,
+        # which no other operation reads, are modified.
+        if index == 0 and lgb is not None:
+            output.data[lgs] = torch.as_tensor(lgb, device=output.device)
+        elif index == 1 and rgb is not None:
+            output.data[rgs] = torch.as_tensor(rgb, device=output.device)
+
+    @staticmethod
+    def start_forward(input, P_x, slices, buffers, neighbor_ranks, inplace=False):
+        r"""Starts the forward halo exchange, without waiting for it to complete.
+
+        Only the exchange along the first dimension with neighbors is started
+        immediately.  The remaining dimensions depend on its ghost data, so
+        they are exchanged, in order, when the handle is waited on.  To have
+        all dimensions in flight at once, use
+        :any:`NeighborhoodHaloExchangeFunction`.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor, with space allocated for the halos.
+        P_x : Partition
+            Partition of the input tensor.
+        slices : list
+            Bulk and ghost slices in each dimension.
+        buffers : list
+            Send and receive buffers in each dimension.
+        neighbor_ranks : list
+            Left and right neighbor in each dimension.
+        inplace : bool, optional
+            Write the ghost data directly into the input tensor, rather than
+            into a copy of it.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the exchanged tensor.
+
+        """
+
+        if P_x.size == 1:
+            return MPICollectiveWork([], lambda: input)
 
         # TODO: mark_dirty() is buggy and does not work properly if halo exchange is
-        # chained with certain operations like ReLU, MaxPool, etc. For now, we make
-        # a memory copy of the input, rather than modifying the halo in place.
+        # chained with certain operations like ReLU, MaxPool, etc. Unless the caller
+        # owns the input, e.g., a persistent padded buffer, we make a memory copy of
+        # the input, rather than modifying the halo in place.
         # ctx.mark_dirty(input)
-        output = torch.clone(input.detach())
+        if inplace:
+            output = input.detach()
+        else:
+            output = torch.clone(input.detach())
 
-        if P_x.size == 1:
-            return input
+        # Leading dimensions without neighbors, e.g., the batch and channel
+        # dimensions, have nothing to exchange
+        first = next((i for i, ranks in enumerate(neighbor_ranks) if any(r != MPI.PROC_NULL for r in ranks)), 0)
+        reqs, ghosts = HaloExchangeFunction._post_exchange(output, first, P_x, slices, buffers, neighbor_ranks)
 
-        dim = P_x.dim
-        for i in range(dim):
+        def finalize():
 
-            lbs, lgs, rbs, rgs = slices[i]
-            lbb, lgb, rbb, rgb = buffers[i]
-            if lbb is not None:
-                lbb = lbb.get_view(compute_nd_slice_shape(lbs))
-            if lgb is not None:
-                lgb = lgb.get_view(compute_nd_slice_shape(lgs))
-            if rbb is not None:
-                rbb = rbb.get_view(compute_nd_slice_shape(rbs))
-            if rgb is not None:
-                rgb = rgb.get_view(compute_nd_slice_shape(rgs))
-            lrank, rrank = neighbor_ranks[i]
+            HaloExchangeFunction._unpack_exchange(output, 0, ghosts)
+            HaloExchangeFunction._unpack_exchange(output, 1, ghosts)
 
-            if lbb is not None:
-                np.copyto(lbb, output[lbs].cpu().numpy())
-            if rbb is not None:
-                np.copyto(rbb, output[rbs].cpu().numpy())
+            for i in range(first + 1, P_x.dim):
 
-            ltag = 0
-            rtag = 1
+                reqs, ghosts_i = HaloExchangeFunction._post_exchange(output, i, P_x, slices, buffers,
+                                                                     neighbor_ranks)
+                n_reqs_completed = 0
 
-            lrecv_req = P_x._comm.Irecv(lgb, source=lrank, tag=rtag) if lgb is not None else MPI.REQUEST_NULL
-            rrecv_req = P_x._comm.Irecv(rgb, source=rrank, tag=ltag) if rgb is not None else MPI.REQUEST_NULL
-            lsend_req = P_x._comm.Isend(lbb, dest=lrank, tag=ltag) if lbb is not None else MPI.REQUEST_NULL
-            rsend_req = P_x._comm.Isend(rbb, dest=rrank, tag=rtag) if rbb is not None else MPI.REQUEST_NULL
+                while n_reqs_completed < len(reqs):
+                    status = MPI.Status()
+                    index = MPI.Request.Waitany(reqs, status)
+                    tracer.mark("wait")
 
-            reqs = [lrecv_req, rrecv_req, lsend_req, rsend_req]
-            n_reqs_completed = 0
+                    if index != MPI.UNDEFINED:
+                        HaloExchangeFunction._unpack_exchange(output, index, ghosts_i)
+                        tracer.mark("unpack")
 
-            while n_reqs_completed < len(reqs):
-                status = MPI.Status()
-                index = MPI.Request.Waitany(reqs, status)
+                    n_reqs_completed += 1
 
-                if index != MPI.UNDEFINED:
-                    if index == 0:
-                        output[lgs] = torch.tensor(lgb, device=device)
-                    elif index == 1:
-                        output[rgs] = torch.tensor(rgb, device=device)
+            return output
 
-                n_reqs_completed += 1
+        return MPICollectiveWork(reqs, finalize)
+
+    @staticmethod
+    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks, inplace=False, work=None):
+
+        device = input.device
+        ctx.slices = slices
+        ctx.buffers = buffers
+        ctx.neighbor_ranks = neighbor_ranks
+        ctx.P_x = P_x
+        ctx.device = device
+
+        if not P_x.active:
+            return zero_volume_tensor(input.shape[0], device=device)
+
+        if work is None:
+            work = HaloExchangeFunction.start_forward(input, P_x, slices, buffers, neighbor_ranks, inplace)
+        output = work.wait()
+
+        if P_x.size == 1:
+            return output
 
         return output.requires_grad_(input.requires_grad)
 
@@ -89,10 +181,10 @@ class HaloExchangeFunction(torch.autograd.Function):
         assert grad_output.device == device
 
         if not P_x.active:
-            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None
+            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None, None, None
 
         if P_x.size == 1:
-            return grad_output, None, None, None, None
+            return grad_output, None, None, None, None, None, None
 
         ctx.mark_dirty(grad_output)
 
@@ -127,18 +219,210 @@ class HaloExchangeFunction(torch.autograd.Function):
             rsend_req = P_x._comm.Isend(rgb, dest=rrank, tag=rtag) if rgb is not None else MPI.REQUEST_NULL
 
             reqs = [lrecv_req, rrecv_req, lsend_req, rsend_req]
+            tracer.mark("pack",
+                        sent=sum(b.nbytes for b in (lgb, rgb) if b is not None),
+                        received=sum(b.nbytes for b in (lbb, rbb) if b is not None))
             n_reqs_completed = 0
 
             while n_reqs_completed < len(reqs):
                 status = MPI.Status()
                 index = MPI.Request.Waitany(reqs, status)
+                tracer.mark("wait")
 
                 if index != MPI.UNDEFINED:
                     if index == 0:
-                        grad_output[lbs] += torch.tensor(lbb, device=device)
+                        grad_output[lbs] += torch.as_tensor(lbb, device=device)
                     elif index == 1:
-                        grad_output[rbs] += torch.tensor(rbb, device=device)
+                        grad_output[rbs] += torch.as_tensor(rbb, device=device)
+                    tracer.mark("unpack")
 
                 n_reqs_completed += 1
 
-        return grad_output, None, None, None, None
+        return grad_output, None, None, None, None, None, None
+
+
+class NeighborhoodHaloExchangeFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a concurrent halo exchange.
+
+    Rather than exchanging one dimension at a time, every worker exchanges
+    directly with all of its Cartesian neighbors, including the diagonal
+    neighbors that own the corners of the halo.  All messages are posted at
+    once, so the exchange costs a single round of communication regardless
+    of the tensor dimension.
+
+    Note
+    ----
+    The forward exchange can also be started asynchronously, with
+    `start_forward()`, which returns a work handle whose `wait()` completes
+    the exchange and returns the result.
+
+    """
+
+    @staticmethod
+    def _compute_tags(offset):
+
+        # Messages are tagged by the direction they travel in, so the tag
+        # of a message received from the neighbor at `offset` is that of
+        # the opposite direction.
+        dim = len(offset)
+        send_tag = int(np.ravel_multi_index(np.asarray(offset) + 1, (3,) * dim))
+        recv_tag = 3**dim - 1 - send_tag
+
+        return send_tag, recv_tag
+
+    @staticmethod
+    def start_forward(input, P_x, slices, buffers, neighbor_ranks, inplace=False):
+        r"""Starts the forward halo exchange, without waiting for it to complete.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor, with space allocated for the halos.
+        P_x : Partition
+            Partition of the input tensor.
+        slices : list
+            (offset, bulk slice, ghost slice) for each neighbor.
+        buffers : list
+            (bulk buffer, ghost buffer) for each neighbor.
+        neighbor_ranks : list
+            (offset, rank) for each neighbor.
+        inplace : bool, optional
+            Write the ghost data directly into the input tensor, rather than
+            into a copy of it.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the exchanged tensor.
+
+        """
+
+        if P_x.size == 1:
+            return MPICollectiveWork([], lambda: input)
+
+        if inplace:
+            output = input.detach()
+        else:
+            output = torch.clone(input.detach())
+
+        recv_reqs = []
+        send_reqs = []
+        ghosts = []
+
+        for (offset, bs, gs), (bb, gb), (_, rank) in zip(slices, buffers, neighbor_ranks):
+
+            if rank == MPI.PROC_NULL:
+                continue
+
+            send_tag, recv_tag = NeighborhoodHaloExchangeFunction._compute_tags(offset)
+
+            if gb is not None:
+                gb = gb.get_view(compute_nd_slice_shape(gs))
+                recv_reqs.append(P_x._comm.Irecv(gb, source=rank, tag=recv_tag))
+                ghosts.append((gs, gb))
+                tracer.mark("pack", received=gb.nbytes)
+
+            if bb is not None:
+                bb = bb.get_view(compute_nd_slice_shape(bs))
+                np.copyto(bb, output[bs].cpu().numpy())
+                send_reqs.append(P_x._comm.Isend(bb, dest=rank, tag=send_tag))
+                tracer.mark("pack", sent=bb.nbytes)
+
+        def finalize():
+
+            # Ghost data are written through .data, so that the writes are not
+            # seen by autograd when the exchange is in place.
+            for gs, gb in ghosts:
+                output.data[gs] = torch.as_tensor(gb, device=output.device)
+
+            return output
+
+        return MPICollectiveWork(recv_reqs + send_reqs, finalize)
+
+    @staticmethod
+    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks, inplace=False, work=None):
+
+        device = input.device
+        ctx.slices = slices
+        ctx.buffers = buffers
+        ctx.neighbor_ranks = neighbor_ranks
+        ctx.P_x = P_x
+        ctx.device = device
+
+        if not P_x.active:
+            return zero_volume_tensor(input.shape[0], device=device)
+
+        if work is None:
+            work = NeighborhoodHaloExchangeFunction.start_forward(input, P_x, slices, buffers,
+                                                                  neighbor_ranks, inplace)
+        output = work.wait()
+
+        if P_x.size == 1:
+            return output
+
+        return output.requires_grad_(input.requires_grad)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+
+        slices = ctx.slices
+        buffers = ctx.buffers
+        neighbor_ranks = ctx.neighbor_ranks
+        P_x = ctx.P_x
+        device = ctx.device
+
+        assert grad_output.device == device
+
+        if not P_x.active:
+            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None, None, None
+
+        if P_x.size == 1:
+            return grad_output, None, None, None, None, None, None
+
+        ctx.mark_dirty(grad_output)
+
+        # The adjoint sends the ghost gradients back to their owners, which
+        # add them to their bulk.  The bulk regions sent to different
+        # neighbors overlap, so the received contributions are accumulated.
+        recv_reqs = []
+        send_reqs = []
+        bulks = []
+        ghost_slices = []
+
+        for (offset, bs, gs), (bb, gb), (_, rank) in zip(slices, buffers, neighbor_ranks):
+
+            if rank == MPI.PROC_NULL:
+                continue
+
+            send_tag, recv_tag = NeighborhoodHaloExchangeFunction._compute_tags(offset)
+
+            if bb is not None:
+                bb = bb.get_view(compute_nd_slice_shape(bs))
+                recv_reqs.append(P_x._comm.Irecv(bb, source=rank, tag=recv_tag))
+                bulks.append((bs, bb))
+                tracer.mark("pack", received=bb.nbytes)
+
+            if gb is not None:
+                gb = gb.get_view(compute_nd_slice_shape(gs))
+                np.copyto(gb, grad_output.detach()[gs].cpu().numpy())
+                send_reqs.append(P_x._comm.Isend(gb, dest=rank, tag=send_tag))
+                ghost_slices.append(gs)
+                tracer.mark("pack", sent=gb.nbytes)
+
+        for gs in ghost_slices:
+            grad_output[gs] = 0.0
+
+        # All contributions are received before any is added, so that they
+        # are accumulated in the fixed neighbor order and the result does
+        # not depend on the order in which the messages arrive.
+        MPI.Request.Waitall(recv_reqs)
+        tracer.mark("wait")
+
+        for bs, bb in bulks:
+            grad_output[bs] += torch.as_tensor(bb, device=device)
+        tracer.mark("unpack")
+
+        MPI.Request.Waitall(send_reqs)
+        tracer.mark("wait")
+
+        return grad_output, None, None, None, None, None, None
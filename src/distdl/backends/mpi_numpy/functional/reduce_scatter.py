@@ -2,12 +2,14 @@ __all__ = ["ReduceScatterFunction"]
 
 import numpy as np
 import torch
-from einops import rearrange
 from mpi4py import MPI
 
+from distdl.backends.common.work import MPICollectiveWork
+from distdl.backends.mpi_numpy.buffer_numpy import default_buffer_pool
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
-from distdl.utilities.slicing import get_rearrange_ordering
-from distdl.utilities.torch import distdl_padding_to_torch_padding
+from distdl.utilities.slicing import compute_balanced_counts
+from distdl.utilities.torch import to_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -29,24 +31,22 @@ class ReduceScatterFunction(torch.autograd.Function):
     -------
     The ``mpi4py`` interface currently used requires NumPy views of the tensors.
 
+    Note
+    ----
+    The communication of each pass can also be started asynchronously, with
+    `start_forward()` and `start_backward()`, which return a work handle
+    whose `wait()` completes the communication and returns the result.
+
     """
 
     @staticmethod
-    def forward(ctx, input, P_reducescatter,
-                input_tensor_structure, output_tensor_structure, axes
-                ):
-        r"""Forward function of distributed reduce-scatter layer.
-
-        This method implements the forward reduce-scatter operation using the
-        ``MPI_Ireduce_scatter`` function on the communicator defined by ``P_reducescatter``.
-
-        When the current worker is inactive in the ``P_reducescatter`` partition, it will
-        output a zero-volume tensor.
+    def start_forward(input, P_reducescatter,
+                      input_tensor_structure, output_tensor_structure, axes):
+        r"""Starts the forward reduce-scatter, without waiting for it to
+        complete.
 
         Parameters
         ----------
-        ctx :
-            PyTorch context.
         input : `torch.tensor`
             Input tensor.
         P_reducescatter : Partition
@@ -62,180 +62,213 @@ class ReduceScatterFunction(torch.autograd.Function):
 
         Returns
         -------
-        output :
-            Output tensor.
+        work :
+            Work handle, whose `wait()` returns the output tensor.
 
         """
 
         device = input.device
-        ctx.P_reducescatter = P_reducescatter
-        ctx.input_tensor_structure = input_tensor_structure
-        ctx.output_tensor_structure = output_tensor_structure
-        ctx.device = device
-        ctx.axes = axes
-        ctx.remainder = 0
 
-        output = zero_volume_tensor(device=device, dtype=output_tensor_structure.dtype)
-        output_tensor_shape = output_tensor_structure.shape.copy()
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
+        output_tensor_shape = list(output_tensor_structure.shape)
 
         requests = []
+        buffers = []
+        scattered_data = None
 
         # There is no need to specificy a root.
         if P_reducescatter.active:
 
-            # Get operator to rearrange tensor to be contiguous along the reduce-scatter axis
-            expanded_order, new_order = get_rearrange_ordering(len(input.shape), axes[0])
-            operation = new_order + ' -> ' + expanded_order
-
-            # If input shape does not split evenly along no. of partitions, we need to zero-pad
-            ctx.remainder = input_tensor_structure.shape[axes[0]] % P_reducescatter.shape[axes[0]]
-            if ctx.remainder > 0:
-
-                # Split tensor along reduce-scatter axis
-                local_shapes = [input_tensor_structure.shape[axes[0]] // P_reducescatter.shape[axes[0]]] * \
-                    P_reducescatter.shape[axes[0]]
-                for i in range(ctx.remainder):
-                    local_shapes[i] += 1
-                input_list = list(torch.split(input, local_shapes, dim=axes[0]))
-
-                # Re-order each sub-tensor
-                for i in range(P_reducescatter.shape[axes[0]]):
-                    input_list[i] = rearrange(input_list[i], operation, p=1)
-
-                # Zero-pad sub-tensors that are too small
-                for i in range(ctx.remainder, P_reducescatter.shape[axes[0]]):
-                    padding = [0] * 2 * P_reducescatter.dim
-                    padding[2 * axes[0]] = 1
-                    padding = distdl_padding_to_torch_padding(tuple(padding))
-                    input_list[i] = torch.nn.functional.pad(input_list[i], padding, mode='constant', value=0)
-
-                # Concatenate and flatten
-                input_flat = torch.cat(input_list, dim=0).reshape(-1)
-
-                # Update output shape for ranks that received zero-padded data
-                if P_reducescatter.rank >= ctx.remainder:
-                    output_tensor_shape[axes[0]] += 1
-            else:
-                input_flat = rearrange(input, operation, p=P_reducescatter.shape[axes]).reshape(-1)
+            # Data are reduced with the reduce-scatter dimension leading, so
+            # that the block for each worker, even if the dimension does not
+            # divide evenly, is contiguous in the input.
+            scattered_shape = [output_tensor_shape[axis]] + \
+                output_tensor_shape[:axis] + output_tensor_shape[axis+1:]
+            counts, _ = compute_balanced_counts(input_tensor_shape[axis],
+                                                P_reducescatter.shape[axis],
+                                                int(np.prod(scattered_shape[1:])))
 
             # Allocate output array
             numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-            scattered_data = np.zeros(output_tensor_shape, dtype=numpy_dtype)
-            input_flat = np.asarray(input_flat.detach(), dtype=numpy_dtype)
+            scattered_data = default_buffer_pool.request_array(scattered_shape, numpy_dtype)
+            input_numpy = to_numpy(input.movedim(axis, 0))
 
             # Reduce scatter
-            req = P_reducescatter._comm.Ireduce_scatter(input_flat, scattered_data, op=MPI.SUM)
+            req = P_reducescatter._comm.Ireduce_scatter(input_numpy, scattered_data,
+                                                        recvcounts=counts, op=MPI.SUM)
             requests.append(req)
+            buffers.append(input_numpy)
+            tracer.mark("pack", sent=input_numpy.nbytes, received=scattered_data.nbytes)
 
-        MPI.Request.Waitall(requests)
+        def finalize():
 
-        # If we had to receive data, we need to tensorify it.
-        if P_reducescatter.active:
-            output = torch.asarray(scattered_data,
-                                   requires_grad=output_tensor_structure.requires_grad,
-                                   device=device)
+            if not P_reducescatter.active:
+                return zero_volume_tensor(device=device, dtype=output_tensor_structure.dtype)
 
-            # If we're one of the workers having received zero-padded data, remove padding
-            if ctx.remainder != 0 and P_reducescatter.rank >= ctx.remainder:
-                s = [slice(None)] * (P_reducescatter.dim)
-                s[axes[0]] = slice(0, -1)
-                output = output[s]
+            # If we had to receive data, we need to tensorify it.
+            output = torch.asarray(scattered_data, device=device).movedim(0, axis).contiguous()
+            output.requires_grad_(output_tensor_structure.requires_grad)
 
-        return output
+            return output
 
-    @staticmethod
-    def backward(ctx, grad_output):
-        r"""Backward function of distributed reduce-scatter layer.
-
-        This method implements the adjoint of the Jacobian of the
-        reduce-scatter operation, the all-gather operation, using the
-        ``MPI_Iallgather`` function.
+        return MPICollectiveWork(requests, finalize, buffers)
 
-        When the current worker is inactive in the ``P_reducescatter`` partition,
-        it will output a zero-volume tensor.
+    @staticmethod
+    def start_backward(grad_output, P_reducescatter,
+                       input_tensor_structure, output_tensor_structure, axes):
+        r"""Starts the adjoint reduce-scatter (an all-gather), without waiting
+        for it to complete.
 
         Parameters
         ----------
-        ctx :
-            PyTorch context.
         grad_output : `torch.tensor`
             Input tensor.
+        P_reducescatter : Partition
+            Partition reduce-scatter happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+        axes : tuple
+            Axes along which to reduce-scatter.
 
         Returns
         -------
-        grad_input :
-            Output tensor.
+        work :
+            Work handle, whose `wait()` returns the gradient tensor.
+
         """
 
-        P_reducescatter = ctx.P_reducescatter
-        input_tensor_structure = ctx.input_tensor_structure
-        output_tensor_structure = ctx.output_tensor_structure
-        device = ctx.device
-        axes = ctx.axes
-        remainder = ctx.remainder
+        device = grad_output.device
 
-        grad_input = zero_volume_tensor(device=device, dtype=input_tensor_structure.dtype)
-        input_tensor_shape = np.array(input_tensor_structure.shape)
-        output_tensor_shape = np.array(output_tensor_structure.shape)
+        axis = axes[0]
+        input_tensor_shape = list(input_tensor_structure.shape)
 
         requests = []
+        buffers = []
+        gathered_data = None
 
         # All-gather operation
         if P_reducescatter.active:
 
-            # If output shape does not evenly divide by number of partitions, we need to zero-pad input
-            if remainder != 0:
-                if P_reducescatter.rank >= remainder:
-                    padding = [0] * 2 * P_reducescatter.dim
-                    padding[2 * axes[0]] = 1
-                    padding = distdl_padding_to_torch_padding(tuple(padding))
-                    grad_output = torch.nn.functional.pad(grad_output, padding, mode='constant', value=0)
-                output_tensor_shape = grad_output.shape
-                input_tensor_shape[axes[0]] = output_tensor_shape[axes[0]] * P_reducescatter.shape[axes[0]]
+            # The adjoint gathers blocks laid out as by the forward
+            # reduce-scatter, with the reduce-scatter dimension leading.
+            gathered_shape = [input_tensor_shape[axis]] + \
+                input_tensor_shape[:axis] + input_tensor_shape[axis+1:]
+            counts, displacements = compute_balanced_counts(gathered_shape[0],
+                                                            P_reducescatter.shape[axis],
+                                                            int(np.prod(gathered_shape[1:])))
 
             # Allocate output tensor
             numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-            gathered_data = np.zeros(np.prod(input_tensor_shape), dtype=numpy_dtype)
-            grad_output_numpy = grad_output.detach().contiguous().cpu().numpy()
+            gathered_data = default_buffer_pool.request_array(gathered_shape, numpy_dtype)
+            grad_output_numpy = to_numpy(grad_output.movedim(axis, 0))
 
             # All-gather
-            req = P_reducescatter._comm.Iallgather(grad_output_numpy, gathered_data)
+            req = P_reducescatter._comm.Iallgatherv(grad_output_numpy,
+                                                    (gathered_data, (counts, displacements)))
             requests.append(req)
+            buffers.append(grad_output_numpy)
+            tracer.mark("pack", sent=grad_output_numpy.nbytes, received=gathered_data.nbytes)
 
-        MPI.Request.Waitall(requests)
+        def finalize():
 
-        # If we had to receive data, we need to tensorify it.
-        if P_reducescatter.active:
-            grad_input.requires_grad_(input_tensor_structure.requires_grad)
+            if not P_reducescatter.active:
+                return zero_volume_tensor(device=device, dtype=input_tensor_structure.dtype)
+
+            # Move the reduce-scatter dimension back in place.  This is only a
+            # copy if the dimensions ahead of it are not all trivial.
+            grad_input = torch.asarray(gathered_data, device=device, dtype=output_tensor_structure.dtype)
+            grad_input = grad_input.movedim(0, axis).contiguous()
+
+            return grad_input
+
+        return MPICollectiveWork(requests, finalize, buffers)
+
+    @staticmethod
+    def forward(ctx, input, P_reducescatter,
+                input_tensor_structure, output_tensor_structure, axes,
+                work=None):
+        r"""Forward function of distributed reduce-scatter layer.
+
+        This method implements the forward reduce-scatter operation using the
+        ``MPI_Ireduce_scatter`` function on the communicator defined by ``P_reducescatter``.
+
+        When the current worker is inactive in the ``P_reducescatter`` partition, it will
+        output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        P_reducescatter : Partition
+            Partition reduce-scatter happens within.
+        input_tensor_structure : tuple
+            Tuple containing properties of the input tensor (dimension, shape,
+            requires_grad).
+        output_tensor_structure : tuple
+            Tuple containing properties of the output tensor (dimension, shape,
+            requires_grad).
+        axes : tuple
+            Axes along which to reduce-scatter.
+        work : optional
+            Handle returned by `start_forward()` for this input.  If given,
+            the communication has already been started and is only completed.
+
+        Returns
+        -------
+        output :
+            Output tensor.
 
-            # Re-order flat output array from all-gather to correct cartesian shape
-            gathered_data = torch.asarray(gathered_data, device=device, dtype=output_tensor_structure.dtype)
+        """
+
+        ctx.P_reducescatter = P_reducescatter
+        ctx.input_tensor_structure = input_tensor_structure
+        ctx.output_tensor_structure = output_tensor_structure
+        ctx.device = input.device
+        ctx.axes = axes
+
+        if work is None:
+            work = ReduceScatterFunction.start_forward(input, P_reducescatter,
+                                                       input_tensor_structure,
+                                                       output_tensor_structure,
+                                                       axes)
 
-            # Reshape vectorized all-gather output to tensor.
-            gathered_cart_shape = [P_reducescatter.shape[axes[0]]] + list(output_tensor_shape)
-            grad_input = gathered_data.reshape(gathered_cart_shape)
+        return work.wait()
 
-            # Dimension ordering for rearrange.E.g.,  p a, b, c -> a, (p b), c
-            in_shape_char, out_shape_char = get_rearrange_ordering(P_reducescatter.dim, axes[0])
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of distributed reduce-scatter layer.
+
+        This method implements the adjoint of the Jacobian of the
+        reduce-scatter operation, the all-gather operation, using the
+        ``MPI_Iallgatherv`` function.
 
-            # If we zero-padded, we need to remove the padding now
-            if remainder > 0:
+        When the current worker is inactive in the ``P_reducescatter`` partition,
+        it will output a zero-volume tensor.
 
-                # Split tensor into its original inputs, so we can
-                # remove padding from inputs that were zero-padded
-                grad_input_list = list(torch.split(grad_input, 1, dim=0))
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
 
-                # Remove padding
-                s = [slice(None)] * (P_reducescatter.dim + 1)
-                s[axes[0] + 1] = slice(0, -1)
-                for i in range(remainder, P_reducescatter.shape[axes[0]]):
-                    grad_input_list[i] = grad_input_list[i][s]
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
 
-                # Rearrange and undo splitting
-                for i in range(P_reducescatter.shape[axes[0]]):
-                    grad_input_list[i] = rearrange(grad_input_list[i], in_shape_char + ' -> ' + out_shape_char)
-                grad_input = torch.cat(tuple(grad_input_list), dim=axes[0])
-            else:
-                grad_input = rearrange(grad_input, in_shape_char + ' -> ' + out_shape_char)
+        work = ReduceScatterFunction.start_backward(grad_output, ctx.P_reducescatter,
+                                                    ctx.input_tensor_structure,
+                                                    ctx.output_tensor_structure,
+                                                    ctx.axes)
+        grad_input = work.wait()
 
         return grad_input, None, None, None, None, None
@@ -1,11 +1,13 @@
-__all__ = ["RepartitionFunction"]
+__all__ = ["RepartitionFunction", "RepartitionPlan", "PersistentRepartitionFunction"]
 
 import numpy as np
 import torch
 from mpi4py import MPI
 
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_mpi_dtype_dict
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.torch import from_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -148,6 +150,7 @@ class RepartitionFunction(torch.autograd.Function):
                     output_dtype = torch_to_mpi_dtype_dict[x_global_structure.dtype]
                     req = P_union._comm.Irecv((xfer_buff, output_dtype), source=partner, tag=111)
                     requests.append(req)
+                    tracer.mark("pack", received=xfer_buff.nbytes)
                 else:
                     # We add this if there is no recv so that the indices of
                     # the requests array match the indices of
@@ -165,6 +168,7 @@ class RepartitionFunction(torch.autograd.Function):
                     input_dtype = torch_to_mpi_dtype_dict[x_global_structure.dtype]
                     req = P_union._comm.Isend((xfer_buff, input_dtype), dest=partner, tag=111)
                     requests.append(req)
+                    tracer.mark("pack", sent=xfer_buff.nbytes)
                 else:
                     # We add this for symmetry, but don't really need it.
                     requests.append(MPI.REQUEST_NULL)
@@ -189,11 +193,14 @@ class RepartitionFunction(torch.autograd.Function):
                     # There is only one case where this can happen
                     break
 
+        tracer.mark("pack")
+
         # Unpack the received data as it arrives
         completed_count = 0
         while completed_count < len(requests):
             status = MPI.Status()
             index = MPI.Request.Waitany(requests, status)
+            tracer.mark("wait")
 
             # In MPI, we don't get the index out if the request is an
             # instance of MPI.REQUEST_NULL, instead MPI.UNDEFINED is returned.
@@ -205,12 +212,13 @@ class RepartitionFunction(torch.autograd.Function):
                     xfer_buff = buff.get_view(sh)
                     np.copyto(output[sl], xfer_buff)
 
+            tracer.mark("unpack")
             completed_count += 1
 
         if P_y.active:
-            output = torch.tensor(output,
-                                  requires_grad=input_requires_grad,
-                                  device=device)
+            output = from_numpy(output,
+                                requires_grad=input_requires_grad,
+                                device=device)
 
         return output
 
@@ -288,6 +296,7 @@ class RepartitionFunction(torch.autograd.Function):
                     output_dtype = torch_to_mpi_dtype_dict[x_global_structure.dtype]
                     req = P_union._comm.Irecv((xfer_buff, output_dtype), source=partner, tag=113)
                     requests.append(req)
+                    tracer.mark("pack", received=xfer_buff.nbytes)
                 else:
                     # We add this if there is no recv so that the indices of
                     # the requests array match the indices of
@@ -305,6 +314,7 @@ class RepartitionFunction(torch.autograd.Function):
                     input_dtype = torch_to_mpi_dtype_dict[x_global_structure.dtype]
                     req = P_union._comm.Isend((xfer_buff, input_dtype), dest=partner, tag=113)
                     requests.append(req)
+                    tracer.mark("pack", sent=xfer_buff.nbytes)
                 else:
                     # We add this for symmetry, but don't really need it.
                     requests.append(MPI.REQUEST_NULL)
@@ -327,11 +337,14 @@ class RepartitionFunction(torch.autograd.Function):
                     # There is only one case where this can happen
                     break
 
+        tracer.mark("pack")
+
         # Unpack the received data as it arrives
         completed_count = 0
         while completed_count < len(requests):
             status = MPI.Status()
             index = MPI.Request.Waitany(requests, status)
+            tracer.mark("wait")
 
             # In MPI, we don't get the index out if the request is an
             # instance of MPI.REQUEST_NULL, instead MPI.UNDEFINED is returned.
@@ -345,11 +358,289 @@ class RepartitionFunction(torch.autograd.Function):
                     # but we just created it, so a copy is sufficient.
                     np.copyto(grad_input[sl], xfer_buff)
 
+            tracer.mark("unpack")
             completed_count += 1
 
         if P_x.active:
-            grad_input = torch.tensor(grad_input,
-                                      requires_grad=input_requires_grad,
-                                      device=device)
+            grad_input = from_numpy(grad_input,
+                                    requires_grad=input_requires_grad,
+                                    device=device)
 
         return grad_input, None, None, None, None, None, None, None, None, None, None, None
+
+
+class RepartitionPlan:
+    r"""Compiled, persistent communication plan for a repartition.
+
+    Captures everything about a repartition that does not change between
+    calls with the same input structure: the non-empty overlaps, views into
+    the pre-allocated communication buffers, the self-copy slices, and
+    persistent MPI requests (``MPI_Recv_init`` / ``MPI_Send_init``) for both
+    the forward and adjoint data movement.  Steady-state calls only need to
+    start the requests and pack/unpack data.
+
+    The plan holds its own buffer views, so if a shared buffer is later
+    expanded by another layer, the plan continues to use (and keep alive)
+    the memory it was compiled against.
+
+    Parameters
+    ----------
+    P_union : Partition
+        Partition through which all communication occurs.
+    x_global_structure :
+        Structure of the global input tensor.
+    x_local_structure :
+        Structure of the local input tensor.
+    y_local_structure :
+        Structure of the local output tensor.
+    P_x : Partition
+        Input partition.
+    P_x_to_y_overlaps : list
+        List of tuples (sl, sh, partner) for each send current worker must
+        perform.
+    P_x_to_y_buffers : list
+        List of pre-allocated send buffers for each send current worker
+        must perform.
+    P_y : Partition
+        Output partition.
+    P_y_to_x_overlaps : list
+        List of tuples (sl, sh, partner) for each receive current worker
+        must perform.
+    P_y_to_x_buffers : list
+        List of pre-allocated receive buffers for each receive current
+        worker must perform.
+    preserve_batch : bool
+        Indicates if batch size should be preserved for zero-volume outputs.
+
+    """
+
+    def __init__(self, P_union, x_global_structure,
+                 x_local_structure, y_local_structure,
+                 P_x, P_x_to_y_overlaps, P_x_to_y_buffers,
+                 P_y, P_y_to_x_overlaps, P_y_to_x_buffers, preserve_batch):
+
+        self.P_union = P_union
+        self.P_x = P_x
+        self.P_y = P_y
+        self.preserve_batch = preserve_batch
+
+        self.dtype = x_global_structure.dtype
+        self.numpy_dtype = torch_to_numpy_dtype_dict[self.dtype]
+        self.x_local_shape = x_local_structure.shape
+        self.y_local_shape = y_local_structure.shape
+
+        # The requires-grad status of the input is shared with every worker
+        # in the union when the global structure is assembled, so it does not
+        # need to be communicated on every call.
+        self.input_requires_grad = bool(x_global_structure.requires_grad)
+
+        mpi_dtype = torch_to_mpi_dtype_dict[self.dtype]
+
+        # (slice, buffer view) pairs for subtensors of x that leave this
+        # worker in the forward pass, and return to it in the adjoint.
+        self.x_transfers = []
+        if P_x.active:
+            for (sl, sh, partner), buff in zip(P_x_to_y_overlaps, P_x_to_y_buffers):
+                if buff is not None:
+                    self.x_transfers.append((sl, buff.get_view(sh), partner))
+
+        # (slice, buffer view) pairs for subtensors of y that arrive at this
+        # worker in the forward pass, and leave it in the adjoint.
+        self.y_transfers = []
+        if P_y.active:
+            for (sl, sh, partner), buff in zip(P_y_to_x_overlaps, P_y_to_x_buffers):
+                if buff is not None:
+                    self.y_transfers.append((sl, buff.get_view(sh), partner))
+
+        # Slices of the self-copy, if there is one.  There is only one case
+        # where this can happen.
+        self.self_copy = None
+        if P_x.active and P_y.active:
+            xsl = next((sl for (sl, sh, p) in P_x_to_y_overlaps if p == "self"), None)
+            ysl = next((sl for (sl, sh, p) in P_y_to_x_overlaps if p == "self"), None)
+            if xsl is not None and ysl is not None:
+                self.self_copy = (xsl, ysl)
+
+        comm = P_union._comm
+
+        # Tags match those of the non-persistent implementation.
+        self.forward_recv_requests = [comm.Recv_init((view, mpi_dtype), source=partner, tag=111)
+                                      for (sl, view, partner) in self.y_transfers]
+        self.forward_send_requests = [comm.Send_init((view, mpi_dtype), dest=partner, tag=111)
+                                      for (sl, view, partner) in self.x_transfers]
+
+        self.adjoint_recv_requests = [comm.Recv_init((view, mpi_dtype), source=partner, tag=113)
+                                      for (sl, view, partner) in self.x_transfers]
+        self.adjoint_send_requests = [comm.Send_init((view, mpi_dtype), dest=partner, tag=113)
+                                      for (sl, view, partner) in self.y_transfers]
+
+    def _empty_output(self, batch_size, device):
+
+        if self.preserve_batch:
+            return zero_volume_tensor(batch_size, dtype=self.dtype, device=device)
+        return zero_volume_tensor(dtype=self.dtype, device=device)
+
+    def _execute(self, input, send_transfers, send_requests,
+                 recv_transfers, recv_requests,
+                 output_shape, src_slice_index, dest_slice_index):
+
+        # Post the receives first, allowing them to complete as they can.
+        MPI.Prequest.Startall(recv_requests)
+
+        # Pack and start each send as soon as its buffer is ready.
+        input = input.detach()
+        for (sl, view, partner), req in zip(send_transfers, send_requests):
+            np.copyto(view, input[sl].cpu().numpy())
+            req.Start()
+            tracer.mark("pack", sent=view.nbytes)
+
+        output = None
+        if output_shape is not None:
+            output = np.zeros(output_shape, dtype=self.numpy_dtype)
+
+            if self.self_copy is not None:
+                src_sl = self.self_copy[src_slice_index]
+                dest_sl = self.self_copy[dest_slice_index]
+                np.copyto(output[dest_sl], input[src_sl].cpu().numpy())
+        tracer.mark("pack")
+
+        # Unpack the received data as it arrives
+        for _ in range(len(recv_requests)):
+            index = MPI.Request.Waitany(recv_requests)
+            tracer.mark("wait")
+            sl, view, partner = recv_transfers[index]
+            np.copyto(output[sl], view)
+            tracer.mark("unpack", received=view.nbytes)
+
+        MPI.Request.Waitall(send_requests)
+        tracer.mark("wait")
+
+        return output
+
+    def forward(self, input):
+        r"""Applies the forward repartition to ``input``.
+
+        Parameters
+        ----------
+        input : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        device = input.device
+
+        output_shape = self.y_local_shape if self.P_y.active else None
+        output = self._execute(input,
+                               self.x_transfers, self.forward_send_requests,
+                               self.y_transfers, self.forward_recv_requests,
+                               output_shape, 0, 1)
+
+        if output is None:
+            return self._empty_output(input.shape[0], device)
+
+        return from_numpy(output, requires_grad=self.input_requires_grad, device=device)
+
+    def adjoint(self, grad_output, device):
+        r"""Applies the adjoint repartition to ``grad_output``.
+
+        Parameters
+        ----------
+        grad_output : `torch.tensor`
+            Input tensor.
+        device :
+            Device of the forward input.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+
+        """
+
+        grad_input_shape = self.x_local_shape if self.P_x.active else None
+        grad_input = self._execute(grad_output,
+                                   self.y_transfers, self.adjoint_send_requests,
+                                   self.x_transfers, self.adjoint_recv_requests,
+                                   grad_input_shape, 1, 0)
+
+        if grad_input is None:
+            return self._empty_output(grad_output.shape[0], device)
+
+        return from_numpy(grad_input, requires_grad=self.input_requires_grad, device=device)
+
+    def free(self):
+        r"""Releases the persistent MPI requests held by the plan."""
+
+        for requests in [self.forward_recv_requests, self.forward_send_requests,
+                         self.adjoint_recv_requests, self.adjoint_send_requests]:
+            for req in requests:
+                req.Free()
+            requests.clear()
+
+
+class PersistentRepartitionFunction(torch.autograd.Function):
+    r"""MPI-based functional implementation of a distributed repartition layer
+    driven by a pre-compiled :class:`RepartitionPlan`.
+
+    Performs the same data movement as :class:`RepartitionFunction`, but all
+    request construction and the requires-grad broadcast happen once, when
+    the plan is compiled.
+
+    Warning
+    -------
+    This implementation currently requires that tensors have data stored in main
+    memory (CPU) only, not auxiliary memories such as those on GPUs.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, plan):
+        r"""Forward function of distributed repartition layer.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        plan : RepartitionPlan
+            Compiled communication plan.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        ctx.plan = plan
+        ctx.device = input.device
+
+        return plan.forward(input)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Adjoint function of distributed repartition layer.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        assert grad_output.device == ctx.device
+
+        return ctx.plan.adjoint(grad_output, ctx.device), None
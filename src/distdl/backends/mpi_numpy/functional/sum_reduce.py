@@ -4,7 +4,10 @@ import numpy as np
 import torch
 from mpi4py import MPI
 
+from distdl.utilities import tracer
 from distdl.utilities.dtype import torch_to_numpy_dtype_dict
+from distdl.utilities.torch import from_numpy
+from distdl.utilities.torch import to_numpy
 from distdl.utilities.torch import zero_volume_tensor
 
 
@@ -110,30 +113,35 @@ class SumReduceFunction(torch.autograd.Function):
         # below.
         if P_send.active:
             numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-            reduced_data_send = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
-            input_numpy = input.detach().cpu().contiguous().numpy()
+            reduced_data_send = np.empty(input_tensor_structure.shape, dtype=numpy_dtype)
+            input_numpy = to_numpy(input)
             req = P_send._comm.Ireduce(input_numpy, reduced_data_send, root=0, op=MPI.SUM)
             requests.append(req)
+            tracer.mark("pack", sent=input_numpy.nbytes, received=reduced_data_send.nbytes)
 
         # If I sent data in the forward, I have to receive it here.
         if P_send != P_recv and P_recv.active:
             numpy_dtype = torch_to_numpy_dtype_dict[output_tensor_structure.dtype]
+            # The root contributes its buffer in place, so it must start at zero.
             reduced_data_recv = np.zeros(output_tensor_structure.shape, dtype=numpy_dtype)
             req = P_recv._comm.Ireduce(MPI.IN_PLACE, reduced_data_recv, root=0, op=MPI.SUM)
             requests.append(req)
+            tracer.mark("pack", received=reduced_data_recv.nbytes)
 
         MPI.Request.Waitall(requests)
+        tracer.mark("wait")
 
         # If we had to receive data, we need to tensorify it.
         if P_recv.active:
             if P_send == P_recv:
-                output = torch.tensor(reduced_data_send,
-                                      requires_grad=output_tensor_structure.requires_grad,
-                                      device=device)
+                output = from_numpy(reduced_data_send,
+                                    requires_grad=output_tensor_structure.requires_grad,
+                                    device=device)
             else:
-                output = torch.tensor(reduced_data_recv,
-                                      requires_grad=output_tensor_structure.requires_grad,
-                                      device=device)
+                output = from_numpy(reduced_data_recv,
+                                    requires_grad=output_tensor_structure.requires_grad,
+                                    device=device)
+        tracer.mark("unpack")
 
         return output
 
@@ -207,9 +215,10 @@ class SumReduceFunction(torch.autograd.Function):
 
         # If I received the reduction in the forward call, I broadcast my data
         if P_recv.active:
-            grad_output_numpy = grad_output.detach().cpu().contiguous().numpy()
+            grad_output_numpy = to_numpy(grad_output)
             req = P_recv._comm.Ibcast(grad_output_numpy, root=0)
             requests.append(req)
+            tracer.mark("pack", sent=grad_output_numpy.nbytes)
 
         # If I just receive, receive the broadcast
         if P_send.active:
@@ -218,14 +227,18 @@ class SumReduceFunction(torch.autograd.Function):
                 grad_input = grad_output.clone()
             else:
                 numpy_dtype = torch_to_numpy_dtype_dict[input_tensor_structure.dtype]
-                grad_input = np.zeros(input_tensor_structure.shape, dtype=numpy_dtype)
+                grad_input = np.empty(input_tensor_structure.shape, dtype=numpy_dtype)
 
                 req = P_send._comm.Ibcast(grad_input, root=0)
+                tracer.mark("pack", received=grad_input.nbytes)
                 req.Wait()
-                grad_input = torch.tensor(grad_input,
-                                          requires_grad=input_tensor_structure.requires_grad,
-                                          device=device)
+                tracer.mark("wait")
+                grad_input = from_numpy(grad_input,
+                                        requires_grad=input_tensor_structure.requires_grad,
+                                        device=device)
+                tracer.mark("unpack")
 
         MPI.Request.Waitall(requests)
+        tracer.mark("wait")
 
         return grad_input, None, None, None, None, None, None
@@ -1,5 +1,6 @@
 from distdl.backends.mpi_cupy.functional.all_gather import AllGatherFunction  # noqa: F401
 from distdl.backends.nccl_cupy.functional.all_sum_reduce import AllSumReduceFunction  # noqa: F401
+from distdl.backends.nccl_cupy.functional.all_to_all import AllToAllFunction  # noqa: F401
 from distdl.backends.nccl_cupy.functional.broadcast import BroadcastFunction  # noqa: F401
 from distdl.backends.nccl_cupy.functional.halo_exchange import HaloExchangeFunction  # noqa: F401
 from distdl.backends.nccl_cupy.functional.reduce_scatter import ReduceScatterFunction  # noqa: F401
@@ -8,6 +9,7 @@ from distdl.backends.nccl_cupy.functional.sum_reduce import SumReduceFunction  #
 
 from . import all_gather  # noqa: F401
 from . import all_sum_reduce  # noqa: F401
+from . import all_to_all  # noqa: F401
 from . import broadcast  # noqa: F401
 from . import halo_exchange  # noqa: F401
 from . import reduce_scatter  # noqa: F401
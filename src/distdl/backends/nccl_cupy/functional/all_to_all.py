@@ -0,0 +1,99 @@
+__all__ = ["AllToAllFunction"]
+
+import cupy as cp
+import numpy as np
+import torch
+
+from distdl.utilities.torch import zero_volume_tensor
+
+
+def _all_to_all(input, P_alltoall, send_counts, recv_counts):
+
+    device = input.device
+
+    if not P_alltoall.active:
+        return zero_volume_tensor(device=device, dtype=input.dtype)
+
+    received = torch.empty((int(np.sum(recv_counts)),) + tuple(input.shape[1:]), dtype=input.dtype, device=device)
+
+    # Counts are given in rows, of the trailing dimensions of the tensor
+    row_volume = int(np.prod(input.shape[1:]))
+    send_counts = [int(count) * row_volume for count in send_counts]
+    recv_counts = [int(count) * row_volume for count in recv_counts]
+
+    stream = cp.cuda.stream.get_current_stream()
+    P_alltoall._nccl.all_to_all_v(input.detach().contiguous().view(-1), send_counts,
+                                  received.view(-1), recv_counts, stream=stream)
+
+    return received
+
+
+class AllToAllFunction(torch.autograd.Function):
+    r"""NCCL-based functional implementation of a distributed all-to-all layer.
+
+    Implements the required `forward()` and adjoint (`backward()`) operations
+    for a distributed AllToAll layer using the PyTorch autograd interface.
+
+    This implementation uses grouped NCCL point-to-point operations for data
+    movement.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, P_alltoall, send_counts, recv_counts):
+        r"""Forward function of distributed all-to-all layer.
+
+        When the current worker is inactive in the ``P_alltoall`` partition,
+        it will output a zero-volume tensor.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor, with the rows sent to each worker contiguous and in
+            rank order.
+        P_alltoall : Partition
+            Partition the all-to-all happens within.
+        send_counts : iterable
+            Number of rows sent to each worker.
+        recv_counts : iterable
+            Number of rows received from each worker.
+
+        Returns
+        -------
+        output :
+            Output tensor, with the rows received from each worker contiguous
+            and in rank order.
+
+        """
+
+        ctx.P_alltoall = P_alltoall
+        ctx.send_counts = send_counts
+        ctx.recv_counts = recv_counts
+
+        return _all_to_all(input, P_alltoall, send_counts, recv_counts)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of distributed all-to-all layer.
+
+        This method implements the adjoint of the Jacobian of the all-to-all
+        operation, the all-to-all with the send and receive counts exchanged.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        grad_input = _all_to_all(grad_output, ctx.P_alltoall, ctx.recv_counts, ctx.send_counts)
+
+        return grad_input, None, None, None
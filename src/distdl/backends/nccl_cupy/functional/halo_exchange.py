@@ -10,7 +10,7 @@ from distdl.utilities.torch import zero_volume_tensor
 class HaloExchangeFunction(torch.autograd.Function):
 
     @staticmethod
-    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks):
+    def forward(ctx, input, P_x, slices, buffers, neighbor_ranks, inplace=False):
 
         device = input.device
         ctx.slices = slices
@@ -23,10 +23,14 @@ class HaloExchangeFunction(torch.autograd.Function):
             return zero_volume_tensor(input.shape[0], device=device)
 
         # TODO: mark_dirty() is buggy and does not work properly if halo exchange is
-        # chained with certain operations like ReLU, MaxPool, etc. For now, we make
-        # a memory copy of the input, rather than modifying the halo in place.
+        # chained with certain operations like ReLU, MaxPool, etc. Unless the caller
+        # owns the input, e.g., a persistent padded buffer, we make a memory copy of
+        # the input, rather than modifying the halo in place.
         # ctx.mark_dirty(input)
-        output = torch.clone(input.detach())
+        if inplace:
+            output = input.detach()
+        else:
+            output = torch.clone(input.detach())
 
         if P_x.size == 1:
             return input
@@ -68,16 +72,16 @@ class HaloExchangeFunction(torch.autograd.Function):
                 P_x._nccl.send(rbb, rrank, stream=stream)
             cp.cuda.nccl.groupEnd()
 
-            # Wait for receive calls to complete
+            # Wait for receive calls to complete. Ghost data are written through
+            # .data, so that the writes are not seen by autograd when the exchange
+            # is in place.
             if rgb is not None:
                 cp.cuda.runtime.eventSynchronize(event_rgb.ptr)
-                output[rgs].copy_(rgb.detach())
-                output[rgs].requires_grad_(input.requires_grad)
+                output.data[rgs].copy_(rgb.detach())
 
             if lgb is not None:
                 cp.cuda.runtime.eventSynchronize(event_lgb.ptr)
-                output[lgs].copy_(lgb.detach())
-                output[lgs].requires_grad_(input.requires_grad)
+                output.data[lgs].copy_(lgb.detach())
 
         return output.requires_grad_(input.requires_grad)
 
@@ -93,10 +97,10 @@ class HaloExchangeFunction(torch.autograd.Function):
         assert grad_output.device == device
 
         if not P_x.active:
-            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None
+            return zero_volume_tensor(grad_output.shape[0], device=device), None, None, None, None, None
 
         if P_x.size == 1:
-            return grad_output, None, None, None, None
+            return grad_output, None, None, None, None, None
 
         ctx.mark_dirty(grad_output)
 
@@ -147,4 +151,4 @@ class HaloExchangeFunction(torch.autograd.Function):
                 cp.cuda.runtime.eventSynchronize(event_rbb.ptr)
                 grad_output[rbs] += rbb
 
-        return grad_output, None, None, None, None
+        return grad_output, None, None, None, None, None
@@ -322,6 +322,21 @@ class NCCLBackend(_Backend):
         self._dispatch_arg_type(
             'all_to_all', (in_array, out_array, stream))
 
+    def all_to_all_v(self, in_array, in_counts, out_array, out_counts, stream=None):
+        """Performs an all to all operation with variable counts.
+        Args:
+            in_array (torch.Tensor): flat array to be sent, with the data for
+                each rank contiguous and in rank order.
+            in_counts (list): number of elements sent to each rank.
+            out_array (torch.Tensor): flat array where the result will be
+                stored, with the data from each rank in rank order.
+            out_counts (list): number of elements received from each rank.
+            stream (cupy.cuda.Stream, optional): if supported, stream to
+                perform the communication.
+        """
+        self._dispatch_arg_type(
+            'all_to_all_v', (in_array, in_counts, out_array, out_counts, stream))
+
     def barrier(self):
         """Performs a barrier operation.
         The barrier is done in the cpu and is a explicit synchronization
@@ -484,6 +499,29 @@ class _DenseNCCLCommunicator:
             cls._recv(comm, out_array[i], i, odtype, ocount, stream)
         nccl.groupEnd()
 
+    @classmethod
+    def all_to_all_v(cls, comm, in_array, in_counts, out_array, out_counts, stream=None):
+        if len(in_counts) != comm._n_devices or len(out_counts) != comm._n_devices:
+            raise RuntimeError(
+                f'all_to_all_v requires counts for {comm._n_devices} ranks')
+        comm._check_contiguous(in_array)
+        comm._check_contiguous(out_array)
+        stream = comm._get_stream(stream)
+        dtype, _ = comm._get_nccl_dtype_and_count(in_array)
+        in_offset = 0
+        out_offset = 0
+        nccl.groupStart()
+        for i in range(comm._n_devices):
+            if in_counts[i] > 0:
+                cls._send(comm, in_array[in_offset:in_offset + in_counts[i]],
+                          i, dtype, in_counts[i], stream)
+            if out_counts[i] > 0:
+                cls._recv(comm, out_array[out_offset:out_offset + out_counts[i]],
+                          i, dtype, out_counts[i], stream)
+            in_offset += in_counts[i]
+            out_offset += out_counts[i]
+        nccl.groupEnd()
+
 
 def _make_sparse_empty(dtype, sparse_type):
     data = cupy.empty(1, dtype)
@@ -1,3 +1,11 @@
+from . import collective_matmul  # noqa: F401
+from . import grouped  # noqa: F401
 from . import interpolate  # noqa: F401
+from . import normalization  # noqa: F401
+from . import ring_attention  # noqa: F401
 from . import zero_volume_corrector  # noqa: F401
+from .collective_matmul import AllGatherLinearFunction  # noqa: F401
+from .collective_matmul import LinearReduceScatterFunction  # noqa: F401
+from .grouped import grouped_linear  # noqa: F401
+from .ring_attention import RingAttentionFunction  # noqa: F401
 from .zero_volume_corrector import ZeroVolumeCorrectorFunction  # noqa: F401
@@ -0,0 +1,277 @@
+import torch
+
+
+def _chunk_sizes(extent, num_chunks):
+    r"""Returns the sizes of the at most ``num_chunks`` non-empty, balanced
+    chunks of a dimension."""
+
+    num_chunks = max(1, min(num_chunks, extent))
+
+    return [extent // num_chunks + (1 if i < extent % num_chunks else 0) for i in range(num_chunks)]
+
+
+def _matmul_weight(grad_output, input):
+    r"""Returns the gradient of the weight of a linear map, summed over all
+    leading dimensions."""
+
+    return grad_output.reshape(-1, grad_output.shape[-1]).t() @ input.reshape(-1, input.shape[-1])
+
+
+def _sum_bias(grad_output):
+    return grad_output.reshape(-1, grad_output.shape[-1]).sum(dim=0)
+
+
+class AllGatherLinearFunction(torch.autograd.Function):
+    r"""Functional implementation of an all-gather followed by a linear map,
+    pipelined over chunks of the input.
+
+    The input is split into chunks along ``dim``, which must not be the
+    all-gathered dimension, and the all-gather of each chunk overlaps with
+    the product of the previous one.  If ``dim`` is the last dimension, the
+    chunks split the contraction and their products are summed, otherwise
+    they are concatenated.  The adjoint is pipelined the same way: the
+    reduce-scatter of the gradient of each chunk overlaps with the products
+    of the next one.
+
+    Each chunk is communicated by its own all-gather, so that the structure
+    of the input of each primitive does not change between calls.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, weight, bias, all_gathers, dim):
+        r"""Forward function of the pipelined all-gather and linear map.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        weight : `torch.tensor`
+            Weight of the linear map, of shape ``[out_features, in_features]``.
+        bias : `torch.tensor`
+            Bias of the linear map, or None.
+        all_gathers : list
+            :any:`AllGather` layers, one per chunk, supporting ``async_op``.
+        dim : int
+            Negative index of the dimension along which the input is chunked.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        contract = dim == -1
+        sizes = _chunk_sizes(input.shape[dim], len(all_gathers))
+        chunks = input.split(sizes, dim=dim)
+        weights = weight.split(sizes, dim=-1) if contract else [weight] * len(sizes)
+
+        works = [all_gathers[0](chunks[0], async_op=True)]
+        gathered = list()
+        outputs = list()
+        for i in range(len(sizes)):
+            if i + 1 < len(sizes):
+                works.append(all_gathers[i + 1](chunks[i + 1], async_op=True))
+            gathered.append(works[i].wait())
+            outputs.append(torch.nn.functional.linear(gathered[i], weights[i], None if contract else bias))
+
+        if contract:
+            output = sum(outputs)
+            if bias is not None:
+                output = output + bias
+        else:
+            output = torch.cat(outputs, dim=dim)
+
+        ctx.all_gathers = all_gathers
+        ctx.dim = dim
+        ctx.sizes = sizes
+        ctx.has_bias = bias is not None
+        ctx.save_for_backward(weight, *gathered)
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of the pipelined all-gather and linear map.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        weight, *gathered = ctx.saved_tensors
+        dim = ctx.dim
+        contract = dim == -1
+
+        weights = weight.split(ctx.sizes, dim=-1) if contract else [weight] * len(ctx.sizes)
+        grad_outputs = [grad_output] * len(ctx.sizes) if contract else grad_output.split(ctx.sizes, dim=dim)
+
+        # The reduce-scatter of each chunk overlaps with the products of the next
+        works = list()
+        grad_weights = list()
+        for i in range(len(ctx.sizes)):
+            if ctx.needs_input_grad[0]:
+                works.append(ctx.all_gathers[i].start_adjoint(grad_outputs[i] @ weights[i]))
+            if ctx.needs_input_grad[1]:
+                grad_weights.append(_matmul_weight(grad_outputs[i], gathered[i]))
+
+        grad_input = torch.cat([work.wait() for work in works], dim=dim) if ctx.needs_input_grad[0] else None
+
+        grad_weight = None
+        if ctx.needs_input_grad[1]:
+            grad_weight = torch.cat(grad_weights, dim=-1) if contract else sum(grad_weights)
+
+        grad_bias = _sum_bias(grad_output) if ctx.has_bias and ctx.needs_input_grad[2] else None
+
+        return grad_input, grad_weight, grad_bias, None, None
+
+
+class LinearReduceScatterFunction(torch.autograd.Function):
+    r"""Functional implementation of a linear map followed by a reduce-scatter,
+    pipelined over chunks of the output.
+
+    The output is split into chunks along ``dim``, which must not be the
+    reduce-scattered dimension, and the reduce-scatter of each chunk
+    overlaps with the product of the next one.  If ``dim`` is the last
+    dimension, the chunks split the output features, otherwise they split the
+    input along the same dimension.  The adjoint is pipelined the same way:
+    the all-gather of the gradient of each chunk overlaps with the products
+    of the previous one.
+
+    Each chunk is communicated by its own reduce-scatter, so that the
+    structure of the input of each primitive does not change between calls.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, weight, bias, reduce_scatters, dim):
+        r"""Forward function of the pipelined linear map and reduce-scatter.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        weight : `torch.tensor`
+            Weight of the linear map, of shape ``[out_features, in_features]``.
+        bias : `torch.tensor`
+            Bias of the linear map, or None.
+        reduce_scatters : list
+            :any:`ReduceScatter` layers, one per chunk, supporting ``async_op``.
+        dim : int
+            Negative index of the dimension along which the output is chunked.
+
+        Returns
+        -------
+        output :
+            Output tensor.
+
+        """
+
+        split_features = dim == -1
+        extent = weight.shape[0] if split_features else input.shape[dim]
+        sizes = _chunk_sizes(extent, len(reduce_scatters))
+
+        if split_features:
+            chunks = [input] * len(sizes)
+            weights = weight.split(sizes, dim=0)
+            biases = bias.split(sizes, dim=0) if bias is not None else [None] * len(sizes)
+        else:
+            chunks = input.split(sizes, dim=dim)
+            weights = [weight] * len(sizes)
+            biases = [bias] * len(sizes)
+
+        # The reduce-scatter of each chunk overlaps with the product of the next
+        works = list()
+        for i in range(len(sizes)):
+            output = torch.nn.functional.linear(chunks[i], weights[i], biases[i])
+            works.append(reduce_scatters[i](output, async_op=True))
+
+        output = torch.cat([work.wait() for work in works], dim=dim)
+
+        ctx.reduce_scatters = reduce_scatters
+        ctx.dim = dim
+        ctx.sizes = sizes
+        ctx.has_bias = bias is not None
+        ctx.save_for_backward(input, weight)
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of the pipelined linear map and reduce-scatter.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        input, weight = ctx.saved_tensors
+        dim = ctx.dim
+        split_features = dim == -1
+        sizes = ctx.sizes
+
+        if split_features:
+            chunks = [input] * len(sizes)
+            weights = weight.split(sizes, dim=0)
+        else:
+            chunks = input.split(sizes, dim=dim)
+            weights = [weight] * len(sizes)
+
+        # The reduced-scattered dimension is not chunked, so the chunks of
+        # the gradient have the sizes of the forward chunks
+        grad_outputs = grad_output.split(sizes, dim=dim)
+
+        # The all-gather of each chunk overlaps with the products of the previous
+        works = [ctx.reduce_scatters[0].start_adjoint(grad_outputs[0])]
+        grad_inputs = list()
+        grad_weights = list()
+        grad_biases = list()
+        for i in range(len(sizes)):
+            if i + 1 < len(sizes):
+                works.append(ctx.reduce_scatters[i + 1].start_adjoint(grad_outputs[i + 1]))
+            grad = works[i].wait()
+            if ctx.needs_input_grad[0]:
+                grad_inputs.append(grad @ weights[i])
+            if ctx.needs_input_grad[1]:
+                grad_weights.append(_matmul_weight(grad, chunks[i]))
+            if ctx.has_bias and ctx.needs_input_grad[2]:
+                grad_biases.append(_sum_bias(grad))
+
+        grad_input = grad_weight = grad_bias = None
+        if split_features:
+            if ctx.needs_input_grad[0]:
+                grad_input = sum(grad_inputs)
+            if ctx.needs_input_grad[1]:
+                grad_weight = torch.cat(grad_weights, dim=0)
+            if grad_biases:
+                grad_bias = torch.cat(grad_biases, dim=0)
+        else:
+            if ctx.needs_input_grad[0]:
+                grad_input = torch.cat(grad_inputs, dim=dim)
+            if ctx.needs_input_grad[1]:
+                grad_weight = sum(grad_weights)
+            if grad_biases:
+                grad_bias = sum(grad_biases)
+
+        return grad_input, grad_weight, grad_bias, None, None
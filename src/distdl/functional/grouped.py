@@ -0,0 +1,44 @@
+import torch
+
+
+def grouped_linear(input, weight, counts, bias=None):
+    r"""Applies a different linear map to each group of consecutive rows.
+
+    The rows of ``input`` are packed by group: the first ``counts[0]`` rows
+    belong to group 0, the next ``counts[1]`` rows to group 1, and so on, and
+    the rows of group ``g`` are multiplied by ``weight[g]``.  Only the packed
+    rows are computed, so, unlike a batched product over a padded tensor,
+    no work is spent on padding or on empty groups.
+
+    Parameters
+    ----------
+    input : torch.Tensor
+        Packed input, of shape ``[sum(counts), *, in_features]``.
+    weight : torch.Tensor
+        Weights of the groups, of shape ``[groups, out_features, in_features]``.
+    counts : iterable
+        Number of rows of each group.
+    bias : torch.Tensor, optional
+        Biases of the groups, with ``out_features`` entries per group, e.g.,
+        of shape ``[groups, 1, out_features]``.
+
+    Returns
+    -------
+    Packed output, of shape ``[sum(counts), *, out_features]``.
+
+    """
+
+    counts = [int(count) for count in counts]
+    if len(counts) != weight.shape[0]:
+        raise ValueError(f"Expected {weight.shape[0]} group counts, got {len(counts)}.")
+    if sum(counts) != input.shape[0]:
+        raise ValueError(f"Group counts sum to {sum(counts)}, but the input has {input.shape[0]} rows.")
+
+    # Unbinding, rather than indexing, the groups back-propagates into the
+    # weights with a single stack
+    weights = weight.unbind(0)
+    biases = bias.reshape(weight.shape[0], -1).unbind(0) if bias is not None else [None] * len(counts)
+
+    outputs = [torch.nn.functional.linear(x, w, b) for x, w, b in zip(input.split(counts), weights, biases)]
+
+    return torch.cat(outputs, dim=0)
@@ -0,0 +1,259 @@
+import torch
+
+
+def _sum_to_shape(tensor, shape):
+    r"""Sums a tensor over its broadcast dimensions, to a given shape."""
+
+    return tensor.sum_to_size(shape) if tensor.shape != shape else tensor
+
+
+def _statistics(partials, allreduce):
+    r"""Sums stacked partial statistics over all workers."""
+
+    if allreduce is not None:
+        partials = allreduce(partials)
+    return partials
+
+
+class DistributedNormFunction(torch.autograd.Function):
+    r"""Functional implementation of distributed layer and RMS normalization.
+
+    Implements the required `forward()` and adjoint (`backward()`) operations
+    for normalization over dimensions that may be partitioned over several
+    workers.
+
+    The partial statistics are summed over all workers with a single
+    all-reduction.  For RMS norm, they are the sum of squares.  For layer
+    norm, each worker writes the count, mean and sum of squared deviations
+    (M2) of its elements into its own slot of the reduced tensor, and the
+    global variance is assembled from them with Chan's formula, in at least
+    single precision.  Unlike the difference of the global mean of squares
+    and the squared mean, this does not lose precision when the mean is
+    large compared to the standard deviation.  The normalization and the
+    affine transform are then applied in one pass.  Similarly, the adjoint
+    requires a single all-reduction of the stacked partial sums of the
+    gradient terms.
+
+    """
+
+    @staticmethod
+    def forward(ctx, input, weight, bias, dims, num_elements, eps, allreduce, rms, num_workers=1, worker_index=0):
+        r"""Forward function of distributed normalization.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        input : `torch.tensor`
+            Input tensor.
+        weight : `torch.tensor`
+            Scale of the affine transform, broadcastable to the input, or None.
+        bias : `torch.tensor`
+            Shift of the affine transform, broadcastable to the input, or None.
+        dims : tuple
+            Dimensions over which to normalize.
+        num_elements : int
+            Global number of elements over which each statistic is computed.
+        eps : float
+            A value added to the denominator for numerical stability.
+        allreduce : callable
+            Sum-all-reduction over the workers sharing the normalized
+            dimensions, or None if they are not partitioned.
+        rms : bool
+            If True, applies RMS normalization, otherwise layer normalization.
+        num_workers : int, optional
+            Number of workers sharing the normalized dimensions.
+        worker_index : int, optional
+            Index of this worker among those sharing the normalized dimensions.
+
+        Returns
+        -------
+        output :
+            Normalized and transformed input.
+
+        """
+
+        if rms:
+            # The squared norm is reduced without materializing the squares
+            sumsq = torch.linalg.vector_norm(input, ord=2, dim=dims, keepdim=True).square()
+            partials = _statistics(sumsq.unsqueeze(0), allreduce)
+            rstd = torch.rsqrt(partials[0] / num_elements + eps)
+            xhat = input * rstd
+        else:
+            # Local statistics, in at least single precision, in the slot of
+            # this worker
+            dtype = torch.promote_types(input.dtype, torch.float32)
+            local_mean = input.to(dtype).mean(dim=dims, keepdim=True)
+            local_count = input.numel() // max(1, local_mean.numel())
+            local_m2 = torch.linalg.vector_norm(input - local_mean, ord=2, dim=dims, keepdim=True, dtype=dtype).square()
+
+            partials = local_mean.new_zeros((num_workers, 3) + tuple(local_mean.shape))
+            partials[worker_index, 0] = local_count
+            # The mean of a worker without elements is NaN, and would spread
+            # to all workers, so it contributes nothing
+            if local_count > 0:
+                partials[worker_index, 1] = local_mean
+                partials[worker_index, 2] = local_m2
+            partials = _statistics(partials, allreduce)
+
+            # Chan's formula: the sum of the M2 of all workers, plus the
+            # deviations of their means from the global mean
+            counts, means, m2s = partials.unbind(1)
+            mean = (counts * means).sum(dim=0) / num_elements
+            var = (m2s.sum(dim=0) + (counts * (means - mean).square()).sum(dim=0)) / num_elements
+            rstd = torch.rsqrt(var + eps).to(input.dtype)
+            xhat = (input - mean.to(input.dtype)) * rstd
+
+        if weight is not None and bias is not None:
+            output = torch.addcmul(bias, xhat, weight)
+        elif weight is not None:
+            output = xhat * weight
+        elif bias is not None:
+            output = xhat + bias
+        else:
+            output = xhat
+
+        ctx.save_for_backward(xhat, rstd, weight, bias)
+        ctx.dims = dims
+        ctx.num_elements = num_elements
+        ctx.allreduce = allreduce
+        ctx.rms = rms
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Adjoint function of distributed normalization.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        output :
+            Gradients with respect to the input, the weight and the bias.
+
+        """
+
+        xhat, rstd, weight, bias = ctx.saved_tensors
+        dims = ctx.dims
+        n = ctx.num_elements
+
+        grad_input = grad_weight = grad_bias = None
+
+        if weight is not None and ctx.needs_input_grad[1]:
+            grad_weight = _sum_to_shape(grad_output * xhat, weight.shape)
+        if bias is not None and ctx.needs_input_grad[2]:
+            grad_bias = _sum_to_shape(grad_output, bias.shape)
+
+        if ctx.needs_input_grad[0]:
+            grad_xhat = grad_output * weight if weight is not None else grad_output
+            projection = (grad_xhat * xhat).sum(dim=dims, keepdim=True)
+            if ctx.rms:
+                partials = _statistics(projection.unsqueeze(0), ctx.allreduce)
+                grad_input = rstd * (grad_xhat - xhat * (partials[0] / n))
+            else:
+                partials = torch.stack([grad_xhat.sum(dim=dims, keepdim=True), projection])
+                partials = _statistics(partials, ctx.allreduce)
+                grad_input = rstd * (grad_xhat - partials[0] / n - xhat * (partials[1] / n))
+
+        return grad_input, grad_weight, grad_bias, None, None, None, None, None, None, None
+
+
+def distributed_layer_norm(input, normalized_shape, weight=None, bias=None, eps=1e-5,
+                           dims=None, allreduce=None, num_workers=1, worker_index=0):
+    r"""Applies layer normalization over possibly partitioned dimensions.
+
+    If the normalized dimensions are not partitioned, this is the native
+    PyTorch implementation.
+
+    Parameters
+    ----------
+    input : `torch.tensor`
+        Input tensor.
+    normalized_shape : tuple
+        Global shape of the normalized dimensions.
+    weight : `torch.tensor`, optional
+        Scale of the affine transform, broadcastable to the input.
+    bias : `torch.tensor`, optional
+        Shift of the affine transform, broadcastable to the input.
+    eps : float, optional
+        A value added to the denominator for numerical stability.
+    dims : tuple, optional
+        Dimensions over which to normalize.  Default is the trailing
+        ``len(normalized_shape)`` dimensions.
+    allreduce : callable, optional
+        Sum-all-reduction over the workers sharing the normalized dimensions.
+    num_workers : int, optional
+        Number of workers sharing the normalized dimensions.
+    worker_index : int, optional
+        Index, in ``[0, num_workers)``, of this worker among those sharing
+        the normalized dimensions.
+
+    Returns
+    -------
+    output :
+        Normalized and transformed input.
+
+    """
+
+    normalized_shape = tuple(normalized_shape)
+    if dims is None:
+        dims = tuple(range(input.dim() - len(normalized_shape), input.dim()))
+
+    num_elements = 1
+    for n in normalized_shape:
+        num_elements *= int(n)
+
+    if allreduce is None:
+        weight = weight.reshape(normalized_shape) if weight is not None else None
+        bias = bias.reshape(normalized_shape) if bias is not None else None
+        return torch.nn.functional.layer_norm(input, normalized_shape, weight, bias, eps)
+
+    return DistributedNormFunction.apply(input, weight, bias, tuple(int(d) for d in dims),
+                                         num_elements, eps, allreduce, False, num_workers, worker_index)
+
+
+def distributed_rms_norm(input, normalized_shape, weight=None, bias=None, eps=1e-5,
+                         dims=None, allreduce=None):
+    r"""Applies RMS normalization over possibly partitioned dimensions.
+
+    Parameters
+    ----------
+    input : `torch.tensor`
+        Input tensor.
+    normalized_shape : tuple
+        Global shape of the normalized dimensions.
+    weight : `torch.tensor`, optional
+        Scale of the affine transform, broadcastable to the input.
+    bias : `torch.tensor`, optional
+        Shift of the affine transform, broadcastable to the input.
+    eps : float, optional
+        A value added to the denominator for numerical stability.
+    dims : tuple, optional
+        Dimensions over which to normalize.  Default is the trailing
+        ``len(normalized_shape)`` dimensions.
+    allreduce : callable, optional
+        Sum-all-reduction over the workers sharing the normalized dimensions.
+
+    Returns
+    -------
+    output :
+        Normalized and transformed input.
+
+    """
+
+    normalized_shape = tuple(normalized_shape)
+    if dims is None:
+        dims = tuple(range(input.dim() - len(normalized_shape), input.dim()))
+
+    num_elements = 1
+    for n in normalized_shape:
+        num_elements *= int(n)
+
+    return DistributedNormFunction.apply(input, weight, bias, tuple(int(d) for d in dims),
+                                         num_elements, eps, allreduce, True)
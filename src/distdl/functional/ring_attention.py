@@ -0,0 +1,238 @@
+import math
+
+import torch
+
+
+def _start_shift(ring, input, overlap):
+    r"""Starts sending a tensor to the next worker of a ring, and receiving
+    the tensor of the previous one.
+
+    Returns a function that waits for, and returns, the received tensor.
+    If ``overlap`` is set, only the two neighbours exchange messages;
+    otherwise, the shift is a blocking all-to-all.
+
+    """
+
+    if overlap:
+        return ring.start_shift(input).wait
+
+    P_ring = ring.P_x
+    send_counts = [0] * P_ring.size
+    recv_counts = [0] * P_ring.size
+    send_counts[(P_ring.rank + 1) % P_ring.size] = input.shape[0]
+    recv_counts[(P_ring.rank - 1) % P_ring.size] = input.shape[0]
+
+    output = ring(input, send_counts, recv_counts)
+    return lambda: output
+
+
+def _block_scores(query, key, q_offset, k_offset, k_count, causal, scale, dtype):
+    r"""Returns the masked attention scores of the local queries against a
+    block of keys, in ``dtype``, or None if all of them are masked."""
+
+    num_queries = query.shape[-2]
+    if k_count == 0 or num_queries == 0 or (causal and k_offset > q_offset + num_queries - 1):
+        return None
+
+    scores = scale * torch.matmul(query, key.transpose(-2, -1)).to(dtype)
+
+    # Keys past the end of the block are padding
+    k_index = k_offset + torch.arange(key.shape[-2], device=query.device)
+    mask = (k_index >= k_offset + k_count).expand(num_queries, -1)
+    if causal:
+        q_index = q_offset + torch.arange(num_queries, device=query.device)
+        mask = mask | (k_index.unsqueeze(0) > q_index.unsqueeze(1))
+
+    return scores.masked_fill(mask, -math.inf)
+
+
+def _expand_heads(input, groups):
+    return input.repeat_interleave(groups, dim=-3) if groups > 1 else input
+
+
+def _reduce_heads(input, groups):
+    return input.unflatten(-3, (-1, groups)).sum(dim=-3) if groups > 1 else input
+
+
+class RingAttentionFunction(torch.autograd.Function):
+    r"""Functional implementation of scaled dot-product attention over a
+    sequence partitioned on a ring of workers.
+
+    Each worker holds a contiguous block of the queries, keys and values.  The
+    key and value blocks are passed around the ring, and the output of the
+    local queries is accumulated one block at a time, with the online softmax:
+    a running maximum and sum of the exponentiated scores rescale the partial
+    output as each block arrives.  The softmax and the partial output are
+    accumulated in at least single precision, and the output is cast to the
+    type of the queries at the end.  Only the log-sum-exp of each query is
+    saved for the adjoint, which recomputes the scores block by block, so
+    neither pass stores more than one block of scores.
+
+    In the adjoint, the key and value blocks travel around the ring again,
+    followed by the accumulators of their gradients, which return to the
+    owner of the block after a full turn.  The gradients are also
+    accumulated in at least single precision.
+
+    Keys and values may have fewer heads than the queries, in which case each
+    of them is shared by a group of consecutive query heads.
+
+    """
+
+    @staticmethod
+    def forward(ctx, query, key, value, ring, q_offset, kv_counts, kv_offsets, causal, scale, overlap):
+        r"""Forward function of the ring attention.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        query : `torch.tensor`
+            Local queries, of shape ``[*, heads, sequence, head_dim]``.
+        key : `torch.tensor`
+            Local keys, of shape ``[*, kv_heads, sequence, head_dim]``.
+        value : `torch.tensor`
+            Local values, of the shape of the keys.
+        ring : :any:`AllToAll`
+            All-to-all layer over the workers of the ring, in sequence order.
+            Blocks are passed to the next worker with its `start_shift()`.
+        q_offset : int
+            Global index of the first local query.
+        kv_counts : list
+            Number of keys of each worker of the ring.
+        kv_offsets : list
+            Global index of the first key of each worker of the ring.
+        causal : bool
+            If True, queries do not attend to keys with larger global index.
+        scale : float
+            Scaling of the scores.
+        overlap : bool
+            If True, the communication of the next block overlaps with the
+            computation of the current one, and only involves the neighbours
+            of each worker.
+
+        Returns
+        -------
+        output :
+            Output tensor, of the shape of the queries.
+
+        """
+
+        P_ring = ring.P_x
+        groups = query.shape[-3] // key.shape[-3]
+
+        # Half precision accumulators lose the small contributions of later
+        # blocks, and may overflow
+        dtype = torch.promote_types(query.dtype, torch.float32)
+
+        # Blocks are padded to the longest one, so that all messages, and the
+        # structure of the input of the all-to-all, are the same
+        padding = max(kv_counts) - key.shape[-2]
+        kv = torch.stack([torch.nn.functional.pad(key, (0, 0, 0, padding)),
+                          torch.nn.functional.pad(value, (0, 0, 0, padding))])
+
+        row_max = torch.full(query.shape[:-1], -math.inf, dtype=dtype, device=query.device)
+        row_sum = torch.zeros(query.shape[:-1], dtype=dtype, device=query.device)
+        output = torch.zeros(query.shape, dtype=dtype, device=query.device)
+
+        for step in range(P_ring.size):
+            if step + 1 < P_ring.size:
+                recv_kv = _start_shift(ring, kv, overlap)
+
+            source = (P_ring.rank - step) % P_ring.size
+            k_block, v_block = _expand_heads(kv, groups).unbind(0)
+            scores = _block_scores(query, k_block, q_offset, kv_offsets[source], kv_counts[source], causal, scale,
+                                   dtype)
+
+            if scores is not None:
+                # Rows without an unmasked score yet keep a zero shift, so
+                # that no infinities are subtracted
+                new_max = torch.maximum(row_max, scores.amax(dim=-1))
+                shift = torch.where(torch.isinf(new_max), torch.zeros_like(new_max), new_max)
+                probs = torch.exp(scores - shift.unsqueeze(-1))
+                correction = torch.exp(row_max - shift)
+                row_sum = row_sum * correction + probs.sum(dim=-1)
+                output = output * correction.unsqueeze(-1) + torch.matmul(probs, v_block.to(dtype))
+                row_max = new_max
+
+            if step + 1 < P_ring.size:
+                kv = recv_kv()
+
+        output = (output / row_sum.unsqueeze(-1)).to(query.dtype)
+        row_max = torch.where(torch.isinf(row_max), torch.zeros_like(row_max), row_max)
+        logsumexp = row_max + torch.log(row_sum)
+
+        ctx.ring = ring
+        ctx.q_offset = q_offset
+        ctx.kv_counts = kv_counts
+        ctx.kv_offsets = kv_offsets
+        ctx.causal = causal
+        ctx.scale = scale
+        ctx.overlap = overlap
+        ctx.save_for_backward(query, key, value, output, logsumexp)
+
+        return output
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        r"""Backward function of the ring attention.
+
+        Parameters
+        ----------
+        ctx :
+            PyTorch context.
+        grad_output : `torch.tensor`
+            Input tensor.
+
+        Returns
+        -------
+        grad_input :
+            Output tensor.
+        """
+
+        query, key, value, output, logsumexp = ctx.saved_tensors
+        ring = ctx.ring
+        P_ring = ring.P_x
+        groups = query.shape[-3] // key.shape[-3]
+        dtype = logsumexp.dtype
+
+        padding = max(ctx.kv_counts) - key.shape[-2]
+        kv = torch.stack([torch.nn.functional.pad(key, (0, 0, 0, padding)),
+                          torch.nn.functional.pad(value, (0, 0, 0, padding))])
+
+        query_acc = query.to(dtype)
+        grad_output_acc = grad_output.to(dtype)
+        delta = (grad_output_acc * output.to(dtype)).sum(dim=-1, keepdim=True)
+        grad_query = torch.zeros(query.shape, dtype=dtype, device=query.device)
+
+        # The gradient of each block is computed while the accumulated
+        # gradient of the block, from the previous workers, is in flight
+        recv_grad_kv = None
+        for step in range(P_ring.size):
+            if step + 1 < P_ring.size:
+                recv_kv = _start_shift(ring, kv, ctx.overlap)
+
+            source = (P_ring.rank - step) % P_ring.size
+            k_block, v_block = _expand_heads(kv, groups).to(dtype).unbind(0)
+            scores = _block_scores(query_acc, k_block, ctx.q_offset, ctx.kv_offsets[source], ctx.kv_counts[source],
+                                   ctx.causal, ctx.scale, dtype)
+
+            if scores is not None:
+                probs = torch.exp(scores - logsumexp.unsqueeze(-1))
+                grad_scores = ctx.scale * probs * (torch.matmul(grad_output_acc, v_block.transpose(-2, -1)) - delta)
+                grad_query = grad_query + torch.matmul(grad_scores, k_block)
+                grad_kv = torch.stack([_reduce_heads(torch.matmul(grad_scores.transpose(-2, -1), query_acc), groups),
+                                       _reduce_heads(torch.matmul(probs.transpose(-2, -1), grad_output_acc), groups)])
+            else:
+                grad_kv = torch.zeros(kv.shape, dtype=dtype, device=kv.device)
+
+            if recv_grad_kv is not None:
+                grad_kv = grad_kv + recv_grad_kv()
+            recv_grad_kv = _start_shift(ring, grad_kv, ctx.overlap)
+
+            if step + 1 < P_ring.size:
+                kv = recv_kv()
+
+        # After a full turn, each block of gradients is back with its owner
+        grad_key, grad_value = recv_grad_kv()[..., :key.shape[-2], :].to(key.dtype).unbind(0)
+
+        return grad_query.to(query.dtype), grad_key, grad_value, None, None, None, None, None, None, None
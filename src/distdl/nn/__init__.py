@@ -1,9 +1,12 @@
 import distdl.nn.loss  # noqa: F401
 
+from . import checkpoint  # noqa: F401
 from . import init  # noqa: F401
 from . import mixins  # noqa: F401
 from .all_gather import AllGather  # noqa: F401
 from .all_sum_reduce import AllSumReduce  # noqa: F401
+from .all_to_all import AllToAll  # noqa: F401
+from .attention import DistributedAttention  # noqa: F401
 from .batchnorm import DistributedBatchNorm  # noqa: F401
 from .broadcast import Broadcast  # noqa: F401
 from .conv import DistributedConv1d  # noqa: F401
@@ -35,6 +38,8 @@ from .conv_general import DistributedGeneralConv2d  # noqa: F401
 from .conv_general import DistributedGeneralConv3d  # noqa: F401
 from .embedding import DistributedEmbedding
 from .embedding_zero import DistributedEmbeddingZero
+from .expert_dispatch import ExpertDispatch  # noqa: F401
+from .grad_buckets import ZeroGradientBuckets  # noqa: F401
 from .halo_exchange import HaloExchange  # noqa: F401
 from .interpolate import Interpolate  # noqa: F401
 from .layernorm import DistributedLayerNorm
@@ -59,6 +64,7 @@ from .pooling import DistributedAvgPool3d  # noqa: F401
 from .pooling import DistributedMaxPool1d  # noqa: F401
 from .pooling import DistributedMaxPool2d  # noqa: F401
 from .pooling import DistributedMaxPool3d  # noqa: F401
+from .prefetch import WeightPrefetcher  # noqa: F401
 from .reduce_scatter import ReduceScatter  # noqa: F401
 from .repartition import Repartition  # noqa: F401
 from .rmsnorm_zero import DistributedRMSNormZero  # noqa: F401
@@ -68,7 +74,9 @@ from .upsampling import DistributedUpsample  # noqa: F401
 
 __all__ = ["AllGather",
            "AllSumReduce",
+           "AllToAll",
            "Broadcast",
+           "DistributedAttention",
            "DistributedBatchNorm",
            "DistributedConv1d",
            "DistributedConv2d",
@@ -110,6 +118,7 @@ __all__ = ["AllGather",
            "DistributedLinearReduceScatterZero",
            "DistributedExpertAllGather",
            "DistributedExpertReduceScatter",
+           "ExpertDispatch",
            "DistributedL1Loss",
            "DistributedMSELoss",
            "DistributedPoissonNLLLoss",
@@ -126,6 +135,8 @@ __all__ = ["AllGather",
            "Repartition",
            "ReduceScatter",
            "SumReduce",
+           "WeightPrefetcher",
+           "ZeroGradientBuckets",
            "DistributedTranspose",
            "Interpolate",
            "DistributedUpsample",
@@ -1,5 +1,6 @@
 from distdl.nn.module import Module
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class AllGather(Module):
@@ -31,10 +32,22 @@ class AllGather(Module):
         Currently, only supportes all-gather operation along single dimension.
     scale_backward: Union[int, slice], optional
         Scale the backward pass by the number of workers along the given dimension(s).
+    comm_dtype : torch.dtype, optional
+        If given, data are communicated at this, typically lower, precision,
+        e.g., ``torch.bfloat16``, and returned at their original precision.
+        Reductions, in the backward pass, accumulate at full precision.
+        Requires a back-end with compressed collectives.
+    variable_axes : tuple, optional
+        Tensor dimensions whose extents may change from one call to the next
+        without a new setup, e.g., a number of packed tokens.  They must not
+        be gathered, and their extents must be the same on all workers
+        of each call, so that the structure of the output is updated
+        locally, without communication.
 
     """
 
-    def __init__(self, P_x, axes_all_gather=None, axes_keep=None, scale_backward=None):
+    def __init__(self, P_x, axes_all_gather=None, axes_keep=None, scale_backward=None, comm_dtype=None,
+                 variable_axes=()):
 
         super(AllGather, self).__init__()
 
@@ -73,6 +86,14 @@ class AllGather(Module):
         # Scale the backward pass by the number of workers along given dimension.
         self.scale_backward = scale_backward
 
+        # Communication dtype, if data are compressed.
+        self.comm_dtype = comm_dtype
+
+        # Tensor dimensions whose extents may change without a new setup.
+        self.variable_axes = tuple(variable_axes)
+        if any(axis in self.axes_all_gather for axis in self.variable_axes):
+            raise ValueError("Variable axes must not be gathered.")
+
         # The identity case is if the partition is of size 1,
         if self.P_x.size == 1:
             self.identity = True
@@ -158,30 +179,127 @@ class AllGather(Module):
         """
 
         new_tensor_structure = TensorStructure(input[0])
+        expected_tensor_structure = self._input_tensor_structure.with_extents(new_tensor_structure.shape,
+                                                                              self.variable_axes)
+
+        return expected_tensor_structure != new_tensor_structure
+
+    def _update_variable_extents(self, input):
+        r"""Updates the stored tensor structures to the extents of the
+        variable axes of the input.
+
+        Parameters
+        ----------
+        input :
+            Input tensor.
+
+        """
+
+        self.input_tensor_structure = self.input_tensor_structure.with_extents(input.shape, self.variable_axes)
+        self.output_tensor_structure = self.output_tensor_structure.with_extents(input.shape, self.variable_axes)
+        self._input_tensor_structure = self._input_tensor_structure.with_extents(input.shape, self.variable_axes)
+
+    def _function(self):
+        r"""Returns the functional implementation of the all-gather, compressed
+        if ``comm_dtype`` is given, and its trailing arguments.
+
+        """
+
+        Function = self._distdl_backend.functional.all_gather.AllGatherFunction
+        args = ()
+
+        if self.comm_dtype is not None:
+            if not hasattr(self._distdl_backend.functional, "compressed"):
+                raise ValueError("Compressed all-gather is not supported by the selected back-end.")
+            Function = self._distdl_backend.functional.compressed.CompressedAllGatherFunction
+            args = (self.comm_dtype,)
 
-        return self._input_tensor_structure != new_tensor_structure
+        return Function, args
 
-    def forward(self, input):
+    def start_adjoint(self, grad_output):
+        """Starts the adjoint of the all-gather, a reduce-scatter, outside of autograd.
+
+        For layers that schedule the communication of their backward pass
+        themselves.  The layer must have been applied to an input of the same
+        structure first.  As in the backward pass of the layer, data are
+        communicated at ``comm_dtype``, if it is given.
+
+        Parameters
+        ----------
+        grad_output :
+            Gradient of the output tensor.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the gradient of the input tensor.
+
+        """
+
+        Function, args = self._function()
+
+        if not hasattr(Function, "start_backward"):
+            raise ValueError("Asynchronous all-gather is not supported by the selected back-end.")
+
+        if self.identity or not (self.P_x.active):
+            return self._distdl_backend.CollectiveWork([], lambda: grad_output)
+
+        return Function.start_backward(grad_output,
+                                       self.P_allgather,
+                                       self.input_tensor_structure,
+                                       self.output_tensor_structure,
+                                       self.axes_all_gather,
+                                       self.scale_backward,
+                                       *args)
+
+    @traced("all_gather")
+    def forward(self, input, async_op=False):
         """Forward function interface.
 
         Parameters
         ----------
         input :
             Input tensor to be reduce-scattered.
+        async_op : bool, optional
+            If True, the all-gather is only started and a work handle is returned,
+            whose `wait()` completes it and returns the output tensor.
 
         """
 
-        Function = self._distdl_backend.functional.all_gather.AllGatherFunction
+        Function, args = self._function()
 
-        if self.identity:
-            return input
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous all-gather is not supported by the selected back-end.")
 
-        if not (self.P_x.active):
+        if self.identity or not (self.P_x.active):
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
             return input
 
+        if self.variable_axes:
+            self._update_variable_extents(input)
+
+        if async_op:
+            work = Function.start_forward(input,
+                                          self.P_allgather,
+                                          self.input_tensor_structure,
+                                          self.output_tensor_structure,
+                                          self.axes_all_gather,
+                                          *args)
+            # The autograd function is applied once the data has arrived.
+            return work.then(lambda output: Function.apply(input,
+                                                           self.P_allgather,
+                                                           self.input_tensor_structure,
+                                                           self.output_tensor_structure,
+                                                           self.axes_all_gather,
+                                                           self.scale_backward,
+                                                           *args,
+                                                           work))
+
         return Function.apply(input,
                               self.P_allgather,
                               self.input_tensor_structure,
                               self.output_tensor_structure,
                               self.axes_all_gather,
-                              self.scale_backward)
+                              self.scale_backward,
+                              *args)
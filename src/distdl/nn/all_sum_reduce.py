@@ -1,5 +1,6 @@
 from distdl.nn.module import Module
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class AllSumReduce(Module):
@@ -30,10 +31,14 @@ class AllSumReduce(Module):
         Partition dimensions to reduce to.  Complement of `axes_reduce`.
     scale_backward: Union[int, slice], optional
         Scale the backward pass by the number of workers along the given dimension(s).
+    comm_dtype : torch.dtype, optional
+        If given, data are communicated at this, typically lower, precision,
+        e.g., ``torch.bfloat16``, and accumulated and returned at their
+        original precision.  Requires a back-end with compressed collectives.
 
     """
 
-    def __init__(self, P_x, axes_reduce=None, axes_keep=None, scale_backward=None):
+    def __init__(self, P_x, axes_reduce=None, axes_keep=None, scale_backward=None, comm_dtype=None):
 
         super(AllSumReduce, self).__init__()
 
@@ -71,6 +76,9 @@ class AllSumReduce(Module):
         # Scale the backward pass by the number of workers along given dimension.
         self.scale_backward = scale_backward
 
+        # Communication dtype, if data are compressed.
+        self.comm_dtype = comm_dtype
+
         # The identity case is if the partition is of size 1,
         if self.P_x.size == 1:
             self.identity = True
@@ -153,26 +161,55 @@ class AllSumReduce(Module):
 
         return self._input_tensor_structure != new_tensor_structure
 
-    def forward(self, input):
+    @traced("all_sum_reduce")
+    def forward(self, input, async_op=False):
         """Forward function interface.
 
         Parameters
         ----------
         input :
             Input tensor to be all-sum-reduced.
+        async_op : bool, optional
+            If True, the all-sum-reduction is only started and a work handle is returned,
+            whose `wait()` completes it and returns the output tensor.
 
         """
 
         Function = self._distdl_backend.functional.all_sum_reduce.AllSumReduceFunction
+        args = ()
 
-        if self.identity:
-            return input
+        if self.comm_dtype is not None:
+            if not hasattr(self._distdl_backend.functional, "compressed"):
+                raise ValueError("Compressed all-sum-reduction is not supported by the selected back-end.")
+            Function = self._distdl_backend.functional.compressed.CompressedAllSumReduceFunction
+            args = (self.comm_dtype,)
 
-        if not (self.P_x.active):
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous all-sum-reduction is not supported by the selected back-end.")
+
+        if self.identity or not (self.P_x.active):
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
             return input
 
+        if async_op:
+            work = Function.start_forward(input,
+                                          self.P_allreduce,
+                                          self.input_tensor_structure,
+                                          self.output_tensor_structure,
+                                          *args)
+            # The autograd function is applied once the data has arrived.
+            return work.then(lambda output: Function.apply(input,
+                                                           self.P_allreduce,
+                                                           self.input_tensor_structure,
+                                                           self.output_tensor_structure,
+                                                           self.scale_backward,
+                                                           *args,
+                                                           work))
+
         return Function.apply(input,
                               self.P_allreduce,
                               self.input_tensor_structure,
                               self.output_tensor_structure,
-                              self.scale_backward)
+                              self.scale_backward,
+                              *args)
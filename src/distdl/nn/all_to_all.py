@@ -0,0 +1,201 @@
+import numpy as np
+
+from distdl.nn.module import Module
+from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
+
+
+class AllToAll(Module):
+    r"""A distributed all-to-all layer, with variable counts.
+
+    This class provides the user interface to the all-to-all distributed data
+    movement primitive.  Implementation details are back-end specific.
+
+    The input tensor is split, along its first dimension, into one block of
+    rows for each worker of ``P_x``, in rank order, with ``send_counts[i]``
+    rows sent to the worker of rank ``i``.  The output tensor is the
+    concatenation of the blocks received from each worker, in rank order.
+    All other dimensions must be the same on all workers.
+
+    The adjoint of the all-to-all is the all-to-all with the send and receive
+    counts exchanged.
+
+    Parameters
+    ----------
+    P_x :
+        Partition of input and output tensor.  The all-to-all happens
+        between all of its workers.
+
+    """
+
+    def __init__(self, P_x):
+
+        super(AllToAll, self).__init__()
+
+        # Partition of input and output tensor.
+        self.P_x = P_x
+
+        # The identity case is if the partition is of size 1,
+        self.identity = self.P_x.size == 1
+
+        # Variables for tracking input changes and buffer construction
+        self._distdl_is_setup = False
+        self._input_tensor_structure = TensorStructure()
+
+    def extra_repr(self) -> str:
+        return f'P_x.shape={self.P_x.shape}'
+
+    def _distdl_module_setup(self, input):
+        r"""AllToAll module setup function.
+
+        This function is called every time something changes in the input
+        tensor structure.  It should not be called manually.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        if self.P_x.active and not self.identity:
+            self.P_x.initialize_backend_comm()
+
+        self._distdl_is_setup = True
+        self._input_tensor_structure = TensorStructure(input[0])
+
+    def _distdl_module_teardown(self, input):
+        r"""AllToAll module teardown function.
+
+        This function is called every time something changes in the input
+        tensor structure.  It should not be called manually.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        # Reset any info about the input
+        self._distdl_is_setup = False
+        self._input_tensor_structure = TensorStructure()
+
+    def _distdl_input_changed(self, input):
+        r"""Determine if the structure of inputs has changed.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        new_tensor_structure = TensorStructure(input[0])
+
+        return self._input_tensor_structure != new_tensor_structure
+
+    def exchange_counts(self, send_counts):
+        r"""Returns the receive counts matching the send counts of all workers.
+
+        Parameters
+        ----------
+        send_counts : iterable
+            Number of rows sent to each worker.
+
+        Returns
+        -------
+        Tuple of the number of rows received from each worker.
+
+        """
+
+        if self.identity:
+            return tuple(int(count) for count in send_counts)
+
+        recv_counts = self.P_x.alltoall_data(np.asarray(send_counts).reshape(-1, 1))
+
+        return tuple(int(count) for count in recv_counts.reshape(-1))
+
+    def start_shift(self, input, displacement=1):
+        """Starts a cyclic shift of the input, outside of autograd.
+
+        The shift is the all-to-all in which each worker sends all of its rows
+        to the worker ``displacement`` ranks ahead, for layers that pass
+        blocks around a ring of workers and schedule the communication
+        themselves.  Only the two neighbours exchange messages.  The input
+        must be of the same shape on all workers.
+
+        Parameters
+        ----------
+        input :
+            Input tensor.
+        displacement : int, optional
+            Number of ranks the input moves forward by.  Default is 1.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the tensor of the worker
+            ``displacement`` ranks behind.
+
+        """
+
+        Function = self._distdl_backend.functional.all_to_all.AllToAllFunction
+
+        if not hasattr(Function, "start_shift"):
+            raise ValueError("Asynchronous shift is not supported by the selected back-end.")
+
+        if self.identity or not (self.P_x.active):
+            return self._distdl_backend.CollectiveWork([], lambda: input)
+
+        return Function.start_shift(input, self.P_x, displacement)
+
+    @traced("all_to_all")
+    def forward(self, input, send_counts, recv_counts=None, async_op=False):
+        """Forward function interface.
+
+        Parameters
+        ----------
+        input :
+            Input tensor, with the rows sent to each worker contiguous and in
+            rank order.
+        send_counts : iterable
+            Number of rows sent to each worker.
+        recv_counts : iterable, optional
+            Number of rows received from each worker.  If not given, they are
+            exchanged with a small all-to-all of the send counts first.
+        async_op : bool, optional
+            If True, the all-to-all is only started and a work handle is returned,
+            whose `wait()` completes it and returns the output tensor.
+
+        """
+
+        Function = self._distdl_backend.functional.all_to_all.AllToAllFunction
+
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous all-to-all is not supported by the selected back-end.")
+
+        if self.identity or not (self.P_x.active):
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
+            return input
+
+        send_counts = tuple(int(count) for count in send_counts)
+        if len(send_counts) != self.P_x.size:
+            raise ValueError(f"Expected {self.P_x.size} send counts, got {len(send_counts)}.")
+        if sum(send_counts) != input.shape[0]:
+            raise ValueError(f"Send counts sum to {sum(send_counts)}, but the input has {input.shape[0]} rows.")
+
+        if recv_counts is None:
+            recv_counts = self.exchange_counts(send_counts)
+        recv_counts = tuple(int(count) for count in recv_counts)
+
+        if async_op:
+            work = Function.start_forward(input, self.P_x, send_counts, recv_counts)
+            # The autograd function is applied once the data has arrived.
+            return work.then(lambda output: Function.apply(input, self.P_x, send_counts, recv_counts, work))
+
+        return Function.apply(input, self.P_x, send_counts, recv_counts)
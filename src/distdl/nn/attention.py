@@ -0,0 +1,174 @@
+import math
+
+import numpy as np
+
+from distdl.functional.ring_attention import RingAttentionFunction
+from distdl.nn.all_to_all import AllToAll
+from distdl.nn.module import Module
+from distdl.utilities.torch import TensorStructure
+
+
+class DistributedAttention(Module):
+    r"""A distributed scaled dot-product attention layer, for sequence-parallel inputs.
+
+    Queries, keys and values are of shape ``[*, heads, sequence, head_dim]``,
+    as in ``torch.nn.functional.scaled_dot_product_attention``, and are
+    partitioned by ``P_x`` along the sequence dimension, and possibly along
+    any leading dimension, but not along the last dimension.  If the heads
+    are partitioned, the query heads of each worker must be those of its
+    key and value heads.
+
+    The full sequence is never gathered.  Instead, the blocks of keys and
+    values are passed around the ring of workers that share the other
+    indices of ``P_x`` (ring attention), and the attention of the local
+    queries is accumulated one block at a time, with an online softmax.  The
+    backward pass recomputes the scores block by block, so the memory of
+    each worker scales with its block of the sequence.  If the back-end
+    supports asynchronous shifts, the transfer of each block overlaps
+    with the computation on the previous one.
+
+    Keys and values may have fewer heads than the queries, for grouped-query
+    attention, as produced by :any:`DistributedLinearAllGatherZero` with
+    ``num_heads_kv``.
+
+    Parameters
+    ----------
+    P_x :
+        Partition of the queries, keys, values and output.
+    causal : bool, optional
+        If True, queries only attend to keys at the same or earlier global
+        positions of the sequence.  Default is False.
+    scale : float, optional
+        Scaling of the scores.  Default is ``1 / sqrt(head_dim)``.
+
+    """
+
+    def __init__(self, P_x, causal=False, scale=None):
+
+        super(DistributedAttention, self).__init__()
+
+        self.P_x = P_x
+        self.causal = causal
+        self.scale = scale
+
+        # Variables for tracking input changes
+        self._distdl_is_setup = False
+        self._query_tensor_structure = TensorStructure()
+        self._key_tensor_structure = TensorStructure()
+
+        if not self.P_x.active:
+            return
+
+        if P_x.dim < 3 or P_x.shape[-1] != 1:
+            raise ValueError(f"Partition of shape {P_x.shape} must have at least 3 dimensions, "
+                             "and must not partition the last one.")
+
+        # Ring of the workers holding the blocks of the same sequences
+        remain_dims = [False] * P_x.dim
+        remain_dims[-2] = True
+        self.P_ring = P_x.cached_cartesian_subtopology_partition(remain_dims)
+        self.ring = AllToAll(self.P_ring)
+
+        # Overlap transfers with computation, if the back-end allows it
+        Function = self._distdl_backend.functional.all_to_all.AllToAllFunction
+        self.overlap = hasattr(Function, "start_shift")
+
+    def extra_repr(self) -> str:
+        return f'P_x.shape={self.P_x.shape}, causal={self.causal}, scale={self.scale}'
+
+    def _distdl_module_setup(self, input):
+        r"""Distributed attention module setup function.
+
+        This function is called every time something changes in the input
+        tensor structure.  It should not be called manually.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        if self.P_x.active:
+            # Sequence lengths of the queries and keys of all workers of the ring
+            lengths = self.P_ring.allgather_data([input[0].shape[-2], input[1].shape[-2]])
+            q_offsets = np.cumsum(lengths[:, 0]) - lengths[:, 0]
+            kv_offsets = np.cumsum(lengths[:, 1]) - lengths[:, 1]
+
+            self.q_offset = int(q_offsets[self.P_ring.rank])
+            self.kv_counts = [int(count) for count in lengths[:, 1]]
+            self.kv_offsets = [int(offset) for offset in kv_offsets]
+
+        self._distdl_is_setup = True
+        self._query_tensor_structure = TensorStructure(input[0])
+        self._key_tensor_structure = TensorStructure(input[1])
+
+    def _distdl_module_teardown(self, input):
+        r"""Distributed attention module teardown function.
+
+        This function is called every time something changes in the input
+        tensor structure.  It should not be called manually.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        # Reset any info about the input
+        self._distdl_is_setup = False
+        self._query_tensor_structure = TensorStructure()
+        self._key_tensor_structure = TensorStructure()
+
+    def _distdl_input_changed(self, input):
+        r"""Determine if the structure of inputs has changed.
+
+        Parameters
+        ----------
+        input :
+            Tuple of forward inputs.  See
+            `torch.nn.Module.register_forward_pre_hook` for more details.
+
+        """
+
+        return (self._query_tensor_structure != TensorStructure(input[0]) or
+                self._key_tensor_structure != TensorStructure(input[1]))
+
+    def forward(self, query, key, value):
+        """Forward function interface.
+
+        Parameters
+        ----------
+        query :
+            Local queries, of shape ``[*, heads, sequence, head_dim]``.
+        key :
+            Local keys, of shape ``[*, kv_heads, sequence, head_dim]``, where
+            ``heads`` is a multiple of ``kv_heads``.
+        value :
+            Local values, of the shape of the keys.
+
+        Returns
+        -------
+        output :
+            Attention output of the local queries, of the shape of the queries.
+
+        """
+
+        if not self.P_x.active:
+            return query
+
+        if key.shape != value.shape:
+            raise ValueError(f"Keys of shape {tuple(key.shape)} and values of shape {tuple(value.shape)} differ.")
+        if query.shape[:-3] != key.shape[:-3] or query.shape[-1] != key.shape[-1]:
+            raise ValueError(f"Queries of shape {tuple(query.shape)} do not match keys of shape {tuple(key.shape)}.")
+        if query.shape[-3] % key.shape[-3] != 0:
+            raise ValueError(f"Number of query heads {query.shape[-3]} is not a multiple of "
+                             f"the number of key heads {key.shape[-3]}.")
+
+        scale = self.scale if self.scale is not None else 1.0 / math.sqrt(query.shape[-1])
+
+        return RingAttentionFunction.apply(query, key, value, self.ring, self.q_offset, self.kv_counts,
+                                           self.kv_offsets, self.causal, scale, self.overlap)
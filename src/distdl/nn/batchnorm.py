@@ -3,10 +3,14 @@ from contextlib import nullcontext
 import torch
 
 from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+from distdl.nn.all_sum_reduce import AllSumReduce
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.repartition import Repartition
 from distdl.nn.sum_reduce import SumReduce
+from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
 from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_stop_index
 from distdl.utilities.slicing import worker_layout
@@ -45,12 +49,19 @@ class DistributedBatchNorm(Module):
     scale_backward : Union[int, slice], optional
         Scale backward pass for AllGather operation by no. of workers along the given
         dimension. Default is None.
+    fused_statistics : bool, optional
+        If True, the batch mean and variance are computed from the count,
+        sum and sum of squares of each worker, shifted by the running mean,
+        which are summed, in double precision, by a single all-sum-reduction
+        of ``3 * num_features`` values.  The backward pass then also requires
+        a single all-sum-reduction.  Otherwise, the mean and the variance are
+        each computed with a sum-reduction and a broadcast.  Default is False.
     """
 
     def __init__(self, P_x,
                  num_features, eps=1e-05, momentum=0.1, affine=True,
                  track_running_stats=True, device=None, dtype=None,
-                 collect_state=False, scale_backward=None):
+                 collect_state=False, scale_backward=None, fused_statistics=False):
         super(DistributedBatchNorm, self).__init__()
 
         self.num_dimensions = len(P_x.shape)
@@ -102,6 +113,12 @@ class DistributedBatchNorm(Module):
 
         self.sr = SumReduce(P_x, self.P_sum)
         self.bc = Broadcast(self.P_sum, P_x)
+
+        # The shifted moments of all workers sharing the same features are
+        # summed by one all-sum-reduction.
+        self.fused_statistics = fused_statistics
+        if self.fused_statistics:
+            self.allreduce_stats = AllSumReduce(P_x, axes_keep=[1])
         self.bc_affine = Broadcast(self.P_sum, P_x, scale_backward=scale_backward)
 
         if self.affine:
@@ -118,7 +135,7 @@ class DistributedBatchNorm(Module):
 
             # CUDA streams for weight prefetching
             if not self.P_x.device == 'cpu':
-                self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+                self.stream_context = stream_context
                 self.stream_gamma = torch.cuda.Stream(device=self.P_x.device)
                 self.stream_beta = torch.cuda.Stream(device=self.P_x.device)
             else:
@@ -137,6 +154,25 @@ class DistributedBatchNorm(Module):
             self.gather_affine = Repartition(self.P_sum, self.P_root, preserve_batch=False)
             self.scatter_affine = Repartition(self.P_root, self.P_sum, preserve_batch=False)
 
+    def _distdl_shard_spec(self):
+
+        # Features are partitioned along the second dimension.  The running
+        # statistics are replicated over the other dimensions of P_x.
+        global_shape = [1] * self.num_dimensions
+        global_shape[1] = self.num_features
+
+        spec = dict()
+        if self.track_running_stats and self.P_x.active:
+            partition_dims = [None] * self.num_dimensions
+            partition_dims[1] = 1
+            spec['running_mean'] = block_shard_spec(self.P_x, global_shape, partition_dims)
+            spec['running_var'] = spec['running_mean']
+        if self.affine and self.P_sum.active:
+            spec['gamma'] = block_shard_spec(self.P_sum, global_shape)
+            spec['beta'] = spec['gamma']
+
+        return spec
+
     def extra_repr(self) -> str:
         return f'num_features={self.num_features}'
 
@@ -260,6 +296,51 @@ class DistributedBatchNorm(Module):
         x = (input - mean) ** 2
         return self._compute_mean(x, feature_volume)
 
+    def _compute_fused_statistics(self, input):
+        r"""
+        Compute global feature mean and variance in a single pass over the
+        input and with a single all-sum-reduction.
+        Ensures all ranks have the mean and variance tensors.
+
+        Parameters
+        ----------
+        input :
+            PyTorch Tensor of values for which statistics should be computed.
+
+        """
+
+        dims = [d for d in range(self.num_dimensions) if d != 1]
+        count = input.numel() // max(input.shape[1], 1)
+
+        # The moments are shifted by a pivot shared by all workers with the
+        # same features, close to the mean once the running mean has been
+        # updated, and accumulated in double precision, so that neither the
+        # counts overflow nor the variance cancels in low precision.
+        stats_options = {'device': input.device, 'dtype': torch.float64}
+        pivot = torch.zeros(input.shape[1], **stats_options)
+        if self.running_mean is not None:
+            pivot = self.running_mean.detach().reshape(-1).to(**stats_options)
+
+        # Local count, and sum and sum of squares of the shifted input.  The
+        # squares are those of the deviations from the local mean, computed
+        # in one pass, plus the squared shift of the local mean.
+        partials = torch.zeros(3, input.shape[1], **stats_options)
+        if count > 0:
+            var, mean = torch.var_mean(input.to(torch.promote_types(input.dtype, torch.float32)),
+                                       dim=dims, unbiased=False)
+            shift = mean.to(torch.float64) - pivot
+            partials = torch.stack([torch.full_like(shift, count), count * shift,
+                                    count * (var.to(torch.float64) + shift * shift)])
+
+        total, shifted_sum, shifted_sumsq = self.allreduce_stats(partials).unbind(0)
+        mean_shift = shifted_sum / total
+        mean = (pivot + mean_shift).to(input.dtype)
+        var = (shifted_sumsq / total - mean_shift * mean_shift).to(input.dtype)
+
+        shape = [1] * self.num_dimensions
+        shape[1] = -1
+        return mean.reshape(shape), var.reshape(shape)
+
     def _update_running_stats(self, mean, var):
         r"""
         Updates the running statistics given the new batch mean and variance.
@@ -288,7 +369,7 @@ class DistributedBatchNorm(Module):
                 self.inputs_seen += 1
 
     def prefetch_weights(self):
-        if self.P_x.size == 1:
+        if not self.affine or self.P_x.size == 1:
             return
         if self.stream_gamma is not None:
             with self.stream_context(self.stream_gamma):
@@ -324,19 +405,18 @@ class DistributedBatchNorm(Module):
             feature_volume *= k
 
         # mini-batch statistics
-        if self.training:
-            mean = self._compute_mean(input, feature_volume)
-            var = self._compute_var(input, mean, feature_volume)
-            if self.track_running_stats:
-                self._update_running_stats(mean, var)
-        else:
-            if self.track_running_stats:
-                # use the tracked batch statistics
-                mean = self.running_mean
-                var = self.running_var
+        if self.training or not self.track_running_stats:
+            if self.fused_statistics:
+                mean, var = self._compute_fused_statistics(input)
             else:
                 mean = self._compute_mean(input, feature_volume)
                 var = self._compute_var(input, mean, feature_volume)
+            if self.training and self.track_running_stats:
+                self._update_running_stats(mean, var)
+        else:
+            # use the tracked batch statistics
+            mean = self.running_mean
+            var = self.running_var
 
         # normalize
         x = (input - mean) / torch.sqrt(var + self.eps)
@@ -352,8 +432,8 @@ class DistributedBatchNorm(Module):
                 self.gamma_buffer = None
                 self.beta_buffer = None
             if self.stream_gamma is not None and self.stream_beta is not None:
-                torch.cuda.current_stream().wait_stream(self.stream_gamma)
-                torch.cuda.current_stream().wait_stream(self.stream_beta)
+                stream_barrier(self.stream_gamma, gamma)
+                stream_barrier(self.stream_beta, beta)
 
             x = gamma * x + beta
 
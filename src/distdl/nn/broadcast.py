@@ -2,6 +2,7 @@ __all__ = ["Broadcast"]
 
 from distdl.nn.module import Module
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class Broadcast(Module):
@@ -48,12 +49,17 @@ class Broadcast(Module):
         Indicates if batch size should be preserved for zero-volume outputs.
     scale_backward: Union[int, slice], optional
         Scale the backward pass by the number of workers along the given dimension(s).
+    comm_dtype : torch.dtype, optional
+        If given, data are communicated at this, typically lower, precision,
+        e.g., ``torch.bfloat16``, and returned at their original precision.
+        Reductions, in the backward pass, accumulate at full precision.
+        Requires a back-end with compressed collectives.
 
     """
 
     def __init__(self, P_x, P_y,
                  transpose_src=False, transpose_dest=False,
-                 preserve_batch=True, scale_backward=None):
+                 preserve_batch=True, scale_backward=None, comm_dtype=None):
 
         super(Broadcast, self).__init__()
 
@@ -95,6 +101,9 @@ class Broadcast(Module):
         # Scale the backward pass by the number of workers along given dimension.
         self.scale_backward = scale_backward
 
+        # Communication dtype, if data are compressed.
+        self.comm_dtype = comm_dtype
+
         # The identity case is if the partitions are of size 1,
         # or they are the same partition and neither is tranposed,
         # or they are the same partition and both are transposed.
@@ -190,32 +199,63 @@ class Broadcast(Module):
 
         return self._input_tensor_structure != new_tensor_structure
 
-    def forward(self, input):
+    @traced("broadcast")
+    def forward(self, input, async_op=False):
         """Forward function interface.
 
         Parameters
         ----------
         input :
             Input tensor to be broadcast.
+        async_op : bool, optional
+            If True, the broadcast is only started and a work handle is returned,
+            whose `wait()` completes it and returns the output tensor.
 
         """
 
         Function = self._distdl_backend.functional.broadcast.BroadcastFunction
+        args = ()
+
+        if self.comm_dtype is not None:
+            if not hasattr(self._distdl_backend.functional, "compressed"):
+                raise ValueError("Compressed broadcast is not supported by the selected back-end.")
+            Function = self._distdl_backend.functional.compressed.CompressedBroadcastFunction
+            args = (self.comm_dtype,)
+
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous broadcast is not supported by the selected back-end.")
 
         # If this is an identity operation (no communication necessary),
         # simply return a clone of the input.
-        if self.identity:
-            return input
-
         # If this worker is not active for the input or output, then the input
         # should be a zero-volume tensor, and the output should be the same.
-        if not (self.P_x.active or self.P_y.active):
+        if self.identity or not (self.P_x.active or self.P_y.active):
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
             return input
 
+        if async_op:
+            work = Function.start_forward(input,
+                                          self.P_send,
+                                          self.P_recv,
+                                          self.preserve_batch,
+                                          self.input_tensor_structure,
+                                          self.output_tensor_structure)
+            # The autograd function is applied once the data has arrived.
+            return work.then(lambda output: Function.apply(input,
+                                                           self.P_send,
+                                                           self.P_recv,
+                                                           self.preserve_batch,
+                                                           self.input_tensor_structure,
+                                                           self.output_tensor_structure,
+                                                           self.scale_backward,
+                                                           work))
+
         return Function.apply(input,
                               self.P_send,
                               self.P_recv,
                               self.preserve_batch,
                               self.input_tensor_structure,
                               self.output_tensor_structure,
-                              self.scale_backward)
+                              self.scale_backward,
+                              *args)
@@ -0,0 +1,250 @@
+import json
+import os
+
+import numpy as np
+import torch
+
+from distdl.nn.module import Module
+from distdl.utilities.slicing import compute_intersection
+from distdl.utilities.slicing import compute_start_index
+
+# Name of the index file written by each worker
+_index_file = "index.{rank}.json"
+
+# Name of the file, written last by the root worker, listing the index files
+# of the checkpoint
+_manifest_file = "manifest.json"
+
+# Name of the file holding one shard of one tensor
+_shard_file = "{key}.{rank}.npy"
+
+# Tensors whose dtype NumPy does not support are stored as raw integers
+_raw_dtypes = {torch.bfloat16: torch.int16}
+
+
+def block_shard_spec(P, global_shape, partition_dims=None):
+    r"""Describes a tensor that is block partitioned over a partition.
+
+    Dimension ``i`` of the tensor is partitioned along dimension
+    ``partition_dims[i]`` of ``P``, with the balanced decomposition of
+    :any:`compute_subshape`, or not at all if it is ``None``.  The tensor is
+    replicated along any dimension of ``P`` that is not listed, and only the
+    workers at index 0 along those dimensions own their shard.
+
+    Parameters
+    ----------
+    P : Partition
+        Partition over which the tensor is distributed.
+    global_shape : iterable
+        Shape of the global tensor.
+    partition_dims : iterable, optional
+        Partition dimension of each tensor dimension.  Default is the
+        identity, which requires the tensor and ``P`` to have the same
+        number of dimensions.
+
+    Returns
+    -------
+    Tuple of the global shape, the global start index of the local shard and
+    whether the local worker owns it.
+
+    """
+
+    global_shape = [int(n) for n in global_shape]
+    if partition_dims is None:
+        partition_dims = list(range(P.dim))
+    if len(partition_dims) != len(global_shape):
+        raise ValueError("A partition dimension is required for every tensor dimension.")
+
+    start_index = [0] * len(global_shape)
+    for i, d in enumerate(partition_dims):
+        if d is not None:
+            start_index[i] = int(compute_start_index(P.shape[d], P.index[d], [global_shape[i]])[0])
+
+    owner = all(P.index[d] == 0 for d in range(P.dim) if d not in partition_dims)
+
+    return global_shape, start_index, owner
+
+
+def _shard_specs(module, P_world):
+    r"""Returns the shard description of every non-empty tensor of a module,
+    keyed by its name in the state dict."""
+
+    # Layers may describe the tensors of their sub-modules
+    layer_specs = dict()
+    for prefix, m in module.named_modules():
+        if isinstance(m, Module):
+            prefix = prefix + "." if prefix else ""
+            for name, spec in m._distdl_shard_spec().items():
+                layer_specs[prefix + name] = spec
+
+    specs = dict()
+    for prefix, m in module.named_modules():
+        prefix = prefix + "." if prefix else ""
+
+        tensors = list(m._parameters.items())
+        tensors += [(n, b) for n, b in m._buffers.items() if n not in m._non_persistent_buffers_set]
+        for name, tensor in tensors:
+            key = prefix + name
+            if tensor is None or tensor.numel() == 0:
+                continue
+
+            # Undescribed tensors are replicated everywhere and owned by the root
+            spec = layer_specs.get(key, (list(tensor.shape), [0] * tensor.dim(), P_world.rank == 0))
+            specs[key] = (tensor, *spec)
+
+    return specs
+
+
+def save_sharded_state_dict(module, path, P_world):
+    r"""Saves the parameters and buffers of a module as a sharded checkpoint.
+
+    Every worker writes the shards it owns, in parallel and without any
+    communication, to one NumPy file per shard, alongside an index of the
+    global shape and offset of each shard.  Unlike the ``state_dict`` of a
+    layer with ``collect_state``, no worker ever holds more than its own
+    shards.  The checkpoint can be loaded, with
+    :any:`load_sharded_state_dict`, into a model with any partitioning.
+
+    Distributed layers describe their sharding through
+    :any:`Module._distdl_shard_spec`.  Any other tensor is assumed to be
+    replicated on all workers and is written by the root of ``P_world``.
+
+    Once every worker has written its part, the root writes a manifest of
+    the number of workers and of their index files.  Only those are read
+    when loading, so files left in the directory by an earlier checkpoint,
+    e.g., one saved by more workers, are ignored.
+
+    Parameters
+    ----------
+    module : torch.nn.Module
+        Module to save.
+    path : str
+        Directory of the checkpoint, created if needed.
+    P_world : Partition
+        Partition of all workers holding a part of the module.
+
+    """
+
+    if not P_world.active:
+        return
+
+    os.makedirs(path, exist_ok=True)
+
+    # A checkpoint being overwritten is incomplete until the new manifest
+    # is written
+    manifest_filename = os.path.join(path, _manifest_file)
+    if P_world.rank == 0 and os.path.exists(manifest_filename):
+        os.remove(manifest_filename)
+
+    index = list()
+    for key, (tensor, global_shape, start_index, owner) in _shard_specs(module, P_world).items():
+        if not owner:
+            continue
+
+        data = tensor.detach()
+        dtype = str(data.dtype).replace("torch.", "")
+        if data.dtype in _raw_dtypes:
+            data = data.view(_raw_dtypes[data.dtype])
+        data = data.cpu().numpy()
+
+        filename = _shard_file.format(key=key, rank=P_world.rank)
+        shard = np.lib.format.open_memmap(os.path.join(path, filename), mode="w+",
+                                          dtype=data.dtype, shape=data.shape)
+        shard[...] = data
+        shard.flush()
+        del shard
+
+        index.append({"key": key,
+                      "file": filename,
+                      "dtype": dtype,
+                      "global_shape": [int(n) for n in global_shape],
+                      "start_index": [int(n) for n in start_index],
+                      "shape": list(data.shape)})
+
+    with open(os.path.join(path, _index_file.format(rank=P_world.rank)), "w") as f:
+        json.dump(index, f)
+
+    # The checkpoint is complete only once every worker has written its part
+    P_world._comm.Barrier()
+
+    if P_world.rank == 0:
+        manifest = {"world_size": P_world.size,
+                    "index_files": [_index_file.format(rank=rank) for rank in range(P_world.size)]}
+        with open(manifest_filename, "w") as f:
+            json.dump(manifest, f)
+
+    P_world._comm.Barrier()
+
+
+def load_sharded_state_dict(module, path, P_world, strict=True):
+    r"""Loads a sharded checkpoint written by :any:`save_sharded_state_dict`.
+
+    Each worker reads, through memory maps, only the parts of the saved
+    shards that intersect its own shards, so the module may be partitioned
+    differently than the one that was saved.  No communication is required.
+
+    Parameters
+    ----------
+    module : torch.nn.Module
+        Module to load into.
+    path : str
+        Directory of the checkpoint.
+    P_world : Partition
+        Partition of all workers holding a part of the module.
+    strict : bool, optional
+        If True, raises an error for any tensor of the module that is not in
+        the checkpoint.
+
+    """
+
+    if not P_world.active:
+        return
+
+    manifest_filename = os.path.join(path, _manifest_file)
+    if not os.path.exists(manifest_filename):
+        raise ValueError(f"{path} does not hold a complete sharded checkpoint.")
+    with open(manifest_filename) as f:
+        manifest = json.load(f)
+
+    # Saved shards of each tensor, from the index files of the checkpoint
+    # only
+    shards = dict()
+    for filename in manifest["index_files"]:
+        with open(os.path.join(path, filename)) as f:
+            for entry in json.load(f):
+                shards.setdefault(entry["key"], []).append(entry)
+
+    for key, (tensor, global_shape, start_index, _) in _shard_specs(module, P_world).items():
+        if key not in shards:
+            if strict:
+                raise ValueError(f"Tensor {key} is missing from the checkpoint.")
+            continue
+
+        start_index = np.asarray(start_index)
+        stop_index = start_index + np.asarray(tensor.shape)
+
+        loaded = 0
+        with torch.no_grad():
+            for entry in shards[key]:
+                if list(entry["global_shape"]) != [int(n) for n in global_shape]:
+                    raise ValueError(f"Tensor {key} has global shape {list(global_shape)}, "
+                                     f"but {entry['global_shape']} in the checkpoint.")
+
+                shard_start = np.asarray(entry["start_index"])
+                shard_stop = shard_start + np.asarray(entry["shape"])
+                start, stop, subshape = compute_intersection(start_index, stop_index, shard_start, shard_stop)
+                if np.prod(subshape) == 0:
+                    continue
+
+                shard = np.load(os.path.join(path, entry["file"]), mmap_mode="r")
+                src = tuple(slice(a, b) for a, b in zip(start - shard_start, stop - shard_start))
+                dst = tuple(slice(a, b) for a, b in zip(start - start_index, stop - start_index))
+
+                data = torch.from_numpy(np.array(shard[src]))
+                if entry["dtype"] == "bfloat16":
+                    data = data.view(torch.bfloat16)
+                tensor[dst] = data.to(device=tensor.device, dtype=tensor.dtype)
+                loaded += int(np.prod(subshape))
+
+        if loaded != tensor.numel():
+            raise ValueError(f"The checkpoint does not cover the local shard of tensor {key}.")
@@ -17,11 +17,12 @@ from torch.nn.modules.utils import _triple
 
 import distdl.nn.init as init
 from distdl.backends.common.partition import MPIPartition
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -126,6 +127,11 @@ class _DistributedChannelReduceScatterConvNd(Module):
                 valid_padding_modes, padding_mode))
 
         self.P_x = P_x
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_x.active:
             return
 
@@ -246,15 +252,52 @@ class _DistributedChannelReduceScatterConvNd(Module):
         # Setting a=sqrt(5) in kaiming_uniform is the same as initializing with
         # uniform(-1/sqrt(k), 1/sqrt(k)), where k = weight.size(1) * prod(*kernel_size)
         # For more details see: https://github.com/pytorch/pytorch/issues/15314#issuecomment-477448573
+
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed.  The input
+        # channels are partitioned along the second dimension of P_weight.
+        if self.transposed:
+            weight_global_shape = [self.in_channels, self.out_channels // self.groups, *self.kernel_size]
+            sharded_dim = 0
+        else:
+            weight_global_shape = [self.out_channels, self.in_channels // self.groups, *self.kernel_size]
+            sharded_dim = 1
+
         if self.P_weight.active:
-            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(self.weight, self.P_weight).shape
+            in_start_index = compute_start_index(self.P_weight.shape[1], self.P_weight.index[1],
+                                                 [self.in_channels])[0]
+            weight_start_index = [0] * len(weight_global_shape)
+            weight_start_index[sharded_dim] = in_start_index if self.transposed else in_start_index // self.groups
+            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5), global_shape=weight_global_shape,
+                                  start_index=weight_start_index, seed=weight_seed)
 
         if self.use_bias and self.P_store_bias.active:
             fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
             if fan_in != 0:
                 bound = 1 / math.sqrt(fan_in)
-                init.uniform_(self.bias, -bound, bound)
+                init.uniform_(self.bias, -bound, bound, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        # Input channels are partitioned along the second dimension of P_weight
+        spec = dict()
+        if self.P_weight.active:
+            num_kernel_dims = len(self.kernel_size)
+            if self.transposed:
+                weight_global_shape = [self.in_channels, self.out_channels // self.groups, *self.kernel_size]
+                partition_dims = [1, None] + [None] * num_kernel_dims
+            else:
+                weight_global_shape = [self.out_channels, self.in_channels // self.groups, *self.kernel_size]
+                partition_dims = [None, 1] + [None] * num_kernel_dims
+            spec['weight'] = block_shard_spec(self.P_weight, weight_global_shape, partition_dims)
+        if self.use_bias and self.P_store_bias.active:
+            spec['bias'] = ([self.out_channels], [0], True)
+
+        return spec
 
     def extra_repr(self):
         s = ('{in_channels}, {out_channels}, kernel_size={kernel_size}'
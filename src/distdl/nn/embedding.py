@@ -4,8 +4,13 @@ import torch
 
 import distdl.nn.init as init
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
+from distdl.nn.init import next_seed
 from distdl.nn.module import Module
 from distdl.nn.repartition import Repartition
+from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -84,6 +89,11 @@ class DistributedEmbedding(Module):
         self.dtype = dtype
 
         self.P_x = P_x
+
+        # Initialization seed, drawn on all workers, active or not, to keep
+        # the seed counters consistent
+        self._init_seed = next_seed()
+
         if not self.P_x.active:
             return
 
@@ -130,7 +140,7 @@ class DistributedEmbedding(Module):
         # Buffer and stream for weight prefetching
         self.weight_buffer = None
         if not self.P_x.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
         else:
             self.stream_context = nullcontext
@@ -148,7 +158,18 @@ class DistributedEmbedding(Module):
             self.scatter_weight = Repartition(self.P_root, P_weight, preserve_batch=False)
 
     def reset_parameters(self, init=init.normal_, mean=0.0, std=1.0):
-        if self.P_weight.active:
+
+        # With a seed, each worker fills its own shard, without communication.
+        # The init function must then accept the global_shape, start_index and
+        # seed keywords.
+        seed = self._init_seed
+        if seed is not None:
+            if self.P_weight.active:
+                start_index = [0, compute_start_index(self.P_weight.shape[-1], self.P_weight.index[-1],
+                                                      [self.embedding_dim])[0]]
+                init(self.weight, mean=mean, std=std, global_shape=[self.num_embeddings, self.embedding_dim],
+                     start_index=start_index, seed=seed)
+        elif self.P_weight.active:
             weight_shape = [1] * self.P_x.dim
             weight_shape[-2] = self.num_embeddings
             weight_shape[-1] = self.embedding_dim
@@ -159,6 +180,18 @@ class DistributedEmbedding(Module):
                 self.weight[:] = weight
         self._fill_padding_idx_with_zero()
 
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        spec = dict()
+        if self.P_weight.active:
+            spec['weight'] = block_shard_spec(self.P_weight, [self.num_embeddings, self.embedding_dim],
+                                              [None, self.P_weight.dim - 1])
+
+        return spec
+
     def extra_repr(self) -> str:
         return f'num_embeddings={self.num_embeddings}, embedding_dim={self.embedding_dim}'
 
@@ -211,7 +244,7 @@ class DistributedEmbedding(Module):
         return destination
 
     def prefetch_weights(self):
-        if self.P_x.size == 1:
+        if not self.P_x.active or self.P_x.size == 1:
             return
         if self.stream_weight is not None:
             with self.stream_context(self.stream_weight):
@@ -239,7 +272,7 @@ class DistributedEmbedding(Module):
             self.weight_buffer = None
 
         if self.stream_weight is not None:
-            torch.cuda.current_stream().wait_stream(self.stream_weight)
+            stream_barrier(self.stream_weight, weight)
 
         return torch.nn.functional.embedding(input, weight, self.padding_idx, self.max_norm,
                                              self.norm_type, self.scale_grad_by_freq, self.sparse
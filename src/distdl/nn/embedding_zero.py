@@ -4,10 +4,14 @@ import torch
 
 import distdl.nn.init as init
 from distdl.nn.all_gather import AllGather
+from distdl.nn.checkpoint import block_shard_spec
+from distdl.nn.init import next_seed
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
 from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.torch import zero_volume_tensor
 
@@ -61,12 +65,16 @@ class DistributedEmbeddingZero(Module):
         If true, clears the weight buffers after each forward pass. Default is True.
         For ZeRO stage 1 and to take advantage of gradient accumulation, set this
         to False and call clear_weight_buffer() manually after the optimizer step.
+    comm_dtype: torch.dtype, optional
+        If given, the weights are all-gathered, and their gradients
+        reduce-scattered, at this, typically lower, precision, e.g.,
+        ``torch.bfloat16``.  Gradients are accumulated at full precision.
     """
 
     def __init__(self, P_x, num_embeddings, embedding_dim, padding_idx=None,
                  max_norm=None, norm_type=2., scale_grad_by_freq=False, sparse=False,
                  _weight=None, _freeze=False, collect_state=False, device=None,
-                 dtype=None, scale_backward=None, auto_clear_buffer=True):
+                 dtype=None, scale_backward=None, auto_clear_buffer=True, comm_dtype=None):
 
         factory_kwargs = {'device': P_x.device, 'dtype': dtype}
         super(DistributedEmbeddingZero, self).__init__()
@@ -88,9 +96,15 @@ class DistributedEmbeddingZero(Module):
         self.collect_state = collect_state
         self.dtype = dtype
         self.auto_clear_buffer = auto_clear_buffer
+        self.comm_dtype = comm_dtype
         self.scale_backward = scale_backward
 
         self.P_x = P_x
+
+        # Initialization seed, drawn on all workers, active or not, to keep
+        # the seed counters consistent
+        self._init_seed = next_seed()
+
         if not self.P_x.active:
             return
 
@@ -100,8 +114,9 @@ class DistributedEmbeddingZero(Module):
         P_root_base.deactivate()
 
         # Allgather
-        self.allgather = AllGather(self.P_x, axes_all_gather=(0,), scale_backward=scale_backward)
-        self.reducescatter = ReduceScatter(self.P_x, axes_reduce_scatter=(0,))
+        self.allgather = AllGather(self.P_x, axes_all_gather=(0,), scale_backward=scale_backward,
+                                   comm_dtype=comm_dtype)
+        self.reducescatter = ReduceScatter(self.P_x, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
         self.init_scatter = Repartition(self.P_root, self.P_x)
 
         # Local embedding size
@@ -128,8 +143,14 @@ class DistributedEmbeddingZero(Module):
 
         # Buffer and stream for weight prefetching
         self.weight_buffer = None
+
+        # Handle to an in-flight weight all-gather. On the CPU, prefetching uses
+        # the back-end's asynchronous collectives if they are available.
+        self.weight_work = None
+        self.async_prefetch = self.P_x.device == 'cpu' and \
+            hasattr(self.allgather._distdl_backend, "CollectiveWork")
         if not self.P_x.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
         else:
             self.stream_context = nullcontext
@@ -146,7 +167,19 @@ class DistributedEmbeddingZero(Module):
         self.scatter_weight = Repartition(self.P_root, P_x, preserve_batch=False)
 
     def reset_parameters(self, init=init.normal_, mean=0.0, std=1.0):
-        if self.P_x.active:
+
+        # With a seed, each worker fills its own shard, without communication.
+        # The init function must then accept the global_shape, start_index and
+        # seed keywords.
+        seed = self._init_seed
+        if seed is not None:
+            if self.P_x.active:
+                start_index = compute_start_index([self.P_x.shape[0], self.P_x.shape[-1]],
+                                                  [self.P_x.index[0], self.P_x.index[-1]],
+                                                  [self.num_embeddings, self.embedding_dim])
+                init(self.weight, mean=mean, std=std, global_shape=[self.num_embeddings, self.embedding_dim],
+                     start_index=start_index, seed=seed)
+        elif self.P_x.active:
             weight_shape = [1] * self.P_x.dim
             weight_shape[0] = self.num_embeddings
             weight_shape[-1] = self.embedding_dim
@@ -158,6 +191,25 @@ class DistributedEmbeddingZero(Module):
                 self.weight[:] = weight
         self._fill_padding_idx_with_zero()
 
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        spec = dict()
+        if self.P_x.active:
+            spec['weight'] = block_shard_spec(self.P_x, [self.num_embeddings, self.embedding_dim],
+                                              [0, self.P_x.dim - 1])
+
+        return spec
+
+    def _distdl_zero_gradients(self):
+
+        if not self.P_x.active or self.auto_clear_buffer:
+            return list()
+
+        return [(self.weight, self.weight_buffer, self.reducescatter, self._expand, self._squeeze)]
+
     def extra_repr(self) -> str:
         return f'num_embeddings={self.num_embeddings}, embedding_dim={self.embedding_dim}'
 
@@ -213,7 +265,17 @@ class DistributedEmbeddingZero(Module):
 
    # Keep for backward compatibility
     def prefetch_weights(self):
-        self.collect_weights()
+        # Start the weight all-gather without waiting for it to complete, as in
+        # DistributedLinearAllGatherZero. Without asynchronous collectives, fall
+        # back to collecting the weights immediately.
+        if not self.P_x.active:
+            return
+        if not self.async_prefetch:
+            self.collect_weights()
+            return
+
+        if self.weight_buffer is None and self.weight_work is None:
+            self.weight_work = self.allgather(self._expand(self.weight), async_op=True)
 
     def collect_weights(self):
         # For ZeRO-1 (auto_clear_buffer: False), we want to temporarily turn the weight buffer
@@ -231,9 +293,15 @@ class DistributedEmbeddingZero(Module):
 
         # If weight buffer is not already filled, start an allgather call. If cuda is used,
         # this call will be asynchronously executed in a separate stream.
+        # If prefetch_weights() started an asynchronous all-gather, complete it instead.
         if self.weight_buffer is None:
             with self.stream_context(self.stream_weight):
-                self.weight_buffer = self._squeeze(self.allgather(self._expand(self.weight)))
+                if self.weight_work is not None:
+                    weight = self.weight_work.wait()
+                    self.weight_work = None
+                else:
+                    weight = self.allgather(self._expand(self.weight))
+                self.weight_buffer = self._squeeze(weight)
 
     def clear_weight_buffer(self):
 
@@ -241,15 +309,20 @@ class DistributedEmbeddingZero(Module):
         # Only at this point do we call the reduce-scatter operations and populate the weight
         # gradient. For ZeRO-3, this function is called after each forward pass and  reduce-scatter
         # is called automatically, since the forward all-gather was tracked.
+        # Gradients already reduce-scattered by ZeroGradientBuckets are skipped.
         if not self.auto_clear_buffer:
             with torch.no_grad():
 
-                # Reduce-scatter gradient
-                if self.scale_backward is not None:
-                    self.weight_buffer.grad.div_(self.scale_backward)
-                self.weight.grad = self._squeeze(self.reducescatter(self._expand(self.weight_buffer.grad)))
+                # Reduce-scatter gradients
+                for param, buffer, reduce_scatter, pack, unpack in self._distdl_zero_gradients():
+                    if buffer is None or buffer.grad is None:
+                        continue
+                    if self.scale_backward is not None:
+                        buffer.grad.div_(self.scale_backward)
+                    param.grad = unpack(reduce_scatter(pack(buffer.grad)))
 
         self.weight_buffer = None
+        self.weight_work = None
 
     def forward(self, input):
         r"""Forward function interface.
@@ -266,7 +339,7 @@ class DistributedEmbeddingZero(Module):
         # All-gather weights into the weight buffer. If prefetch_weights() has been
         # called previously, this doesn't do anything.
         self.collect_weights()
-        stream_barrier(self.stream_weight)
+        stream_barrier(self.stream_weight, self.weight_buffer)
 
         input = torch.nn.functional.embedding(input, self.weight_buffer, self.padding_idx, self.max_norm,
                                               self.norm_type, self.scale_grad_by_freq, self.sparse
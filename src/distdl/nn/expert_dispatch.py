@@ -0,0 +1,256 @@
+import math
+
+import numpy as np
+import torch
+
+from distdl.nn.all_to_all import AllToAll
+from distdl.nn.module import Module
+from distdl.utilities.slicing import compute_balanced_counts
+
+
+class ExpertRouting:
+    r"""Record of a token dispatch, required to combine the expert outputs.
+
+    Returned by :any:`ExpertDispatch.forward`.
+
+    Attributes
+    ----------
+    num_tokens : int
+        Number of local tokens.
+    top_k : int
+        Number of experts each token is assigned to.
+    capacity : int
+        Capacity of the local experts, i.e., the second dimension of the
+        dispatched tensor, or None if it is ragged.
+    expert_counts : tuple
+        Number of tokens received by each local expert.
+    num_dropped : int
+        Number of local token assignments dropped for lack of capacity.
+    send_counts : tuple
+        Number of rows sent to each worker.
+    recv_counts : tuple
+        Number of rows received from each worker.
+    assignments : torch.Tensor
+        Kept assignments, ``token * top_k + slot``, in the order they are sent.
+    positions : torch.Tensor
+        Rows of the flattened dispatched tensor the received rows are placed at.
+
+    """
+
+    def __init__(self, num_tokens, top_k, capacity, expert_counts, num_dropped, send_counts, recv_counts,
+                 assignments, positions):
+
+        self.num_tokens = num_tokens
+        self.top_k = top_k
+        self.capacity = capacity
+        self.expert_counts = expert_counts
+        self.num_dropped = num_dropped
+        self.send_counts = send_counts
+        self.recv_counts = recv_counts
+        self.assignments = assignments
+        self.positions = positions
+
+
+class ExpertDispatch(Module):
+    r"""Routes tokens to their assigned experts, for mixture of experts (MoE) layers.
+
+    Each worker of ``P_x`` holds a batch of tokens and the indices of the
+    experts each token is assigned to.  The experts are distributed over the
+    workers of ``P_x`` in balanced, contiguous blocks, in rank order, as the
+    expert dimension of :any:`DistributedExpertAllGather` and
+    :any:`DistributedExpertReduceScatter`.  The forward pass sends each token
+    to the workers of its experts with a single variable-count all-to-all, and
+    returns them arranged as ``[expert, capacity, feature]``.  The matching
+    :any:`combine` returns the expert outputs to the workers of their tokens.
+
+    If a capacity factor is given, each worker sends at most
+    ``ceil(capacity_factor * num_tokens * top_k / num_experts)`` tokens to
+    each expert, and the others are dropped.  First choices are kept before
+    second choices, and earlier tokens before later ones.  Dropped tokens do
+    not contribute to the combined output.
+
+    If ``ragged`` is True, the tokens are instead returned packed by expert,
+    without padding, as ``[token, feature]``, with the number of tokens of
+    each local expert in the ``expert_counts`` of the routing, as expected
+    by the ``expert_counts`` argument of the expert linear layers.
+
+    Parameters
+    ----------
+    P_x :
+        Partition of the tokens and of the experts.
+    num_experts :
+        Number of experts in the *global* expert dimension.
+    capacity_factor : float, optional
+        Factor of the uniform share of tokens each expert accepts from each
+        worker.  If None, no tokens are dropped and the capacity is the
+        largest number of tokens received by a local expert.
+    ragged : bool, optional
+        If True, the dispatched tokens are packed by expert, without padding.
+
+    """
+
+    def __init__(self, P_x, num_experts, capacity_factor=None, ragged=False):
+
+        super(ExpertDispatch, self).__init__()
+
+        if capacity_factor is not None and capacity_factor <= 0:
+            raise ValueError(f"Capacity factor must be positive, got {capacity_factor}.")
+
+        self.P_x = P_x
+        self.num_experts = num_experts
+        self.capacity_factor = capacity_factor
+        self.ragged = ragged
+
+        # Experts are distributed in balanced blocks over the workers
+        expert_counts, expert_offsets = compute_balanced_counts(num_experts, P_x.size)
+        self.expert_counts = expert_counts
+        self.expert_offsets = expert_offsets
+        self.num_experts_local = expert_counts[P_x.rank] if P_x.active else 0
+
+        self.all_to_all = AllToAll(P_x)
+
+    def extra_repr(self) -> str:
+        return (f'P_x.shape={self.P_x.shape}, num_experts={self.num_experts}, '
+                f'capacity_factor={self.capacity_factor}, ragged={self.ragged}')
+
+    def forward(self, input, expert_index):
+        """Forward function interface.
+
+        Parameters
+        ----------
+        input :
+            Local tokens, of shape ``[num_tokens, *features]``.
+        expert_index :
+            Global indices of the experts of each token, of shape
+            ``[num_tokens]`` or ``[num_tokens, top_k]``.
+
+        Returns
+        -------
+        output :
+            Tokens of the local experts, of shape ``[num_local_experts,
+            capacity, *features]``, padded with zeros, or, if ragged, of shape
+            ``[num_received_tokens, *features]``.
+        routing : ExpertRouting
+            Record of the dispatch, to pass to :any:`combine`.
+
+        """
+
+        if not self.P_x.active:
+            return input, None
+
+        num_tokens = input.shape[0]
+        expert_index = expert_index.reshape(num_tokens, -1)
+        top_k = expert_index.shape[1]
+        experts = expert_index.reshape(-1).cpu().numpy()
+
+        if experts.size > 0 and (experts.min() < 0 or experts.max() >= self.num_experts):
+            raise ValueError(f"Expert indices must be in [0, {self.num_experts}).")
+
+        # Assignments, token * top_k + slot, ordered by expert, then by slot,
+        # then by token.  As experts are owned in contiguous blocks, this is
+        # also the order of the destination workers.
+        assignments = np.arange(num_tokens * top_k)
+        slots = assignments % top_k
+        tokens = assignments // top_k
+        order = np.lexsort((tokens, slots, experts))
+        sorted_experts = experts[order]
+
+        counts = np.bincount(experts, minlength=self.num_experts)
+        if self.capacity_factor is not None:
+            local_capacity = math.ceil(self.capacity_factor * num_tokens * top_k / self.num_experts)
+            starts = np.cumsum(counts) - counts
+            keep = np.arange(len(order)) - starts[sorted_experts] < local_capacity
+            order = order[keep]
+            counts = np.minimum(counts, local_capacity)
+        num_dropped = num_tokens * top_k - len(order)
+
+        # Number of rows for each expert of each destination worker
+        max_experts_local = max(self.expert_counts)
+        send_meta = np.zeros((self.P_x.size, max_experts_local), dtype=int)
+        for rank in range(self.P_x.size):
+            offset = self.expert_offsets[rank]
+            send_meta[rank, :self.expert_counts[rank]] = counts[offset:offset + self.expert_counts[rank]]
+        recv_meta = self.P_x.alltoall_data(send_meta)[:, :self.num_experts_local]
+
+        send_counts = tuple(int(count) for count in send_meta.sum(axis=1))
+        recv_counts = tuple(int(count) for count in recv_meta.sum(axis=1))
+
+        assignments = torch.as_tensor(order, dtype=torch.int64, device=input.device)
+        sent = input.index_select(0, assignments // top_k)
+        received = self.all_to_all(sent, send_counts, recv_counts)
+
+        # Rows are received by source, then by local expert, and are packed,
+        # in that order, at the front of the capacity dimension of their expert
+        per_expert = recv_meta.sum(axis=0)
+        if self.ragged:
+            capacity = None
+            num_rows = int(per_expert.sum())
+            expert_starts = np.cumsum(per_expert) - per_expert
+        else:
+            capacity = int(per_expert.max()) if per_expert.size > 0 else 0
+            num_rows = self.num_experts_local * capacity
+            expert_starts = capacity * np.arange(self.num_experts_local)
+        block_offsets = (np.cumsum(recv_meta, axis=0) - recv_meta) + expert_starts
+        block_counts = recv_meta.reshape(-1)
+        block_starts = np.cumsum(block_counts) - block_counts
+        positions = np.arange(block_counts.sum()) + np.repeat(block_offsets.reshape(-1) - block_starts, block_counts)
+        positions = torch.as_tensor(positions, dtype=torch.int64, device=input.device)
+
+        output = received.new_zeros((num_rows,) + tuple(input.shape[1:]))
+        output = output.index_copy(0, positions, received)
+        if not self.ragged:
+            output = output.reshape((self.num_experts_local, capacity) + tuple(input.shape[1:]))
+
+        expert_counts = tuple(int(count) for count in per_expert)
+        routing = ExpertRouting(num_tokens, top_k, capacity, expert_counts, num_dropped,
+                                send_counts, recv_counts, assignments, positions)
+
+        return output, routing
+
+    def combine(self, expert_output, routing, weights=None):
+        """Returns the expert outputs to the workers of their tokens.
+
+        Parameters
+        ----------
+        expert_output :
+            Outputs of the local experts, of shape ``[num_local_experts,
+            capacity, *features]``, or, if ragged, ``[num_received_tokens,
+            *features]``.
+        routing : ExpertRouting
+            Record of the dispatch, as returned by the forward pass.
+        weights : optional
+            Weights of the experts of each token, of shape ``[num_tokens]`` or
+            ``[num_tokens, top_k]``.  If None, the outputs of the experts of
+            each token are summed.
+
+        Returns
+        -------
+        output :
+            Combined output of each local token, of shape ``[num_tokens,
+            *features]``.  Tokens whose assignments were all dropped are zero.
+
+        """
+
+        if not self.P_x.active:
+            return expert_output
+
+        num_tokens = routing.num_tokens
+        top_k = routing.top_k
+
+        if self.ragged:
+            feature_shape = tuple(expert_output.shape[1:])
+        else:
+            feature_shape = tuple(expert_output.shape[2:])
+            expert_output = expert_output.reshape((self.num_experts_local * routing.capacity,) + feature_shape)
+
+        sent = expert_output.index_select(0, routing.positions)
+        received = self.all_to_all(sent, routing.recv_counts, routing.send_counts)
+
+        output = received.new_zeros((num_tokens * top_k,) + feature_shape)
+        output = output.index_copy(0, routing.assignments, received)
+        output = output.reshape((num_tokens, top_k) + feature_shape)
+
+        if weights is not None:
+            output = output * weights.reshape((num_tokens, top_k) + (1,) * len(feature_shape))
+
+        return output.sum(dim=1)
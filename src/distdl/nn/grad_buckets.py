@@ -0,0 +1,289 @@
+from functools import partial
+
+import numpy as np
+import torch
+
+import distdl.backends
+from distdl.nn.module import Module
+from distdl.nn.reduce_scatter import ReduceScatter
+from distdl.utilities.slicing import compute_start_index
+from distdl.utilities.slicing import compute_subshape
+
+
+class _GradientBucket:
+    r"""A flat buffer packing the gradients of several layers, reduce-scattered
+    with a single collective."""
+
+    def __init__(self, P, axis, dtype, device, comm_dtype=None, error_feedback=False):
+
+        self.P = P
+        self.axis = axis
+        self.dtype = dtype
+        self.device = device
+
+        # Layout of each entry: the start and size of the block of each worker
+        # in its flattened gradient, and its offset in the segment of each
+        # worker
+        self.entries = list()
+        self.offsets = np.zeros(P.shape[axis], dtype=int)
+
+        self.reduce_scatter = ReduceScatter(P, axes_reduce_scatter=(axis,),
+                                            comm_dtype=comm_dtype, error_feedback=error_feedback)
+
+        # State of the current reduction
+        self.pending = 0
+        self.work = None
+
+    @property
+    def segment_size(self):
+        return int(self.offsets.max())
+
+    @property
+    def nbytes(self):
+        return self.P.shape[self.axis] * self.segment_size * torch.empty((), dtype=self.dtype).element_size()
+
+    def add(self, entry, packed_shape):
+
+        p = self.P.shape[self.axis]
+        n = packed_shape[self.axis]
+        inner = int(np.prod(packed_shape)) // n if n > 0 else 0
+
+        starts = np.array([compute_start_index(p, r, [n])[0] for r in range(p)], dtype=int)
+        counts = np.array([compute_subshape(p, r, [n])[0] for r in range(p)], dtype=int)
+
+        self.entries.append((entry, starts * inner, counts * inner, self.offsets.copy()))
+        self.offsets += counts * inner
+
+    def pack(self):
+        r"""Copies the gradients into a flat buffer, with the segment of each
+        worker contiguous and padded to the same length."""
+
+        p = self.P.shape[self.axis]
+        L = self.segment_size
+        flat = torch.zeros(p * L, dtype=self.dtype, device=self.device)
+
+        for (layer, _, buffer, _, pack, _), starts, counts, offsets in self.entries:
+            if buffer.grad is None:
+                continue
+            if getattr(layer, "scale_backward", None) is not None:
+                buffer.grad.div_(layer.scale_backward)
+            grad = pack(buffer.grad).movedim(self.axis, 0).reshape(-1)
+            for r in range(p):
+                flat[r*L + offsets[r]:r*L + offsets[r] + counts[r]] = grad[starts[r]:starts[r] + counts[r]]
+
+        shape = [1] * self.P.dim
+        shape[self.axis] = p * L
+        return flat.view(shape)
+
+    def unpack(self, output):
+        r"""Sets the gradient of each parameter from the local segment."""
+
+        r = self.P.index[self.axis]
+        output = output.reshape(-1)
+
+        for (_, parameter, buffer, _, pack, unpack), _, counts, offsets in self.entries:
+            shape = list(pack(buffer).shape)
+            shape[self.axis] = compute_subshape(self.P.shape[self.axis], r, [shape[self.axis]])[0]
+            shape.insert(0, shape.pop(self.axis))
+            grad = output[offsets[r]:offsets[r] + counts[r]].view(shape).movedim(0, self.axis)
+            parameter.grad = unpack(grad)
+            buffer.grad = None
+
+
+class _BucketGroup:
+    r"""Buckets reduce-scattered over the same partition and dimension, which
+    must be started in the same order on all workers."""
+
+    def __init__(self):
+
+        self.buckets = list()
+
+        # Index of the next bucket to start
+        self.next = 0
+
+
+class ZeroGradientBuckets:
+    r"""Bucketed reduce-scatter of the gradients of ZeRO-1 layers.
+
+    In ZeRO stage 1 (``auto_clear_buffer=False``), each layer accumulates the
+    gradients of its all-gathered weights and, in ``clear_weight_buffer()``,
+    reduce-scatters them back to its shards, with one small and latency
+    bound collective per tensor.  Instead, this class packs the gradients of
+    all layers of a model into flat buckets, each reduce-scattered with a
+    single collective.
+
+    Gradients are grouped by the partition and dimension over which they are
+    reduce-scattered, and by dtype and communication dtype (see the
+    ``comm_dtype`` option of the layers), and are laid out so that the segment of
+    the bucket of each worker holds its shard of every gradient.  Buckets are
+    filled in reverse order of the layers, approximately the order in which
+    gradients are produced by the backward pass, up to ``bucket_size`` bytes.
+
+    If :any:`arm` is called before the last backward pass of a gradient
+    accumulation loop, each bucket is reduce-scattered, asynchronously if the
+    back-end supports it, as soon as all of its gradients have been produced,
+    overlapping the communication with the rest of the backward pass.
+    :any:`reduce` then completes the reductions, sets the gradients of the
+    parameters and clears the weight buffers of all layers.
+
+    Parameters
+    ----------
+    module : torch.nn.Module
+        Model containing the ZeRO-1 layers.
+    bucket_size : int, optional
+        Maximum size of a bucket, in bytes.  A gradient larger than this is
+        reduce-scattered in a bucket of its own.
+    error_feedback : bool, optional
+        If true, the error made by rounding the gradients of compressed
+        buckets to their communication dtype is added to the gradients of the
+        next reduction.
+
+    Warning
+    -------
+    Buckets are reduce-scattered in order, so every worker must call the
+    layers in the same order.
+
+    """
+
+    def __init__(self, module, bucket_size=25 * 2**20, error_feedback=False):
+
+        self.module = module
+        self.bucket_size = bucket_size
+        self.error_feedback = error_feedback
+
+        self.async_op = hasattr(distdl.backends.backend, "CollectiveWork")
+
+        # Buckets of each group, in reduction order, and the layout they were
+        # built for
+        self._groups = list()
+        self._layout = None
+
+        # Layers with ZeRO-1 gradients
+        self._zero_layers = list()
+
+        # Hooks on the weight buffers, registered by arm()
+        self._hooks = list()
+
+    @property
+    def buckets(self):
+        return [bucket for group in self._groups for bucket in group.buckets]
+
+    def _layers(self):
+        # Gradients are produced approximately in reverse order of the layers
+        return [m for m in reversed(list(self.module.modules())) if isinstance(m, Module)]
+
+    def _entries(self):
+        entries = list()
+        self._zero_layers = list()
+        for layer in self._layers():
+            gradients = layer._distdl_zero_gradients()
+            if gradients:
+                self._zero_layers.append(layer)
+            for parameter, buffer, reduce_scatter, pack, unpack in gradients:
+                if buffer is None or not reduce_scatter.P_x.active:
+                    continue
+                entries.append((layer, parameter, buffer, reduce_scatter, pack, unpack))
+        return entries
+
+    def _build(self):
+        r"""Assigns the current gradients to buckets, keeping the previous
+        layout if it still applies."""
+
+        entries = self._entries()
+        layout = [(id(e[0]), id(e[3]), tuple(e[4](e[2]).shape), e[2].dtype) for e in entries]
+
+        if layout != self._layout:
+            self._layout = layout
+            self._groups = list()
+            keys = dict()
+            for entry, (_, _, packed_shape, dtype) in zip(entries, layout):
+                reduce_scatter = entry[3]
+                if len(reduce_scatter.axes_reduce_scatter) != 1:
+                    raise ValueError("Bucketed gradients must be reduce-scattered along a single dimension.")
+                P = reduce_scatter.P_x
+                axis = int(reduce_scatter.axes_reduce_scatter[0])
+
+                # Partitions with the same workers and topology share their
+                # communicator, from the communicator pool
+                key = (id(P._comm), tuple(P.shape), axis, dtype, reduce_scatter.comm_dtype)
+                if key not in keys:
+                    keys[key] = _BucketGroup()
+                    self._groups.append(keys[key])
+                buckets = keys[key].buckets
+
+                if not buckets or (buckets[-1].entries and buckets[-1].nbytes >= self.bucket_size):
+                    buckets.append(_GradientBucket(P, axis, dtype, entry[2].device,
+                                                   reduce_scatter.comm_dtype, self.error_feedback))
+                buckets[-1].add(entry, packed_shape)
+        else:
+            # Same layout, but the buffers have been recreated
+            entries = {(id(e[0]), id(e[3])): e for e in entries}
+            for bucket in self.buckets:
+                for j, (entry, *layout) in enumerate(bucket.entries):
+                    bucket.entries[j] = (entries[(id(entry[0]), id(entry[3]))], *layout)
+
+        for group in self._groups:
+            group.next = 0
+            for bucket in group.buckets:
+                bucket.pending = len(bucket.entries)
+                bucket.work = None
+
+    def _launch(self, group):
+        r"""Starts the reduce-scatter of the ready buckets of a group, in order."""
+
+        while group.next < len(group.buckets) and group.buckets[group.next].pending == 0:
+            bucket = group.buckets[group.next]
+            with torch.no_grad():
+                bucket.work = bucket.reduce_scatter(bucket.pack(), async_op=self.async_op)
+            group.next += 1
+
+    def _ready(self, group, bucket, *args):
+        bucket.pending -= 1
+        self._launch(group)
+
+    def arm(self):
+        r"""Reduce-scatters each bucket as soon as the next backward pass has
+        produced all of its gradients.
+
+        Must be called after the last forward pass of the gradient
+        accumulation loop, and before its backward pass.
+
+        """
+
+        self._remove_hooks()
+        self._build()
+        for group in self._groups:
+            for bucket in group.buckets:
+                for (_, _, buffer, _, _, _), _, _, _ in bucket.entries:
+                    hook = partial(self._ready, group, bucket)
+                    self._hooks.append(buffer.register_post_accumulate_grad_hook(hook))
+
+    def reduce(self):
+        r"""Completes the reduce-scatter of all buckets, sets the gradients of
+        the parameters and clears the weight buffers of all layers."""
+
+        if not self._hooks:
+            self._build()
+        self._remove_hooks()
+
+        # Start any bucket that is not yet started, e.g., if some of its
+        # gradients were not produced by the last backward pass
+        for group in self._groups:
+            for bucket in group.buckets[group.next:]:
+                bucket.pending = 0
+            self._launch(group)
+
+        with torch.no_grad():
+            for bucket in self.buckets:
+                output = bucket.work.wait() if self.async_op else bucket.work
+                bucket.unpack(output)
+                bucket.work = None
+
+        # Layers only reduce the gradients that were not bucketed
+        for layer in self._zero_layers:
+            layer.clear_weight_buffer()
+
+    def _remove_hooks(self):
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = list()
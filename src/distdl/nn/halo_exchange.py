@@ -1,10 +1,14 @@
+import itertools
+
 from distdl.nn.module import Module
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class HaloExchange(Module):
 
-    def __init__(self, P_x, halo_shape, recv_buffer_shape, send_buffer_shape, buffer_manager=None):
+    def __init__(self, P_x, halo_shape, recv_buffer_shape, send_buffer_shape, buffer_manager=None,
+                 inplace=False, concurrent=False):
 
         super(HaloExchange, self).__init__()
 
@@ -13,9 +17,24 @@ class HaloExchange(Module):
         self.recv_buffer_shape = recv_buffer_shape
         self.send_buffer_shape = send_buffer_shape
 
+        # If the input is owned by the caller, e.g., a persistent padded
+        # buffer, the ghost data can be written into it directly.
+        self.inplace = inplace
+
+        # In concurrent mode, all dimensions are exchanged at once, directly
+        # with the diagonal neighbors for the corners, rather than one
+        # dimension after the other.
+        functional = self._distdl_backend.functional.halo_exchange
+        if concurrent and not hasattr(functional, "NeighborhoodHaloExchangeFunction"):
+            raise ValueError("Concurrent halo exchange is not supported by the selected back-end.")
+        self.concurrent = concurrent
+
         self.neighbor_ranks = None
         if self.P_x.active:
-            self.neighbor_ranks = self.P_x.neighbor_ranks(self.P_x.rank)
+            if self.concurrent:
+                self.neighbor_ranks = self.P_x.neighborhood_ranks(self.P_x.rank)
+            else:
+                self.neighbor_ranks = self.P_x.neighbor_ranks(self.P_x.rank)
 
         self.slices = None
         self.buffers = None
@@ -33,6 +52,8 @@ class HaloExchange(Module):
 
         # Get some types and functions from the back-end
         self.allocate_halo_exchange_buffers = self._distdl_backend.buffer_allocator.allocate_halo_exchange_buffers
+        self.allocate_neighborhood_exchange_buffers = \
+            self._distdl_backend.buffer_allocator.allocate_neighborhood_exchange_buffers
 
     def _assemble_slices(self, x_local_shape, recv_buffer_shape, send_buffer_shape):
 
@@ -98,16 +119,66 @@ class HaloExchange(Module):
 
         return slices
 
+    def _assemble_neighborhood_slices(self, x_local_shape, recv_buffer_shape, send_buffer_shape):
+
+        dim = len(x_local_shape)
+
+        slices = []
+
+        # For each neighbor, the ghost region we receive from it is the
+        # rectangular prism formed by, in each dimension, the left ghost, the
+        # right ghost, or the bulk, depending on the offset of the neighbor in
+        # that dimension.  The bulk region we send to it is formed the same
+        # way, from the left bulk, the right bulk, or the bulk.  The neighbor
+        # shares our index in the dimensions where the offset is 0, so it
+        # has the same bulk extent there.
+        for offset in itertools.product([-1, 0, 1], repeat=dim):
+            if not any(offset):
+                continue
+
+            bulk_slices = []
+            ghost_slices = []
+
+            for j in range(dim):
+                s = x_local_shape[j]
+
+                lrecv_size = int(recv_buffer_shape[j, 0])
+                lsend_size = int(send_buffer_shape[j, 0])
+                rrecv_size = int(recv_buffer_shape[j, 1])
+                rsend_size = int(send_buffer_shape[j, 1])
+
+                if offset[j] == -1:
+                    bulk_slices.append(slice(lrecv_size, lrecv_size + lsend_size, None))
+                    ghost_slices.append(slice(0, lrecv_size, None))
+                elif offset[j] == 1:
+                    bulk_slices.append(slice(s - (rrecv_size + rsend_size), s - rrecv_size, None))
+                    ghost_slices.append(slice(s - rrecv_size, s, None))
+                else:
+                    bulk_slices.append(slice(lrecv_size, s - rrecv_size, None))
+                    ghost_slices.append(slice(lrecv_size, s - rrecv_size, None))
+
+            slices.append((offset, tuple(bulk_slices), tuple(ghost_slices)))
+
+        return slices
+
     def _distdl_module_setup(self, input):
 
         if self.P_x.active:
             x_local_shape = input[0].shape
-            self.slices = self._assemble_slices(x_local_shape, self.recv_buffer_shape, self.send_buffer_shape)
-            self.buffers = self.allocate_halo_exchange_buffers(self.buffer_manager,
-                                                               self.slices,
-                                                               self.recv_buffer_shape,
-                                                               self.send_buffer_shape,
-                                                               input[0].dtype)
+            if self.concurrent:
+                self.slices = self._assemble_neighborhood_slices(x_local_shape,
+                                                                 self.recv_buffer_shape,
+                                                                 self.send_buffer_shape)
+                self.buffers = self.allocate_neighborhood_exchange_buffers(self.buffer_manager,
+                                                                           self.slices,
+                                                                           input[0].dtype)
+            else:
+                self.slices = self._assemble_slices(x_local_shape, self.recv_buffer_shape, self.send_buffer_shape)
+                self.buffers = self.allocate_halo_exchange_buffers(self.buffer_manager,
+                                                                   self.slices,
+                                                                   self.recv_buffer_shape,
+                                                                   self.send_buffer_shape,
+                                                                   input[0].dtype)
             self.P_x.initialize_backend_comm()
         self._distdl_is_setup = True
         self._input_tensor_structure = TensorStructure(input[0])
@@ -137,15 +208,41 @@ class HaloExchange(Module):
 
         return self._input_tensor_structure != new_tensor_structure
 
-    def forward(self, input):
+    @traced("halo_exchange")
+    def forward(self, input, async_op=False):
+
+        if self.concurrent:
+            Function = self._distdl_backend.functional.halo_exchange.NeighborhoodHaloExchangeFunction
+        else:
+            Function = self._distdl_backend.functional.halo_exchange.HaloExchangeFunction
 
-        Function = self._distdl_backend.functional.halo_exchange.HaloExchangeFunction
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous halo exchange is not supported by the selected back-end.")
 
         if not self.P_x.active:
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
             return input
 
+        if async_op:
+            work = Function.start_forward(input,
+                                          self.P_x,
+                                          self.slices,
+                                          self.buffers,
+                                          self.neighbor_ranks,
+                                          self.inplace)
+            # The autograd function is applied once the ghost data has arrived.
+            return work.then(lambda output: Function.apply(input,
+                                                           self.P_x,
+                                                           self.slices,
+                                                           self.buffers,
+                                                           self.neighbor_ranks,
+                                                           self.inplace,
+                                                           work))
+
         return Function.apply(input,
                               self.P_x,
                               self.slices,
                               self.buffers,
-                              self.neighbor_ranks)
+                              self.neighbor_ranks,
+                              self.inplace)
@@ -6,10 +6,164 @@
 import math
 import warnings
 
+import numpy as np
 import torch
 from torch import Tensor
 
 from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+from distdl.utilities.slicing import compute_start_index
+from distdl.utilities.slicing import compute_subshape
+
+# Base seed of the counter-based generator, see `manual_seed`
+_base_seed = None
+
+# Number of seeds drawn from the base seed
+_seed_counter = 0
+
+_mask32 = 0xffffffff
+
+
+def manual_seed(seed):
+    r"""Sets the seed of the counter-based parameter initialization.
+
+    Once set, layers initialize their parameters with a counter-based
+    generator keyed on the global offset of each element, rather than with
+    the PyTorch generator.  Every worker fills its own shard without
+    communication, and the parameters are identical for any partitioning.
+
+    Layers draw one seed per parameter from :any:`next_seed`, on every worker
+    and in construction order, so all workers must construct the same layers
+    in the same order, as is already required for their partitions.
+
+    Args:
+        seed: the base seed, or ``None`` to return to the PyTorch generator
+    """
+    global _base_seed, _seed_counter
+
+    _base_seed = None if seed is None else int(seed)
+    _seed_counter = 0
+
+
+def next_seed():
+    r"""Returns the seed for the next parameter initialization.
+
+    Returns ``None`` if :any:`manual_seed` has not been set.
+    """
+    global _seed_counter
+
+    if _base_seed is None:
+        return None
+
+    seed = _hash32_int(_hash32_int(_base_seed & _mask32) ^ _seed_counter)
+    _seed_counter += 1
+
+    return seed
+
+
+def _hash32_int(x):
+    # Integer hash with good avalanche behaviour (Wellons, "hash prospector")
+    x ^= x >> 16
+    x = (x * 0x21f0aaad) & _mask32
+    x ^= x >> 15
+    x = (x * 0xd35a2d97) & _mask32
+    x ^= x >> 15
+    return x
+
+
+def _mul32(x, m):
+    # Product modulo 2**32 that does not overflow int64 intermediates
+    return (x * (m & 0xffff) + (((x * (m >> 16)) & 0xffff) << 16)) & _mask32
+
+
+def _hash32(x):
+    # Element-wise version of `_hash32_int` for int64 tensors in [0, 2**32)
+    x = x ^ (x >> 16)
+    x = _mul32(x, 0x21f0aaad)
+    x = x ^ (x >> 15)
+    x = _mul32(x, 0xd35a2d97)
+    x = x ^ (x >> 15)
+    return x
+
+
+def _global_offsets(shape, global_shape, start_index, device):
+    r"""Returns the global linear offset of every element of a shard."""
+
+    offsets = torch.zeros(shape, dtype=torch.int64, device=device)
+    stride = 1
+    for d in reversed(range(len(shape))):
+        index = torch.arange(int(start_index[d]), int(start_index[d]) + shape[d], dtype=torch.int64, device=device)
+        view = [1] * len(shape)
+        view[d] = shape[d]
+        offsets += stride * index.view(view)
+        stride *= int(global_shape[d])
+
+    return offsets
+
+
+def _counter_uniform(shape, global_shape, start_index, seed, stream, device):
+    r"""Returns uniform draws in (0, 1), as float64, that depend only on the
+    seed, the stream and the global offset of each element."""
+
+    offsets = _global_offsets(shape, global_shape, start_index, device)
+    key_lo = _hash32_int((seed & _mask32) ^ _hash32_int(stream))
+    key_hi = _hash32_int(key_lo ^ 0x9e3779b9)
+    h = _hash32((offsets & _mask32) ^ key_lo)
+    h = _hash32(h ^ _hash32((offsets >> 32) ^ key_hi))
+
+    return (h.to(torch.float64) + 0.5) * 2.0**-32
+
+
+def _resolve_start_index(P_tensor, tensor, global_shape, start_index):
+    r"""Returns the global start index of a shard, which, if it is not given,
+    is that of a balanced decomposition of the global tensor over P_tensor."""
+
+    if start_index is not None:
+        return np.asarray(start_index)
+
+    if len(P_tensor.shape) != len(global_shape) or \
+            np.any(compute_subshape(P_tensor.shape, P_tensor.index, global_shape) != np.asarray(tensor.shape)):
+        raise ValueError("start_index is required for tensors that are not balanced over P_tensor.")
+
+    return compute_start_index(P_tensor.shape, P_tensor.index, global_shape)
+
+
+def _resolve_global_shape(P_tensor, tensor, global_shape):
+    r"""Returns the global shape of a shard, assembling it collectively only
+    if it is not given."""
+
+    if global_shape is not None:
+        return tuple(int(n) for n in global_shape)
+
+    return tuple(int(n) for n in assemble_global_tensor_structure(tensor, P_tensor).shape)
+
+
+def _distributed_uniform_(P_tensor, tensor, a, b, global_shape, start_index, seed):
+    if seed is None:
+        return _no_grad_uniform_(tensor, a, b)
+    start_index = _resolve_start_index(P_tensor, tensor, global_shape, start_index)
+    return _counter_uniform_(tensor, a, b, global_shape, start_index, seed)
+
+
+def _distributed_normal_(P_tensor, tensor, mean, std, global_shape, start_index, seed):
+    if seed is None:
+        return _no_grad_normal_(tensor, mean, std)
+    start_index = _resolve_start_index(P_tensor, tensor, global_shape, start_index)
+    return _counter_normal_(tensor, mean, std, global_shape, start_index, seed)
+
+
+def _counter_uniform_(tensor, a, b, global_shape, start_index, seed):
+    with torch.no_grad():
+        u = _counter_uniform(tensor.shape, global_shape, start_index, seed, 0, tensor.device)
+        return tensor.copy_(a + (b - a) * u)
+
+
+def _counter_normal_(tensor, mean, std, global_shape, start_index, seed):
+    # Box-Muller transform of two independent streams
+    with torch.no_grad():
+        u1 = _counter_uniform(tensor.shape, global_shape, start_index, seed, 1, tensor.device)
+        u2 = _counter_uniform(tensor.shape, global_shape, start_index, seed, 2, tensor.device)
+        z = torch.sqrt(-2.0 * torch.log(u1)) * torch.cos(2.0 * math.pi * u2)
+        return tensor.copy_(mean + std * z)
 
 
 # These no_grad_* functions are necessary as wrappers around the parts of these
@@ -118,35 +272,53 @@ def calculate_gain(nonlinearity, param=None):
         raise ValueError("Unsupported nonlinearity {}".format(nonlinearity))
 
 
-def uniform_(tensor: Tensor, a: float = 0., b: float = 1.) -> Tensor:
+def uniform_(tensor: Tensor, a: float = 0., b: float = 1., *,
+             global_shape=None, start_index=None, seed=None) -> Tensor:
     r"""Fills the input Tensor with values drawn from the uniform
     distribution :math:`\mathcal{U}(a, b)`.
     Args:
         tensor: an n-dimensional `torch.Tensor`
         a: the lower bound of the uniform distribution
         b: the upper bound of the uniform distribution
+        global_shape: shape of the global tensor, of which `tensor` is a shard
+        start_index: global index of the first element of `tensor`, default 0
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.uniform_(w)
     """
     if torch.overrides.has_torch_function_variadic(tensor):
         return torch.overrides.handle_torch_function(uniform_, (tensor,), tensor=tensor, a=a, b=b)
+    if seed is not None:
+        global_shape = tensor.shape if global_shape is None else global_shape
+        start_index = [0] * tensor.dim() if start_index is None else start_index
+        return _counter_uniform_(tensor, a, b, global_shape, start_index, seed)
     return _no_grad_uniform_(tensor, a, b)
 
 
-def normal_(tensor: Tensor, mean: float = 0., std: float = 1.) -> Tensor:
+def normal_(tensor: Tensor, mean: float = 0., std: float = 1., *,
+            global_shape=None, start_index=None, seed=None) -> Tensor:
     r"""Fills the input Tensor with values drawn from the normal
     distribution :math:`\mathcal{N}(\text{mean}, \text{std}^2)`.
     Args:
         tensor: an n-dimensional `torch.Tensor`
         mean: the mean of the normal distribution
         std: the standard deviation of the normal distribution
+        global_shape: shape of the global tensor, of which `tensor` is a shard
+        start_index: global index of the first element of `tensor`, default 0
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.normal_(w)
     """
     if torch.overrides.has_torch_function_variadic(tensor):
         return torch.overrides.handle_torch_function(normal_, (tensor,), tensor=tensor, mean=mean, std=std)
+    if seed is not None:
+        global_shape = tensor.shape if global_shape is None else global_shape
+        start_index = [0] * tensor.dim() if start_index is None else start_index
+        return _counter_normal_(tensor, mean, std, global_shape, start_index, seed)
     return _no_grad_normal_(tensor, mean, std)
 
 
@@ -285,7 +457,8 @@ def _calculate_fan_in_and_fan_out(shape):
     return fan_in, fan_out
 
 
-def xavier_uniform_(P_tensor, tensor: Tensor, gain: float = 1.) -> Tensor:
+def xavier_uniform_(P_tensor, tensor: Tensor, gain: float = 1., *,
+                    global_shape=None, start_index=None, seed=None) -> Tensor:
     r"""Fills the input `Tensor` with values according to the method
     described in `Understanding the difficulty of training deep feedforward
     neural networks` - Glorot, X. & Bengio, Y. (2010), using a uniform
@@ -297,19 +470,27 @@ def xavier_uniform_(P_tensor, tensor: Tensor, gain: float = 1.) -> Tensor:
     Args:
         tensor: an n-dimensional `torch.Tensor`
         gain: an optional scaling factor
+        global_shape: shape of the global tensor, if known, in which case no
+            collective communication is required to compute the fans
+        start_index: global index of the first element of `tensor`, by
+            default that of the balanced decomposition over `P_tensor`
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element, so they do not
+            depend on the partitioning
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.xavier_uniform_(w, gain=nn.init.calculate_gain('relu'))
     """
-    global_tensor_shape = assemble_global_tensor_structure(tensor, P_tensor).shape
-    fan_in, fan_out = _calculate_fan_in_and_fan_out(global_tensor_shape)
+    global_shape = _resolve_global_shape(P_tensor, tensor, global_shape)
+    fan_in, fan_out = _calculate_fan_in_and_fan_out(global_shape)
     std = gain * math.sqrt(2.0 / float(fan_in + fan_out))
     a = math.sqrt(3.0) * std  # Calculate uniform bounds from standard deviation
 
-    return _no_grad_uniform_(tensor, -a, a)
+    return _distributed_uniform_(P_tensor, tensor, -a, a, global_shape, start_index, seed)
 
 
-def xavier_normal_(P_tensor, tensor: Tensor, gain: float = 1.) -> Tensor:
+def xavier_normal_(P_tensor, tensor: Tensor, gain: float = 1., *,
+                   global_shape=None, start_index=None, seed=None) -> Tensor:
     r"""Fills the input `Tensor` with values according to the method
     described in `Understanding the difficulty of training deep feedforward
     neural networks` - Glorot, X. & Bengio, Y. (2010), using a normal
@@ -321,15 +502,22 @@ def xavier_normal_(P_tensor, tensor: Tensor, gain: float = 1.) -> Tensor:
     Args:
         tensor: an n-dimensional `torch.Tensor`
         gain: an optional scaling factor
+        global_shape: shape of the global tensor, if known, in which case no
+            collective communication is required to compute the fans
+        start_index: global index of the first element of `tensor`, by
+            default that of the balanced decomposition over `P_tensor`
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element, so they do not
+            depend on the partitioning
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.xavier_normal_(w)
     """
-    global_tensor_shape = assemble_global_tensor_structure(tensor, P_tensor).shape
-    fan_in, fan_out = _calculate_fan_in_and_fan_out(global_tensor_shape)
+    global_shape = _resolve_global_shape(P_tensor, tensor, global_shape)
+    fan_in, fan_out = _calculate_fan_in_and_fan_out(global_shape)
     std = gain * math.sqrt(2.0 / float(fan_in + fan_out))
 
-    return _no_grad_normal_(tensor, 0., std)
+    return _distributed_normal_(P_tensor, tensor, 0., std, global_shape, start_index, seed)
 
 
 def _calculate_correct_fan(shape, mode):
@@ -343,7 +531,8 @@ def _calculate_correct_fan(shape, mode):
 
 
 def kaiming_uniform_(
-    P_tensor, tensor: Tensor, a: float = 0, mode: str = 'fan_in', nonlinearity: str = 'leaky_relu'
+    P_tensor, tensor: Tensor, a: float = 0, mode: str = 'fan_in', nonlinearity: str = 'leaky_relu', *,
+    global_shape=None, start_index=None, seed=None
 ):
     r"""Fills the input `Tensor` with values according to the method
     described in `Delving deep into rectifiers: Surpassing human-level
@@ -363,6 +552,13 @@ def kaiming_uniform_(
             backwards pass.
         nonlinearity: the non-linear function (`nn.functional` name),
             recommended to use only with ``'relu'`` or ``'leaky_relu'`` (default).
+        global_shape: shape of the global tensor, if known, in which case no
+            collective communication is required to compute the fans
+        start_index: global index of the first element of `tensor`, by
+            default that of the balanced decomposition over `P_tensor`
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element, so they do not
+            depend on the partitioning
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.kaiming_uniform_(w, mode='fan_in', nonlinearity='relu')
@@ -380,17 +576,18 @@ def kaiming_uniform_(
         warnings.warn("Initializing zero-element tensors is a no-op")
         return tensor
 
-    global_tensor_shape = assemble_global_tensor_structure(tensor, P_tensor).shape
-    fan = _calculate_correct_fan(global_tensor_shape, mode)
+    global_shape = _resolve_global_shape(P_tensor, tensor, global_shape)
+    fan = _calculate_correct_fan(global_shape, mode)
     gain = calculate_gain(nonlinearity, a)
     std = gain / math.sqrt(fan)
     bound = math.sqrt(3.0) * std  # Calculate uniform bounds from standard deviation
-    with torch.no_grad():
-        return tensor.uniform_(-bound, bound)
+
+    return _distributed_uniform_(P_tensor, tensor, -bound, bound, global_shape, start_index, seed)
 
 
 def kaiming_normal_(
-    P_tensor, tensor: Tensor, a: float = 0, mode: str = 'fan_in', nonlinearity: str = 'leaky_relu'
+    P_tensor, tensor: Tensor, a: float = 0, mode: str = 'fan_in', nonlinearity: str = 'leaky_relu', *,
+    global_shape=None, start_index=None, seed=None
 ):
     r"""Fills the input `Tensor` with values according to the method
     described in `Delving deep into rectifiers: Surpassing human-level
@@ -410,6 +607,13 @@ def kaiming_normal_(
             backwards pass.
         nonlinearity: the non-linear function (`nn.functional` name),
             recommended to use only with ``'relu'`` or ``'leaky_relu'`` (default).
+        global_shape: shape of the global tensor, if known, in which case no
+            collective communication is required to compute the fans
+        start_index: global index of the first element of `tensor`, by
+            default that of the balanced decomposition over `P_tensor`
+        seed: if given, the values are drawn from a counter-based generator
+            keyed on the global offset of each element, so they do not
+            depend on the partitioning
     Examples:
         >>> w = torch.empty(3, 5)
         >>> nn.init.kaiming_normal_(w, mode='fan_out', nonlinearity='relu')
@@ -418,12 +622,12 @@ def kaiming_normal_(
         warnings.warn("Initializing zero-element tensors is a no-op")
         return tensor
 
-    global_tensor_shape = assemble_global_tensor_structure(tensor, P_tensor).shape
-    fan = _calculate_correct_fan(global_tensor_shape, mode)
+    global_shape = _resolve_global_shape(P_tensor, tensor, global_shape)
+    fan = _calculate_correct_fan(global_shape, mode)
     gain = calculate_gain(nonlinearity, a)
     std = gain / math.sqrt(fan)
-    with torch.no_grad():
-        return tensor.normal_(0, std)
+
+    return _distributed_normal_(P_tensor, tensor, 0., std, global_shape, start_index, seed)
 
 
 # TODO implement distdl version
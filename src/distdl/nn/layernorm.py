@@ -4,10 +4,14 @@ from contextlib import nullcontext
 import numpy as np
 import torch
 
+from distdl.functional.normalization import distributed_layer_norm
 from distdl.nn.all_sum_reduce import AllSumReduce
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.repartition import Repartition
+from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -84,6 +88,9 @@ class DistributedLayerNorm(Module):
         self.dim_bcast_slice = dim_bcast_slice
         self.dim_reduce_slice = dim_reduce_slice
 
+        # Index of this worker among those across which we reduce
+        self.reduce_index = int(np.ravel_multi_index(P_x.index[dim_reduce_slice], P_x.shape[dim_reduce_slice]))
+
         if self.elementwise_affine:
 
             # Shape of partition storing weights/biases
@@ -126,7 +133,7 @@ class DistributedLayerNorm(Module):
 
             # CUDA streams for weight prefetching
             if not self.P_x.device == 'cpu':
-                self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+                self.stream_context = stream_context
                 self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
                 self.stream_bias = torch.cuda.Stream(device=self.P_x.device)
             else:
@@ -157,6 +164,19 @@ class DistributedLayerNorm(Module):
             torch.nn.init.ones_(self.weight)
             torch.nn.init.zeros_(self.bias)
 
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        spec = dict()
+        if self.elementwise_affine and self.P_w.active:
+            global_shape = [1] * (self.P_w.dim - len(self.normalized_shape)) + list(self.normalized_shape)
+            spec['weight'] = block_shard_spec(self.P_w, global_shape)
+            spec['bias'] = spec['weight']
+
+        return spec
+
     def extra_repr(self) -> str:
         return f'normalized_shape={self.normalized_shape}'
 
@@ -215,39 +235,8 @@ class DistributedLayerNorm(Module):
 
         return destination
 
-    def _compute_mean(self, input):
-        r"""
-        Compute global feature mean (i.e., across the last d dimensions,
-        where d is the dimension of self.normalized_shape).
-        Ensures all ranks have the mean tensor.
-
-        Parameters
-        ----------
-        input :
-            PyTorch Tensor of values that should be summed.
-        """
-        # Local mean
-        output = input.mean(dim=self.dim_reduce, keepdim=True)
-
-        # Average across workers
-        return self.allreduce(output) / self.num_reduce
-
-    def _compute_var(self, input, mean):
-        r"""
-        Compute global variance across last d dimensions,
-        where d is the dimension of self.normalized_shape.
-        Ensures all ranks have the variance tensor.
-
-        Parameters
-        ----------
-        input :
-            PyTorch Tensor of values for which variance should be computed.
-        """
-        input = (input - mean)**2
-        return self._compute_mean(input)
-
     def prefetch_weights(self):
-        if self.P_x.size == 1:
+        if not self.P_x.active or not self.elementwise_affine or self.P_x.size == 1:
             return
 
         if self.stream_weight is not None:
@@ -289,33 +278,17 @@ class DistributedLayerNorm(Module):
             weight = None
             bias = None
 
-        # If we compute mean/variance over more than one partition, we need to
-        # use our custom mean/variance implementations with allreduce. Otherwise
-        # just use the torch implementation.
-        if self.num_reduce > 1:
-
-            # Calculate mean and variance
-            mean = self._compute_mean(input)
-            var = self._compute_var(input, mean)
-
-            # Re-scale
-            input = (input - mean) / torch.sqrt(var + self.eps)
-
-            if self.elementwise_affine:
-                if self.stream_weight is not None and self.stream_bias is not None:
-                    torch.cuda.current_stream().wait_stream(self.stream_weight)
-                    torch.cuda.current_stream().wait_stream(self.stream_bias)
-
-                input = weight * input + bias
-        else:
-            if self.elementwise_affine:
-                weight = weight.squeeze()
-                bias = bias.squeeze()
-
+        if self.elementwise_affine:
             if self.stream_weight is not None and self.stream_bias is not None:
-                torch.cuda.current_stream().wait_stream(self.stream_weight)
-                torch.cuda.current_stream().wait_stream(self.stream_bias)
-
-            input = torch.nn.functional.layer_norm(input, self.normalized_shape, weight, bias, self.eps)
+                stream_barrier(self.stream_weight, weight)
+                stream_barrier(self.stream_bias, bias)
+
+        # If we compute mean/variance over more than one partition, the
+        # partial statistics of all workers are combined with a single
+        # all-reduction.  Otherwise just use the torch implementation.
+        allreduce = self.allreduce if self.num_reduce > 1 else None
+        input = distributed_layer_norm(input, self.normalized_shape, weight, bias, self.eps,
+                                       dims=self.dim_reduce, allreduce=allreduce,
+                                       num_workers=int(self.num_reduce), worker_index=self.reduce_index)
 
         return input
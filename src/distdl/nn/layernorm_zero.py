@@ -4,11 +4,14 @@ from contextlib import nullcontext
 import torch
 
 from distdl import backends
+from distdl.functional.normalization import distributed_layer_norm
 from distdl.nn.all_gather import AllGather
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
 from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.torch import zero_volume_tensor
 
@@ -57,11 +60,15 @@ class DistributedLayerNormZero(Module):
         If true, clears the weight buffers after each forward pass. Default is True.
         For ZeRO stage 1 and to take advantage of gradient accumulation, set this
         to False and call clear_weight_buffer() manually after the optimizer step.
+    comm_dtype: torch.dtype, optional
+        If given, the weights are all-gathered, and their gradients
+        reduce-scattered, at this, typically lower, precision, e.g.,
+        ``torch.bfloat16``.  Gradients are accumulated at full precision.
     """
 
     def __init__(self, P_x, normalized_shape, elementwise_affine=True, eps=1e-5,
                  collect_state=False, device=None, dtype=None, scale_backward=None,
-                 auto_clear_buffer=True):
+                 auto_clear_buffer=True, comm_dtype=None):
         super(DistributedLayerNormZero, self).__init__()
 
         self.P_x = P_x
@@ -76,6 +83,7 @@ class DistributedLayerNormZero(Module):
         factory_kwargs = {'device': device, 'dtype': dtype}
         self.dtype = dtype
         self.auto_clear_buffer = auto_clear_buffer
+        self.comm_dtype = comm_dtype
         self.scale_backward = scale_backward
 
         if isinstance(normalized_shape, numbers.Integral):
@@ -113,8 +121,9 @@ class DistributedLayerNormZero(Module):
             self.P_w = P_w
 
             # Allgather for collecting weights from data-parallel workers
-            self.allgather = AllGather(P_w, axes_all_gather=(0,), scale_backward=scale_backward)
-            self.reducescatter = ReduceScatter(P_w, axes_reduce_scatter=(0,))
+            self.allgather = AllGather(P_w, axes_all_gather=(0,), scale_backward=scale_backward,
+                                       comm_dtype=comm_dtype)
+            self.reducescatter = ReduceScatter(P_w, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
 
             # Split normalized work along all workers
             normalized_shape_local = [1] * P_x.dim
@@ -133,9 +142,16 @@ class DistributedLayerNormZero(Module):
             self.weight_buffer = None
             self.bias_buffer = None
 
+            # Handles to in-flight weight all-gathers. On the CPU, prefetching uses
+            # the back-end's asynchronous collectives if they are available.
+            self.weight_work = None
+            self.bias_work = None
+            self.async_prefetch = self.P_x.device == 'cpu' and \
+                hasattr(self.allgather._distdl_backend, "CollectiveWork")
+
             # CUDA streams for weight prefetching
             if not self.P_x.device == 'cpu':
-                self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+                self.stream_context = stream_context
                 self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
                 self.stream_bias = torch.cuda.Stream(device=self.P_x.device)
             else:
@@ -164,6 +180,33 @@ class DistributedLayerNormZero(Module):
             torch.nn.init.ones_(self.weight)
             torch.nn.init.zeros_(self.bias)
 
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        # The last normalized dimension is partitioned over all workers
+        spec = dict()
+        if self.elementwise_affine and self.P_w.active:
+            global_shape = [1] * self.P_w.dim
+            global_shape[-1] = self.normalized_shape[-1]
+            partition_dims = [None] * self.P_w.dim
+            partition_dims[-1] = 0
+            spec['weight'] = block_shard_spec(self.P_w, global_shape, partition_dims)
+            spec['bias'] = spec['weight']
+
+        return spec
+
+    def _distdl_zero_gradients(self):
+
+        if not self.P_x.active or not self.elementwise_affine or self.auto_clear_buffer:
+            return list()
+
+        return [(self.weight, self.weight_buffer, self.reducescatter,
+                 lambda grad: grad.view(1, 1, -1).transpose(0, -1), lambda grad: grad.transpose(0, -1)),
+                (self.bias, self.bias_buffer, self.reducescatter,
+                 lambda grad: grad.view(1, 1, -1).transpose(0, -1), lambda grad: grad.transpose(0, -1))]
+
     def extra_repr(self) -> str:
         return f'normalized_shape={self.normalized_shape}'
 
@@ -222,9 +265,21 @@ class DistributedLayerNormZero(Module):
 
         return destination
 
-    # Keep for backward compatibility
     def prefetch_weights(self):
-        self.collect_weights()
+        # Start the weight all-gathers without waiting for them to complete, as in
+        # DistributedLinearAllGatherZero. Without asynchronous collectives, fall
+        # back to collecting the weights immediately.
+        if not self.P_x.active or not self.elementwise_affine:
+            return
+        if not self.async_prefetch:
+            self.collect_weights()
+            return
+
+        if self.weight_buffer is None and self.weight_work is None:
+            self.weight_work = self.allgather(self.weight.transpose(0, -1), async_op=True)
+
+        if self.bias_buffer is None and self.bias_work is None:
+            self.bias_work = self.allgather(self.bias.transpose(0, -1), async_op=True)
 
     def collect_weights(self):
         # For ZeRO-1 (auto_clear_buffer: False), we want to temporarily turn the weight & bias buffers
@@ -243,14 +298,25 @@ class DistributedLayerNormZero(Module):
 
         # If weight buffer is not already filled, start an allgather call. If cuda is used,
         # this call will be asynchronously executed in a separate stream.
+        # If prefetch_weights() started an asynchronous all-gather, complete it instead.
         if self.weight_buffer is None:
             with self.stream_context(self.stream_weight):
-                self.weight_buffer = self.allgather(self.weight.transpose(0, -1)).transpose(0, -1).squeeze()
+                if self.weight_work is not None:
+                    weight = self.weight_work.wait()
+                    self.weight_work = None
+                else:
+                    weight = self.allgather(self.weight.transpose(0, -1))
+                self.weight_buffer = weight.transpose(0, -1).squeeze()
 
         # Same for this bias buffer.
         if self.bias_buffer is None:
             with self.stream_context(self.stream_bias):
-                self.bias_buffer = self.allgather(self.bias.transpose(0, -1)).transpose(0, -1).squeeze()
+                if self.bias_work is not None:
+                    bias = self.bias_work.wait()
+                    self.bias_work = None
+                else:
+                    bias = self.allgather(self.bias.transpose(0, -1))
+                self.bias_buffer = bias.transpose(0, -1).squeeze()
 
     def clear_weight_buffer(self):
 
@@ -258,23 +324,26 @@ class DistributedLayerNormZero(Module):
         # Only at this point do we call the reduce-scatter operations and populate the weight & bias
         # gradients. For ZeRO-3, this function is called after each forward pass and  reduce-scatter
         # is called automatically, since the forward all-gathers were tracked.
+        # Gradients already reduce-scattered by ZeroGradientBuckets are skipped.
         if not self.auto_clear_buffer:
             with torch.no_grad():
 
                 # Reduce-scatter gradients
-                if self.scale_backward is not None:
-                    self.weight_buffer.grad.div_(self.scale_backward)
-                    self.bias_buffer.grad.div_(self.scale_backward)
-
-                self.weight.grad = self.reducescatter(self.weight_buffer.grad.view(1, 1, -1).transpose(0, -1)).transpose(0, -1)     # noqa: E501
-                self.bias.grad = self.reducescatter(self.bias_buffer.grad.view(1, 1, -1).transpose(0, -1)).transpose(0, -1)     # noqa: E501
+                for param, buffer, reduce_scatter, pack, unpack in self._distdl_zero_gradients():
+                    if buffer is None or buffer.grad is None:
+                        continue
+                    if self.scale_backward is not None:
+                        buffer.grad.div_(self.scale_backward)
+                    param.grad = unpack(reduce_scatter(pack(buffer.grad)))
 
         self.weight_buffer = None
         self.bias_buffer = None
+        self.weight_work = None
+        self.bias_work = None
 
     def wait_for_streams(self):
-        stream_barrier(self.stream_weight)
-        stream_barrier(self.stream_bias)
+        stream_barrier(self.stream_weight, self.weight_buffer)
+        stream_barrier(self.stream_bias, self.bias_buffer)
 
     def forward(self, input):
         r"""Forward function interface.
@@ -295,11 +364,14 @@ class DistributedLayerNormZero(Module):
             self.collect_weights()
             self.wait_for_streams()
 
+        weight = self.weight_buffer if self.elementwise_affine else None
+        bias = self.bias_buffer if self.elementwise_affine else None
+
         if self.use_flash:
             input = flash_layer_norm(input, self.weight_buffer, self.bias_buffer, self.eps)
         else:
-            input = torch.nn.functional.layer_norm(input, self.normalized_shape, self.weight_buffer,
-                                                   self.bias_buffer, self.eps)
+            input = distributed_layer_norm(input, self.normalized_shape, weight, bias, self.eps,
+                                           dims=self.dim_reduce)
 
         if self.auto_clear_buffer:
             self.clear_weight_buffer()
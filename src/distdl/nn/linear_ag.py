@@ -6,11 +6,15 @@ import torch
 from einops import rearrange
 
 import distdl.nn.init as init
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+from distdl.functional.collective_matmul import AllGatherLinearFunction
 from distdl.nn.all_gather import AllGather
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.repartition import Repartition
+from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -84,17 +88,30 @@ class DistributedLinearAllGather(Module):
     scale_backward : Union[int, slice], optional
         Scale backward pass for AllGather operation by no. of workers along the given
         dimension. Default is None.
+    num_chunks : int, optional
+        If greater than 1, the input is split into this many chunks, and the
+        all-gather of each chunk overlaps with the matrix multiplication of the
+        previous one, in the forward and the backward pass.  Inputs partitioned
+        along the feature dimension are split along the token dimension, and
+        inputs partitioned along the token dimension along the feature
+        dimension.  Requires a back-end with asynchronous collectives.
+        Default is 1.
     """
 
     def __init__(self, P_y, in_features, out_features, bias=True, device=None, dtype=None,
                  P_x=None, P_store_weight=None, P_apply_weight=None, collect_state=False, num_heads=None,
-                 num_heads_kv=None, num_vars=3, geglu=False, scale_backward=None):
+                 num_heads_kv=None, num_vars=3, geglu=False, scale_backward=None, num_chunks=1):
 
         super(DistributedLinearAllGather, self).__init__()
 
         # P_y is assumed to have shape [ *, 1, p]
         # Data is assumed to have shape [ *, n, channel_in/p ]
         self.P_y = P_y
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_y.active:
             return
         else:
@@ -204,9 +221,17 @@ class DistributedLinearAllGather(Module):
         gather_dim = torch.argmax(torch.tensor(self.P_x.shape[-2:])) + self.P_x.dim - 2
         self.all_gather = AllGather(self.P_x, axes_all_gather=(gather_dim,))
 
+        # All-gathers of the chunks of the input, if pipelined with the
+        # product.  The chunked dimension is the other of the last two.
+        self.num_chunks = num_chunks
+        if num_chunks > 1:
+            self.chunk_dim = -2 if gather_dim == self.P_x.dim - 1 else -1
+            self.all_gather_chunks = torch.nn.ModuleList([AllGather(self.P_x, axes_all_gather=(gather_dim,))
+                                                          for _ in range(num_chunks)])
+
         # CUDA streams for weight prefetching
         if not self.P_y.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_y.device)
             if self.use_bias:
                 self.stream_bias = torch.cuda.Stream(device=self.P_y.device)
@@ -237,15 +262,46 @@ class DistributedLinearAllGather(Module):
 
     def reset_parameters(self) -> None:
 
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed
+        weight_global_shape = [1] * self.P_store_weight.dim
+        weight_global_shape[-2] = self.out_features
+        weight_global_shape[-1] = self.in_features
+
         if self.P_store_weight.active:
-            init.kaiming_uniform_(self.P_store_weight, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(
-                self.weight, self.P_store_weight).shape
+            init.kaiming_uniform_(self.P_store_weight, self.weight, a=math.sqrt(5),
+                                  global_shape=weight_global_shape, seed=weight_seed)
 
             if self.bias is not None:
+                bias_global_shape = weight_global_shape.copy()
+                bias_global_shape[-1] = 1
                 fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
                 bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
-                init.uniform_(self.bias, -bound, bound)
+                bias_start_index = compute_start_index(self.P_store_weight.shape,
+                                                       self.P_store_weight.index,
+                                                       bias_global_shape)
+                init.uniform_(self.bias, -bound, bound, global_shape=bias_global_shape,
+                              start_index=bias_start_index, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_y.active:
+            return dict()
+
+        weight_global_shape = [1] * self.P_store_weight.dim
+        weight_global_shape[-2] = self.out_features
+        weight_global_shape[-1] = self.in_features
+
+        spec = dict()
+        if self.P_store_weight.active:
+            spec['weight'] = block_shard_spec(self.P_store_weight, weight_global_shape)
+            if self.use_bias:
+                bias_global_shape = weight_global_shape.copy()
+                bias_global_shape[-1] = 1
+                spec['bias'] = block_shard_spec(self.P_store_weight, bias_global_shape)
+
+        return spec
 
     def extra_repr(self) -> str:
         return f'in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}'
@@ -429,7 +485,7 @@ class DistributedLinearAllGather(Module):
         return destination
 
     def prefetch_weights(self):
-        if self.P_x.size == 1:
+        if not self.P_y.active or self.P_x.size == 1:
             return
 
         if self.stream_weight is not None:
@@ -458,8 +514,9 @@ class DistributedLinearAllGather(Module):
         if not self.P_y.active:
             return input
 
-        # All-gather input
-        input = self.all_gather(input)
+        # All-gather input, unless pipelined with the product
+        if self.num_chunks == 1:
+            input = self.all_gather(input)
 
         # Broadcast weights to everyone
         if self.weight_buffer is None:
@@ -478,9 +535,11 @@ class DistributedLinearAllGather(Module):
         else:
             bias = self.bias
         if self.stream_weight is not None:
-            torch.cuda.current_stream().wait_stream(self.stream_weight)
+            stream_barrier(self.stream_weight, weight)
         if self.use_bias and self.stream_bias is not None:
-            torch.cuda.current_stream().wait_stream(self.stream_bias)
+            stream_barrier(self.stream_bias, bias)
 
         # Affine/linear transform
+        if self.num_chunks > 1:
+            return AllGatherLinearFunction.apply(input, weight, bias, self.all_gather_chunks, self.chunk_dim)
         return torch.nn.functional.linear(input, weight, bias)
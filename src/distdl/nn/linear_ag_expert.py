@@ -6,14 +6,17 @@ import torch
 from einops import rearrange
 
 import distdl.nn.init as init
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+from distdl.functional.grouped import grouped_linear
 from distdl.nn.all_gather import AllGather
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
 from distdl.nn.sum_reduce import SumReduce
 from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -84,6 +87,11 @@ class DistributedExpertAllGather(Module):
 
         self.P_expert_emb = P_expert_emb
         self.P_expert_seq = P_expert_seq
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_expert_emb.active:
             return
 
@@ -187,10 +195,11 @@ class DistributedExpertAllGather(Module):
 
         # All-gather operation. For sequence parallelism, gather hidden states along the sequence dimension.
         # Otherwise, gather along the embedding dimension. Weights are all-gathered along the capacity dimension.
+        # The capacity dimension holds the packed tokens, whose number changes with every batch, without a new setup.
         if P_expert_seq is not None:
-            self.all_gather_hidden = AllGather(self.P_expert_seq, axes_all_gather=(2,))
+            self.all_gather_hidden = AllGather(self.P_expert_seq, axes_all_gather=(2,), variable_axes=(1,))
         else:
-            self.all_gather_hidden = AllGather(self.P_expert_emb, axes_all_gather=(3,))
+            self.all_gather_hidden = AllGather(self.P_expert_emb, axes_all_gather=(3,), variable_axes=(1,))
         self.all_gather_weight = AllGather(self.P_weight, axes_all_gather=(1,), scale_backward=scale_backward)
         self.reduce_scatter_weight = ReduceScatter(self.P_weight, axes_reduce_scatter=(1,))
         if self.use_bias:
@@ -199,7 +208,7 @@ class DistributedExpertAllGather(Module):
 
         # CUDA streams for weight prefetching
         if not self.P_expert_emb.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_expert_emb.device)
             if self.use_bias:
                 self.stream_bias = torch.cuda.Stream(device=self.P_expert_emb.device)
@@ -228,15 +237,56 @@ class DistributedExpertAllGather(Module):
 
     def reset_parameters(self) -> None:
 
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed
+        weight_global_shape = [1] * self.P_weight.dim
+        weight_global_shape[0] = self.num_experts
+        weight_global_shape[1] = self.in_features
+        weight_global_shape[2] = self.out_features
+
+        if self.P_weight.active:
+            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5),
+                                  global_shape=weight_global_shape, seed=weight_seed)
+
+        if self.use_bias and self.P_bias.active:
+            bias_global_shape = weight_global_shape.copy()
+            bias_global_shape[1] = 1
+            bias_start_index = compute_start_index(self.P_bias.shape, self.P_bias.index, bias_global_shape)
+
+            fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
+            bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
+            init.uniform_(self.bias, -bound, bound, global_shape=bias_global_shape,
+                          start_index=bias_start_index, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_expert_emb.active:
+            return dict()
+
+        weight_global_shape = [1] * self.P_weight.dim
+        weight_global_shape[0] = self.num_experts
+        weight_global_shape[1] = self.in_features
+        weight_global_shape[2] = self.out_features
+
+        spec = dict()
         if self.P_weight.active:
-            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(
-                self.weight, self.P_weight).shape
+            spec['weight'] = block_shard_spec(self.P_weight, weight_global_shape)
+        if self.use_bias and self.P_bias.active:
+            bias_global_shape = weight_global_shape.copy()
+            bias_global_shape[1] = 1
+            spec['bias'] = block_shard_spec(self.P_bias, bias_global_shape)
+
+        return spec
+
+    def _distdl_zero_gradients(self):
 
-            if self.bias is not None:
-                fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
-                bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
-                init.uniform_(self.bias, -bound, bound)
+        if not self.P_expert_emb.active or self.auto_clear_buffer:
+            return list()
+
+        # The bias is summed onto the workers that store it, not reduce-scattered
+        return [(self.weight, self.weight_buffer, self.reduce_scatter_weight,
+                 lambda grad: grad.transpose(1, 2), lambda grad: grad)]
 
     def extra_repr(self) -> str:
         return f'in_features={self.in_features}, out_features={self.out_features}, num_experts={self.num_experts}, bias={self.bias is not None}'    # noqa: E501
@@ -324,6 +374,8 @@ class DistributedExpertAllGather(Module):
 
     # Keep for backward compatibility
     def prefetch_weights(self):
+        if not self.P_expert_emb.active:
+            return
         self.collect_weights()
 
     def collect_weights(self):
@@ -359,13 +411,17 @@ class DistributedExpertAllGather(Module):
         # Only at this point do we call the reduce-scatter operations and populate the weight & bias
         # gradients. For ZeRO-3, this function is called after each forward pass and  reduce-scatter
         # is called automatically, since the forward all-gathers were tracked.
+        # Gradients already reduce-scattered by ZeroGradientBuckets are skipped.
         if not self.auto_clear_buffer:
             with torch.no_grad():
 
                 # Reduce-scatter gradients
-                if self.scale_backward is not None:
-                    self.weight_buffer.grad.div_(self.scale_backward)
-                self.weight.grad = self.reduce_scatter_weight(self.weight_buffer.grad.transpose(1, 2))
+                for param, buffer, reduce_scatter, pack, unpack in self._distdl_zero_gradients():
+                    if buffer is None or buffer.grad is None:
+                        continue
+                    if self.scale_backward is not None:
+                        buffer.grad.div_(self.scale_backward)
+                    param.grad = unpack(reduce_scatter(pack(buffer.grad)))
 
                 if self.bias is not None:
                     if self.scale_backward is not None:
@@ -376,17 +432,23 @@ class DistributedExpertAllGather(Module):
         self.bias_buffer = None
 
     def wait_for_streams(self):
-        stream_barrier(self.stream_weight)
+        stream_barrier(self.stream_weight, self.weight_buffer)
         if self.use_bias:
-            stream_barrier(self.stream_bias)
+            stream_barrier(self.stream_bias, self.bias_buffer)
 
-    def forward(self, input):
+    def forward(self, input, expert_counts=None):
         r"""Forward function interface.
 
         Parameters
         ----------
         input :
             Input tensor to the convolution.
+        expert_counts : iterable, optional
+            Number of tokens of each local expert.  If given, the input holds
+            only the routed tokens, packed by expert, of shape [ tokens, sequence,
+            feature_in ], and so does the output.  Neither padding nor empty
+            capacity slots are communicated or computed.  The counts must be the
+            same on all model-parallel workers.
 
         """
 
@@ -397,6 +459,18 @@ class DistributedExpertAllGather(Module):
         # this call doesn't do anything.
         self.collect_weights()
 
+        # Packed tokens are all-gathered as a single pseudo-expert
+        if expert_counts is not None:
+            input = self.all_gather_hidden(input.unsqueeze(0)).squeeze(0)
+
+            self.wait_for_streams()
+            y = grouped_linear(input, self.weight_buffer, expert_counts, self.bias_buffer)
+
+            if self.auto_clear_buffer:
+                self.clear_weight_buffer()
+
+            return y
+
         # All-gather input along model-parallel dimension
         input = self.all_gather_hidden(input)
 
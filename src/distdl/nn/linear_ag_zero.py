@@ -6,12 +6,14 @@ import torch
 from einops import rearrange
 
 import distdl.nn.init as init
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
 from distdl.nn.all_gather import AllGather
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
 from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -154,18 +156,27 @@ class DistributedLinearAllGatherZero(Module):
         If true, clears the weight buffers after each forward pass. Default is True.
         For ZeRO stage 1 and to take advantage of gradient accumulation, set this
         to False and call clear_weight_buffer() manually after the optimizer step.
+    comm_dtype: torch.dtype, optional
+        If given, the weights are all-gathered, and their gradients
+        reduce-scattered, at this, typically lower, precision, e.g.,
+        ``torch.bfloat16``.  Gradients are accumulated at full precision.
     """
 
     def __init__(self, P_y, in_features, out_features, bias=True, device=None, dtype=None,
                  P_x=None, P_store_bias=None, P_weight=None, collect_state=False, num_heads=None,
                  num_heads_kv=None, num_vars=3, geglu=False, checkpoint=False, scale_backward=None,
-                 auto_clear_buffer=True):
+                 auto_clear_buffer=True, comm_dtype=None):
 
         super(DistributedLinearAllGatherZero, self).__init__()
 
         # P_y is assumed to have shape [ *, 1, p]
         # Data is assumed to have shape [ *, n, channel_in/p ]
         self.P_y = P_y
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_y.active:
             return
         else:
@@ -197,6 +208,7 @@ class DistributedLinearAllGatherZero(Module):
         self.checkpoint = checkpoint
         self.scale_backward = scale_backward
         self.auto_clear_buffer = auto_clear_buffer
+        self.comm_dtype = comm_dtype
 
         # Partition for storing weights & biases
         if P_store_bias is not None:
@@ -242,11 +254,13 @@ class DistributedLinearAllGatherZero(Module):
         self.P_weight = P_weight
 
         # Function to gather weights and biases
-        self.allgather_weight = AllGather(P_weight, axes_all_gather=(0,), scale_backward=scale_backward)
-        self.reduce_scatter_weight = ReduceScatter(P_weight, axes_reduce_scatter=(0,))
+        self.allgather_weight = AllGather(P_weight, axes_all_gather=(0,), scale_backward=scale_backward,
+                                          comm_dtype=comm_dtype)
+        self.reduce_scatter_weight = ReduceScatter(P_weight, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
         if bias:
-            self.allgather_bias = AllGather(P_weight, axes_all_gather=(0,), scale_backward=scale_backward)
-            self.reducescatter_bias = ReduceScatter(P_weight, axes_reduce_scatter=(0,))
+            self.allgather_bias = AllGather(P_weight, axes_all_gather=(0,), scale_backward=scale_backward,
+                                            comm_dtype=comm_dtype)
+            self.reducescatter_bias = ReduceScatter(P_weight, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
 
         # Create weights
         if P_weight.active:
@@ -290,7 +304,7 @@ class DistributedLinearAllGatherZero(Module):
 
         # CUDA streams for weight prefetching. Only used if cuda is enabled.
         if not self.P_y.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_y.device)
             if self.use_bias:
                 self.stream_bias = torch.cuda.Stream(device=self.P_y.device)
@@ -304,6 +318,13 @@ class DistributedLinearAllGatherZero(Module):
         self.weight_buffer = None
         self.bias_buffer = None
 
+        # Handles to in-flight weight all-gathers. On the CPU, prefetching uses the
+        # back-end's asynchronous collectives if they are available.
+        self.weight_work = None
+        self.bias_work = None
+        self.async_prefetch = self.P_y.device == 'cpu' and \
+            hasattr(self.allgather_weight._distdl_backend, "CollectiveWork")
+
         # State dict hooks for gather/scattering distributed weights
         self._register_state_dict_hook(self.gather_state_dict)
         self._register_load_state_dict_pre_hook(self.scatter_state_dict)
@@ -320,15 +341,87 @@ class DistributedLinearAllGatherZero(Module):
 
     def reset_parameters(self) -> None:
 
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed
+        weight_global_shape = [1] * self.P_weight.dim
+        weight_global_shape[0] = self.in_features
+        weight_global_shape[-2] = self.out_features
+
         if self.P_weight.active:
-            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(
-                self.weight, self.P_weight).shape
+
+            # Weights are sharded along the first and second to last dimensions
+            # and replicated along the others
+            weight_start_index = [0] * self.P_weight.dim
+            weight_start_index[0] = compute_start_index(self.P_weight.shape[0], self.P_weight.index[0],
+                                                        [self.in_features])[0]
+            out_start_index = compute_start_index(self.P_weight.shape[-2], self.P_weight.index[-2],
+                                                  [self.out_features])[0]
+            weight_start_index[-2] = out_start_index
+            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5), global_shape=weight_global_shape,
+                                  start_index=weight_start_index, seed=weight_seed)
 
             if self.bias is not None:
+
+                # The local output features are further sharded along the first dimension
+                out_features_local = compute_subshape(self.P_weight.shape[-2], self.P_weight.index[-2],
+                                                      [self.out_features])[0]
+                bias_global_shape = [1] * self.P_weight.dim
+                bias_global_shape[-2] = self.out_features
+                bias_start_index = [0] * self.P_weight.dim
+                bias_start_index[-2] = out_start_index + \
+                    compute_start_index(self.P_weight.shape[0], self.P_weight.index[0], [out_features_local])[0]
+
                 fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
                 bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
-                init.uniform_(self.bias, -bound, bound)
+                init.uniform_(self.bias, -bound, bound, global_shape=bias_global_shape,
+                              start_index=bias_start_index, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_y.active:
+            return dict()
+
+        spec = dict()
+        if self.P_weight.active:
+            dim = self.P_weight.dim
+
+            # Weights are sharded along the first and second to last dimensions
+            weight_global_shape = [1] * dim
+            weight_global_shape[0] = self.in_features
+            weight_global_shape[-2] = self.out_features
+            partition_dims = [None] * dim
+            partition_dims[0] = 0
+            partition_dims[-2] = dim - 2
+            spec['weight'] = block_shard_spec(self.P_weight, weight_global_shape, partition_dims)
+
+            # The local output features of the bias are further sharded along
+            # the first dimension
+            if self.use_bias:
+                out_start_index = spec['weight'][1][-2]
+                out_features_local = compute_subshape(self.P_weight.shape[-2], self.P_weight.index[-2],
+                                                      [self.out_features])[0]
+                bias_global_shape = [1] * dim
+                bias_global_shape[-2] = self.out_features
+                bias_start_index = [0] * dim
+                bias_start_index[-2] = out_start_index + \
+                    compute_start_index(self.P_weight.shape[0], self.P_weight.index[0], [out_features_local])[0]
+                spec['bias'] = (bias_global_shape, bias_start_index, spec['weight'][2])
+
+        return spec
+
+    def _distdl_zero_gradients(self):
+
+        if not self.P_y.active or self.auto_clear_buffer:
+            return list()
+
+        gradients = [(self.weight, self.weight_buffer, self.reduce_scatter_weight,
+                      lambda grad: grad.unsqueeze(0).transpose(-1, 0), lambda grad: grad)]
+        if self.bias is not None:
+            gradients.append((self.bias, self.bias_buffer, self.reducescatter_bias,
+                              lambda grad: grad.view(-1, 1, 1), lambda grad: grad.transpose(0, 1)))
+
+        return gradients
 
     def extra_repr(self) -> str:
         return f'in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}'
@@ -515,9 +608,22 @@ class DistributedLinearAllGatherZero(Module):
 
         return destination
 
-    # Keep for backward compatibility
     def prefetch_weights(self):
-        self.collect_weights()
+        # Start the weight all-gathers without waiting for them to complete. The
+        # communication overlaps with any work done before the next forward pass,
+        # which completes it in collect_weights(). Without asynchronous collectives,
+        # fall back to collecting the weights immediately.
+        if not self.P_y.active:
+            return
+        if not self.async_prefetch:
+            self.collect_weights()
+            return
+
+        if self.weight_buffer is None and self.weight_work is None:
+            self.weight_work = self.allgather_weight(self.weight, async_op=True)
+
+        if self.bias is not None and self.bias_buffer is None and self.bias_work is None:
+            self.bias_work = self.allgather_bias(self.bias.transpose(0, 1), async_op=True)
 
     def collect_weights(self):
         # For ZeRO-1 (auto_clear_buffer: False), we want to temporarily turn the weight & bias buffers
@@ -537,14 +643,25 @@ class DistributedLinearAllGatherZero(Module):
 
         # If weight buffer is not already filled, start an allgather call. If cuda is used,
         # this call will be asynchronously executed in a separate stream.
+        # If prefetch_weights() started an asynchronous all-gather, complete it instead.
         if self.weight_buffer is None:
             with self.stream_context(self.stream_weight):
-                self.weight_buffer = self.allgather_weight(self.weight).transpose(-1, 0).view(-1, self.in_features)
+                if self.weight_work is not None:
+                    weight = self.weight_work.wait()
+                    self.weight_work = None
+                else:
+                    weight = self.allgather_weight(self.weight)
+                self.weight_buffer = weight.transpose(-1, 0).view(-1, self.in_features)
 
         # Same for this bias buffer if bias is used.
         if self.bias is not None and self.bias_buffer is None:
             with self.stream_context(self.stream_bias):
-                self.bias_buffer = self.allgather_bias(self.bias.transpose(0, 1)).view(-1)
+                if self.bias_work is not None:
+                    bias = self.bias_work.wait()
+                    self.bias_work = None
+                else:
+                    bias = self.allgather_bias(self.bias.transpose(0, 1))
+                self.bias_buffer = bias.view(-1)
 
     def clear_weight_buffer(self):
 
@@ -552,27 +669,28 @@ class DistributedLinearAllGatherZero(Module):
         # Only at this point do we call the reduce-scatter operations and populate the weight & bias
         # gradients. For ZeRO-3, this function is called after each forward pass and  reduce-scatter
         # is called automatically, since the forward all-gathers were tracked.
+        # Gradients already reduce-scattered by ZeroGradientBuckets are skipped.
         if not self.auto_clear_buffer:
             with torch.no_grad():
 
                 # Reduce-scatter gradients
-                if self.scale_backward is not None:
-                    self.weight_buffer.grad.div_(self.scale_backward)
-                self.weight.grad = self.reduce_scatter_weight(self.weight_buffer.grad.unsqueeze(0).transpose(-1, 0))
-
-                if self.bias is not None:
+                for param, buffer, reduce_scatter, pack, unpack in self._distdl_zero_gradients():
+                    if buffer is None or buffer.grad is None:
+                        continue
                     if self.scale_backward is not None:
-                        self.bias_buffer.grad.div_(self.scale_backward)
-                    self.bias.grad = self.reducescatter_bias(self.bias_buffer.grad.view(-1, 1, 1)).transpose(0, 1)
+                        buffer.grad.div_(self.scale_backward)
+                    param.grad = unpack(reduce_scatter(pack(buffer.grad)))
 
         # Clear buffers
         self.weight_buffer = None
         self.bias_buffer = None
+        self.weight_work = None
+        self.bias_work = None
 
     def wait_for_streams(self):
-        stream_barrier(self.stream_weight)
+        stream_barrier(self.stream_weight, self.weight_buffer)
         if self.use_bias:
-            stream_barrier(self.stream_bias)
+            stream_barrier(self.stream_bias, self.bias_buffer)
 
     def forward(self, input):
         r"""Forward function interface.
@@ -5,11 +5,14 @@ import numpy as np
 import torch
 
 import distdl.nn.init as init
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+from distdl.functional.collective_matmul import LinearReduceScatterFunction
 from distdl.nn.broadcast import Broadcast
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
+from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -65,17 +68,30 @@ class DistributedLinearReduceScatter(Module):
     scale_backward : Union[int, slice], optional
         Scale backward pass for AllGather operation by no. of workers along the given
         dimension. Default is None.
+    num_chunks : int, optional
+        If greater than 1, the output is computed in this many chunks, and the
+        reduce-scatter of each chunk overlaps with the matrix multiplication of
+        the next one, in the forward and the backward pass.  Outputs
+        partitioned along the feature dimension are split along the token
+        dimension, and outputs partitioned along the token dimension along the
+        feature dimension.  Requires a back-end with asynchronous collectives.
+        Default is 1.
     """
 
     def __init__(self, P_x, in_features, out_features, bias=True, device=None, dtype=None,
                  P_y=None, P_weight=None, P_store_bias=None, P_apply_bias=None,
-                 collect_state=False, scale_backward=None):
+                 collect_state=False, scale_backward=None, num_chunks=1):
 
         super(DistributedLinearReduceScatter, self).__init__()
 
         # P_x is assumed to have shape [ *, 1, p]
         # Data is assumed to have shape [ *, n, channel_in/p ]
         self.P_x = P_x
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_x.active:
             return
         else:
@@ -190,9 +206,17 @@ class DistributedLinearReduceScatter(Module):
         scatter_dim = torch.argmax(torch.tensor(self.P_y.shape[-2:])) + self.P_y.dim - 2
         self.reduce_scatter = ReduceScatter(self.P_y, axes_reduce_scatter=(scatter_dim,))
 
+        # Reduce-scatters of the chunks of the output, if pipelined with the
+        # product.  The chunked dimension is the other of the last two.
+        self.num_chunks = num_chunks
+        if num_chunks > 1:
+            self.chunk_dim = -2 if scatter_dim == self.P_y.dim - 1 else -1
+            self.reduce_scatter_chunks = torch.nn.ModuleList(
+                [ReduceScatter(self.P_y, axes_reduce_scatter=(scatter_dim,)) for _ in range(num_chunks)])
+
         # CUDA streams for weight prefetching
         if not self.P_x.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
             if self.use_bias:
                 self.stream_bias = torch.cuda.Stream(device=self.P_x.device)
@@ -220,14 +244,40 @@ class DistributedLinearReduceScatter(Module):
 
     def reset_parameters(self) -> None:
 
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed
+        weight_global_shape = [1] * self.P_x.dim
+        weight_global_shape[-2] = self.out_features
+        weight_global_shape[-1] = self.in_features
+
         if self.P_weight.active:
-            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(self.weight, self.P_weight).shape
+            init.kaiming_uniform_(self.P_weight, self.weight, a=math.sqrt(5),
+                                  global_shape=weight_global_shape, seed=weight_seed)
 
         if self.use_bias and self.P_store_bias.active:
             fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
             bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
-            init.uniform_(self.bias, -bound, bound)
+            init.uniform_(self.bias, -bound, bound, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        weight_global_shape = [1] * self.P_x.dim
+        weight_global_shape[-2] = self.out_features
+        weight_global_shape[-1] = self.in_features
+
+        spec = dict()
+        if self.P_weight.active:
+            spec['weight'] = block_shard_spec(self.P_weight, weight_global_shape)
+        if self.use_bias and self.P_store_bias.active:
+            bias_global_shape = weight_global_shape.copy()
+            bias_global_shape[-1] = 1
+            spec['bias'] = block_shard_spec(self.P_store_bias, bias_global_shape)
+
+        return spec
 
     def extra_repr(self) -> str:
         return f'in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}'
@@ -307,7 +357,7 @@ class DistributedLinearReduceScatter(Module):
         return destination
 
     def prefetch_weights(self):
-        if self.P_x.size == 1:
+        if not self.P_x.active or self.P_x.size == 1:
             return
 
         if self.stream_weight is not None:
@@ -353,9 +403,13 @@ class DistributedLinearReduceScatter(Module):
         else:
             bias = self.bias
         if self.stream_weight is not None:
-            torch.cuda.current_stream().wait_stream(self.stream_weight)
+            stream_barrier(self.stream_weight, weight)
         if self.use_bias and self.stream_bias is not None:
-            torch.cuda.current_stream().wait_stream(self.stream_bias)
+            stream_barrier(self.stream_bias, bias)
+
+        # Affine/linear transform, pipelined with the reduce-scatter
+        if self.num_chunks > 1:
+            return LinearReduceScatterFunction.apply(input, weight, bias, self.reduce_scatter_chunks, self.chunk_dim)
 
         # Affine/linear transform
         y = torch.nn.functional.linear(input, weight, bias)
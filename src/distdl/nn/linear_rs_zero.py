@@ -5,12 +5,14 @@ import numpy as np
 import torch
 
 import distdl.nn.init as init
-from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
 from distdl.nn.all_gather import AllGather
+from distdl.nn.checkpoint import block_shard_spec
 from distdl.nn.module import Module
 from distdl.nn.reduce_scatter import ReduceScatter
 from distdl.nn.repartition import Repartition
 from distdl.utilities.misc import stream_barrier
+from distdl.utilities.misc import stream_context
+from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 from distdl.utilities.slicing import worker_layout
 from distdl.utilities.torch import zero_volume_tensor
@@ -136,17 +138,26 @@ class DistributedLinearReduceScatterZero(Module):
         If true, clears the weight buffers after each forward pass. Default is True.
         For ZeRO stage 1 and to take advantage of gradient accumulation, set this
         to False and call clear_weight_buffer() manually after the optimizer step.
+    comm_dtype: torch.dtype, optional
+        If given, the weights are all-gathered, and their gradients
+        reduce-scattered, at this, typically lower, precision, e.g.,
+        ``torch.bfloat16``.  Gradients are accumulated at full precision.
     """
 
     def __init__(self, P_x, in_features, out_features, bias=True, device=None, dtype=None,
                  P_y=None, P_bias=None, collect_state=False, checkpoint=False, scale_backward=None,
-                 auto_clear_buffer=True):
+                 auto_clear_buffer=True, comm_dtype=None):
 
         super(DistributedLinearReduceScatterZero, self).__init__()
 
         # P_x is assumed to have shape [ *, 1, p]
         # Data is assumed to have shape [ *, n, channel_in/p ]
         self.P_x = P_x
+
+        # Initialization seeds are drawn on all workers, active or not, to
+        # keep the seed counters consistent
+        self._init_seeds = (init.next_seed(), init.next_seed())
+
         if not self.P_x.active:
             return
         else:
@@ -174,6 +185,7 @@ class DistributedLinearReduceScatterZero(Module):
         self.checkpoint = checkpoint
         self.scale_backward = scale_backward
         self.auto_clear_buffer = auto_clear_buffer
+        self.comm_dtype = comm_dtype
 
         # Partition for applying bias
         if P_bias is not None:
@@ -199,11 +211,13 @@ class DistributedLinearReduceScatterZero(Module):
             self.P_bias = P_bias
 
         # Function to broadcast weights and biases
-        self.all_gather_weight = AllGather(P_x, axes_all_gather=(0,), scale_backward=scale_backward)
-        self.reduce_scatter_weight = ReduceScatter(P_x, axes_reduce_scatter=(0,))
+        self.all_gather_weight = AllGather(P_x, axes_all_gather=(0,), scale_backward=scale_backward,
+                                           comm_dtype=comm_dtype)
+        self.reduce_scatter_weight = ReduceScatter(P_x, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
         if bias and self.P_bias.active:
-            self.all_gather_bias = AllGather(P_bias, axes_all_gather=(0,), scale_backward=scale_backward)
-            self.reduce_scatter_bias = ReduceScatter(P_bias, axes_reduce_scatter=(0,))
+            self.all_gather_bias = AllGather(P_bias, axes_all_gather=(0,), scale_backward=scale_backward,
+                                             comm_dtype=comm_dtype)
+            self.reduce_scatter_bias = ReduceScatter(P_bias, axes_reduce_scatter=(0,), comm_dtype=comm_dtype)
         else:
             self.all_gather_bias = None
             self.reduce_scatter_bias = None
@@ -247,7 +261,7 @@ class DistributedLinearReduceScatterZero(Module):
 
         # CUDA streams for weight prefetching
         if not self.P_x.device == 'cpu':
-            self.stream_context = nullcontext  # ppe.cuda.stream TODO Fix
+            self.stream_context = stream_context
             self.stream_weight = torch.cuda.Stream(device=self.P_x.device)
             if self.use_bias:
                 self.stream_bias = torch.cuda.Stream(device=self.P_x.device)
@@ -261,6 +275,13 @@ class DistributedLinearReduceScatterZero(Module):
         self.weight_buffer = None
         self.bias_buffer = None
 
+        # Handles to in-flight weight all-gathers. On the CPU, prefetching uses the
+        # back-end's asynchronous collectives if they are available.
+        self.weight_work = None
+        self.bias_work = None
+        self.async_prefetch = self.P_x.device == 'cpu' and \
+            hasattr(self.all_gather_weight._distdl_backend, "CollectiveWork")
+
         # State dict hooks for gather/scattering distributed weights
         self._register_state_dict_hook(self.gather_state_dict)
         self._register_load_state_dict_pre_hook(self.scatter_state_dict)
@@ -276,14 +297,73 @@ class DistributedLinearReduceScatterZero(Module):
 
     def reset_parameters(self) -> None:
 
+        weight_seed, bias_seed = self._init_seeds
+
+        # Global shapes are known, so no communication is needed
+        weight_global_shape = [1] * self.P_x.dim
+        weight_global_shape[0] = self.out_features
+        weight_global_shape[-1] = self.in_features
+
         if self.P_x.active:
-            init.kaiming_uniform_(self.P_x, self.weight, a=math.sqrt(5))
-            weight_global_shape = assemble_global_tensor_structure(self.weight, self.P_x).shape
+
+            # Weights are sharded along the first and last dimensions and
+            # replicated along the others
+            weight_start_index = [0] * self.P_x.dim
+            weight_start_index[0] = compute_start_index(self.P_x.shape[0], self.P_x.index[0],
+                                                        [self.out_features])[0]
+            weight_start_index[-1] = compute_start_index(self.P_x.shape[-1], self.P_x.index[-1],
+                                                         [self.in_features])[0]
+            init.kaiming_uniform_(self.P_x, self.weight, a=math.sqrt(5), global_shape=weight_global_shape,
+                                  start_index=weight_start_index, seed=weight_seed)
 
         if self.use_bias and self.P_bias.active:
+            bias_global_shape = [1] * self.P_bias.dim
+            bias_global_shape[0] = self.out_features
+            bias_start_index = [0] * self.P_bias.dim
+            bias_start_index[0] = compute_start_index(self.P_bias.shape[0], self.P_bias.index[0],
+                                                      [self.out_features])[0]
+
             fan_in, _ = init._calculate_fan_in_and_fan_out(weight_global_shape)
             bound = 1 / math.sqrt(fan_in) if fan_in > 0 else 0
-            init.uniform_(self.bias, -bound, bound)
+            init.uniform_(self.bias, -bound, bound, global_shape=bias_global_shape,
+                          start_index=bias_start_index, seed=bias_seed)
+
+    def _distdl_shard_spec(self):
+
+        if not self.P_x.active:
+            return dict()
+
+        spec = dict()
+        dim = self.P_x.dim
+        if self.P_x.active:
+            weight_global_shape = [1] * dim
+            weight_global_shape[0] = self.out_features
+            weight_global_shape[-1] = self.in_features
+            partition_dims = [None] * dim
+            partition_dims[0] = 0
+            partition_dims[-1] = dim - 1
+            spec['weight'] = block_shard_spec(self.P_x, weight_global_shape, partition_dims)
+        if self.use_bias and self.P_bias.active:
+            bias_global_shape = [1] * dim
+            bias_global_shape[0] = self.out_features
+            partition_dims = [None] * dim
+            partition_dims[0] = 0
+            spec['bias'] = block_shard_spec(self.P_bias, bias_global_shape, partition_dims)
+
+        return spec
+
+    def _distdl_zero_gradients(self):
+
+        if not self.P_x.active or self.auto_clear_buffer:
+            return list()
+
+        gradients = [(self.weight, self.weight_buffer, self.reduce_scatter_weight,
+                      lambda grad: grad.unsqueeze(1), lambda grad: grad)]
+        if self.bias is not None and self.P_bias.active:
+            gradients.append((self.bias, self.bias_buffer, self.reduce_scatter_bias,
+                              lambda grad: grad.view(-1, 1, 1), lambda grad: grad))
+
+        return gradients
 
     def extra_repr(self) -> str:
         return f'in_features={self.in_features}, out_features={self.out_features}, bias={self.bias is not None}'
@@ -364,7 +444,20 @@ class DistributedLinearReduceScatterZero(Module):
 
     # Keep for backward compatibility
     def prefetch_weights(self):
-        self.collect_weights()
+        # Start the weight all-gathers without waiting for them to complete, as in
+        # DistributedLinearAllGatherZero. Without asynchronous collectives, fall
+        # back to collecting the weights immediately.
+        if not self.P_x.active:
+            return
+        if not self.async_prefetch:
+            self.collect_weights()
+            return
+
+        if self.weight_buffer is None and self.weight_work is None:
+            self.weight_work = self.all_gather_weight(self.weight, async_op=True)
+
+        if self.bias is not None and self.P_bias.active and self.bias_buffer is None and self.bias_work is None:
+            self.bias_work = self.all_gather_bias(self.bias, async_op=True)
 
     def collect_weights(self):
         # For ZeRO-1 (auto_clear_buffer: False), we want to temporarily turn the weight & bias buffers
@@ -384,15 +477,26 @@ class DistributedLinearReduceScatterZero(Module):
 
         # If weight buffer is not already filled, start an allgather call. If cuda is used,
         # this call will be asynchronously executed in a separate stream.
+        # If prefetch_weights() started an asynchronous all-gather, complete it instead.
         if self.weight_buffer is None:
             with self.stream_context(self.stream_weight):
-                self.weight_buffer = self.all_gather_weight(self.weight).view(self.out_features, -1)
+                if self.weight_work is not None:
+                    weight = self.weight_work.wait()
+                    self.weight_work = None
+                else:
+                    weight = self.all_gather_weight(self.weight)
+                self.weight_buffer = weight.view(self.out_features, -1)
 
         # Same for this bias buffer if bias is used.
         if self.bias is not None and self.P_bias.active:
             if self.bias_buffer is None:
                 with self.stream_context(self.stream_bias):
-                    self.bias_buffer = self.all_gather_bias(self.bias).view(self.out_features)
+                    if self.bias_work is not None:
+                        bias = self.bias_work.wait()
+                        self.bias_work = None
+                    else:
+                        bias = self.all_gather_bias(self.bias)
+                    self.bias_buffer = bias.view(self.out_features)
 
     def clear_weight_buffer(self):
 
@@ -400,26 +504,27 @@ class DistributedLinearReduceScatterZero(Module):
         # Only at this point do we call the reduce-scatter operations and populate the weight & bias
         # gradients. For ZeRO-3, this function is called after each forward pass and  reduce-scatter
         # is called automatically, since the forward all-gathers were tracked.
+        # Gradients already reduce-scattered by ZeroGradientBuckets are skipped.
         if not self.auto_clear_buffer:
             with torch.no_grad():
 
                 # Reduce-scatter gradients
-                if self.scale_backward is not None:
-                    self.weight_buffer.grad.div_(self.scale_backward)
-                self.weight.grad = self.reduce_scatter_weight(self.weight_buffer.grad.unsqueeze(1))
-
-                if self.bias is not None and self.P_bias.active:
+                for param, buffer, reduce_scatter, pack, unpack in self._distdl_zero_gradients():
+                    if buffer is None or buffer.grad is None:
+                        continue
                     if self.scale_backward is not None:
-                        self.bias_buffer.grad.div_(self.scale_backward)
-                    self.bias.grad = self.reduce_scatter_bias(self.bias_buffer.grad.view(-1, 1, 1))
+                        buffer.grad.div_(self.scale_backward)
+                    param.grad = unpack(reduce_scatter(pack(buffer.grad)))
 
         self.weight_buffer = None
         self.bias_buffer = None
+        self.weight_work = None
+        self.bias_work = None
 
     def wait_for_streams(self):
-        stream_barrier(self.stream_weight)
+        stream_barrier(self.stream_weight, self.weight_buffer)
         if self.use_bias:
-            stream_barrier(self.stream_bias)
+            stream_barrier(self.stream_bias, self.bias_buffer)
 
     def forward(self, input):
         r"""Forward function interface.
@@ -1,9 +1,28 @@
+import weakref
+from contextlib import nullcontext
+
 import numpy as np
+import torch
 
 from distdl.utilities.slicing import compute_start_index
 from distdl.utilities.slicing import compute_subshape
 
 
+class _SavedBufferTensor:
+    r"""Tensor saved by autograd that shares the memory of a persistent
+    padded buffer.
+
+    The layer holds weak references to these handles, so the buffer is free
+    for reuse once the autograd graph releases all of them.
+
+    """
+
+    __slots__ = ("tensor", "__weakref__")
+
+    def __init__(self, tensor):
+        self.tensor = tensor
+
+
 class HaloMixin:
 
     def _compute_exchange_info(self,
@@ -205,3 +224,190 @@ class HaloMixin:
             x_local_right_halo_shape = np.maximum(x_local_right_halo_shape, 0)
 
         return np.hstack([x_local_left_halo_shape, x_local_right_halo_shape]).reshape(2, -1).T
+
+    def _compute_overlap_regions(self,
+                                 x_local_shape,
+                                 halo_shape,
+                                 needed_ranges,
+                                 kernel_size,
+                                 stride,
+                                 dilation):
+        r"""Splits the local output into interior and boundary regions.
+
+        The interior region is the part of the output whose inputs contain no
+        ghost data, so it can be computed while the halo exchange is in
+        flight.  The remainder of the output is covered by nested boundary
+        strips, in the same manner as the halo exchange slices.
+
+        Parameters
+        ----------
+        x_local_shape :
+            Local input shape, including explicit padding but not the halos.
+        halo_shape :
+            Halo shape, as computed by `_compute_exchange_info`.
+        needed_ranges :
+            Needed ranges of the exchanged input, as computed by
+            `_compute_exchange_info`.
+        kernel_size:
+            Size of the kernel in all feature dimensions.
+        stride:
+            Size of the stride in all feature dimensions.
+        dilation:
+            Size of the dilation parameter in all feature dimensions.
+
+        Returns
+        -------
+        None if there is no ghost data or no interior region.  Otherwise, the
+        local output shape, with None for dimensions that are never split, and
+        a list of (input slices, output slices) pairs, relative to the needed
+        input and the output, with the interior region first.
+
+        """
+
+        dim = len(x_local_shape)
+
+        def lpad(array, value):
+            array = np.atleast_1d(array)
+            return np.pad(array, pad_width=(dim - len(array), 0), mode='constant', constant_values=value)
+
+        kernel_size = lpad(kernel_size, 1)
+        stride = lpad(stride, 1)
+        dilation = lpad(dilation, 1)
+        extent = dilation * (kernel_size - 1)
+
+        start = needed_ranges[:, 0]
+        stop = needed_ranges[:, 1]
+        length = stop - start
+        x_shape_with_halos = np.asarray(x_local_shape) + halo_shape[:, 0] + halo_shape[:, 1]
+
+        # Range of the needed input that does not hold any ghost data
+        bulk_start = np.maximum(halo_shape[:, 0] - start, 0)
+        bulk_stop = np.minimum(x_shape_with_halos - halo_shape[:, 1], stop) - start
+
+        # Dimensions without ghost data are never split
+        full = (bulk_start == 0) & (bulk_stop == length)
+        if np.all(full):
+            return None
+
+        # Output range whose kernel support lies entirely within the bulk
+        y_shape = (length - extent - 1) // stride + 1
+        interior_start = np.where(full, 0, np.maximum(-(-bulk_start // stride), 0))
+        interior_stop = np.where(full, y_shape, np.minimum((bulk_stop - extent - 1) // stride + 1, y_shape))
+        if np.any(interior_stop <= interior_start):
+            return None
+
+        def assemble_region(y_start, y_stop):
+            x_slices = []
+            y_slices = []
+            for d in range(dim):
+                if full[d]:
+                    x_slices.append(slice(None))
+                    y_slices.append(slice(None))
+                else:
+                    x_slices.append(slice(int(y_start[d] * stride[d]),
+                                          int((y_stop[d] - 1) * stride[d] + extent[d] + 1)))
+                    y_slices.append(slice(int(y_start[d]), int(y_stop[d])))
+            return tuple(x_slices), tuple(y_slices)
+
+        regions = [assemble_region(interior_start, interior_stop)]
+
+        # Dimensions before i are restricted to the interior, dimensions after
+        # i take the full range, so that the strips do not overlap.
+        for i in range(dim):
+            if full[i]:
+                continue
+
+            y_start = np.where(np.arange(dim) < i, interior_start, 0)
+            y_stop = np.where(np.arange(dim) < i, interior_stop, y_shape)
+
+            for lo, hi in [(0, interior_start[i]), (interior_stop[i], y_shape[i])]:
+                if hi > lo:
+                    y_start[i] = lo
+                    y_stop[i] = hi
+                    regions.append(assemble_region(y_start, y_stop))
+
+        y_shape = [None if full[d] else int(y_shape[d]) for d in range(dim)]
+
+        return y_shape, regions
+
+    def _overlapped_forward(self, function, input_padded):
+        r"""Applies a function to the exchanged input, overlapping the halo
+        exchange with the computation of the interior region.
+
+        Parameters
+        ----------
+        function :
+            Local function to apply, e.g., the PyTorch convolution.
+        input_padded :
+            Input tensor, with space allocated for the halos.
+
+        Returns
+        -------
+        The output of `function` applied to the needed exchanged input.
+
+        """
+
+        y_shape, regions = self.overlap_regions
+
+        # Start the exchange, then compute the interior from the bulk data
+        work = self.halo_layer(input_padded, async_op=True)
+        x_slices, y_slices = regions[0]
+        y_interior = function(input_padded[self.needed_slices][x_slices])
+
+        # Compute the boundary strips once the ghost data have arrived
+        input_needed = work.wait()[self.needed_slices]
+        y_shape = [n if n is not None else m for n, m in zip(y_shape, y_interior.shape)]
+        output = y_interior.new_empty(y_shape)
+        output[y_slices] = y_interior
+        for x_slices, y_slices in regions[1:]:
+            output[y_slices] = function(input_needed[x_slices])
+
+        return output
+
+    def _acquire_padded_buffer(self):
+        r"""Returns the persistent padded buffer, to be filled by a forward pass.
+
+        If autograd still holds tensors saved from the buffer by an earlier
+        forward pass, e.g., of another micro-batch, the layer moves on to a
+        copy of the buffer, so that they are not overwritten before the
+        backward pass.
+
+        Returns
+        -------
+        The padded buffer, with its padding regions filled.
+
+        """
+
+        if len(self._saved_buffer_tensors) > 0:
+            self.padded_buffer = self.padded_buffer.clone()
+            self._saved_buffer_tensors = weakref.WeakSet()
+
+        return self.padded_buffer
+
+    def _track_padded_buffer(self):
+        r"""Returns a context in which the tensors that autograd saves from
+        the persistent padded buffer are tracked.
+
+        Returns
+        -------
+        Context manager, which does nothing if the layer has no persistent
+        padded buffer.
+
+        """
+
+        if self.padded_buffer is None:
+            return nullcontext()
+
+        buffer_address = self.padded_buffer.untyped_storage().data_ptr()
+
+        def pack(tensor):
+            if tensor.untyped_storage().data_ptr() != buffer_address:
+                return tensor
+            saved = _SavedBufferTensor(tensor)
+            self._saved_buffer_tensors.add(saved)
+            return saved
+
+        def unpack(saved):
+            return saved.tensor if isinstance(saved, _SavedBufferTensor) else saved
+
+        return torch.autograd.graph.saved_tensors_hooks(pack, unpack)
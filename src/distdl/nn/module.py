@@ -98,6 +98,45 @@ class Module(torch.nn.Module):
 
         pass
 
+    def _distdl_shard_spec(self):
+        r"""Describes how the parameters and buffers of the layer are sharded.
+
+        Used by :any:`distdl.nn.checkpoint.save_sharded_state_dict` and
+        :any:`distdl.nn.checkpoint.load_sharded_state_dict`.  To be defined
+        by sub-classes that store distributed tensors.
+
+        Returns
+        -------
+        Dict mapping the names of the local, non-empty tensors, relative to
+        the layer, to tuples of the global shape, the global start index of
+        the local shard and whether the local worker owns, and thus saves,
+        the shard.  Tensors that are not described are assumed to be
+        replicated on all workers.
+
+        """
+
+        return dict()
+
+    def _distdl_zero_gradients(self):
+        r"""Describes the gradients that the layer reduce-scatters outside of
+        autograd, in ZeRO stage 1.
+
+        Used by ``clear_weight_buffer()`` and by
+        :any:`distdl.nn.grad_buckets.ZeroGradientBuckets`.  To be defined by
+        sub-classes that accumulate gradients in all-gathered weight buffers.
+
+        Returns
+        -------
+        List of tuples of the parameter, the weight buffer holding its
+        accumulated gradient, the reduce-scatter that reduces it, and the
+        functions that map the gradient of the buffer to the input of the
+        reduce-scatter and the output of the reduce-scatter to the gradient
+        of the parameter.
+
+        """
+
+        return list()
+
     def _distdl_module_requires_reset(self, input):
         r"""Indicate if the layer needs to be reset.
 
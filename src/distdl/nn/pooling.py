@@ -1,3 +1,5 @@
+import weakref
+
 import numpy as np
 import torch
 import torch.nn.functional as F
@@ -57,6 +59,22 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
     buffer_manager :
         (BufferManager, optional)
         DistDL BufferManager. Default: None
+    overlap_halo :
+        (bool, optional)
+        Compute the interior of the output while the halo exchange is in
+        flight, and the boundary once the halos arrive.  The halos of all
+        dimensions are then exchanged concurrently, so that all of them are
+        in flight during the interior computation. Default: False
+    persistent_buffer :
+        (bool, optional)
+        Pad the input into a buffer owned by the layer and exchange the halos
+        in place, rather than allocating a padded copy and a halo-exchanged
+        copy on every call.  While autograd holds the buffer for an earlier
+        forward pass, later ones use a copy of it. Default: False
+    concurrent_halo :
+        (bool, optional)
+        Exchange the halos of all dimensions at once, directly with the
+        diagonal neighbors for the corners. Default: False
 
     """
 
@@ -71,7 +89,10 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
                  stride=1,
                  padding=0,
                  dilation=1,
-                 buffer_manager=None):
+                 buffer_manager=None,
+                 overlap_halo=False,
+                 persistent_buffer=False,
+                 concurrent_halo=False):
 
         super(DistributedPoolBase, self).__init__()
 
@@ -87,6 +108,19 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
             raise ValueError("Buffer manager type does not match backend.")
         self.buffer_manager = buffer_manager
 
+        # Overlap requires the concurrent exchange, which starts all dimensions
+        NeighborhoodHaloExchangeFunction = getattr(self._distdl_backend.functional.halo_exchange,
+                                                   "NeighborhoodHaloExchangeFunction", None)
+        if overlap_halo and not hasattr(NeighborhoodHaloExchangeFunction, "start_forward"):
+            raise ValueError("Overlapped halo exchange is not supported by the selected back-end.")
+        self.overlap_halo = overlap_halo
+
+        if concurrent_halo and not hasattr(self._distdl_backend.functional.halo_exchange,
+                                           "NeighborhoodHaloExchangeFunction"):
+            raise ValueError("Concurrent halo exchange is not supported by the selected back-end.")
+        self.concurrent_halo = concurrent_halo
+        self.persistent_buffer = persistent_buffer
+
         if not self.P_x.active:
             return
 
@@ -132,6 +166,15 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
         # to do this in the pre-forward hook.
         self.halo_layer = None
 
+        # Interior and boundary regions of the output, if the computation is
+        # overlapped with the halo exchange.
+        self.overlap_regions = None
+
+        # Persistent padded input buffer and the slices of its bulk, if used.
+        self.padded_buffer = None
+        self._saved_buffer_tensors = weakref.WeakSet()
+        self.bulk_slices = None
+
         # Variables for tracking input changes and buffer construction
         self._distdl_is_setup = False
         self._input_tensor_structure = TensorStructure()
@@ -204,18 +247,39 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
 
         self.halo_shape = halo_shape
 
+        # The padding regions of the persistent buffer are filled once. The bulk
+        # is overwritten by each input and the ghosts by each halo exchange.
+        total_padding = self.local_padding + halo_shape
+        if self.persistent_buffer and total_padding.sum() > 0:
+            x_local_shape_padded = x_local_shape + np.sum(total_padding, axis=1, keepdims=False)
+            self.padded_buffer = torch.full(tuple(x_local_shape_padded), self.default_pad_value,
+                                            dtype=input[0].dtype,
+                                            device=input[0].device)
+            self.bulk_slices = assemble_slices(total_padding[:, 0],
+                                               total_padding[:, 0] + x_local_shape)
+
         # We can also set up part of the halo layer.
         self.halo_layer = HaloExchange(self.P_x,
                                        halo_shape,
                                        recv_buffer_shape,
                                        send_buffer_shape,
-                                       buffer_manager=self.buffer_manager)
+                                       buffer_manager=self.buffer_manager,
+                                       inplace=self.padded_buffer is not None,
+                                       concurrent=self.concurrent_halo or self.overlap_halo)
 
         # We have to select out the "unused" entries.  Sometimes there can
         # be "negative" halos.
         self.needed_slices = assemble_slices(needed_ranges[:, 0],
                                              needed_ranges[:, 1])
 
+        if self.overlap_halo:
+            self.overlap_regions = self._compute_overlap_regions(x_local_shape_after_pad,
+                                                                 halo_shape,
+                                                                 needed_ranges,
+                                                                 self.kernel_size,
+                                                                 self.stride,
+                                                                 self.dilation)
+
     def _distdl_module_teardown(self, input):
         r"""Distributed (channel) pooling module teardown function.
 
@@ -233,6 +297,10 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
         # Reset all sub_layers
         self.needed_slices = None
         self.halo_layer = None
+        self.overlap_regions = None
+        self.padded_buffer = None
+        self._saved_buffer_tensors = weakref.WeakSet()
+        self.bulk_slices = None
 
         # Reset any info about the input
         self._distdl_is_setup = False
@@ -290,14 +358,23 @@ class DistributedPoolBase(Module, HaloMixin, PoolingMixin):
         total_padding = self.local_padding + self.halo_shape
         torch_padding = self._to_torch_padding(total_padding)
 
-        if total_padding.sum() == 0:
+        if self.padded_buffer is not None:
+            input_padded = self._acquire_padded_buffer().detach()
+            input_padded[self.bulk_slices] = input
+        elif total_padding.sum() == 0:
             input_padded = input
         else:
             input_padded = F.pad(input, pad=torch_padding, mode='constant', value=self.default_pad_value)
 
-        input_exchanged = self.halo_layer(input_padded)
-        input_needed = input_exchanged[self.needed_slices]
-        pool_output = self.pool_layer(input_needed)
+        # Autograd may save parts of the persistent buffer, which must not be
+        # overwritten by the next forward pass before the backward pass
+        with self._track_padded_buffer():
+            if self.overlap_regions is not None:
+                return self._overlapped_forward(self.pool_layer, input_padded)
+
+            input_exchanged = self.halo_layer(input_padded)
+            input_needed = input_exchanged[self.needed_slices]
+            pool_output = self.pool_layer(input_needed)
 
         return pool_output
 
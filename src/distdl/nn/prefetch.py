@@ -0,0 +1,151 @@
+import numpy as np
+import torch
+
+from distdl.nn.module import Module
+
+
+def _prefetched_nbytes(layer):
+    r"""Returns the size, in bytes, of the weights prefetched by a layer.
+
+    Layers keep the weights collected by ``prefetch_weights()`` in their
+    ``*_buffer`` attributes or, if the collection is still in flight, behind
+    the work handles in their ``*_work`` attributes.  Waiting on a handle
+    does not consume its result.
+
+    """
+
+    nbytes = 0
+    for name, value in vars(layer).items():
+        if name.endswith("_work") and value is not None:
+            value = value.wait()
+        if (name.endswith("_buffer") or name.endswith("_work")) and isinstance(value, torch.Tensor):
+            nbytes += value.numel() * value.element_size()
+
+    return nbytes
+
+
+class WeightPrefetcher:
+    r"""Automatic, layer-ahead prefetching of distributed weights.
+
+    Layers that all-gather or broadcast their weights before use, such as the
+    ZeRO layers, expose ``prefetch_weights()`` to start this communication
+    ahead of their forward pass.  This class calls it automatically.  During
+    the first forward pass of the model, forward pre-hooks record the order
+    in which these layers run.  In every later forward pass, just before a
+    layer runs, the weights of the next ``depth`` layers are prefetched, so
+    that their communication overlaps with its computation.
+
+    On the CPU, the ZeRO layers prefetch with the asynchronous collectives of
+    the back-end.  On the GPU, the communication is issued on the side
+    streams of the layers.
+
+    Parameters
+    ----------
+    module : torch.nn.Module
+        Model whose layers are prefetched.
+    depth : int, optional
+        Number of layers to prefetch ahead of the running layer.
+    max_bytes : int, optional
+        Maximum size, in bytes, of the prefetched weights that have not yet
+        been used.  If None, the size is not limited.
+    P_world : Partition, optional
+        Partition of all workers running the model.  Required if
+        ``max_bytes`` is given, to agree on the size of the weights of each
+        layer.
+
+    Warning
+    -------
+    Every worker must run the layers in the same order, and this order must
+    not change after the first forward pass.  If it does, prefetching stops
+    until the next forward pass.
+
+    """
+
+    def __init__(self, module, depth=1, max_bytes=None, P_world=None):
+
+        if depth < 1:
+            raise ValueError("Prefetch depth must be at least 1.")
+        if max_bytes is not None and P_world is None:
+            raise ValueError("A partition of all workers is required to limit the prefetched memory.")
+
+        self.module = module
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.P_world = P_world
+
+        # Layers in execution order, and the size of their collected weights,
+        # recorded during the first forward pass
+        self.order = None
+        self.nbytes = None
+        self._recording = list()
+        self._recorded_nbytes = list()
+
+        # State of the current forward pass: position in the execution order,
+        # and in-flight prefetches, by position
+        self._position = 0
+        self._in_flight = set()
+        self._diverged = False
+
+        self._hooks = [module.register_forward_pre_hook(self._start_forward)]
+        for layer in module.modules():
+            if isinstance(layer, Module) and hasattr(layer, "prefetch_weights"):
+                self._hooks.append(layer.register_forward_pre_hook(self._layer_forward))
+
+    def remove(self):
+        r"""Removes the hooks, and stops prefetching."""
+
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = list()
+
+    def _start_forward(self, module, input):
+
+        # The first forward pass is complete
+        if self.order is None and self._recording:
+            self.order = self._recording
+            self.nbytes = np.zeros(len(self.order), dtype=np.int64)
+            if self.max_bytes is not None:
+                self.nbytes[:] = self._recorded_nbytes
+                if self.P_world.active:
+                    self.nbytes = self.P_world.allreduce_data(self.nbytes, op="max")
+
+        self._position = 0
+        self._in_flight = set()
+        self._diverged = False
+
+    def _layer_forward(self, layer, input):
+
+        # Record the execution order and, if memory is limited, the size of
+        # the weights, which are collected now rather than in the forward pass
+        if self.order is None:
+            self._recording.append(layer)
+            if self.max_bytes is not None:
+                layer.prefetch_weights()
+                self._recorded_nbytes.append(_prefetched_nbytes(layer))
+            return
+
+        i = self._position
+        self._position += 1
+        if self._diverged or i >= len(self.order) or self.order[i] is not layer:
+            self._diverged = True
+            return
+
+        # The weights of this layer are now in use
+        self._in_flight.discard(i)
+
+        in_flight_bytes = sum(self.nbytes[j] for j in self._in_flight)
+        in_flight_layers = [self.order[j] for j in self._in_flight] + [layer]
+        for j in range(i + 1, min(i + 1 + self.depth, len(self.order))):
+            if j in self._in_flight:
+                continue
+
+            # A layer holds the weights of one prefetch at a time
+            if any(self.order[j] is other for other in in_flight_layers):
+                break
+            if self.max_bytes is not None and in_flight_bytes + self.nbytes[j] > self.max_bytes:
+                break
+
+            self.order[j].prefetch_weights()
+            self._in_flight.add(j)
+            in_flight_bytes += self.nbytes[j]
+            in_flight_layers.append(self.order[j])
@@ -1,6 +1,7 @@
 from distdl.nn.module import Module
 from distdl.utilities.slicing import compute_subshape_along_axis
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class ReduceScatter(Module):
@@ -31,10 +32,25 @@ class ReduceScatter(Module):
     axes_keep : tuple, optional
         Partition dimensions to reduce-scatter to.  Complement of `axes_reduce_scatter`.
         Currently, only supportes reduce-scatter operation along single dimension.
+    comm_dtype : torch.dtype, optional
+        If given, data are communicated at this, typically lower, precision,
+        e.g., ``torch.bfloat16``, and accumulated and returned at their
+        original precision.  Requires a back-end with compressed collectives.
+    error_feedback : bool, optional
+        If true, and ``comm_dtype`` is given, the error made by rounding the
+        input to the communication dtype is kept and added to the next input,
+        so that it is not lost, e.g., when reduce-scattering gradients.
+    variable_axes : tuple, optional
+        Tensor dimensions whose extents may change from one call to the next
+        without a new setup, e.g., a number of packed tokens.  They must not
+        be reduce-scattered, and their extents must be the same on all workers
+        of each call, so that the structure of the output is updated
+        locally, without communication.
 
     """
 
-    def __init__(self, P_x, axes_reduce_scatter=None, axes_keep=None):
+    def __init__(self, P_x, axes_reduce_scatter=None, axes_keep=None, comm_dtype=None, error_feedback=False,
+                 variable_axes=()):
 
         super(ReduceScatter, self).__init__()
 
@@ -70,6 +86,17 @@ class ReduceScatter(Module):
         self._distdl_is_setup = False
         self._input_tensor_structure = TensorStructure()
 
+        # Communication dtype, if data are compressed, and the rounding error
+        # of the last input, if it is fed back.
+        self.comm_dtype = comm_dtype
+        self.error_feedback = error_feedback
+        self.residual = None
+
+        # Tensor dimensions whose extents may change without a new setup.
+        self.variable_axes = tuple(variable_axes)
+        if any(axis in self.axes_reduce_scatter for axis in self.variable_axes):
+            raise ValueError("Variable axes must not be reduce-scattered.")
+
         # The identity case is if the partition is of size 1,
         if self.P_x.size == 1:
             self.identity = True
@@ -140,6 +167,7 @@ class ReduceScatter(Module):
         # Reset any info about the input
         self._distdl_is_setup = False
         self._input_tensor_structure = TensorStructure()
+        self.residual = None
 
     def _distdl_input_changed(self, input):
         r"""Determine if the structure of inputs has changed.
@@ -153,30 +181,134 @@ class ReduceScatter(Module):
         """
 
         new_tensor_structure = TensorStructure(input[0])
+        expected_tensor_structure = self._input_tensor_structure.with_extents(new_tensor_structure.shape,
+                                                                              self.variable_axes)
+
+        return expected_tensor_structure != new_tensor_structure
+
+    def _update_variable_extents(self, input):
+        r"""Updates the stored tensor structures to the extents of the
+        variable axes of the input.
+
+        Parameters
+        ----------
+        input :
+            Input tensor.
+
+        """
+
+        self.input_tensor_structure = self.input_tensor_structure.with_extents(input.shape, self.variable_axes)
+        self.output_tensor_structure = self.output_tensor_structure.with_extents(input.shape, self.variable_axes)
+        self._input_tensor_structure = self._input_tensor_structure.with_extents(input.shape, self.variable_axes)
+
+        # The rounding error of an input of other extents is not fed back
+        if self.residual is not None and self.residual.shape != input.shape:
+            self.residual = None
+
+    def _function(self):
+        r"""Returns the functional implementation of the reduce-scatter, compressed
+        if ``comm_dtype`` is given, and its trailing arguments.
+
+        """
+
+        Function = self._distdl_backend.functional.reduce_scatter.ReduceScatterFunction
+        args = ()
 
-        return self._input_tensor_structure != new_tensor_structure
+        if self.comm_dtype is not None:
+            if not hasattr(self._distdl_backend.functional, "compressed"):
+                raise ValueError("Compressed reduce-scatter is not supported by the selected back-end.")
+            Function = self._distdl_backend.functional.compressed.CompressedReduceScatterFunction
+            args = (self.comm_dtype,)
 
-    def forward(self, input):
+        return Function, args
+
+    def start_adjoint(self, grad_output):
+        """Starts the adjoint of the reduce-scatter, an all-gather, outside of autograd.
+
+        For layers that schedule the communication of their backward pass
+        themselves.  The layer must have been applied to an input of the same
+        structure first.  As in the backward pass of the layer, data are
+        communicated at ``comm_dtype``, if it is given.
+
+        Parameters
+        ----------
+        grad_output :
+            Gradient of the output tensor.
+
+        Returns
+        -------
+        work :
+            Work handle, whose `wait()` returns the gradient of the input tensor.
+
+        """
+
+        Function, args = self._function()
+
+        if not hasattr(Function, "start_backward"):
+            raise ValueError("Asynchronous reduce-scatter is not supported by the selected back-end.")
+
+        if self.identity or not (self.P_x.active):
+            return self._distdl_backend.CollectiveWork([], lambda: grad_output)
+
+        return Function.start_backward(grad_output,
+                                       self.P_reducescatter,
+                                       self.input_tensor_structure,
+                                       self.output_tensor_structure,
+                                       self.axes_reduce_scatter,
+                                       *args)
+
+    @traced("reduce_scatter")
+    def forward(self, input, async_op=False):
         """Forward function interface.
 
         Parameters
         ----------
         input :
             Input tensor to be reduce-scattered.
+        async_op : bool, optional
+            If True, the reduce-scatter is only started and a work handle is returned,
+            whose `wait()` completes it and returns the output tensor.
 
         """
 
-        Function = self._distdl_backend.functional.reduce_scatter.ReduceScatterFunction
+        Function, args = self._function()
 
-        if self.identity:
-            return input
+        if async_op and not hasattr(Function, "start_forward"):
+            raise ValueError("Asynchronous reduce-scatter is not supported by the selected back-end.")
 
-        if not (self.P_x.active):
+        if self.identity or not (self.P_x.active):
+            if async_op:
+                return self._distdl_backend.CollectiveWork([], lambda: input)
             return input
 
+        if self.variable_axes:
+            self._update_variable_extents(input)
+
+        # Compensate for the rounding error of the previous input
+        if self.comm_dtype is not None and self.error_feedback:
+            if self.residual is not None:
+                input = input + self.residual
+            self.residual = (input - input.to(self.comm_dtype).to(input.dtype)).detach()
+
+        if async_op:
+            work = Function.start_forward(input,
+                                          self.P_reducescatter,
+                                          self.input_tensor_structure,
+                                          self.output_tensor_structure,
+                                          self.axes_reduce_scatter,
+                                          *args)
+            # The autograd function is applied once the data has arrived.
+            return work.then(lambda output: Function.apply(input,
+                                                           self.P_reducescatter,
+                                                           self.input_tensor_structure,
+                                                           self.output_tensor_structure,
+                                                           self.axes_reduce_scatter,
+                                                           *args,
+                                                           work))
+
         return Function.apply(input,
                               self.P_reducescatter,
                               self.input_tensor_structure,
                               self.output_tensor_structure,
                               self.axes_reduce_scatter,
-                              )
+                              *args)
@@ -2,13 +2,15 @@ import numpy as np
 
 from distdl.nn.module import Module
 from distdl.utilities.slicing import compute_nd_slice_shape
+from distdl.utilities.slicing import compute_start_index
+from distdl.utilities.slicing import compute_stop_index
 from distdl.utilities.slicing import compute_subshape
-from distdl.utilities.slicing import range_index
-from distdl.utilities.tensor_decomposition import compute_subtensor_intersection_slice
-from distdl.utilities.tensor_decomposition import compute_subtensor_shapes_balanced
+from distdl.utilities.tensor_decomposition import compute_balanced_subtensor_overlaps
+from distdl.utilities.tensor_decomposition import compute_subtensor_overlaps
 from distdl.utilities.tensor_decomposition import compute_subtensor_start_indices
 from distdl.utilities.tensor_decomposition import compute_subtensor_stop_indices
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class Repartition(Module):
@@ -39,10 +41,14 @@ class Repartition(Module):
         Indicates if batch size should be preserved for zero-volume outputs.
     buffer_manager : optional
         External manager for communication buffers
+    persistent : bool, optional
+        If True, the communication pattern is compiled into a persistent plan
+        when the layer is set up, so steady-state calls only start
+        pre-initialized requests.  Requires back-end support.
 
     """
 
-    def __init__(self, P_x, P_y, preserve_batch=True, buffer_manager=None):
+    def __init__(self, P_x, P_y, preserve_batch=True, buffer_manager=None, persistent=False):
         super(Repartition, self).__init__()
 
         # Global structure of the input tensor, assembled when layer is called
@@ -82,6 +88,14 @@ class Repartition(Module):
         # List of buffers for copying data from other workers
         self.P_y_to_x_buffers = None
 
+        # Indicates if a persistent communication plan should be used
+        if persistent and not hasattr(self._distdl_backend.functional.repartition, "RepartitionPlan"):
+            raise ValueError("Persistent repartition is not supported by the selected back-end.")
+        self.persistent = persistent
+
+        # Compiled persistent communication plan, built when layer is set up
+        self.plan = None
+
         # Variables for tracking input changes and buffer construction
         self._distdl_is_setup = False
         self._input_tensor_structure = TensorStructure()
@@ -126,6 +140,14 @@ class Repartition(Module):
         data = np.array([P_y.rank if P_y.active else -1], dtype=int)
         self.P_y_ranks = P_union.allgather_data(data)
 
+        # Invert the maps, so that the rank in the union of any worker in the
+        # input or output partition can be found directly.
+        self.P_x_union_ranks = np.full(np.prod(self.P_x_shape), -1, dtype=int)
+        self.P_x_union_ranks[self.P_x_ranks[self.P_x_ranks >= 0]] = np.nonzero(self.P_x_ranks >= 0)[0]
+
+        self.P_y_union_ranks = np.full(np.prod(self.P_y_shape), -1, dtype=int)
+        self.P_y_union_ranks[self.P_y_ranks[self.P_y_ranks >= 0]] = np.nonzero(self.P_y_ranks >= 0)[0]
+
         # Get some types and functions from the back-end
         self.allocate_repartition_buffers = self._distdl_backend.buffer_allocator.allocate_repartition_buffers
 
@@ -194,98 +216,65 @@ class Repartition(Module):
                                                                  self.P_x,
                                                                  self.P_union)
 
-        # Get the collective output lengths and origins. This will always be
-        # load balanced, so we can infer the subshape tensor from the global
-        # tensor shape and the shape of P_y.  At this point, every worker in
-        # P_union has both of these pieces of information, so we can build it
-        # with no communication.
-
-        y_subtensor_shapes = compute_subtensor_shapes_balanced(self.global_input_tensor_structure,
-                                                               self.P_y_shape)
-
         # Given all subtensor shapes, we can compute the start and stop indices
-        # for each partition.
-
+        # for each input subtensor.
         x_subtensor_start_indices = compute_subtensor_start_indices(x_subtensor_shapes)
         x_subtensor_stop_indices = compute_subtensor_stop_indices(x_subtensor_shapes)
 
-        y_subtensor_start_indices = compute_subtensor_start_indices(y_subtensor_shapes)
-        y_subtensor_stop_indices = compute_subtensor_stop_indices(y_subtensor_shapes)
+        # The output will always be load balanced, so the bounds of any output
+        # subtensor can be inferred from the global tensor shape and the shape
+        # of P_y.  At this point, every worker in P_union has both of these
+        # pieces of information, so no communication is needed.  Only the
+        # non-empty overlaps are computed.
 
         # We only need to move data to the output partition if we actually
         # have input data.  It is possible to have both input and output data,
         # either input or output data, or neither.  Hence the active guard.
         if self.P_x.active:
             x_slice = tuple([slice(i, i + 1) for i in self.P_x.index] + [slice(None)])
-            # ToDO: We have equivallent squeeze() in cupy - check later
-            x_start_index = x_subtensor_start_indices[x_slice].squeeze()
-            x_stop_index = x_subtensor_stop_indices[x_slice].squeeze()
-
-            # Compute our overlaps for each output subpartition.
-            for rank, P_y_index in enumerate(range_index(self.P_y_shape)):
-
-                y_slice = tuple([slice(i, i + 1) for i in P_y_index] + [slice(None)])
-                y_start_index = y_subtensor_start_indices[y_slice].squeeze()
-                y_stop_index = y_subtensor_stop_indices[y_slice].squeeze()
-
-                sl = compute_subtensor_intersection_slice(x_start_index, x_stop_index,
-                                                          y_start_index, y_stop_index)
-
-                if sl is not None:
-                    sh = compute_nd_slice_shape(sl)
-                    # If it is a self-copy, mark it so we don't have to create
-                    # a potentially large buffer
-                    # ToDO: index is only a field, but is it on the device? - done
-                    # ToDO: Is it needed to use cupy.all() ? - done
-                    if self.P_y.active and np.all(P_y_index == self.P_y.index):
-                        partner = "self"
-                    # Otherwise, reverse the mapping to get the output
-                    # partner's rank in the common partition.
-                    else:
-                        # ToDO: The same question as cupy.all() - done
-                        partner = np.where(self.P_y_ranks == rank)[0][0]
-
-                    # ToDO: We don't have ndarray.append in cupy, instead we have cupy.append,
-                    # ToDO: so the buffers should be appended using different calls on cupy.append(arr, values)
-                    self.P_x_to_y_overlaps.append((sl, sh, partner))
-
+            x_start_index = x_subtensor_start_indices[x_slice].reshape(-1)
+            x_stop_index = x_subtensor_stop_indices[x_slice].reshape(-1)
+
+            # Compute our overlaps with the output subpartitions.
+            overlaps = compute_balanced_subtensor_overlaps(x_start_index, x_stop_index,
+                                                           x_global_shape, self.P_y_shape)
+            for P_y_index, sl in overlaps:
+                sh = compute_nd_slice_shape(sl)
+                # If it is a self-copy, mark it so we don't have to create
+                # a potentially large buffer
+                if self.P_y.active and np.all(P_y_index == self.P_y.index):
+                    partner = "self"
+                # Otherwise, use the inverted map to get the output
+                # partner's rank in the common partition.
                 else:
-                    self.P_x_to_y_overlaps.append((None, None, None))
+                    rank = np.ravel_multi_index(tuple(P_y_index), self.P_y_shape)
+                    partner = self.P_y_union_ranks[rank]
+
+                self.P_x_to_y_overlaps.append((sl, sh, partner))
 
         # We only need to obtain data from the input partition if we actually
         # have output data.
         if self.P_y.active:
-            y_slice = tuple([slice(i, i + 1) for i in self.P_y.index] + [slice(None)])
-            y_start_index = y_subtensor_start_indices[y_slice].squeeze()
-            y_stop_index = y_subtensor_stop_indices[y_slice].squeeze()
-
-            # Compute our overlaps for each input subpartition.
-            for rank, P_x_index in enumerate(range_index(self.P_x_shape)):
-
-                x_slice = tuple([slice(i, i + 1) for i in P_x_index] + [slice(None)])
-                x_start_index = x_subtensor_start_indices[x_slice].squeeze()
-                x_stop_index = x_subtensor_stop_indices[x_slice].squeeze()
-
-                sl = compute_subtensor_intersection_slice(y_start_index, y_stop_index,
-                                                          x_start_index, x_stop_index)
-
-                if sl is not None:
-                    sh = compute_nd_slice_shape(sl)
-                    # If it is a self-copy, mark it so we don't have to create
-                    # a potentially large buffer
-                    # ToDO: same as before - done
-                    if self.P_x.active and np.all(P_x_index == self.P_x.index):
-                        partner = "self"
-                    # Otherwise, reverse the mapping to get the output
-                    # partner's rank in the common partition.
-                    else:
-                        # ToDO: same as before - done
-                        partner = np.where(self.P_x_ranks == rank)[0][0]
-
-                    self.P_y_to_x_overlaps.append((sl, sh, partner))
-
+            y_start_index = compute_start_index(self.P_y_shape, self.P_y.index, x_global_shape)
+            y_stop_index = compute_stop_index(self.P_y_shape, self.P_y.index, x_global_shape)
+
+            # Compute our overlaps with the input subpartitions.
+            overlaps = compute_subtensor_overlaps(y_start_index, y_stop_index,
+                                                  x_subtensor_start_indices,
+                                                  x_subtensor_stop_indices)
+            for P_x_index, sl in overlaps:
+                sh = compute_nd_slice_shape(sl)
+                # If it is a self-copy, mark it so we don't have to create
+                # a potentially large buffer
+                if self.P_x.active and np.all(P_x_index == self.P_x.index):
+                    partner = "self"
+                # Otherwise, use the inverted map to get the input
+                # partner's rank in the common partition.
                 else:
-                    self.P_y_to_x_overlaps.append((None, None, None))
+                    rank = np.ravel_multi_index(tuple(P_x_index), self.P_x_shape)
+                    partner = self.P_x_union_ranks[rank]
+
+                self.P_y_to_x_overlaps.append((sl, sh, partner))
 
         buffs = self.allocate_repartition_buffers(self.buffer_manager,
                                                   self.P_x_to_y_overlaps,
@@ -294,6 +283,20 @@ class Repartition(Module):
         self.P_x_to_y_buffers = buffs[0]
         self.P_y_to_x_buffers = buffs[1]
 
+        if self.persistent:
+            RepartitionPlan = self._distdl_backend.functional.repartition.RepartitionPlan
+            self.plan = RepartitionPlan(self.P_union,
+                                        self.global_input_tensor_structure,
+                                        self.input_tensor_structure,
+                                        self.output_tensor_structure,
+                                        self.P_x,
+                                        self.P_x_to_y_overlaps,
+                                        self.P_x_to_y_buffers,
+                                        self.P_y,
+                                        self.P_y_to_x_overlaps,
+                                        self.P_y_to_x_buffers,
+                                        self.preserve_batch)
+
     def _distdl_module_teardown(self, input):
         r"""Repartition module teardown function.
 
@@ -311,6 +314,10 @@ class Repartition(Module):
         """
 
         # Reset all of the buffers and communication objects
+        if self.plan is not None:
+            self.plan.free()
+            self.plan = None
+
         self.P_x_to_y_overlaps = []
         self.P_y_to_x_overlaps = []
 
@@ -336,6 +343,7 @@ class Repartition(Module):
 
         return self._input_tensor_structure != new_tensor_structure
 
+    @traced("repartition")
     def forward(self, input):
         """Forward function interface.
 
@@ -356,6 +364,10 @@ class Repartition(Module):
         if not (self.P_x.active or self.P_y.active):
             return input
 
+        if self.plan is not None:
+            PersistentFunction = self._distdl_backend.functional.repartition.PersistentRepartitionFunction
+            return PersistentFunction.apply(input, self.plan)
+
         return Function.apply(input,
                               self.P_union,
                               self.global_input_tensor_structure,
@@ -1,5 +1,6 @@
 from distdl.nn.module import Module
 from distdl.utilities.torch import TensorStructure
+from distdl.utilities.tracer import traced
 
 
 class SumReduce(Module):
@@ -45,12 +46,16 @@ class SumReduce(Module):
         Transpose the output partition prior to the broadcast.
     preserve_batch : bool, optional
         Indicates if batch size should be preserved for zero-volume outputs.
+    comm_dtype : torch.dtype, optional
+        If given, data are communicated at this, typically lower, precision,
+        e.g., ``torch.bfloat16``, and accumulated and returned at their
+        original precision.  Requires a back-end with compressed collectives.
 
     """
 
     def __init__(self, P_x, P_y,
                  transpose_src=False, transpose_dest=False,
-                 preserve_batch=True):
+                 preserve_batch=True, comm_dtype=None):
 
         super(SumReduce, self).__init__()
 
@@ -69,6 +74,9 @@ class SumReduce(Module):
         # Indicates if batch size should be preserved for zero-volume outputs.
         self.preserve_batch = preserve_batch
 
+        # Communication dtype, if data are compressed.
+        self.comm_dtype = comm_dtype
+
         # Indicates if broadcast requires any data movement.
         self.identity = False
 
@@ -184,6 +192,7 @@ class SumReduce(Module):
 
         return self._input_tensor_structure != new_tensor_structure
 
+    @traced("sum_reduce")
     def forward(self, input):
         """Forward function interface.
 
@@ -195,6 +204,13 @@ class SumReduce(Module):
         """
 
         Function = self._distdl_backend.functional.sum_reduce.SumReduceFunction
+        args = ()
+
+        if self.comm_dtype is not None:
+            if not hasattr(self._distdl_backend.functional, "compressed"):
+                raise ValueError("Compressed sum-reduction is not supported by the selected back-end.")
+            Function = self._distdl_backend.functional.compressed.CompressedSumReduceFunction
+            args = (self.comm_dtype,)
 
         if self.identity:
             return input
@@ -208,4 +224,4 @@ class SumReduce(Module):
                               self.preserve_batch,
                               self.input_tensor_structure,
                               self.output_tensor_structure,
-                              )
+                              *args)
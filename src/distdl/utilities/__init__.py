@@ -4,3 +4,4 @@ from . import index_tricks  # noqa: F401
 from . import misc  # noqa: F401
 from . import slicing  # noqa: F401
 from . import torch  # noqa: F401
+from . import tracer  # noqa: F401
@@ -1,10 +1,55 @@
+from contextlib import ExitStack
+from contextlib import contextmanager
+
+import torch
 from torch.autograd.function import _ContextMethodMixin
 from torch.cuda import current_stream
 
 
-def stream_barrier(stream):
+@contextmanager
+def stream_context(stream):
+    r"""Issues the work of both PyTorch and CuPy on a CUDA stream.
+
+    The CuPy and NCCL back-ends launch their collectives on the current CuPy
+    stream, so it is pointed at the same stream as PyTorch.
+
+    Parameters
+    ----------
+    stream : torch.cuda.Stream
+        Stream on which to issue work, or None for the current stream.
+
+    """
+
+    with ExitStack() as stack:
+        if stream is not None:
+            stack.enter_context(torch.cuda.stream(stream))
+            try:
+                import cupy
+                stack.enter_context(cupy.cuda.ExternalStream(stream.cuda_stream))
+            except ImportError:
+                pass
+        yield
+
+
+def stream_barrier(stream, *tensors):
+    r"""Makes the current stream wait for the work issued on another stream.
+
+    Parameters
+    ----------
+    stream : torch.cuda.Stream
+        Stream to wait for, or None.
+    tensors : torch.Tensor
+        Tensors produced on ``stream`` and used on the current stream.  Their
+        memory is not reused by ``stream`` until the current stream is done
+        with them.
+
+    """
+
     if stream is not None:
         current_stream().wait_stream(stream)
+        for tensor in tensors:
+            if tensor is not None:
+                tensor.record_stream(current_stream())
 
 
 class Bunch(dict):
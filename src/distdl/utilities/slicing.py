@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import numpy as np
 
 INDEX_DTYPE = np.int64
@@ -271,3 +273,39 @@ def get_rearrange_ordering(num_dims, axis):
     new_order = ' '.join(new_order)
 
     return expanded_order, new_order
+
+
+@lru_cache(maxsize=None)
+def compute_balanced_counts(extent, n_workers, block_volume=1):
+    r"""Returns the counts and displacements of a balanced decomposition of
+    one dimension, for variable-count collectives.
+
+    The dimension is split as by `compute_subshape`, so the first
+    ``extent % n_workers`` workers hold one more entry than the others.
+    Results are cached, so the counts are only computed once for each
+    decomposition.
+
+    Parameters
+    ----------
+    extent : int
+        Global extent of the decomposed dimension.
+    n_workers : int
+        Number of workers the dimension is decomposed over.
+    block_volume : int, optional
+        Number of elements per entry of the decomposed dimension.
+
+    Returns
+    -------
+    counts : tuple
+        Number of elements held by each worker.
+    displacements : tuple
+        Offset, in elements, of the data of each worker.
+    """
+
+    extents = np.full(n_workers, extent // n_workers, dtype=INDEX_DTYPE)
+    extents[:extent % n_workers] += 1
+
+    counts = extents * block_volume
+    displacements = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    return tuple(int(c) for c in counts), tuple(int(d) for d in displacements)
@@ -1,8 +1,10 @@
+import itertools
+
 import numpy as np
 
 from distdl.utilities.slicing import assemble_slices
 from distdl.utilities.slicing import compute_intersection
-from distdl.utilities.slicing import range_index
+from distdl.utilities.slicing import compute_start_index
 
 
 def compute_subtensor_shapes_balanced(global_tensor_structure, P_tensor_shape):
@@ -30,23 +32,13 @@ def compute_subtensor_shapes_balanced(global_tensor_structure, P_tensor_shape):
     P_tensor_shape = np.atleast_1d(P_tensor_shape)
     global_tensor_shape = np.atleast_1d(global_tensor_structure.shape)
 
-    shapes_size = list(P_tensor_shape) + [len(P_tensor_shape)]
-    shapes = np.zeros(shapes_size, dtype=int)
-
-    for P_tensor_index in range_index(P_tensor_shape):
-
-        P_tensor_index = np.atleast_1d(P_tensor_index)
+    # Cartesian index of every worker, with the index in the last dimension
+    P_tensor_indices = np.moveaxis(np.indices(P_tensor_shape, dtype=int), 0, -1)
 
-        # Generate a slice that isolates the worker's index into shapes
-        # where it can store its shape
-        sl = tuple([slice(i, i + 1) for i in P_tensor_index] + [slice(None)])
+    shapes = global_tensor_shape // P_tensor_shape + \
+        (P_tensor_indices < global_tensor_shape % P_tensor_shape)
 
-        subshape = global_tensor_shape // P_tensor_shape
-        subshape[P_tensor_index < global_tensor_shape % P_tensor_shape] += 1
-
-        shapes[sl] = np.asarray(subshape)
-
-    return shapes
+    return shapes.astype(int)
 
 
 def compute_subtensor_start_indices(shapes):
@@ -188,3 +180,117 @@ def compute_subtensor_intersection_slice(x_start_index, x_stop_index,
         i_stop_index_rel_x = i_start_index_rel_x + i_shape
         i_slice_rel_x = assemble_slices(i_start_index_rel_x, i_stop_index_rel_x)
         return i_slice_rel_x
+
+
+def compute_subtensor_overlaps(start_index, stop_index,
+                               subtensor_start_indices, subtensor_stop_indices):
+    r"""Given index bounds of a region, finds all subtensors of a Cartesian
+        decomposition that overlap it.
+
+        The overlap test is performed for all subtensors at once, so no
+        Python-level work is done for subtensors that do not overlap the
+        region.  This works for any decomposition, balanced or not.
+
+        Parameters
+        ----------
+        start_index : iterable
+            D starting indices of the region.
+        stop_index : iterable
+            D stopping indices of the region.
+        subtensor_start_indices : np.ndarray
+            D+1 dimensional array of start indices of all subtensors.
+        subtensor_stop_indices : np.ndarray
+            D+1 dimensional array of stop indices of all subtensors.
+
+        Returns
+        -------
+        List of tuples (index, sl), in lexicographic order of the Cartesian
+        index of the overlapping subtensors, where `sl` is a tuple of slice
+        objects describing the overlap, relative to the region.
+
+    """
+
+    start_index = np.atleast_1d(start_index)
+    stop_index = np.atleast_1d(stop_index)
+
+    i_start_indices = np.maximum(subtensor_start_indices, start_index)
+    i_stop_indices = np.minimum(subtensor_stop_indices, stop_index)
+
+    is_overlapping = np.all(i_stop_indices > i_start_indices, axis=-1)
+
+    overlaps = []
+    for index in np.argwhere(is_overlapping):
+        i_start_index = i_start_indices[tuple(index)]
+        i_stop_index = i_stop_indices[tuple(index)]
+        sl = assemble_slices(i_start_index - start_index,
+                             i_stop_index - start_index)
+        overlaps.append((index, sl))
+
+    return overlaps
+
+
+def compute_balanced_subtensor_overlaps(start_index, stop_index,
+                                        global_tensor_shape, P_tensor_shape):
+    r"""Given index bounds of a region, finds all subtensors of a perfectly
+        load balanced decomposition that overlap it.
+
+        In a balanced decomposition, the owner of any global index can be
+        computed directly, so the overlapping subtensors in each dimension
+        form a contiguous range of workers that is found in constant time.
+        The work is proportional to the number of overlaps, not to the size
+        of the partition.
+
+        Parameters
+        ----------
+        start_index : iterable
+            D starting indices of the region.
+        stop_index : iterable
+            D stopping indices of the region.
+        global_tensor_shape : iterable
+            Shape of the global tensor.
+        P_tensor_shape : iterable
+            Shape of the partition containing the global tensor.
+
+        Returns
+        -------
+        List of tuples (index, sl), in lexicographic order of the Cartesian
+        index of the overlapping subtensors, where `sl` is a tuple of slice
+        objects describing the overlap, relative to the region.
+
+    """
+
+    start_index = np.atleast_1d(start_index)
+    stop_index = np.atleast_1d(stop_index)
+    global_tensor_shape = np.atleast_1d(global_tensor_shape)
+    P_tensor_shape = np.atleast_1d(P_tensor_shape)
+
+    if np.any(stop_index <= start_index):
+        return []
+
+    # Subtensors with index less than r have length q + 1, the rest have
+    # length q.
+    q = global_tensor_shape // P_tensor_shape
+    r = global_tensor_shape % P_tensor_shape
+
+    def owner(i, d):
+        # Index of the subtensor containing global index i in dimension d
+        if i < r[d] * (q[d] + 1):
+            return i // (q[d] + 1)
+        return r[d] + (i - r[d] * (q[d] + 1)) // q[d]
+
+    ranges = [range(owner(start_index[d], d), owner(stop_index[d] - 1, d) + 1)
+              for d in range(len(P_tensor_shape))]
+
+    overlaps = []
+    for index in itertools.product(*ranges):
+        index = np.asarray(index)
+        subtensor_start_index = compute_start_index(P_tensor_shape, index, global_tensor_shape)
+        subtensor_stop_index = subtensor_start_index + q + (index < r)
+
+        i_start_index = np.maximum(subtensor_start_index, start_index)
+        i_stop_index = np.minimum(subtensor_stop_index, stop_index)
+        sl = assemble_slices(i_start_index - start_index,
+                             i_stop_index - start_index)
+        overlaps.append((index, sl))
+
+    return overlaps
@@ -33,6 +33,27 @@ class TensorStructure:
         self.dtype = tensor.dtype
         self.requires_grad = tensor.requires_grad
 
+    def with_extents(self, shape, axes):
+        r"""Returns a copy of the structure, with the extents of the
+        dimensions ``axes`` taken from ``shape``.
+
+        The shape is unchanged if it has a different number of dimensions.
+
+        """
+
+        structure = TensorStructure()
+        structure.shape = self.shape
+        structure.dtype = self.dtype
+        structure.requires_grad = self.requires_grad
+
+        if self.shape is not None and len(self.shape) == len(shape):
+            new_shape = list(self.shape)
+            for axis in axes:
+                new_shape[axis] = shape[axis]
+            structure.shape = torch.Size(new_shape)
+
+        return structure
+
     def __eq__(self, other):
 
         return ((self.shape == other.shape) and  # noqa: W504
@@ -47,3 +68,53 @@ def distdl_padding_to_torch_padding(pad):
 
     """
     return tuple(np.array(list(reversed(pad)), dtype=int).flatten())
+
+
+def to_numpy(tensor):
+    r"""Returns a NumPy array holding the data of a tensor, for communication.
+
+    Contiguous tensors in main memory are exposed to NumPy without a copy, so
+    the array shares memory with the tensor.  Tensors that are non-contiguous,
+    or stored in another memory, are copied.
+
+    Parameters
+    ----------
+    tensor : torch.Tensor
+        Tensor to expose.
+
+    Returns
+    -------
+    A contiguous NumPy array with the data of ``tensor``.
+
+    """
+
+    return tensor.detach().cpu().contiguous().numpy()
+
+
+def from_numpy(array, requires_grad=False, device=None):
+    r"""Returns a tensor holding the data of a NumPy array, for communication.
+
+    The tensor shares memory with the array if ``device`` is main memory, so
+    the array must be a buffer owned by the caller, e.g., a freshly received
+    message, and not be modified afterwards.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        Array to wrap.
+    requires_grad : bool, optional
+        Requires-grad status of the output tensor.
+    device : torch.device, optional
+        Device of the output tensor.
+
+    Returns
+    -------
+    A tensor with the data of ``array``.
+
+    """
+
+    tensor = torch.from_numpy(array)
+    if device is not None:
+        tensor = tensor.to(device)
+
+    return tensor.requires_grad_(requires_grad)
@@ -0,0 +1,371 @@
+r"""Tracing of the communication of the distributed primitives.
+
+When enabled, every call of a data movement primitive, e.g.,
+:any:`distdl.nn.AllGather` or :any:`distdl.nn.Repartition`, in the forward or
+the backward pass, is recorded with the name of the layer, the type of the
+primitive, the shapes of its partitions, the number of bytes it sends and
+receives and the time spent packing and posting the messages, waiting for them
+and unpacking them.  The timing of each phase is reported by the back-end
+functionals, currently those of the ``mpi_numpy`` back-end.  For other
+back-ends, only the total time is recorded.
+
+Traces are exported, one file per worker, in the Chrome trace event format,
+which can be opened with ``chrome://tracing`` or https://ui.perfetto.dev, and
+:any:`merge_chrome_traces` merges them and flags the calls whose duration is
+imbalanced across workers, and the workers that arrive last.
+
+Example
+-------
+>>> tracer.enable(model, P_world)
+>>> loss = model(x).sum()
+>>> loss.backward()
+>>> tracer.export_chrome_trace("trace.{rank}.json")
+>>> if P_world.rank == 0:
+...     report = tracer.merge_chrome_traces(paths, "trace.json")
+
+When disabled, the default, the only cost is one check of a global flag per
+primitive call and per communication phase.
+
+"""
+
+import contextlib
+import functools
+import json
+import time
+
+from mpi4py import MPI
+
+# Tracing state.  All times are relative to the start of the trace.
+_enabled = False
+_span = None
+_spans = list()
+_names = dict()
+_rank = 0
+_t0 = 0.0
+
+
+class _Span:
+    r"""The record of one call of a primitive."""
+
+    def __init__(self, layer, primitive, partitions, direction):
+
+        self.layer = layer
+        self.primitive = primitive
+        self.partitions = partitions
+        self.direction = direction
+
+        self.start = time.perf_counter()
+        self.end = None
+        self._last = self.start
+
+        self.sent = 0
+        self.received = 0
+        self.phases = {"pack": 0.0, "wait": 0.0, "unpack": 0.0}
+
+    def mark(self, phase, sent=0, received=0):
+        r"""Attributes the time since the last mark to ``phase``.
+
+        If ``phase`` is None, the time is not attributed to any phase, e.g.,
+        the computation overlapped with an asynchronous communication.
+
+        """
+
+        now = time.perf_counter()
+        if phase is not None:
+            self.phases[phase] += now - self._last
+        self._last = now
+
+        self.sent += sent
+        self.received += received
+
+    def to_event(self):
+
+        us = 1e6
+        return {"name": self.layer,
+                "cat": self.direction,
+                "ph": "X",
+                "ts": (self.start - _t0) * us,
+                "dur": (self.end - self.start) * us,
+                "pid": _rank,
+                "tid": 0 if self.direction == "forward" else 1,
+                "args": {"primitive": self.primitive,
+                         "partitions": self.partitions,
+                         "bytes_sent": self.sent,
+                         "bytes_received": self.received,
+                         "pack_us": self.phases["pack"] * us,
+                         "wait_us": self.phases["wait"] * us,
+                         "unpack_us": self.phases["unpack"] * us}}
+
+
+def enable(model=None, P_world=None):
+    r"""Starts recording the communication of all primitives.
+
+    Any previously recorded trace is discarded.
+
+    Parameters
+    ----------
+    model : torch.nn.Module, optional
+        If given, primitives are named by their qualified name in the model.
+        Otherwise, they are named by their class.
+    P_world : Partition, optional
+        If given, the workers of the partition synchronize, so that their
+        traces start at approximately the same time and can be compared.
+
+    """
+
+    global _enabled, _names, _rank, _t0
+
+    _names = dict()
+    if model is not None:
+        _names = {id(module): name for name, module in model.named_modules()}
+
+    if P_world is not None and P_world.active:
+        P_world._comm.Barrier()
+    _rank = MPI.COMM_WORLD.Get_rank()
+    _t0 = time.perf_counter()
+
+    reset()
+    _enabled = True
+
+
+def disable():
+    r"""Stops recording.  The recorded trace is kept."""
+
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    r"""Discards the recorded trace."""
+
+    global _spans
+    _spans = list()
+
+
+def is_enabled():
+    return _enabled
+
+
+def current():
+    r"""Returns the record of the primitive call in progress, or None."""
+
+    return _span
+
+
+def mark(phase, sent=0, received=0):
+    r"""Attributes the time since the last mark of the primitive call in
+    progress to ``phase``, one of ``"pack"``, ``"wait"`` or ``"unpack"``.
+
+    Called by the back-end functionals.  Does nothing if no call is being
+    traced.
+
+    Parameters
+    ----------
+    phase : str
+        Communication phase that just completed.
+    sent : int, optional
+        Number of bytes posted for sending in this phase.
+    received : int, optional
+        Number of bytes posted for receiving in this phase.
+
+    """
+
+    if _span is not None:
+        _span.mark(phase, sent, received)
+
+
+@contextlib.contextmanager
+def resumed(span):
+    r"""Makes ``span`` the primitive call in progress, e.g., to complete an
+    asynchronous call after another call has started."""
+
+    global _span
+
+    previous = _span
+    _span = span
+    try:
+        yield span
+    finally:
+        _span = previous
+
+
+def events():
+    r"""Returns the recorded calls as Chrome trace events."""
+
+    return [span.to_event() for span in _spans if span.end is not None]
+
+
+def export_chrome_trace(path):
+    r"""Writes the trace of the local worker in the Chrome trace event format.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.  ``{rank}`` is replaced by the rank of the worker.
+
+    """
+
+    with open(path.format(rank=_rank), "w") as f:
+        json.dump({"traceEvents": events(), "displayTimeUnit": "ms"}, f)
+
+
+def merge_chrome_traces(paths, output_path=None, threshold=1.5):
+    r"""Merges the traces of several workers and looks for imbalance.
+
+    Collective calls happen in the same order on all of their workers, so the
+    k-th call of a layer in a pass on one worker matches the k-th call on
+    every other worker.  For each such call, the durations and start times
+    are compared across workers.  Since a collective completes only when its
+    last worker arrives, the worker that starts last is the straggler that
+    the others wait for.
+
+    Parameters
+    ----------
+    paths : iterable
+        Paths of the traces of the workers.
+    output_path : str, optional
+        If given, path of the merged trace.
+    threshold : float, optional
+        A call is flagged if its longest duration exceeds its mean duration,
+        across workers, by more than this factor.
+
+    Returns
+    -------
+    Dict with, under ``"calls"``, the flagged calls, with their mean and
+    maximum duration, the imbalance ratio, the straggler and the spread of
+    the start times, slowest first, and, under ``"workers"``, the total time
+    and waiting time in communication of each worker.
+
+    """
+
+    merged = list()
+    for path in paths:
+        with open(path) as f:
+            trace = json.load(f)
+        merged.extend(trace["traceEvents"] if isinstance(trace, dict) else trace)
+
+    if output_path is not None:
+        with open(output_path, "w") as f:
+            json.dump({"traceEvents": merged, "displayTimeUnit": "ms"}, f)
+
+    # Match the k-th call of each layer and direction across workers
+    calls = dict()
+    counts = dict()
+    workers = dict()
+    for event in sorted(merged, key=lambda e: (e["pid"], e["ts"])):
+        key = (event["pid"], event["name"], event["cat"])
+        k = counts.get(key, 0)
+        counts[key] = k + 1
+        calls.setdefault((event["name"], event["cat"], k), list()).append(event)
+
+        totals = workers.setdefault(event["pid"], {"total_us": 0.0, "wait_us": 0.0})
+        totals["total_us"] += event["dur"]
+        totals["wait_us"] += event["args"].get("wait_us", 0.0)
+
+    flagged = list()
+    for (name, direction, k), group in calls.items():
+        if len(group) < 2:
+            continue
+        durations = [e["dur"] for e in group]
+        mean = sum(durations) / len(durations)
+        imbalance = max(durations) / mean if mean > 0 else 1.0
+        if imbalance > threshold:
+            last = max(group, key=lambda e: e["ts"])
+            flagged.append({"name": name,
+                            "direction": direction,
+                            "call": k,
+                            "primitive": group[0]["args"].get("primitive"),
+                            "mean_us": mean,
+                            "max_us": max(durations),
+                            "imbalance": imbalance,
+                            "straggler": last["pid"],
+                            "skew_us": last["ts"] - min(e["ts"] for e in group)})
+
+    flagged.sort(key=lambda call: call["max_us"] - call["mean_us"], reverse=True)
+
+    return {"calls": flagged, "workers": workers}
+
+
+def _partitions(module):
+
+    partitions = dict()
+    for name in ("P_x", "P_y"):
+        P = getattr(module, name, None)
+        if P is not None and getattr(P, "shape", None) is not None:
+            partitions[name] = [int(s) for s in P.shape]
+
+    return partitions
+
+
+def _finish(span, output):
+    r"""Completes the record of a forward call, and arranges for the backward
+    call to be recorded."""
+
+    span.end = time.perf_counter()
+    _spans.append(span)
+
+    grad_fn = getattr(output, "grad_fn", None)
+    if _enabled and grad_fn is not None:
+        state = dict()
+
+        def pre_hook(grad_outputs):
+            global _span
+            state["previous"] = _span
+            _span = _Span(span.layer, span.primitive, span.partitions, "backward")
+
+        def post_hook(grad_inputs, grad_outputs):
+            global _span
+            _span.end = time.perf_counter()
+            _spans.append(_span)
+            _span = state["previous"]
+
+        grad_fn.register_prehook(pre_hook)
+        grad_fn.register_hook(post_hook)
+
+    return output
+
+
+def traced(primitive):
+    r"""Decorates the ``forward`` of a primitive, so that its calls are
+    recorded when tracing is enabled.
+
+    Calls that return their input unchanged, e.g., on inactive workers, do
+    not communicate and are not recorded.
+
+    Parameters
+    ----------
+    primitive : str
+        Name of the type of the primitive.
+
+    """
+
+    def decorator(forward):
+
+        @functools.wraps(forward)
+        def wrapper(module, input, *args, **kwargs):
+
+            global _span
+
+            if not _enabled:
+                return forward(module, input, *args, **kwargs)
+
+            span = _Span(_names.get(id(module), type(module).__name__), primitive, _partitions(module), "forward")
+            previous = _span
+            _span = span
+            try:
+                output = forward(module, input, *args, **kwargs)
+            finally:
+                _span = previous
+
+            if output is input:
+                return output
+
+            # Asynchronous calls are complete once their handle is waited on
+            if hasattr(output, "then"):
+                return output.then(lambda result: result if result is input else _finish(span, result))
+
+            return _finish(span, output)
+
+        return wrapper
+
+    return decorator
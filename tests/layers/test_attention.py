@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("P_x_shape, kv_heads, comm_split_fixture",
+                         [pytest.param([1, 1, 1, 1], 4, 1, id="sequential", marks=[pytest.mark.mpi(min_size=1)]),
+                          pytest.param([1, 1, 4, 1], 4, 4, id="ring-4", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param([1, 1, 4, 1], 2, 4, id="ring-4-gqa", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param([2, 1, 2, 1], 4, 4, id="batch-ring-2", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param([1, 2, 2, 1], 2, 4, id="heads-ring-2-gqa", marks=[pytest.mark.mpi(min_size=4)])],
+                         indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("causal", [False, True])
+def test_attention_matches_sequential(barrier_fence_fixture,
+                                      comm_split_fixture,
+                                      P_x_shape, kv_heads, causal):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.attention import DistributedAttention
+    from distdl.utilities.slicing import compute_start_index
+    from distdl.utilities.slicing import compute_stop_index
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(P_world.size))
+    P_x = P_x_base.create_cartesian_topology_partition(P_x_shape)
+
+    # The same global tensors on all workers.  The sequence is not evenly
+    # divisible by the partition.
+    torch.manual_seed(0)
+    batch, heads, sequence, head_dim = 2, 4, 10, 8
+    q_global = torch.randn(batch, heads, sequence, head_dim, dtype=torch.float64, requires_grad=True)
+    k_global = torch.randn(batch, kv_heads, sequence, head_dim, dtype=torch.float64, requires_grad=True)
+    v_global = torch.randn(batch, kv_heads, sequence, head_dim, dtype=torch.float64, requires_grad=True)
+    dy_global = torch.randn(batch, heads, sequence, head_dim, dtype=torch.float64)
+
+    groups = heads // kv_heads
+    y_global = torch.nn.functional.scaled_dot_product_attention(q_global,
+                                                                k_global.repeat_interleave(groups, dim=1),
+                                                                v_global.repeat_interleave(groups, dim=1),
+                                                                is_causal=causal)
+    y_global.backward(dy_global)
+
+    def local(tensor):
+        start = compute_start_index(P_x.shape, P_x.index, tensor.shape)
+        stop = compute_stop_index(P_x.shape, P_x.index, tensor.shape)
+        return tensor.detach()[tuple(slice(a, b) for a, b in zip(start, stop))]
+
+    q = local(q_global).requires_grad_(True)
+    k = local(k_global).requires_grad_(True)
+    v = local(v_global).requires_grad_(True)
+
+    layer = DistributedAttention(P_x, causal=causal)
+
+    y = layer(q, k, v)
+    assert torch.allclose(y, local(y_global))
+
+    # The adjoint recomputes the scores block by block
+    y.backward(local(dy_global))
+    assert torch.allclose(q.grad, local(q_global.grad))
+    assert torch.allclose(k.grad, local(k_global.grad))
+    assert torch.allclose(v.grad, local(v_global.grad))
+
+    with pytest.raises(ValueError):
+        layer(q, k, v[..., :-1])
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("P_x_shape, comm_split_fixture",
+                         [pytest.param([1, 1, 1, 1], 1, id="sequential", marks=[pytest.mark.mpi(min_size=1)]),
+                          pytest.param([1, 1, 4, 1], 4, id="ring-4", marks=[pytest.mark.mpi(min_size=4)])],
+                         indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("dtype", ["float16", "bfloat16"])
+def test_attention_reduced_precision(barrier_fence_fixture,
+                                     comm_split_fixture,
+                                     P_x_shape, dtype):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.attention import DistributedAttention
+    from distdl.utilities.slicing import compute_start_index
+    from distdl.utilities.slicing import compute_stop_index
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(P_world.size))
+    P_x = P_x_base.create_cartesian_topology_partition(P_x_shape)
+
+    # Scores with a large offset, and many keys, so that reduced precision
+    # accumulators lose the contributions of later blocks
+    dtype = getattr(torch, dtype)
+    torch.manual_seed(0)
+    batch, heads, sequence, head_dim = 1, 2, 512, 8
+    q_global = torch.randn(batch, heads, sequence, head_dim).to(dtype)
+    k_global = torch.randn(batch, heads, sequence, head_dim).to(dtype)
+    v_global = (torch.randn(batch, heads, sequence, head_dim) + 4).to(dtype)
+    dy_global = torch.randn(batch, heads, sequence, head_dim).to(dtype)
+
+    # The reference is computed in double precision, from the same inputs
+    q_ref = q_global.double().requires_grad_(True)
+    k_ref = k_global.double().requires_grad_(True)
+    v_ref = v_global.double().requires_grad_(True)
+    y_global = torch.nn.functional.scaled_dot_product_attention(q_ref, k_ref, v_ref)
+    y_global.backward(dy_global.double())
+
+    def local(tensor):
+        start = compute_start_index(P_x.shape, P_x.index, tensor.shape)
+        stop = compute_stop_index(P_x.shape, P_x.index, tensor.shape)
+        return tensor.detach()[tuple(slice(a, b) for a, b in zip(start, stop))]
+
+    q = local(q_global).requires_grad_(True)
+    k = local(k_global).requires_grad_(True)
+    v = local(v_global).requires_grad_(True)
+
+    layer = DistributedAttention(P_x)
+
+    y = layer(q, k, v)
+    assert y.dtype == dtype
+
+    # Within a few units in the last place of the output
+    eps = torch.finfo(dtype).eps
+    assert torch.allclose(y.double(), local(y_global), rtol=4 * eps, atol=0)
+
+    y.backward(local(dy_global))
+    assert q.grad.dtype == dtype
+    for grad, grad_ref in [(q.grad, q_ref.grad), (k.grad, k_ref.grad), (v.grad, v_ref.grad)]:
+        grad_ref = local(grad_ref)
+        assert torch.allclose(grad.double(), grad_ref, rtol=0, atol=8 * eps * grad_ref.abs().max().item())
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
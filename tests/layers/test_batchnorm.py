@@ -125,13 +125,15 @@ parametrizations_non_affine.append(
                          "comm_split_fixture",
                          parametrizations_affine,
                          indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("fused_statistics", [False, True])
 def test_batch_norm_with_training(barrier_fence_fixture,
                                   P_x_ranks, P_x_shape,
                                   input_shape,
                                   num_features, eps, momentum, affine,
                                   track_running_stats,
                                   affine_workers,
-                                  comm_split_fixture):
+                                  comm_split_fixture,
+                                  fused_statistics):
 
     from distdl.backends.common.partition import MPIPartition
     from distdl.config import set_backend
@@ -207,7 +209,8 @@ def test_batch_norm_with_training(barrier_fence_fixture,
                                              eps=eps,
                                              momentum=momentum,
                                              affine=affine,
-                                             track_running_stats=track_running_stats)
+                                             track_running_stats=track_running_stats,
+                                             fused_statistics=fused_statistics)
     dist_bn = dist_bn.to(P_x.device)
     tr2 = distdl.nn.Repartition(P_x, P_in_out)
     tr2 = tr2.to(P_x.device)
@@ -293,12 +296,14 @@ def test_batch_norm_with_training(barrier_fence_fixture,
                          "comm_split_fixture",
                          parametrizations_non_affine,
                          indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("fused_statistics", [False, True])
 def test_batch_norm_no_training(barrier_fence_fixture,
                                 P_x_ranks, P_x_shape,
                                 input_shape,
                                 num_features, eps, momentum, affine,
                                 track_running_stats,
-                                comm_split_fixture):
+                                comm_split_fixture,
+                                fused_statistics):
 
     from distdl.backends.common.partition import MPIPartition
     from distdl.config import set_backend
@@ -350,7 +355,8 @@ def test_batch_norm_no_training(barrier_fence_fixture,
                                                                   eps=eps,
                                                                   momentum=momentum,
                                                                   affine=affine,
-                                                                  track_running_stats=track_running_stats),
+                                                                  track_running_stats=track_running_stats,
+                                                                  fused_statistics=fused_statistics),
                                    distdl.nn.Repartition(P_x, P_in_out))
     dist_net = dist_net.to(P_x.device)
 
@@ -384,3 +390,50 @@ def test_batch_norm_no_training(barrier_fence_fixture,
     P_x.deactivate()
     P_in_out_base.deactivate()
     P_in_out.deactivate()
+
+
+@pytest.mark.parametrize("dtype, mean, length",
+                         [pytest.param(torch.float32, 1e4, 8, id="large-mean"),
+                          pytest.param(torch.float16, 0.0, 20000, id="half-large-volume")])
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_batch_norm_fused_statistics_precision(barrier_fence_fixture,
+                                               comm_split_fixture,
+                                               dtype, mean, length):
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.utilities.slicing import compute_start_index
+    from distdl.utilities.slicing import compute_stop_index
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([4, 1, 1])
+
+    # The same global input on all workers.  Either the mean is much larger
+    # than the standard deviation, or the volume of each feature is larger
+    # than the largest half precision number.
+    torch.manual_seed(0)
+    x_global = mean + torch.randn(4, 3, length, dtype=torch.float64)
+    y_global = torch.nn.functional.batch_norm(x_global, None, None, training=True)
+
+    start = compute_start_index(P_x.shape, P_x.index, x_global.shape)
+    stop = compute_stop_index(P_x.shape, P_x.index, x_global.shape)
+    local = tuple(slice(a, b) for a, b in zip(start, stop))
+
+    layer = distdl.nn.DistributedBatchNorm(P_x, num_features=3, affine=False, track_running_stats=False,
+                                           fused_statistics=True)
+    y = layer(x_global[local].to(dtype))
+
+    assert torch.isfinite(y).all()
+    assert torch.allclose(y.double(), y_global[local], atol=1e-2)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
@@ -258,6 +258,8 @@ params.append(
                          "comm_split_fixture",
                          params,
                          indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("overlap_halo, persistent_buffer",
+                         [(False, False), (True, False), (False, True), (True, True)])
 def test_conv_versus_pytorch(barrier_fence_fixture,
                              comm_split_fixture,
                              P_x_ranks, P_x_shape,
@@ -267,7 +269,9 @@ def test_conv_versus_pytorch(barrier_fence_fixture,
                              padding,
                              stride,
                              dilation,
-                             bias):
+                             bias,
+                             overlap_halo,
+                             persistent_buffer):
 
     import numpy as np
     import torch
@@ -324,7 +328,9 @@ def test_conv_versus_pytorch(barrier_fence_fixture,
                                  padding=padding,
                                  stride=stride,
                                  dilation=dilation,
-                                 bias=bias)
+                                 bias=bias,
+                                 overlap_halo=overlap_halo,
+                                 persistent_buffer=persistent_buffer)
     dist_layer = dist_layer.to(P_x.device)
     if P_0.active:
         seq_layer = seq_layer_type(in_channels=x_global_shape[1],
@@ -404,3 +410,120 @@ def test_conv_versus_pytorch(barrier_fence_fixture,
     P_0.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("overlap_halo", [False, True])
+def test_conv_persistent_buffer_reuse(barrier_fence_fixture,
+                                      comm_split_fixture,
+                                      overlap_halo):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.conv_feature import DistributedFeatureConv2d
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 1, 2, 2])
+
+    layers = [DistributedFeatureConv2d(P_x, in_channels=3, out_channels=4, kernel_size=3, padding=1,
+                                       overlap_halo=overlap_halo, persistent_buffer=persistent_buffer)
+              for persistent_buffer in [False, True]]
+    with torch.no_grad():
+        layers[1].weight.copy_(layers[0].weight)
+        layers[1].bias.copy_(layers[0].bias)
+
+    # Two forward passes through the same layer, e.g., for two micro-batches,
+    # before a single backward pass
+    torch.manual_seed(P_x.rank)
+    xs = [torch.randn(2, 3, 5, 6) for _ in range(2)]
+    dys = [torch.randn(2, 4, 5, 6) for _ in range(2)]
+
+    grads = []
+    for layer in layers:
+        inputs = [x.clone().requires_grad_(True) for x in xs]
+        ys = [layer(x) for x in inputs]
+        sum((y * dy).sum() for y, dy in zip(ys, dys)).backward()
+        grads.append([x.grad for x in inputs] + [layer.weight.grad, layer.bias.grad])
+
+    for grad, grad_ref in zip(grads[1], grads[0]):
+        assert torch.allclose(grad, grad_ref, atol=1e-5)
+
+    # Once the backward pass has released it, the buffer is reused
+    buffer = layers[1].padded_buffer
+    layers[1](xs[0].clone().requires_grad_(True)).sum().backward()
+    assert layers[1].padded_buffer is buffer
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_conv_overlap_halo_in_flight(barrier_fence_fixture,
+                                     comm_split_fixture):
+
+    import torch
+    from mpi4py import MPI
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.conv_feature import DistributedFeatureConv2d
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Only the spatial dimensions are partitioned
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 1, 2, 2])
+
+    layer = DistributedFeatureConv2d(P_x, in_channels=3, out_channels=4, kernel_size=3, padding=1,
+                                     overlap_halo=True)
+    x = torch.randn(2, 3, 5, 6)
+    y_ref = layer(x)
+
+    # Record the exchange started by the layer, and its requests when the
+    # interior is computed
+    works = []
+    halo_forward = layer.halo_layer.forward
+
+    def record_work(*args, **kwargs):
+        works.append(halo_forward(*args, **kwargs))
+        return works[-1]
+
+    in_flight = []
+    conv_forward = layer.conv_layer.forward
+
+    def record_requests(input):
+        if len(in_flight) == 0:
+            work = works[-1]
+            in_flight.append(0 if work._completed else sum(r != MPI.REQUEST_NULL for r in work._requests))
+        return conv_forward(input)
+
+    layer.halo_layer.forward = record_work
+    layer.conv_layer.forward = record_requests
+
+    y = layer(x)
+    assert torch.allclose(y, y_ref)
+
+    # Each worker of the 2 x 2 grid has a neighbor along each spatial
+    # dimension, and a diagonal one, with one send and one receive each
+    assert in_flight == [6]
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
@@ -308,3 +308,80 @@ def test_linear_adjoint_bias(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_expert_ragged(barrier_fence_fixture,
+                       comm_split_fixture):
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.linear_ag_expert import DistributedExpertAllGather
+    from distdl.utilities.slicing import compute_subshape
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Experts are partitioned over 2 workers and features over 2 workers
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([2, 1, 1, 2])
+
+    num_experts = 4
+    capacity = 5
+    x_global_shape = [num_experts, capacity, 3, 6]
+    out_features = 8
+
+    layer = DistributedExpertAllGather(P_x, num_experts, x_global_shape[-1], out_features, bias=True)
+
+    # The model-parallel workers of an expert share its tokens, and some
+    # experts have none
+    counts = [(2, 0), (5, 3)][P_x.index[0]]
+
+    x_local_shape = compute_subshape(P_x.shape, P_x.index, x_global_shape)
+    x_padded = torch.zeros(*x_local_shape)
+    for e, count in enumerate(counts):
+        x_padded[e, :count] = torch.randn(count, *x_local_shape[2:])
+    x_packed = torch.cat([x_padded[e, :count] for e, count in enumerate(counts)]).requires_grad_(True)
+    x_padded.requires_grad = True
+
+    y_padded = layer(x_padded)
+    dy_padded = torch.zeros_like(y_padded)
+    for e, count in enumerate(counts):
+        dy_padded[e, :count] = torch.randn(count, *y_padded.shape[2:])
+    y_padded.backward(dy_padded)
+    dw_padded = layer.weight.grad.clone()
+    layer.weight.grad = None
+
+    # Only the routed tokens are computed and communicated
+    y_packed = layer(x_packed, expert_counts=counts)
+    assert y_packed.shape == (sum(counts),) + y_padded.shape[2:]
+    y_packed.backward(torch.cat([dy_padded[e, :count] for e, count in enumerate(counts)]))
+
+    for e, count in enumerate(counts):
+        offset = sum(counts[:e])
+        assert torch.allclose(y_packed[offset:offset + count], y_padded[e, :count], atol=1e-6)
+        assert torch.allclose(x_packed.grad[offset:offset + count], x_padded.grad[e, :count], atol=1e-6)
+    assert torch.allclose(layer.weight.grad, dw_padded, atol=1e-6)
+
+    # A batch with one token less is communicated without a new setup
+    setups = []
+    setup = layer.all_gather_hidden._distdl_module_setup
+    layer.all_gather_hidden._distdl_module_setup = lambda input: setups.append(input) or setup(input)
+
+    last = max(e for e, count in enumerate(counts) if count > 0)
+    fewer_counts = tuple(count - (e == last) for e, count in enumerate(counts))
+    y_fewer = layer(x_packed.detach()[:-1].requires_grad_(True), expert_counts=fewer_counts)
+    assert len(setups) == 0
+    assert torch.allclose(y_fewer, y_packed[:-1], atol=1e-6)
+
+    with pytest.raises(ValueError):
+        layer(x_packed, expert_counts=(sum(counts) + 1, 0))
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
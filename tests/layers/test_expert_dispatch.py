@@ -0,0 +1,125 @@
+import math
+
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("num_experts, top_k, comm_split_fixture",
+                         [pytest.param(4, 1, 4, id="top-1", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param(6, 2, 4, id="top-2-uneven", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param(3, 2, 4, id="fewer-experts", marks=[pytest.mark.mpi(min_size=4)])],
+                         indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("ragged", [False, True])
+def test_expert_dispatch_combine(barrier_fence_fixture,
+                                 comm_split_fixture,
+                                 num_experts, top_k, ragged):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.expert_dispatch import ExpertDispatch
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_x = MPIPartition(base_comm)
+
+    torch.manual_seed(P_x.rank)
+
+    # Workers hold different numbers of tokens
+    num_tokens = 5 + P_x.rank
+    x = torch.rand(num_tokens, 3, 2, dtype=torch.float64, requires_grad=True)
+    expert_index = torch.stack([torch.randperm(num_experts)[:top_k] for _ in range(num_tokens)])
+    weights = torch.rand(num_tokens, top_k, dtype=torch.float64, requires_grad=True)
+
+    layer = ExpertDispatch(P_x, num_experts, ragged=ragged)
+
+    y, routing = layer(x, expert_index)
+    assert len(routing.expert_counts) == layer.num_experts_local
+    assert routing.num_dropped == 0
+
+    # Each expert scales its tokens by its global index, plus one
+    expert_scale = layer.expert_offsets[P_x.rank] + 1 + torch.arange(layer.num_experts_local, dtype=torch.float64)
+    if ragged:
+        # Tokens are packed by expert, without padding
+        assert y.shape == (sum(routing.expert_counts),) + x.shape[1:]
+        expert_counts = torch.tensor(routing.expert_counts, dtype=torch.int64)
+        y = y * torch.repeat_interleave(expert_scale, expert_counts).reshape(-1, 1, 1)
+    else:
+        assert y.shape[0] == layer.num_experts_local
+        assert y.shape[2:] == x.shape[1:]
+        y = y * expert_scale.reshape(-1, 1, 1, 1)
+
+    z = layer.combine(y, routing, weights)
+
+    scale = (weights * (expert_index + 1)).sum(dim=1)
+    expected = x * scale.reshape(-1, 1, 1)
+    assert torch.allclose(z, expected)
+
+    dz = torch.rand_like(z)
+    z.backward(dz)
+    assert torch.allclose(x.grad, dz * scale.reshape(-1, 1, 1))
+    grad_weights = (dz.unsqueeze(1) * x.detach().unsqueeze(1)).sum(dim=(2, 3)) * (expert_index + 1)
+    assert torch.allclose(weights.grad, grad_weights)
+
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_expert_dispatch_capacity(barrier_fence_fixture,
+                                  comm_split_fixture):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.expert_dispatch import ExpertDispatch
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_x = MPIPartition(base_comm)
+
+    num_experts = 4
+    num_tokens = 6
+    top_k = 2
+    capacity_factor = 1.0
+    local_capacity = math.ceil(capacity_factor * num_tokens * top_k / num_experts)
+
+    # All first choices are expert 0, so the last tokens overflow it.  The
+    # second choices, expert 1 + (token % 3), do not overflow.
+    x = torch.rand(num_tokens, 4, dtype=torch.float64, requires_grad=True)
+    expert_index = torch.stack([torch.zeros(num_tokens, dtype=torch.int64),
+                                1 + torch.arange(num_tokens) % 3], dim=1)
+
+    layer = ExpertDispatch(P_x, num_experts, capacity_factor=capacity_factor)
+
+    y, routing = layer(x, expert_index)
+    assert routing.num_dropped == num_tokens - local_capacity
+    if P_x.rank == 0:
+        # Expert 0 receives its capacity from each worker
+        assert y.shape == (1, P_x.size * local_capacity, 4)
+        assert torch.count_nonzero(y.detach().abs().sum(dim=-1)) == P_x.size * local_capacity
+
+    z = layer.combine(y, routing)
+
+    kept = torch.arange(num_tokens) < local_capacity
+    expected = x.detach() * (1 + kept.to(x.dtype)).reshape(-1, 1)
+    assert torch.allclose(z, expected)
+
+    z.sum().backward()
+    assert torch.allclose(x.grad, (1 + kept.to(x.dtype)).reshape(-1, 1).expand_as(x))
+
+    with pytest.raises(ValueError):
+        layer(x, torch.full((num_tokens,), num_experts))
+
+    P_x.deactivate()
@@ -421,3 +421,67 @@ def test_linear_adjoint_bias(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("P_y_shape, y_global_shape",
+                         [pytest.param(None, [2, 7, 10], id="scatter-features"),
+                          pytest.param([1, 4, 1], [2, 10, 7], id="scatter-tokens")])
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_linear_chunked(barrier_fence_fixture,
+                        comm_split_fixture,
+                        P_y_shape, y_global_shape):
+
+    import numpy as np
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.linear_rs import DistributedLinearReduceScatter
+    from distdl.utilities.slicing import compute_subshape
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 1, 4])
+    P_y = P_x_base.create_cartesian_topology_partition(P_y_shape) if P_y_shape is not None else None
+
+    x_global_shape = np.asarray(y_global_shape[:-1] + [12])
+    out_features = y_global_shape[-1]
+
+    layer = DistributedLinearReduceScatter(P_x, 12, out_features, bias=True, P_y=P_y)
+    chunked = DistributedLinearReduceScatter(P_x, 12, out_features, bias=True, P_y=P_y, num_chunks=3)
+    for p, p_chunked in zip(layer.parameters(), chunked.parameters()):
+        p_chunked.data.copy_(p.data)
+
+    x_local_shape = compute_subshape(P_x.shape, P_x.index, x_global_shape)
+    x = torch.randn(*x_local_shape, dtype=torch.float64)
+    layer.to(x.dtype)
+    chunked.to(x.dtype)
+
+    x_chunked = x.clone().requires_grad_(True)
+    x.requires_grad = True
+
+    # The pipelined product matches the reduce-scattered product
+    y = layer(x)
+    y_chunked = chunked(x_chunked)
+    assert torch.allclose(y_chunked, y)
+
+    dy = torch.randn_like(y)
+    y.backward(dy)
+    y_chunked.backward(dy)
+    assert torch.allclose(x_chunked.grad, x.grad)
+    for p, p_chunked in zip(layer.parameters(), chunked.parameters()):
+        assert torch.allclose(p_chunked.grad, p.grad)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+    if P_y is not None:
+        P_y.deactivate()
@@ -213,6 +213,8 @@ params.append(
                          params,
                          indirect=["comm_split_fixture"])
 @pytest.mark.parametrize("layer_type", ['max', 'avg'])
+@pytest.mark.parametrize("overlap_halo, persistent_buffer",
+                         [(False, False), (True, False), (False, True), (True, True)])
 def test_matches_sequential(barrier_fence_fixture,
                             comm_split_fixture,
                             P_x_ranks, P_x_shape,
@@ -222,7 +224,9 @@ def test_matches_sequential(barrier_fence_fixture,
                             padding,
                             stride,
                             dilation,
-                            layer_type):
+                            layer_type,
+                            overlap_halo,
+                            persistent_buffer):
 
     import numpy as np
     import torch
@@ -296,7 +300,8 @@ def test_matches_sequential(barrier_fence_fixture,
     if layer_type == 'max':
         layer_kwargs['dilation'] = dilation
 
-    dist_layer = DistributedPoolType(P_x, **layer_kwargs).to(P_x.device)
+    dist_layer = DistributedPoolType(P_x, overlap_halo=overlap_halo, persistent_buffer=persistent_buffer,
+                                     **layer_kwargs).to(P_x.device)
     if P_0.active:
         seq_layer = SequentialPoolType(**layer_kwargs).to(P_x.device)
 
@@ -359,3 +364,56 @@ def test_matches_sequential(barrier_fence_fixture,
     P_0.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("overlap_halo", [False, True])
+def test_pool_persistent_buffer_reuse(barrier_fence_fixture,
+                                      comm_split_fixture,
+                                      overlap_halo):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn import DistributedMaxPool2d
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 1, 2, 2])
+
+    layers = [DistributedMaxPool2d(P_x, kernel_size=3, padding=1, overlap_halo=overlap_halo,
+                                   persistent_buffer=persistent_buffer)
+              for persistent_buffer in [False, True]]
+
+    # Two forward passes through the same layer, e.g., for two micro-batches,
+    # before a single backward pass
+    torch.manual_seed(P_x.rank)
+    xs = [torch.randn(2, 3, 5, 6) for _ in range(2)]
+    dys = [torch.randn(2, 3, 5, 6) for _ in range(2)]
+
+    grads = []
+    for layer in layers:
+        inputs = [x.clone().requires_grad_(True) for x in xs]
+        ys = [layer(x) for x in inputs]
+        sum((y * dy).sum() for y, dy in zip(ys, dys)).backward()
+        grads.append([x.grad for x in inputs])
+
+    for grad, grad_ref in zip(grads[1], grads[0]):
+        assert torch.equal(grad, grad_ref)
+
+    # Once the backward pass has released it, the buffer is reused
+    buffer = layers[1].padded_buffer
+    layers[1](xs[0].clone().requires_grad_(True)).sum().backward()
+    assert layers[1].padded_buffer is buffer
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
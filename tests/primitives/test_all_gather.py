@@ -152,3 +152,187 @@ def test_all_sum_reduce_adjoint(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_all_gather_async(barrier_fence_fixture,
+                          comm_split_fixture):
+
+    import torch
+
+    import distdl.utilities.slicing as slicing
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_gather import AllGather
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([2, 3])
+
+    x_global_shape = [5, 7]
+    y_global_shape = [5, 21]
+    x_local_shape = slicing.compute_subshape(P_x.shape, P_x.index, x_global_shape)
+    y_local_shape = slicing.compute_subshape(P_x.shape, P_x.index, y_global_shape)
+
+    layer = AllGather(P_x, axes_all_gather=(1,))
+
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = torch.rand(*x_local_shape)
+        dy = torch.rand(*y_local_shape)
+
+    x_sync = x.clone().requires_grad_(True)
+    x_async = x.clone().requires_grad_(True)
+
+    y_sync = layer(x_sync)
+    y_sync.backward(dy)
+
+    # The result is only available after the handle is waited on
+    work = layer(x_async, async_op=True)
+    y_async = work.wait()
+    assert work.test()
+    y_async.backward(dy)
+
+    assert torch.equal(y_sync, y_async)
+    assert torch.equal(x_sync.grad, x_async.grad)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_all_gather_uneven(barrier_fence_fixture,
+                           comm_split_fixture):
+
+    import torch
+
+    import distdl.utilities.slicing as slicing
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_gather import AllGather
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 3, 2])
+
+    # The gathered dimension does not divide evenly and is not the leading one
+    global_shape = [2, 7, 5]
+    x_global = torch.arange(np.prod(global_shape), dtype=torch.float64).reshape(global_shape)
+    dy_global = torch.flip(x_global, [1])
+
+    start = slicing.compute_start_index(P_x.shape, P_x.index, global_shape)
+    stop = slicing.compute_stop_index(P_x.shape, P_x.index, global_shape)
+    x_slice = tuple(slice(a, b) for a, b in zip(start, stop))
+    y_slice = (slice(None), slice(None), x_slice[2])
+
+    layer = AllGather(P_x, axes_all_gather=(1,))
+
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = x_global[x_slice].clone()
+        dy = dy_global[y_slice].clone()
+    x.requires_grad = True
+
+    y = layer(x)
+    y.backward(dy)
+
+    assert torch.equal(y, x_global[y_slice])
+    assert torch.equal(x.grad, 3 * dy_global[x_slice])
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_all_gather_compressed(barrier_fence_fixture,
+                               comm_split_fixture):
+
+    import torch
+
+    import distdl.utilities.slicing as slicing
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_gather import AllGather
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 3, 2])
+
+    x_global_shape = [2, 7, 5]
+    y_global_shape = [2, 21, 5]
+    x_local_shape = slicing.compute_subshape(P_x.shape, P_x.index, x_global_shape)
+    y_local_shape = slicing.compute_subshape(P_x.shape, P_x.index, y_global_shape)
+
+    layer = AllGather(P_x, axes_all_gather=(1,))
+    layer_compressed = AllGather(P_x, axes_all_gather=(1,), comm_dtype=torch.bfloat16)
+
+    # Small integers, and their sums, are exact in bfloat16, so compression
+    # does not change the results
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = torch.randint(-8, 8, tuple(x_local_shape)).float()
+        dy = torch.randint(-8, 8, tuple(y_local_shape)).float()
+
+    x_ref = x.clone().requires_grad_(True)
+    y_ref = layer(x_ref)
+    y_ref.backward(dy)
+
+    x_compressed = x.clone().requires_grad_(True)
+    y_compressed = layer_compressed(x_compressed, async_op=True).wait()
+    y_compressed.backward(dy)
+
+    assert y_compressed.dtype == torch.float32
+    assert torch.equal(y_ref, y_compressed)
+    assert torch.equal(x_ref.grad, x_compressed.grad)
+
+    # The adjoint started outside of autograd is compressed too, as in the
+    # backward pass
+    if P_x.active:
+        dy = torch.randn(*y_local_shape)
+    x_compressed = x.clone().requires_grad_(True)
+    layer_compressed(x_compressed).backward(dy)
+    dx = layer_compressed.start_adjoint(dy).wait()
+    assert torch.equal(dx, x_compressed.grad)
+
+    # Otherwise, all workers receive the same rounded data
+    if P_x.active:
+        x = torch.randn(*x_local_shape)
+    y = layer_compressed(x)
+    y_rounded = layer(x.bfloat16().float())
+    assert torch.equal(y, y_rounded)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
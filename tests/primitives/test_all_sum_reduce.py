@@ -182,3 +182,60 @@ def test_all_sum_reduce_adjoint(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_all_sum_reduce_compressed(barrier_fence_fixture,
+                                   comm_split_fixture):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_sum_reduce import AllSumReduce
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([2, 3])
+
+    layer = AllSumReduce(P_x, axes_reduce=(1,))
+    layer_compressed = AllSumReduce(P_x, axes_reduce=(1,), comm_dtype=torch.bfloat16)
+
+    # Small integers, and their sums, are exact in bfloat16, so compression
+    # does not change the results.  The size does not divide evenly.
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = torch.randint(-8, 8, (5, 7)).float()
+        dy = torch.randint(-8, 8, (5, 7)).float()
+
+    x_ref = x.clone().requires_grad_(True)
+    y_ref = layer(x_ref)
+    y_ref.backward(dy)
+
+    x_compressed = x.clone().requires_grad_(True)
+    y_compressed = layer_compressed(x_compressed, async_op=True).wait()
+    y_compressed.backward(dy)
+
+    assert torch.equal(y_ref, y_compressed)
+    assert torch.equal(x_ref.grad, x_compressed.grad)
+
+    # Otherwise, the sum of the rounded inputs is rounded once
+    if P_x.active:
+        x = torch.randn(5, 7)
+    y = layer_compressed(x)
+    y_rounded = layer(x.bfloat16().float()).bfloat16().float()
+    assert torch.allclose(y, y_rounded, rtol=2**-7, atol=0)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+from adjoint_test import check_adjoint_test_tight
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+def _send_counts(rank, size):
+    # Variable counts, including empty messages and a message to self
+    return [(rank + 2 * i) % 3 for i in range(size)]
+
+
+@pytest.mark.parametrize("P_x_shape, comm_split_fixture",
+                         [pytest.param([4], 4, id="distributed-1D", marks=[pytest.mark.mpi(min_size=4)]),
+                          pytest.param([2, 3], 6, id="distributed-2D", marks=[pytest.mark.mpi(min_size=6)])],
+                         indirect=["comm_split_fixture"])
+def test_all_to_all_adjoint(barrier_fence_fixture,
+                            comm_split_fixture,
+                            P_x_shape):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_to_all import AllToAll
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(P_world.size))
+    P_x = P_x_base.create_cartesian_topology_partition(P_x_shape)
+
+    send_counts = _send_counts(P_x.rank, P_x.size)
+    recv_counts = [_send_counts(i, P_x.size)[P_x.rank] for i in range(P_x.size)]
+
+    layer = AllToAll(P_x)
+
+    x = torch.rand(sum(send_counts), 3, 2, dtype=torch.float64)
+    x.requires_grad = True
+    dy = torch.rand(sum(recv_counts), 3, 2, dtype=torch.float64)
+
+    # y = F @ x
+    y = layer(x, send_counts)
+    assert y.shape == dy.shape
+
+    # dx = F* @ dy
+    y.backward(dy)
+    dx = x.grad
+
+    x = x.detach()
+    dx = dx.detach()
+    dy = dy.detach()
+    y = y.detach()
+
+    check_adjoint_test_tight(P_world, x, dx, y, dy)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_all_to_all_values(barrier_fence_fixture,
+                           comm_split_fixture):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_to_all import AllToAll
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_x = MPIPartition(base_comm)
+
+    send_counts = _send_counts(P_x.rank, P_x.size)
+    recv_counts = [_send_counts(i, P_x.size)[P_x.rank] for i in range(P_x.size)]
+
+    # Each row holds its source, its destination and its index in the message
+    x = torch.tensor([[P_x.rank, i, j] for i in range(P_x.size) for j in range(send_counts[i])],
+                     dtype=torch.float32).reshape(-1, 3)
+    expected = torch.tensor([[i, P_x.rank, j] for i in range(P_x.size) for j in range(recv_counts[i])],
+                            dtype=torch.float32).reshape(-1, 3)
+
+    layer = AllToAll(P_x)
+    assert layer.exchange_counts(send_counts) == tuple(recv_counts)
+
+    y_sync = layer(x, send_counts)
+    assert torch.equal(y_sync, expected)
+
+    # The result is only available after the handle is waited on
+    x_async = x.clone().requires_grad_(True)
+    work = layer(x_async, send_counts, recv_counts, async_op=True)
+    y_async = work.wait()
+    assert work.test()
+    assert torch.equal(y_async, expected)
+
+    # The adjoint returns each row to its source
+    y_async.backward(y_async.detach())
+    assert torch.equal(x_async.grad, x)
+
+    with pytest.raises(ValueError):
+        layer(x, send_counts[:-1])
+
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("dtype", ["float32", "bfloat16"])
+def test_all_to_all_shift(barrier_fence_fixture,
+                          comm_split_fixture,
+                          dtype):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.all_to_all import AllToAll
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_x = MPIPartition(base_comm)
+
+    dtype = getattr(torch, dtype)
+    layer = AllToAll(P_x)
+
+    # Several shifts may be in flight at once
+    x = torch.full((3, 2), P_x.rank, dtype=dtype)
+    work_1 = layer.start_shift(x)
+    work_2 = layer.start_shift(x + 10, displacement=2)
+
+    assert torch.equal(work_2.wait(), torch.full((3, 2), (P_x.rank - 2) % P_x.size + 10, dtype=dtype))
+    assert torch.equal(work_1.wait(), torch.full((3, 2), (P_x.rank - 1) % P_x.size, dtype=dtype))
+
+    P_x.deactivate()
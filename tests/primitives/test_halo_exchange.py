@@ -99,13 +99,15 @@ adjoint_parametrizations.append(
                          "comm_split_fixture",
                          adjoint_parametrizations,
                          indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("concurrent", [False, True])
 def test_halo_exchange_adjoint(barrier_fence_fixture,
                                comm_split_fixture,
                                P_x_ranks, P_x_shape,
                                x_global_shape,
                                dtype,
                                kernel_size, stride, padding, dilation,
-                               MockKernelStyle):
+                               MockKernelStyle,
+                               concurrent):
     import numpy as np
     import torch
     import torch.nn.functional as F
@@ -150,7 +152,8 @@ def test_halo_exchange_adjoint(barrier_fence_fixture,
         recv_buffer_shape = exchange_info[1]
         send_buffer_shape = exchange_info[2]
 
-    halo_layer = HaloExchange(P_x, halo_shape, recv_buffer_shape, send_buffer_shape)
+    halo_layer = HaloExchange(P_x, halo_shape, recv_buffer_shape, send_buffer_shape,
+                              concurrent=concurrent)
     halo_layer = halo_layer.to(P_x.device)
 
     x = zero_volume_tensor(x_global_shape[0], device=P_x.device)
@@ -202,3 +205,115 @@ def test_halo_exchange_adjoint(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+concurrent_parametrizations = []
+
+concurrent_parametrizations.append(
+    pytest.param(
+        np.arange(0, 9), [1, 1, 3, 3],  # P_x_ranks, P_x_shape
+        [1, 2, 10, 7],  # x_global_shape
+        [1, 1, 3, 3],  # kernel_size
+        [1, 1, 1, 1],  # stride
+        9,  # passed to comm_split_fixture, required MPI ranks
+        id="conv-2d",
+        marks=[pytest.mark.mpi(min_size=9)]
+    )
+)
+
+concurrent_parametrizations.append(
+    pytest.param(
+        np.arange(0, 8), [1, 1, 2, 2, 2],  # P_x_ranks, P_x_shape
+        [2, 1, 7, 6, 9],  # x_global_shape
+        [1, 1, 3, 5, 2],  # kernel_size
+        [1, 1, 1, 1, 2],  # stride
+        8,  # passed to comm_split_fixture, required MPI ranks
+        id="conv-3d",
+        marks=[pytest.mark.mpi(min_size=8)]
+    )
+)
+
+
+@pytest.mark.parametrize("P_x_ranks, P_x_shape,"
+                         "x_global_shape,"
+                         "kernel_size,"
+                         "stride,"
+                         "comm_split_fixture",
+                         concurrent_parametrizations,
+                         indirect=["comm_split_fixture"])
+def test_halo_exchange_concurrent_matches_sequential(barrier_fence_fixture,
+                                                     comm_split_fixture,
+                                                     P_x_ranks, P_x_shape,
+                                                     x_global_shape,
+                                                     kernel_size, stride):
+    import numpy as np
+    import torch
+    import torch.nn.functional as F
+    from mpi4py import MPI
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.halo_exchange import HaloExchange
+    from distdl.utilities.slicing import compute_subshape
+    from distdl.utilities.torch import distdl_padding_to_torch_padding
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+    P_x_base = P_world.create_partition_inclusive(P_x_ranks)
+    P_x = P_x_base.create_cartesian_topology_partition(P_x_shape)
+
+    x_global_shape = np.asarray(x_global_shape)
+
+    mockup_layer = MockConvLayer()
+    exchange_info = mockup_layer._compute_exchange_info(x_global_shape,
+                                                        np.asarray(kernel_size),
+                                                        np.asarray(stride),
+                                                        np.zeros(len(kernel_size), dtype=int),
+                                                        np.ones(len(kernel_size), dtype=int),
+                                                        P_x.active,
+                                                        P_x.shape,
+                                                        P_x.index)
+    halo_shape, recv_buffer_shape, send_buffer_shape = exchange_info[:3]
+
+    sequential_layer = HaloExchange(P_x, halo_shape, recv_buffer_shape, send_buffer_shape)
+    concurrent_layer = HaloExchange(P_x, halo_shape, recv_buffer_shape, send_buffer_shape,
+                                    concurrent=True)
+
+    x_local_shape = compute_subshape(P_x.shape, P_x.index, x_global_shape)
+    padding = distdl_padding_to_torch_padding(halo_shape)
+
+    # Fill the bulk with data and the ghosts with garbage, which must be overwritten
+    x = F.pad(torch.randn(*x_local_shape, dtype=torch.float64), pad=padding, mode="constant", value=np.nan)
+    dy = torch.randn(*x.shape, dtype=torch.float64)
+
+    x_sequential = x.clone().requires_grad_(True)
+    x_concurrent = x.clone().requires_grad_(True)
+
+    y_sequential = sequential_layer(x_sequential.clone())
+    y_concurrent = concurrent_layer(x_concurrent.clone())
+
+    # Exchanged data are copies, so they are identical.  Only the order of
+    # accumulation of the adjoint differs.
+    assert torch.equal(y_sequential, y_concurrent)
+
+    dx_sequential = dy.clone()
+    dx_concurrent = dy.clone()
+    y_sequential.backward(dx_sequential)
+    y_concurrent.backward(dx_concurrent)
+
+    assert torch.allclose(dx_sequential, dx_concurrent)
+
+    # Asynchronously, the sequential exchange starts with the first
+    # dimension that has neighbors, rather than the batch dimension
+    work = sequential_layer(x.clone(), async_op=True)
+    assert any(r != MPI.REQUEST_NULL for r in work._requests)
+    assert torch.equal(work.wait(), y_sequential)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
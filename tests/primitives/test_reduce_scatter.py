@@ -150,3 +150,135 @@ def test_all_sum_reduce_adjoint(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_reduce_scatter_uneven(barrier_fence_fixture,
+                               comm_split_fixture):
+
+    import torch
+
+    import distdl.utilities.slicing as slicing
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.reduce_scatter import ReduceScatter
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 3, 2])
+
+    # The scattered dimension does not divide evenly and is not the leading one
+    global_shape = [2, 7, 5]
+    x_global = torch.arange(np.prod(global_shape), dtype=torch.float64).reshape(global_shape)
+    dy_global = torch.flip(x_global, [1])
+
+    start = slicing.compute_start_index(P_x.shape, P_x.index, global_shape)
+    stop = slicing.compute_stop_index(P_x.shape, P_x.index, global_shape)
+    y_slice = tuple(slice(a, b) for a, b in zip(start, stop))
+    x_slice = (slice(None), slice(None), y_slice[2])
+
+    layer = ReduceScatter(P_x, axes_reduce_scatter=(1,))
+
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = (P_x.index[1] + 1) * x_global[x_slice]
+        dy = dy_global[y_slice].clone()
+    x.requires_grad = True
+
+    y = layer(x)
+    y.backward(dy)
+
+    assert torch.equal(y, 6 * x_global[y_slice])
+    assert torch.equal(x.grad, dy_global[x_slice])
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_reduce_scatter_compressed(barrier_fence_fixture,
+                                   comm_split_fixture):
+
+    import torch
+
+    import distdl.utilities.slicing as slicing
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.reduce_scatter import ReduceScatter
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([1, 3, 2])
+
+    # Each worker holds a full, uneven, copy of the scattered dimension
+    x_local_shape = [2, 7, 5]
+    y_local_shape = slicing.compute_subshape([1, 3, 1], [0, P_x.index[1], 0], x_local_shape)
+
+    layer = ReduceScatter(P_x, axes_reduce_scatter=(1,))
+    layer_compressed = ReduceScatter(P_x, axes_reduce_scatter=(1,), comm_dtype=torch.bfloat16)
+
+    # Small integers, and their sums, are exact in bfloat16, so compression
+    # does not change the results
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = torch.randint(-8, 8, tuple(x_local_shape)).float()
+        dy = torch.randint(-8, 8, tuple(y_local_shape)).float()
+
+    x_ref = x.clone().requires_grad_(True)
+    y_ref = layer(x_ref)
+    y_ref.backward(dy)
+
+    x_compressed = x.clone().requires_grad_(True)
+    y_compressed = layer_compressed(x_compressed, async_op=True).wait()
+    y_compressed.backward(dy)
+
+    assert y_compressed.dtype == torch.float32
+    assert torch.equal(y_ref, y_compressed)
+    assert torch.equal(x_ref.grad, x_compressed.grad)
+
+    # The adjoint started outside of autograd is compressed too
+    if P_x.active:
+        dy = torch.randn(*y_local_shape)
+    dx = layer_compressed.start_adjoint(dy).wait()
+    dx_rounded = layer.start_adjoint(dy.bfloat16().float()).wait()
+    assert torch.equal(dx, dx_rounded)
+
+    # With error feedback, the rounding error of each input is added to the
+    # next one, so the sum of the outputs is more accurate
+    layer_feedback = ReduceScatter(P_x, axes_reduce_scatter=(1,), comm_dtype=torch.bfloat16,
+                                   error_feedback=True)
+    if P_x.active:
+        x = 1 + torch.rand(*x_local_shape) / 100
+
+    y_ref = sum(layer(x) for _ in range(8))
+    y_compressed = sum(layer_compressed(x) for _ in range(8))
+    y_feedback = sum(layer_feedback(x) for _ in range(8))
+
+    if P_x.active:
+        assert layer_feedback.residual.shape == x.shape
+        assert (y_feedback - y_ref).abs().max() < (y_compressed - y_ref).abs().max()
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
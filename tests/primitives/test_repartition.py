@@ -660,3 +660,101 @@ def test_repartition_identity(barrier_fence_fixture,
     P_world.deactivate()
     P_x_base.deactivate()
     P_x.deactivate()
+
+
+@pytest.mark.parametrize("P_x_ranks, P_x_shape,"
+                         "P_y_ranks, P_y_shape,"
+                         "x_global_shape,"
+                         "comm_split_fixture",
+                         adjoint_parametrizations,
+                         indirect=["comm_split_fixture"])
+@pytest.mark.parametrize("balanced", [True, False])
+def test_repartition_persistent(barrier_fence_fixture,
+                                comm_split_fixture,
+                                P_x_ranks, P_x_shape,
+                                P_y_ranks, P_y_shape,
+                                x_global_shape,
+                                balanced):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.repartition import Repartition
+    from distdl.utilities.slicing import compute_subshape
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_x_base = P_world.create_partition_inclusive(P_x_ranks)
+    P_x = P_x_base.create_cartesian_topology_partition(P_x_shape)
+
+    P_y_base = P_world.create_partition_inclusive(P_y_ranks)
+    P_y = P_y_base.create_cartesian_topology_partition(P_y_shape)
+
+    # The persistent layer must reproduce the standard layer exactly
+    layer = Repartition(P_x, P_y, preserve_batch=False)
+    layer_persistent = Repartition(P_x, P_y, preserve_batch=False, persistent=True)
+
+    x_local_shape = None
+    if P_x.active:
+        if balanced:
+            x_local_shape = compute_subshape(P_x.shape,
+                                             P_x.index,
+                                             x_global_shape)
+        else:
+            quotient = np.atleast_1d(x_global_shape) // np.atleast_1d(P_x_shape)
+            remainder = np.atleast_1d(x_global_shape) % np.atleast_1d(P_x_shape)
+            loc = np.where(P_x.index == 0)
+            x_local_shape = quotient.copy()
+            x_local_shape[loc] += remainder[loc]
+
+    y_local_shape = None
+    if P_y.active:
+        y_local_shape = compute_subshape(P_y.shape,
+                                         P_y.index,
+                                         x_global_shape)
+
+    # Apply repeatedly, so the persistent requests are restarted
+    for _ in range(3):
+        x = zero_volume_tensor(device=P_x.device)
+        if P_x.active:
+            x = torch.randn(*x_local_shape, device=P_x.device)
+        x.requires_grad = True
+        x_persistent = x.detach().clone()
+        x_persistent.requires_grad = True
+
+        dy = zero_volume_tensor(device=P_x.device)
+        if P_y.active:
+            dy = torch.randn(*y_local_shape, device=P_x.device)
+
+        y = layer(x)
+        y_persistent = layer_persistent(x_persistent)
+        assert layer_persistent.plan is not None
+
+        y.backward(dy)
+        y_persistent.backward(dy)
+
+        assert y_persistent.shape == y.shape
+        assert y_persistent.requires_grad == y.requires_grad
+        assert torch.equal(y_persistent.detach(), y.detach())
+        assert torch.equal(x_persistent.grad, x.grad)
+
+    x = x_persistent.detach()
+    dx = x_persistent.grad.detach()
+    y = y_persistent.detach()
+
+    check_adjoint_test_tight(P_world, x, dx, y, dy)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+    P_y_base.deactivate()
+    P_y.deactivate()
@@ -335,3 +335,59 @@ def test_sum_reduce_dtype(barrier_fence_fixture,
     P_x.deactivate()
     P_y_base.deactivate()
     P_y.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_sum_reduce_compressed(barrier_fence_fixture,
+                               comm_split_fixture):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.sum_reduce import SumReduce
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # Create the partitions
+    P_y_base = P_world.create_partition_inclusive([0, 1])
+    P_y = P_y_base.create_cartesian_topology_partition([1, 2])
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 6))
+    P_x = P_x_base.create_cartesian_topology_partition([3, 2])
+
+    layer = SumReduce(P_x, P_y, preserve_batch=False)
+    layer_compressed = SumReduce(P_x, P_y, preserve_batch=False, comm_dtype=torch.bfloat16)
+
+    # Small integers, and their sums, are exact in bfloat16, so compression
+    # does not change the results
+    x = zero_volume_tensor()
+    dy = zero_volume_tensor()
+    if P_x.active:
+        x = torch.randint(-8, 8, (5, 7)).float()
+    if P_y.active:
+        dy = torch.randint(-8, 8, (5, 7)).float()
+
+    x_ref = x.clone().requires_grad_(True)
+    y_ref = layer(x_ref)
+    y_ref.backward(dy)
+
+    x_compressed = x.clone().requires_grad_(True)
+    y_compressed = layer_compressed(x_compressed)
+    y_compressed.backward(dy)
+
+    assert torch.equal(y_ref, y_compressed)
+    assert torch.equal(x_ref.grad, x_compressed.grad)
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_x.deactivate()
+    P_y_base.deactivate()
+    P_y.deactivate()
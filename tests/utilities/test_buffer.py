@@ -125,6 +125,73 @@ def test_buffer_management(barrier_fence_fixture,
         assert buffers[i] is buffer_manager.buffers_map[np.int32][i]
 
 
+@pytest.mark.parametrize("comm_split_fixture", [1], indirect=["comm_split_fixture"])
+def test_buffer_pool(barrier_fence_fixture,
+                     comm_split_fixture):
+
+    import gc
+
+    import numpy as np
+    import torch
+
+    from distdl.backends import backend
+    from distdl.config import set_backend
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+
+    buffer_pool = backend.BufferPool(max_bytes=1024)
+
+    # A leased array is held by any tensor wrapping it
+    x = torch.from_numpy(buffer_pool.request_array((3, 5), np.float32))
+    gc.collect()
+    buffer_pool.request_array((1,), np.int8)
+    assert buffer_pool.free_bytes == 0
+
+    # Once released, its storage is reused for an array of the same size class
+    storage = x.data_ptr()
+    del x
+    gc.collect()
+    y = buffer_pool.request_array((2, 7), np.float32)
+    assert y.ctypes.data == storage
+    assert y.shape == (2, 7)
+
+    # Arrays of a different dtype or size class get new storage
+    z = buffer_pool.request_array((2, 7), np.float64)
+    w = buffer_pool.request_array((17,), np.float32)
+    assert z.ctypes.data != storage
+    assert w.ctypes.data != storage
+
+    # Idle buffers beyond the limit are evicted, least recently used first
+    del y, z, w
+    gc.collect()
+    buffer_pool.request_array((1,), np.int8)
+    assert buffer_pool.free_bytes == 64 + 128 + 128
+
+    v = buffer_pool.request_array((100,), np.float64)
+    del v
+    gc.collect()
+    buffer_pool.request_array((1,), np.int8)
+    assert buffer_pool.free_bytes == 128 * 8
+
+    buffer_pool.trim()
+    assert buffer_pool.free_bytes == 0
+
+    # Above the fine volume, classes are quarter steps between powers of two
+    buffer_pool = backend.BufferPool(max_bytes=4096, fine_volume=64)
+    for volume, capacity in [(64, 64), (65, 80), (100, 112), (128, 128), (129, 160)]:
+        u = buffer_pool.request_array((volume,), np.int8)
+        del u
+        gc.collect()
+        buffer_pool.request_array((1,), np.int8)
+        assert buffer_pool.free_bytes == capacity
+        buffer_pool.trim()
+
+
 @pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
 def test_buffer_management_transpose_network(barrier_fence_fixture,
                                              comm_split_fixture):
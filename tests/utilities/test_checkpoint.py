@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+def _build_model(P_world, P_shape_x, P_shape_zero):
+
+    import torch
+
+    import distdl.nn as dnn
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(int(np.prod(P_shape_x))))
+    P_x = P_x_base.create_cartesian_topology_partition(P_shape_x)
+    P_z_base = P_world.create_partition_inclusive(np.arange(int(np.prod(P_shape_zero))))
+    P_z = P_z_base.create_cartesian_topology_partition(P_shape_zero)
+    P_x_base.deactivate()
+    P_z_base.deactivate()
+
+    model = torch.nn.ModuleDict({
+        "linear_rs": dnn.DistributedLinearReduceScatter(P_x, 10, 7, collect_state=True),
+        "linear_ag_zero": dnn.DistributedLinearAllGatherZero(P_z, 10, 7, collect_state=True),
+        "embedding": dnn.DistributedEmbedding(P_x, 11, 6, collect_state=True),
+        "layernorm": dnn.DistributedLayerNorm(P_x, (9,), collect_state=True),
+        "serial": torch.nn.Linear(3, 2),
+    })
+
+    return model, [P_x, P_z]
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_sharded_checkpoint_repartition(barrier_fence_fixture,
+                                        comm_split_fixture,
+                                        tmp_path):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.checkpoint import load_sharded_state_dict
+    from distdl.nn.checkpoint import save_sharded_state_dict
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # All workers share the directory of the root
+    path = base_comm.bcast(str(tmp_path), root=0)
+
+    # Save with one partitioning
+    torch.manual_seed(P_world.rank + 1)
+    model_a, partitions_a = _build_model(P_world, [1, 1, 4], [2, 1, 2])
+    with torch.no_grad():
+        for p in model_a.parameters():
+            p.uniform_()
+        model_a["serial"].weight.copy_(torch.arange(6.).reshape(2, 3))
+        model_a["serial"].bias.copy_(torch.arange(2.))
+    state_a = model_a.state_dict()
+    save_sharded_state_dict(model_a, path, P_world)
+
+    # Only the owners of each shard write it
+    files = base_comm.bcast(sorted(p.name for p in tmp_path.glob("*.npy")), root=0)
+    assert "serial.weight.0.npy" in files
+    assert "serial.weight.1.npy" not in files
+
+    # Load with another
+    torch.manual_seed(0)
+    model_b, partitions_b = _build_model(P_world, [1, 1, 2], [4, 1, 1])
+    load_sharded_state_dict(model_b, path, P_world)
+    state_b = model_b.state_dict()
+
+    # The collected global tensors match
+    assert set(state_a.keys()) == set(state_b.keys())
+    for key in state_a:
+        assert torch.equal(state_a[key], state_b[key]), key
+
+    # Missing tensors are detected
+    model_c = torch.nn.ModuleDict({"other": torch.nn.Linear(3, 2)})
+    with pytest.raises(ValueError):
+        load_sharded_state_dict(model_c, path, P_world)
+
+    for P in partitions_a + partitions_b:
+        P.deactivate()
+    P_world.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_sharded_checkpoint_overwrite(barrier_fence_fixture,
+                                      comm_split_fixture,
+                                      tmp_path):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.checkpoint import load_sharded_state_dict
+    from distdl.nn.checkpoint import save_sharded_state_dict
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    # All workers share the directory of the root
+    path = base_comm.bcast(str(tmp_path), root=0)
+
+    # A directory without a manifest is not a checkpoint
+    model, partitions = _build_model(P_world, [1, 1, 4], [2, 1, 2])
+    with pytest.raises(ValueError):
+        load_sharded_state_dict(model, path, P_world)
+
+    # Save with all workers, then overwrite with half of them, whose older
+    # index and shard files remain in the directory
+    save_sharded_state_dict(model, path, P_world)
+
+    P_half = P_world.create_partition_inclusive([0, 1])
+    if P_half.active:
+        torch.manual_seed(P_half.rank + 1)
+        model_half, partitions_half = _build_model(P_half, [1, 1, 2], [2, 1, 1])
+        with torch.no_grad():
+            for p in model_half.parameters():
+                p.uniform_()
+        save_sharded_state_dict(model_half, path, P_half)
+        state_half = model_half.state_dict()
+        for P in partitions_half:
+            P.deactivate()
+    base_comm.Barrier()
+
+    # Only the shards of the last checkpoint are loaded
+    load_sharded_state_dict(model, path, P_world)
+    state = model.state_dict()
+    mismatched = None
+    if P_world.rank == 0:
+        keys = set(state.keys()) | set(state_half.keys())
+        mismatched = sorted(key for key in keys if key not in state or key not in state_half or
+                            not torch.equal(state[key], state_half[key]))
+    assert base_comm.bcast(mismatched, root=0) == []
+
+    for P in partitions:
+        P.deactivate()
+    P_half.deactivate()
+    P_world.deactivate()
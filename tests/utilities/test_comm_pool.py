@@ -0,0 +1,82 @@
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_communicator_pool(barrier_fence_fixture,
+                           comm_split_fixture):
+
+    import numpy as np
+    from mpi4py import MPI
+
+    from distdl.backends.common.comm_pool import communicator_pool
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    n_pooled = len(communicator_pool)
+
+    # Identical partitions share their communicators
+    P_a_base = P_world.create_partition_inclusive(np.arange(0, 4))
+    P_a = P_a_base.create_cartesian_topology_partition([2, 2])
+    P_b_base = P_world.create_partition_inclusive(np.arange(0, 4))
+    P_b = P_b_base.create_cartesian_topology_partition([2, 2])
+
+    assert P_a_base._comm == P_b_base._comm
+    assert P_a._comm == P_b._comm
+    assert P_a == P_b
+
+    # A different topology or ordering of the same workers does not
+    P_c = P_a_base.create_cartesian_topology_partition([4, 1])
+    P_d = P_world.create_partition_inclusive(np.arange(3, -1, -1))
+    assert P_c._comm != P_a._comm
+    assert P_d._comm != P_a_base._comm
+
+    # Sub-partitions are shared too
+    P_a_row = P_a.create_allreduction_partition([1])
+    P_b_row = P_b.create_allreduction_partition([1])
+    assert P_a_row._comm == P_b_row._comm
+
+    # Communicators leaked by earlier users may already be in the pool
+    assert len(communicator_pool) <= n_pooled + 5
+
+    # Releasing one user leaves the communicator usable by the others
+    P_a_row.deactivate()
+    P_a.deactivate()
+    P_a_base.deactivate()
+    assert not P_a.active
+    assert P_b.active
+
+    total = P_b_row._comm.allreduce(1, op=MPI.SUM)
+    assert total == 2
+    total = P_b._comm.allreduce(1, op=MPI.SUM)
+    assert total == 4
+
+    # The last user frees it
+    P_b_row.deactivate()
+    P_b.deactivate()
+    P_b_base.deactivate()
+    P_c.deactivate()
+    P_d.deactivate()
+    assert len(communicator_pool) == n_pooled
+
+    # Workers outside of a partition get a null partition from it, without
+    # touching the pool
+    P_e = P_world.create_partition_inclusive(np.arange(0, 2))
+    P_f = P_e.create_partition_inclusive(np.arange(0, 1))
+    assert P_e.active == (P_world.rank < 2)
+    assert P_f.active == (P_world.rank == 0)
+    P_f.deactivate()
+    P_e.deactivate()
+    assert len(communicator_pool) == n_pooled
+
+    P_world.deactivate()
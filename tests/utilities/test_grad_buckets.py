@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+def _build_model(P_x, P_n, comm_dtype):
+
+    import torch
+
+    import distdl.nn as dnn
+
+    dnn.init.manual_seed(1234)
+    model = torch.nn.ModuleDict({
+        "linear_ag_0": dnn.DistributedLinearAllGatherZero(P_x, 10, 7, auto_clear_buffer=False, comm_dtype=comm_dtype),
+        "linear_ag_1": dnn.DistributedLinearAllGatherZero(P_x, 10, 5, auto_clear_buffer=False, comm_dtype=comm_dtype),
+        "linear_rs": dnn.DistributedLinearReduceScatterZero(P_x, 10, 9, auto_clear_buffer=False, comm_dtype=comm_dtype),
+        "rmsnorm": dnn.DistributedRMSNormZero(P_n, (10,), bias=True, auto_clear_buffer=False, comm_dtype=comm_dtype),
+    })
+    dnn.init.manual_seed(None)
+
+    # The affine parameters are not initialized randomly
+    with torch.no_grad():
+        model["rmsnorm"].weight.uniform_()
+        model["rmsnorm"].bias.uniform_()
+
+    return model
+
+
+def _backward(model, P_x, P_n, x_global_shape):
+
+    import torch
+
+    from distdl.utilities.slicing import compute_subshape
+
+    loss = 0
+    for name, layer in model.items():
+        P = P_n if name == "rmsnorm" else P_x
+        x_local_shape = compute_subshape(P.shape, P.index, x_global_shape)
+        x = torch.randn(*x_local_shape)
+        y = layer(x)
+        loss = loss + (y * torch.randn(*y.shape)).sum()
+    loss.backward()
+
+
+@pytest.mark.parametrize("bucket_size, comm_dtype", [(64, None), (2**20, None), (64, "bfloat16")])
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_zero_gradient_buckets(barrier_fence_fixture,
+                               comm_split_fixture,
+                               bucket_size, comm_dtype):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.grad_buckets import ZeroGradientBuckets
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(4))
+    P_x = P_x_base.create_cartesian_topology_partition([2, 1, 2])
+    P_n = P_x_base.create_cartesian_topology_partition([4, 1, 1])
+
+    x_global_shape = np.array([4, 3, 10])
+    if comm_dtype is not None:
+        comm_dtype = getattr(torch, comm_dtype)
+
+    # Reference: each layer reduce-scatters its own gradients
+    model_a = _build_model(P_x, P_n, comm_dtype)
+    for step in range(2):
+        torch.manual_seed(P_world.rank + step)
+        _backward(model_a, P_x, P_n, x_global_shape)
+    for layer in model_a.values():
+        layer.clear_weight_buffer()
+
+    # Bucketed, with the last backward pass overlapped with the reductions
+    model_b = _build_model(P_x, P_n, comm_dtype)
+    buckets = ZeroGradientBuckets(model_b, bucket_size=bucket_size)
+    for step in range(2):
+        torch.manual_seed(P_world.rank + step)
+        if step == 1:
+            buckets.arm()
+        _backward(model_b, P_x, P_n, x_global_shape)
+
+    # All buckets were started during the last backward pass
+    assert all(bucket.work is not None for bucket in buckets.buckets)
+    buckets.reduce()
+
+    for (name, a), b in zip(model_a.named_parameters(), model_b.parameters()):
+        assert b.grad is not None, name
+        assert torch.allclose(a.grad, b.grad), name
+
+    # The weight buffers are cleared
+    for layer in model_b.values():
+        assert layer.weight_buffer is None
+
+    # Large buckets pack the gradients of several layers
+    if bucket_size > 2**10:
+        assert len(buckets.buckets) < sum(len(bucket.entries) for bucket in buckets.buckets)
+
+    P_n.deactivate()
+    P_x.deactivate()
+    P_x_base.deactivate()
+    P_world.deactivate()
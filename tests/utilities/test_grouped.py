@@ -0,0 +1,38 @@
+import pytest
+import torch
+
+from distdl.functional.grouped import grouped_linear
+
+
+@pytest.mark.parametrize("bias", [False, True])
+def test_grouped_linear(bias):
+
+    torch.manual_seed(0)
+
+    # Groups of different sizes, including an empty one
+    counts = (3, 0, 1, 4)
+    x = torch.randn(sum(counts), 2, 5, dtype=torch.float64, requires_grad=True)
+    weight = torch.randn(len(counts), 6, 5, dtype=torch.float64, requires_grad=True)
+    b = torch.randn(len(counts), 1, 6, dtype=torch.float64, requires_grad=True) if bias else None
+
+    y = grouped_linear(x, weight, counts, b)
+
+    group = torch.repeat_interleave(torch.arange(len(counts)), torch.tensor(counts))
+    y_ref = torch.einsum('tsm,tnm->tsn', x, weight[group])
+    if bias:
+        y_ref = y_ref + b[group]
+    assert torch.allclose(y, y_ref)
+
+    inputs = (x, weight, b) if bias else (x, weight)
+    assert torch.autograd.gradcheck(lambda *args: grouped_linear(args[0], args[1], counts, *args[2:]), inputs)
+
+
+def test_grouped_linear_counts():
+
+    x = torch.randn(4, 5)
+    weight = torch.randn(2, 3, 5)
+
+    with pytest.raises(ValueError):
+        grouped_linear(x, weight, (1, 2))
+    with pytest.raises(ValueError):
+        grouped_linear(x, weight, (1, 1, 2))
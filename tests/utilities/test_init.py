@@ -0,0 +1,93 @@
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("init_name", ["uniform_", "normal_"])
+def test_counter_init_is_partition_invariant(init_name):
+
+    import torch
+
+    import distdl.nn.init as init
+
+    init_ = getattr(init, init_name)
+    global_shape = (7, 5, 3)
+
+    x = torch.empty(global_shape, dtype=torch.float64)
+    init_(x, seed=1234)
+
+    # Any shard, filled on its own, matches the same region of the global tensor
+    for start, stop in [((0, 0, 0), (7, 5, 3)), ((2, 1, 0), (5, 4, 3)), ((6, 4, 2), (7, 5, 3))]:
+        shape = [b - a for a, b in zip(start, stop)]
+        x_local = torch.empty(shape, dtype=torch.float64)
+        init_(x_local, global_shape=global_shape, start_index=start, seed=1234)
+        region = tuple(slice(a, b) for a, b in zip(start, stop))
+        assert torch.equal(x_local, x[region])
+
+    # Different seeds give different values
+    y = torch.empty(global_shape, dtype=torch.float64)
+    init_(y, seed=1235)
+    assert not torch.equal(x, y)
+
+
+def test_manual_seed():
+
+    import distdl.nn.init as init
+
+    init.manual_seed(None)
+    assert init.next_seed() is None
+
+    init.manual_seed(0)
+    seeds = [init.next_seed() for _ in range(4)]
+    assert len(set(seeds)) == 4
+
+    init.manual_seed(0)
+    assert [init.next_seed() for _ in range(4)] == seeds
+
+    init.manual_seed(None)
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_kaiming_uniform_without_collectives(barrier_fence_fixture,
+                                             comm_split_fixture):
+
+    import numpy as np
+    import torch
+
+    import distdl.nn.init as init
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.utilities.slicing import compute_start_index
+    from distdl.utilities.slicing import compute_subshape
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    global_shape = np.array([9, 6, 5])
+
+    # The serial reference
+    x = torch.empty(tuple(global_shape))
+    init.kaiming_uniform_(None, x, global_shape=global_shape, start_index=[0, 0, 0], seed=42)
+
+    # Each worker fills its own shard, for two different partitionings
+    for P_shape in [[4, 1, 1], [2, 2, 1]]:
+        P_x_base = P_world.create_partition_inclusive(np.arange(4))
+        P_x = P_x_base.create_cartesian_topology_partition(P_shape)
+
+        x_local = torch.empty(tuple(compute_subshape(P_x.shape, P_x.index, global_shape)))
+        init.kaiming_uniform_(P_x, x_local, global_shape=global_shape, seed=42)
+
+        start = compute_start_index(P_x.shape, P_x.index, global_shape)
+        region = tuple(slice(a, a + n) for a, n in zip(start, x_local.shape))
+        assert torch.equal(x_local, x[region])
+
+        P_x_base.deactivate()
+        P_x.deactivate()
+
+    P_world.deactivate()
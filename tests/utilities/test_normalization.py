@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+import torch
+
+from distdl.functional.normalization import distributed_layer_norm
+from distdl.functional.normalization import distributed_rms_norm
+
+
+def identity_allreduce(x):
+    return x
+
+
+def thread_allreduces(num_workers):
+    r"""Returns one sum-all-reduction per worker, for workers simulated by
+    threads.  The contributions are summed in worker order."""
+
+    barrier = Barrier(num_workers, timeout=30)
+    slots = [None] * num_workers
+
+    def allreduce(worker_index, x):
+        slots[worker_index] = x
+        barrier.wait()
+        total = sum(slots[1:], slots[0])
+        barrier.wait()
+        return total
+
+    return [lambda x, w=w: allreduce(w, x) for w in range(num_workers)]
+
+
+@pytest.mark.parametrize("affine", [False, True])
+def test_distributed_layer_norm(affine):
+
+    torch.manual_seed(0)
+
+    x = torch.randn(3, 4, 5, dtype=torch.float64, requires_grad=True)
+    weight = bias = None
+    if affine:
+        weight = torch.randn(1, 4, 5, dtype=torch.float64, requires_grad=True)
+        bias = torch.randn(1, 4, 5, dtype=torch.float64, requires_grad=True)
+
+    y = distributed_layer_norm(x, (4, 5), weight, bias, allreduce=identity_allreduce)
+    y_ref = torch.nn.functional.layer_norm(x, (4, 5),
+                                           weight.reshape(4, 5) if affine else None,
+                                           bias.reshape(4, 5) if affine else None)
+    assert torch.allclose(y, y_ref)
+
+    inputs = (x, weight, bias) if affine else (x,)
+    assert torch.autograd.gradcheck(
+        lambda *args: distributed_layer_norm(args[0], (4, 5), *args[1:], allreduce=identity_allreduce),
+        inputs)
+
+
+@pytest.mark.parametrize("affine", [False, True])
+def test_distributed_rms_norm(affine):
+
+    torch.manual_seed(0)
+
+    x = torch.randn(3, 4, 5, dtype=torch.float64, requires_grad=True)
+    weight = None
+    if affine:
+        weight = torch.randn(1, 1, 5, dtype=torch.float64, requires_grad=True)
+
+    y = distributed_rms_norm(x, (5,), weight, eps=1e-5)
+    y_ref = x * torch.rsqrt(x.pow(2).mean(-1, keepdim=True) + 1e-5)
+    if affine:
+        y_ref = weight * y_ref
+    assert torch.allclose(y, y_ref)
+
+    inputs = (x, weight) if affine else (x,)
+    assert torch.autograd.gradcheck(lambda *args: distributed_rms_norm(args[0], (5,), *args[1:]), inputs)
+
+
+def test_distributed_layer_norm_large_mean():
+
+    torch.manual_seed(0)
+
+    # The mean is much larger than the standard deviation
+    x = 1e4 + torch.randn(3, 64, dtype=torch.float64)
+
+    y = distributed_layer_norm(x.float(), (64,), allreduce=identity_allreduce)
+    y_ref = torch.nn.functional.layer_norm(x, (64,))
+    assert torch.allclose(y.double(), y_ref, atol=1e-2)
+
+
+@pytest.mark.parametrize("large_mean", [False, True])
+def test_distributed_layer_norm_uneven_workers(large_mean):
+
+    torch.manual_seed(0)
+
+    # The normalized dimension is split into unbalanced chunks, one of them
+    # empty, each normalized by its own worker
+    sizes = [40, 0, 17, 7]
+    num_workers = len(sizes)
+
+    x = torch.randn(3, 64, dtype=torch.float64)
+    if large_mean:
+        # The mean is much larger than the standard deviation
+        x = 1e4 + x
+    dtype = torch.float32 if large_mean else torch.float64
+    weight = torch.randn(1, 64, dtype=torch.float64)
+    bias = torch.randn(1, 64, dtype=torch.float64)
+    dy = torch.randn(3, 64, dtype=torch.float64)
+
+    allreduces = thread_allreduces(num_workers)
+
+    def worker(w, x, weight, bias, dy):
+        x = x.to(dtype).requires_grad_(True)
+        weight = weight.to(dtype).requires_grad_(True)
+        bias = bias.to(dtype).requires_grad_(True)
+        y = distributed_layer_norm(x, (64,), weight, bias, allreduce=allreduces[w],
+                                   num_workers=num_workers, worker_index=w)
+        y.backward(dy.to(dtype))
+        return y.detach(), x.grad, weight.grad, bias.grad
+
+    chunks = zip(range(num_workers), *(t.split(sizes, dim=-1) for t in (x, weight, bias, dy)))
+    with ThreadPoolExecutor(num_workers) as executor:
+        futures = [executor.submit(worker, *args) for args in chunks]
+        results = [torch.cat(r, dim=-1).double() for r in zip(*(f.result() for f in futures))]
+
+    x_ref = x.clone().requires_grad_(True)
+    weight_ref = weight.clone().requires_grad_(True)
+    bias_ref = bias.clone().requires_grad_(True)
+    y_ref = torch.nn.functional.layer_norm(x_ref, (64,), weight_ref.reshape(64), bias_ref.reshape(64))
+    y_ref.backward(dy)
+
+    atol = 1e-2 if large_mean else 1e-8
+    for result, ref in zip(results, (y_ref, x_ref.grad, weight_ref.grad, bias_ref.grad)):
+        assert torch.allclose(result, ref, atol=atol)
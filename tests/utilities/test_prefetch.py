@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+def _build_model(P_y, n_layers, n_features):
+
+    import torch
+
+    import distdl.nn as dnn
+
+    dnn.init.manual_seed(1234)
+    model = torch.nn.Sequential(*[dnn.DistributedLinearAllGatherZero(P_y, n_features, n_features)
+                                  for _ in range(n_layers)])
+    dnn.init.manual_seed(None)
+
+    return model
+
+
+def _run(model, P_y, x_global_shape, n_iterations):
+
+    import torch
+
+    from distdl.utilities.slicing import compute_subshape
+
+    outputs = list()
+    for step in range(n_iterations):
+        torch.manual_seed(P_y.rank + step)
+        x = torch.randn(*compute_subshape(P_y.shape, P_y.index, x_global_shape))
+        y = model(x)
+        y.sum().backward()
+        outputs.append(y.detach())
+
+    return outputs
+
+
+@pytest.mark.parametrize("depth, max_bytes", [(1, None), (2, None), (2, 1)])
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_weight_prefetcher(barrier_fence_fixture,
+                           comm_split_fixture,
+                           depth, max_bytes):
+
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.nn.prefetch import WeightPrefetcher
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_y_base = P_world.create_partition_inclusive(np.arange(4))
+    P_y = P_y_base.create_cartesian_topology_partition([1, 1, 4])
+
+    n_layers = 4
+    x_global_shape = np.array([2, 3, 8])
+
+    # Reference, without prefetching
+    model_a = _build_model(P_y, n_layers, 8)
+    outputs_a = _run(model_a, P_y, x_global_shape, 3)
+
+    model_b = _build_model(P_y, n_layers, 8)
+    prefetcher = WeightPrefetcher(model_b, depth=depth, max_bytes=max_bytes, P_world=P_world)
+
+    # While the first layer runs, the next layers are being prefetched
+    prefetched = list()
+    model_b[0].register_forward_pre_hook(
+        lambda layer, input: prefetched.append([m.weight_work is not None for m in model_b[1:]]))
+
+    outputs_b = _run(model_b, P_y, x_global_shape, 3)
+
+    assert prefetcher.order == list(model_b)
+    if max_bytes is None:
+        assert prefetched[1:] == [[True] * depth + [False] * (n_layers - 1 - depth)] * 2
+    else:
+        assert prefetched[1:] == [[False] * (n_layers - 1)] * 2
+
+    # Prefetching does not change the results
+    for y_a, y_b in zip(outputs_a, outputs_b):
+        assert torch.equal(y_a, y_b)
+    for a, b in zip(model_a.parameters(), model_b.parameters()):
+        assert torch.equal(a.grad, b.grad)
+
+    prefetcher.remove()
+
+    P_y.deactivate()
+    P_y_base.deactivate()
+    P_world.deactivate()
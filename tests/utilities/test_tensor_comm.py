@@ -0,0 +1,174 @@
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("comm_split_fixture", [6], indirect=["comm_split_fixture"])
+def test_assemble_global_tensor_structure(barrier_fence_fixture,
+                                          comm_split_fixture):
+
+    import numpy as np
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.backends.common.tensor_comm import assemble_global_tensor_structure
+    from distdl.backends.common.tensor_comm import assemble_global_tensor_structure_along_axis
+    from distdl.config import set_backend
+    from distdl.utilities.torch import TensorStructure
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive(np.arange(0, 4))
+    P_x = P_x_base.create_cartesian_topology_partition([2, 2])
+
+    P_out = P_world.create_partition_inclusive(np.arange(0, 6))
+
+    # Unbalanced local shapes: each worker's extent depends on its index
+    x = zero_volume_tensor(dtype=torch.float64)
+    if P_x.active:
+        x = torch.zeros(3 + P_x.index[0], 5 + 2*P_x.index[1], dtype=torch.float64)
+    x.requires_grad = True
+
+    structure = assemble_global_tensor_structure(TensorStructure(x), P_x, P_out)
+
+    if P_out.active:
+        assert np.all(structure.shape == [7, 12])
+        assert structure.dtype == torch.float64
+        assert structure.requires_grad
+
+    if P_x.active:
+        # Repeated assembly along an axis reuses the same sub-partition
+        structure = assemble_global_tensor_structure_along_axis(TensorStructure(x), P_x, [1])
+        assert tuple(structure.shape) == (3 + P_x.index[0], 12)
+
+        P_sub = P_x.cached_cartesian_subtopology_partition([False, True])
+        assert P_sub is P_x.cached_cartesian_subtopology_partition([False, True])
+        assert P_sub.active
+
+        P_x.deactivate()
+        assert not P_sub.active
+    else:
+        P_x.deactivate()
+
+    P_world.deactivate()
+    P_x_base.deactivate()
+    P_out.deactivate()
+
+
+def test_pack_metadata():
+
+    import pytest
+
+    from distdl.backends.common.metadata import pack_metadata
+    from distdl.backends.common.metadata import packed_metadata_capacity
+    from distdl.backends.common.metadata import packed_metadata_size
+    from distdl.backends.common.metadata import unpack_metadata
+
+    header = pack_metadata(7, [3, 0, 5], True)
+    assert len(header) == packed_metadata_size()
+    assert unpack_metadata(header) == (7, True, (3, 0, 5))
+
+    # Scalars have an empty shape
+    assert unpack_metadata(pack_metadata(2, [])) == (2, False, ())
+
+    with pytest.raises(ValueError):
+        pack_metadata(7, [1] * (packed_metadata_capacity + 1))
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_broadcast_data(barrier_fence_fixture,
+                        comm_split_fixture):
+
+    import numpy as np
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_data = P_world.create_partition_inclusive(np.arange(2, 4))
+
+    # Small data travels with its description
+    data = None
+    if P_data.active:
+        data = np.array([[P_data.rank, 5, 6]], dtype=np.int32)
+    out = P_world.broadcast_data(data, root=1, P_data=P_data)
+    assert out.dtype == np.int32
+    assert np.all(out == [[1, 5, 6]])
+
+    # Large data requires a second message
+    data = None
+    if P_world.rank == 0:
+        data = np.arange(100, dtype=np.float64).reshape(10, 10)
+    out = P_world.broadcast_data(data, root=0)
+    assert out.dtype == np.float64
+    assert np.all(out == np.arange(100).reshape(10, 10))
+
+    # Scalars are promoted to arrays
+    out = P_world.broadcast_data(3.5 if P_world.rank == 2 else None, root=2)
+    assert out.shape == (1,)
+    assert out[0] == 3.5
+
+    # All workers detect the missing root
+    with pytest.raises(ValueError):
+        P_world.broadcast_data(None, root=2, P_data=P_data)
+
+    P_data.deactivate()
+    P_world.deactivate()
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_broadcast_tensor_structure(barrier_fence_fixture,
+                                    comm_split_fixture):
+
+    import numpy as np
+    import torch
+
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.backends.common.tensor_comm import broadcast_tensor_structure
+    from distdl.config import set_backend
+    from distdl.utilities.torch import TensorStructure
+    from distdl.utilities.torch import zero_volume_tensor
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_x_base = P_world.create_partition_inclusive([0])
+    P_x = P_x_base.create_cartesian_topology_partition([1, 1, 1])
+    P_y_base = P_world.create_partition_inclusive(np.arange(0, 4))
+    P_y = P_y_base.create_cartesian_topology_partition([2, 1, 2])
+
+    P_send, P_recv = P_x.create_broadcast_partition_to(P_y)
+
+    x = zero_volume_tensor(dtype=torch.float32)
+    if P_x.active:
+        x = torch.zeros(3, 4, 5, dtype=torch.float32, requires_grad=True)
+
+    structure = broadcast_tensor_structure(TensorStructure(x), P_send, P_recv)
+
+    if P_y.active:
+        assert tuple(structure.shape) == (3, 4, 5)
+        assert structure.dtype == torch.float32
+        assert structure.requires_grad
+
+    for P in [P_send, P_recv, P_x, P_x_base, P_y, P_y_base, P_world]:
+        P.deactivate()
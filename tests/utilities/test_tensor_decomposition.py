@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from distdl.utilities.slicing import range_index
+from distdl.utilities.tensor_decomposition import compute_balanced_subtensor_overlaps
+from distdl.utilities.tensor_decomposition import compute_subtensor_intersection_slice
+from distdl.utilities.tensor_decomposition import compute_subtensor_overlaps
+from distdl.utilities.tensor_decomposition import compute_subtensor_shapes_balanced
+from distdl.utilities.tensor_decomposition import compute_subtensor_start_indices
+from distdl.utilities.tensor_decomposition import compute_subtensor_stop_indices
+from distdl.utilities.torch import TensorStructure
+
+overlap_parametrizations = []
+
+overlap_parametrizations.append(
+    pytest.param(
+        [4, 1], [3, 4],  # P_x_shape, P_y_shape
+        [77, 55],  # x_global_shape
+        id="2d-overlap",
+    )
+)
+
+overlap_parametrizations.append(
+    pytest.param(
+        [1, 1], [3, 4],  # P_x_shape, P_y_shape
+        [77, 55],  # x_global_shape
+        id="2d-scatter",
+    )
+)
+
+overlap_parametrizations.append(
+    pytest.param(
+        [2, 3, 2], [3, 2, 5],  # P_x_shape, P_y_shape
+        [17, 7, 4],  # x_global_shape
+        id="3d-empty-subtensors",
+    )
+)
+
+
+def brute_force_overlaps(x_start_index, x_stop_index,
+                         y_start_indices, y_stop_indices, P_y_shape):
+
+    overlaps = []
+    for P_y_index in range_index(P_y_shape):
+        y_start_index = y_start_indices[P_y_index]
+        y_stop_index = y_stop_indices[P_y_index]
+        sl = compute_subtensor_intersection_slice(x_start_index, x_stop_index,
+                                                  y_start_index, y_stop_index)
+        if sl is not None:
+            overlaps.append((np.asarray(P_y_index), sl))
+
+    return overlaps
+
+
+@pytest.mark.parametrize("P_x_shape, P_y_shape, x_global_shape",
+                         overlap_parametrizations)
+def test_subtensor_overlaps(P_x_shape, P_y_shape, x_global_shape):
+
+    structure = TensorStructure()
+    structure.shape = np.asarray(x_global_shape)
+
+    x_shapes = compute_subtensor_shapes_balanced(structure, P_x_shape)
+    x_start_indices = compute_subtensor_start_indices(x_shapes)
+    x_stop_indices = compute_subtensor_stop_indices(x_shapes)
+
+    y_shapes = compute_subtensor_shapes_balanced(structure, P_y_shape)
+    y_start_indices = compute_subtensor_start_indices(y_shapes)
+    y_stop_indices = compute_subtensor_stop_indices(y_shapes)
+
+    for P_x_index in range_index(P_x_shape):
+        x_start_index = x_start_indices[P_x_index]
+        x_stop_index = x_stop_indices[P_x_index]
+
+        expected = brute_force_overlaps(x_start_index, x_stop_index,
+                                        y_start_indices, y_stop_indices, P_y_shape)
+
+        general = compute_subtensor_overlaps(x_start_index, x_stop_index,
+                                             y_start_indices, y_stop_indices)
+        balanced = compute_balanced_subtensor_overlaps(x_start_index, x_stop_index,
+                                                       x_global_shape, P_y_shape)
+
+        for overlaps in [general, balanced]:
+            assert len(overlaps) == len(expected)
+            for (index, sl), (expected_index, expected_sl) in zip(overlaps, expected):
+                assert np.all(index == expected_index)
+                assert sl == expected_sl
@@ -0,0 +1,35 @@
+import numpy as np
+import torch
+
+from distdl.utilities.torch import from_numpy
+from distdl.utilities.torch import to_numpy
+
+
+def test_to_numpy_shares_contiguous_memory():
+
+    x = torch.randn(5, 7, requires_grad=True)
+    x_numpy = to_numpy(x)
+
+    assert np.shares_memory(x_numpy, x.detach().numpy())
+    assert x_numpy.flags.c_contiguous
+
+
+def test_to_numpy_copies_non_contiguous():
+
+    x = torch.randn(5, 7)
+    x_t = x.t()
+    x_numpy = to_numpy(x_t)
+
+    assert not np.shares_memory(x_numpy, x.numpy())
+    assert x_numpy.flags.c_contiguous
+    assert np.all(x_numpy == x_t.numpy())
+
+
+def test_from_numpy_shares_memory():
+
+    a = np.random.randn(5, 7)
+    x = from_numpy(a, requires_grad=True, device=torch.device("cpu"))
+
+    assert np.shares_memory(a, x.detach().numpy())
+    assert x.requires_grad
+    assert x.dtype == torch.float64
@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+BACKEND_COMM = "mpi"
+BACKEND_ARRAY = "numpy"
+
+
+@pytest.mark.parametrize("comm_split_fixture", [4], indirect=["comm_split_fixture"])
+def test_tracer(barrier_fence_fixture,
+                comm_split_fixture):
+
+    import torch
+
+    import distdl.nn as dnn
+    from distdl.backends.common.partition import MPIPartition
+    from distdl.config import set_backend
+    from distdl.utilities import tracer
+    from distdl.utilities.slicing import compute_subshape
+
+    set_backend(backend_comm=BACKEND_COMM, backend_array=BACKEND_ARRAY)
+
+    # Isolate the minimum needed ranks
+    base_comm, active = comm_split_fixture
+    if not active:
+        return
+    P_world = MPIPartition(base_comm)
+
+    P_y_base = P_world.create_partition_inclusive(np.arange(4))
+    P_y = P_y_base.create_cartesian_topology_partition([4, 1, 1])
+
+    model = torch.nn.Sequential(dnn.DistributedLinearAllGatherZero(P_y, 8, 8),
+                                dnn.DistributedLinearAllGatherZero(P_y, 8, 8))
+    x = torch.randn(*compute_subshape(P_y.shape, P_y.index, [4, 3, 8]))
+
+    # Nothing is recorded while tracing is disabled
+    model(x).sum().backward()
+    assert not tracer.is_enabled()
+    assert tracer.events() == []
+
+    tracer.enable(model, P_world)
+    model(x).sum().backward()
+    tracer.disable()
+
+    events = tracer.events()
+    names = {(event["name"], event["cat"]) for event in events}
+    for layer in ("0", "1"):
+        assert (f"{layer}.allgather_weight", "forward") in names
+        assert (f"{layer}.allgather_weight", "backward") in names
+
+    for event in events:
+        assert event["ph"] == "X"
+        assert event["pid"] == P_world._comm.Get_rank()
+        assert event["dur"] >= 0
+        args = event["args"]
+        assert args["bytes_sent"] > 0
+        assert args["bytes_received"] > 0
+        assert args["pack_us"] + args["wait_us"] + args["unpack_us"] <= event["dur"]
+
+    weight = [event for event in events if event["name"] == "0.allgather_weight" and event["cat"] == "forward"][0]
+    assert weight["args"]["primitive"] == "all_gather"
+    assert weight["args"]["partitions"] == {"P_x": [4, 1, 1]}
+    assert weight["args"]["bytes_received"] == 4 * weight["args"]["bytes_sent"]
+
+    # Asynchronous calls are attributed to the traced call that started them
+    all_gather = dnn.AllGather(P_y, axes_all_gather=(0,))
+    tracer.enable(all_gather, P_world)
+    work = all_gather(x, async_op=True)
+    assert work._span is not None and work._span.primitive == "all_gather"
+    work.wait()
+    tracer.disable()
+
+    async_events = tracer.events()
+    assert len(async_events) == 1
+    assert async_events[0]["args"]["primitive"] == "all_gather"
+    assert async_events[0]["args"]["bytes_received"] > 0
+
+    tracer.enable(model, P_world)
+    model(x).sum().backward()
+    tracer.disable()
+
+    # Merge the traces of all workers
+    directory = base_comm.bcast(tempfile.mkdtemp() if base_comm.Get_rank() == 0 else None, root=0)
+    tracer.export_chrome_trace(os.path.join(directory, "trace.{rank}.json"))
+    base_comm.Barrier()
+
+    if base_comm.Get_rank() == 0:
+        paths = [os.path.join(directory, f"trace.{rank}.json") for rank in range(P_world.size)]
+        report = tracer.merge_chrome_traces(paths, os.path.join(directory, "trace.json"), threshold=1.0)
+
+        assert sorted(report["workers"]) == list(range(P_world.size))
+        assert len(report["calls"]) > 0
+        for call in report["calls"]:
+            assert call["imbalance"] >= 1.0
+            assert call["straggler"] in report["workers"]
+
+        with open(os.path.join(directory, "trace.json")) as f:
+            merged = json.load(f)
+        assert len(merged["traceEvents"]) == P_world.size * len(events)
+
+        shutil.rmtree(directory)
+
+    tracer.reset()
+
+    P_y.deactivate()
+    P_y_base.deactivate()
+    P_world.deactivate()